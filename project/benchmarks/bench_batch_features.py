@@ -0,0 +1,48 @@
+"""
+bench_batch_features.py
+-----------------------
+วัดเวลาสร้างฟีเจอร์หลาย symbol เทียบกับจำนวน process
+(ข้อมูลจำลอง M15 ~1 ปีต่อ symbol, ไม่ใช้ FeatureStore)
+
+รัน: python -m project.benchmarks.bench_batch_features [n_symbols] [n_bars]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from project.benchmarks.bench_utils import make_ohlcv
+from project.features.batch_features import generate_features_batch
+
+
+def main(n_symbols: int, n_bars: int):
+    root = tempfile.mkdtemp(prefix="batch_features_")
+    try:
+        sources = {}
+        for i in range(n_symbols):
+            path = os.path.join(root, f"SYM{i:02d}_M15.csv")
+            make_ohlcv(n_bars, seed=i).to_csv(path, index=False)
+            sources[f"SYM{i:02d}"] = path
+
+        cores = os.cpu_count() or 1
+        workers = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+        print(f"symbols={n_symbols}, bars/symbol={n_bars}, cores={cores}")
+        print(f"{'workers':>8} | {'time (s)':>9} | speedup")
+        baseline = None
+        for w in workers:
+            start = time.perf_counter()
+            generate_features_batch(sources, max_workers=w)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{w:>8} | {elapsed:>9.3f} | {baseline / elapsed:.2f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 260 * 96,
+    )
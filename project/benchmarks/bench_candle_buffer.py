@@ -0,0 +1,60 @@
+"""
+bench_candle_buffer.py
+----------------------
+เปรียบเทียบการอัปเดตข้อมูล live แบบเดิม (pd.read_csv ทั้งไฟล์ทุกครั้ง)
+กับ CandleRingBuffer + read_csv_tail และวัดหน่วยความจำหลัง append จำนวนมาก
+
+รัน: python -m project.benchmarks.bench_candle_buffer [n_bars]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import pandas as pd
+
+from project.benchmarks.bench_utils import best_of, make_ohlcv
+from project.prediction.candle_buffer import CandleRingBuffer, read_csv_tail, required_history
+from project.utils.memory import MemoryProfiler
+
+
+def main(n_bars: int):
+    df = make_ohlcv(n_bars)
+    capacity = required_history()
+    root = tempfile.mkdtemp(prefix="candle_buffer_")
+    try:
+        path = os.path.join(root, "EURAUD_M15.csv")
+        df.to_csv(path, index=False)
+
+        t_full = best_of(lambda: pd.read_csv(path))
+        t_tail = best_of(lambda: read_csv_tail(path))
+        print(f"bars in file={n_bars}, capacity={capacity}")
+        print(f"  pd.read_csv (whole file)   : {t_full * 1e3:8.2f} ms/call")
+        print(f"  read_csv_tail (64 KB)      : {t_tail * 1e3:8.2f} ms/call")
+
+        records = df.to_dict("records")
+        buffer = CandleRingBuffer(capacity)
+        start = time.perf_counter()
+        for bar in records:
+            buffer.append(bar)
+        elapsed = time.perf_counter() - start
+
+        # หน่วยความจำที่ค้างหลัง append ทั้งไฟล์อีกรอบ (ควรคงที่ ไม่โตตามจำนวนแท่ง)
+        profiler = MemoryProfiler()
+        with profiler.stage("append"):
+            for bar in records:
+                buffer.append(bar)
+        t_frame = best_of(buffer.to_frame)
+
+        print(f"  append                     : {elapsed / n_bars * 1e6:8.2f} us/bar")
+        print(f"  to_frame ({capacity} rows)   : {t_frame * 1e3:8.2f} ms")
+        print(f"  buffer size {buffer.nbytes / 1e6:.2f} MB, retained after {n_bars} appends: "
+              f"{profiler.stages['append']['retained_mb']} MB")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 260 * 96)
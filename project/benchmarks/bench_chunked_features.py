@@ -0,0 +1,50 @@
+"""
+bench_chunked_features.py
+-------------------------
+เปรียบเทียบ peak memory และเวลา ระหว่างคำนวณฟีเจอร์ทั้งไฟล์ในหน่วยความจำ
+กับแบบ chunked (อ่าน/เขียนทีละบล็อก) บนข้อมูลจำลอง M1
+
+รัน: python -m project.benchmarks.bench_chunked_features [n_bars] [chunk_rows]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+import pandas as pd
+
+from project.benchmarks.bench_utils import make_ohlcv
+from project.features.chunked_features import generate_features_chunked
+from project.features.feature_graph import build_feature_graph
+from project.utils.memory import MemoryProfiler
+
+
+def main(n_bars: int, chunk_rows: int):
+    root = tempfile.mkdtemp(prefix="chunked_features_")
+    try:
+        source = os.path.join(root, "EURAUD_M1.csv")
+        make_ohlcv(n_bars, freq="1min").to_csv(source, index=False)
+
+        profiler = MemoryProfiler()
+        with profiler.stage("full (in-memory)"):
+            df = pd.read_csv(source, parse_dates=["datetime"], float_precision="round_trip")
+            build_feature_graph().compute(df).to_parquet(os.path.join(root, "full.parquet"))
+            del df
+
+        for rows in (chunk_rows, chunk_rows * 4):
+            with profiler.stage(f"chunked ({rows} rows)"):
+                generate_features_chunked(source, os.path.join(root, f"chunked_{rows}.parquet"),
+                                          chunk_rows=rows)
+
+        print(f"bars={n_bars}")
+        print(profiler.report()[["peak_mb", "seconds"]].to_string())
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+    )
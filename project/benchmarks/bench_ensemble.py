@@ -0,0 +1,60 @@
+"""
+bench_ensemble.py
+-----------------
+เวลา ModelSelector ensemble: hard voting ทีละโมเดล (แบบเดิม) เทียบกับ soft voting
+แบบทีละโมเดล / พร้อมกันบน thread pool ทั้ง batch และแถวเดียว (แบบ live)
+
+รัน: python -m project.benchmarks.bench_ensemble [n_rows] [n_trees]
+"""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from project.benchmarks.bench_utils import best_of
+from project.models.model_backends import get_backend
+from project.models.model_selector import ModelSelector
+
+
+def per_call(func, n_calls: int) -> float:
+    """เวลาเฉลี่ยต่อครั้ง (µs)"""
+    def loop():
+        for _ in range(n_calls):
+            func()
+    return best_of(loop, repeat=5) / n_calls * 1e6
+
+
+def main(n_rows: int, n_trees: int):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, 30)), columns=[f"f{i}" for i in range(30)])
+    y = (X["f0"] + 0.5 * X["f1"] * X["f2"] + rng.normal(size=n_rows) > 0).astype(int)
+
+    models = {
+        "xgboost": get_backend("xgboost").fit({"n_estimators": n_trees, "max_depth": 6}, X, y),
+        "lightgbm": get_backend("lightgbm").fit({"n_estimators": n_trees, "verbose": -1}, X, y),
+    }
+    if importlib.util.find_spec("tensorflow") is not None:
+        params = {"hidden_units": 32, "dropout": 0.0, "learning_rate": 0.001, "epochs": 1, "batch_size": 256}
+        models["lstm"] = get_backend("lstm").fit(params, X.to_numpy(np.float32), y.to_numpy())
+    selector = ModelSelector(models, {name: {} for name in models})
+    row = X.tail(1)
+    print(f"rows={n_rows} trees={n_trees} models={list(models)} cpu={os.cpu_count()}")
+
+    scenarios = {
+        "hard, sequential (เดิม)": lambda data: selector.ensemble_predict(data, voting="hard"),
+        "soft, sequential": lambda data: selector.ensemble_predict_proba(data, parallel=False),
+        "soft, thread pool": lambda data: selector.ensemble_predict_proba(data, parallel=True),
+    }
+    print(f"{'mode':<24} | {'batch':>8} | {'1 row':>9}")
+    for label, func in scenarios.items():
+        batch = best_of(lambda: func(X))
+        single = per_call(lambda: func(row), 100)
+        print(f"{label:<24} | {batch:>7.3f}s | {single:>7.1f}µs")
+    selector.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, int(sys.argv[2]) if len(sys.argv) > 2 else 300)
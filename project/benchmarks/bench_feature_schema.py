@@ -0,0 +1,53 @@
+"""
+bench_feature_schema.py
+-----------------------
+เวลาเตรียมอินพุตโมเดลของ live 1 ครั้ง (buffer ขนาด required_history)
+- full: คำนวณทุกฟีเจอร์ + ทุก timeframe ใหญ่ แล้วเลือกคอลัมน์ของโมเดล
+- schema: compute_model_inputs คำนวณเฉพาะคอลัมน์ใน feature schema ของโมเดล
+
+รัน: python -m project.benchmarks.bench_feature_schema [n_columns ...]
+"""
+
+import sys
+
+from project.benchmarks.bench_utils import make_ohlcv, best_of
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_schema import build_feature_schema, compute_model_inputs
+from project.features.multi_timeframe import add_multi_timeframe_features
+from project.prediction.candle_buffer import required_history
+
+# คอลัมน์อินพุตตัวอย่าง เรียงตามความสำคัญ (ตัดตามจำนวนคอลัมน์ที่ทดสอบ)
+MODEL_COLUMNS = [
+    "rsi", "macd_diff", "atr", "h1_rsi", "return", "bb_width", "h4_macd_diff", "volatility",
+    "stoch_k", "d1_atr", "volume_spike", "fibo_retracement_0.618", "h1_atr", "candle_body",
+    "log_return", "h4_rsi", "stoch_d", "d1_rsi", "upper_shadow", "lower_shadow",
+]
+
+
+def main(sizes):
+    graph = build_feature_graph()
+    graph.max_workers = 1
+    df = make_ohlcv(required_history())
+
+    print(f"buffer = {len(df)} bars")
+    print(f"{'columns':>8} | {'full (ms)':>10} | {'schema (ms)':>11} | {'speedup':>8}")
+    for n_columns in sizes:
+        columns = MODEL_COLUMNS[:n_columns]
+        schema = build_feature_schema(columns, graph=graph)
+
+        def run_full():
+            full = add_multi_timeframe_features(graph.compute(df), base_timeframe="M15", graph=graph)
+            full["fibo_retracement_0.618"] = (full["fibo_touch_mask"].to_numpy() >> 3) & 1
+            return full.tail(1)[columns]
+
+        def run_schema():
+            return compute_model_inputs(df, schema, graph, base_timeframe="M15", tail=1)
+
+        t_full = best_of(run_full, repeat=20)
+        t_schema = best_of(run_schema, repeat=20)
+        print(f"{n_columns:>8} | {t_full * 1000:>10.2f} | {t_schema * 1000:>11.2f} | {t_full / t_schema:>7.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [3, 8, 20]
+    main(sizes)
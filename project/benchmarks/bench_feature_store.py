@@ -0,0 +1,57 @@
+"""
+bench_feature_store.py
+----------------------
+เปรียบเทียบเวลาคำนวณฟีเจอร์ใหม่ทั้งหมดกับการโหลดจาก FeatureStore
+ข้อมูลจำลอง M15 ย้อนหลัง 5 ปี (~125k แท่ง)
+
+รัน: python -m project.benchmarks.bench_feature_store [n_bars]
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+
+from project.benchmarks.bench_utils import make_ohlcv
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_store import FeatureStore
+
+
+def main(n_bars: int):
+    df = make_ohlcv(n_bars)
+    root = tempfile.mkdtemp(prefix="feature_store_")
+    try:
+        graph = build_feature_graph()
+
+        start = time.perf_counter()
+        graph.compute(df)
+        t_compute = time.perf_counter() - start
+
+        store = FeatureStore(root=root, namespace="bench", graph=graph)
+        start = time.perf_counter()
+        store.load_or_compute(df)
+        t_cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.load_or_compute(df)
+        t_warm = time.perf_counter() - start
+
+        # เพิ่มแท่งใหม่ 1 วัน -> ควรคำนวณใหม่แค่ partition ล่าสุด
+        df_more = make_ohlcv(n_bars + 96)
+        df_more.iloc[:n_bars] = df.to_numpy()
+        store.stats = {"hits": 0, "computed": 0}
+        start = time.perf_counter()
+        store.load_or_compute(df_more)
+        t_append = time.perf_counter() - start
+
+        print(f"bars={n_bars}")
+        print(f"  graph.compute (no store) : {t_compute:.3f}s")
+        print(f"  store cold (compute+write): {t_cold:.3f}s")
+        print(f"  store warm (reload only)  : {t_warm:.3f}s")
+        print(f"  store +1 day of bars      : {t_append:.3f}s  {store.stats}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 260 * 96)
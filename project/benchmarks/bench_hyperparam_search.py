@@ -0,0 +1,67 @@
+"""
+bench_hyperparam_search.py
+--------------------------
+เปรียบเทียบ random search ที่ train ทุกชุด params เต็ม max_resource rounds
+(สร้าง Dataset ใหม่ทุก trial แบบ LGBMClassifier.fit) กับ HyperparameterSearch (Hyperband + Dataset cache)
+ใช้ชุด params จำนวนเท่ากับ bracket แรกของ Hyperband
+
+รัน: python -m project.benchmarks.bench_hyperparam_search [n_rows] [n_features]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.metrics import log_loss
+
+from project.models.hyperparam_search import SEARCH_SPACES, HyperparameterSearch, sample_params
+from project.models.walk_forward import load_config, make_model
+
+SETTINGS = {"min_resource": 30, "max_resource": 810, "eta": 3, "early_stopping_rounds": 30, "seed": 0}
+
+
+def run_random_search(X, y, n_configs: int, split):
+    """แบบเดิม: fit โมเดล sklearn เต็ม max_resource rounds ทุกชุด params"""
+    _, params = load_config()
+    train_end, valid_start = split
+    rng = np.random.default_rng(SETTINGS["seed"])
+    best = np.inf
+    for _ in range(n_configs):
+        trial = {**params["lightgbm"], **sample_params(SEARCH_SPACES["lightgbm"], rng),
+                 "n_estimators": SETTINGS["max_resource"], "verbose": -1}
+        model = make_model("lightgbm", trial, n_jobs=os.cpu_count() or 1)
+        model.fit(X[:train_end], y[:train_end])
+        best = min(best, log_loss(y[valid_start:], model.predict_proba(X[valid_start:])[:, 1]))
+    return best
+
+
+def main(n_rows: int, n_features: int):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.normal(scale=1.0, size=n_rows) > 0).astype(int)
+    print(f"rows={n_rows} features={n_features} cpu={os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as root:
+        search = HyperparameterSearch("lightgbm", X, y, db_path=os.path.join(root, "trials.db"), max_workers=1,
+                                      **SETTINGS)
+        n_configs = search.brackets[0][1][0][0]
+
+        start = time.perf_counter()
+        score = run_random_search(X, y, n_configs, search.split)
+        print(f"{f'random search, {n_configs} x full':<32} {time.perf_counter() - start:>8.2f} s   logloss={score:.4f}")
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            search = HyperparameterSearch("lightgbm", X, y, db_path=os.path.join(root, "trials.db"),
+                                          study=f"bench_{workers}", max_workers=workers, **SETTINGS)
+            stats = search.run(time_budget=None)
+            print(f"{f'hyperband, {workers} worker(s)':<32} {stats['seconds']:>8.2f} s   "
+                  f"logloss={stats['best']['score']:.4f} trials={stats['trials_run']}")
+            search.close()
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_features = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    main(n_rows, n_features)
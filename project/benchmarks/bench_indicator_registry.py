@@ -0,0 +1,44 @@
+"""
+bench_indicator_registry.py
+---------------------------
+เวลาของแต่ละ indicator และเวลารวมของ feature graph เมื่อเปิดทุก indicator
+เทียบกับเปิดเฉพาะบางตัวผ่าน features.indicators
+
+รัน: python -m project.benchmarks.bench_indicator_registry [n_bars]
+"""
+
+import sys
+
+from project.benchmarks.bench_utils import make_ohlcv, best_of
+from project.features.feature_graph import build_feature_graph
+from project.features.indicator_registry import compute_indicators, enabled_indicators
+
+SUBSETS = {
+    "all": None,
+    "RSI + ATR": ["RSI", "ATR"],
+    "RSI": ["RSI"],
+}
+
+
+def main(n_bars: int):
+    df = make_ohlcv(n_bars)
+
+    timings = {}
+    compute_indicators(df["high"], df["low"], df["close"], enabled_indicators({"features": {}}), timings=timings)
+    print(f"per-indicator ({n_bars} bars)")
+    for name, seconds in timings.items():
+        print(f"  {name:<16} {seconds * 1000:>9.1f} ms")
+
+    print(f"\n{'indicators':<12} | {'indicator (s)':>13} | {'all features (s)':>16}")
+    for label, names in SUBSETS.items():
+        config = {"features": {} if names is None else {"indicators": names}}
+        graph = build_feature_graph(config)
+        graph.max_workers = 1
+        indicator_cols = graph.columns_for_branches(["indicators"])
+        t_indicators = best_of(lambda: graph.compute(df, columns=indicator_cols, include_input=False))
+        t_all = best_of(lambda: graph.compute(df, include_input=False))
+        print(f"{label:<12} | {t_indicators:>13.4f} | {t_all:>16.4f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
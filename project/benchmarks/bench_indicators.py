@@ -0,0 +1,46 @@
+"""
+bench_indicators.py
+-------------------
+เปรียบเทียบเวลา add_indicators แบบเดิม (ta) กับ NumPy kernels
+ที่ขนาดข้อมูล 5k, 100k และ 1M แท่ง
+
+รัน: python -m project.benchmarks.bench_indicators [n_bars ...]
+"""
+
+import sys
+import pandas as pd
+
+from project.benchmarks.bench_utils import make_ohlcv, best_of
+from project.features import indicator_kernels
+
+
+def run_ta(df: pd.DataFrame):
+    """indicator ชุดเดียวกันด้วย ta (แยก object ต่อ indicator แบบโค้ดเดิม)"""
+    import ta
+
+    ta.momentum.RSIIndicator(df["close"], window=14).rsi()
+    macd = ta.trend.MACD(df["close"])
+    macd.macd(), macd.macd_signal(), macd.macd_diff()
+    ta.volatility.AverageTrueRange(df["high"], df["low"], df["close"], window=14).average_true_range()
+    bb = ta.volatility.BollingerBands(df["close"], window=20, window_dev=2)
+    bb.bollinger_hband(), bb.bollinger_lband()
+    stoch = ta.momentum.StochasticOscillator(df["high"], df["low"], df["close"])
+    stoch.stoch(), stoch.stoch_signal()
+
+
+def run_kernels(df: pd.DataFrame):
+    indicator_kernels.compute_indicators(df["high"], df["low"], df["close"])
+
+
+def main(sizes):
+    print(f"{'bars':>10} | {'ta (s)':>10} | {'kernels (s)':>12} | {'speedup':>8}")
+    for n_bars in sizes:
+        df = make_ohlcv(n_bars)
+        t_ta = best_of(lambda: run_ta(df), repeat=1 if n_bars >= 1_000_000 else 3)
+        t_kernel = best_of(lambda: run_kernels(df))
+        print(f"{n_bars:>10} | {t_ta:>10.4f} | {t_kernel:>12.4f} | {t_ta / t_kernel:>7.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [5_000, 100_000, 1_000_000]
+    main(sizes)
@@ -0,0 +1,52 @@
+"""
+bench_memory.py
+---------------
+เปรียบเทียบ peak memory ของแต่ละขั้นตอนระหว่างโหมดปกติกับ low-memory
+(FeatureGenerator -> VolumeFeatures -> FiboLevels -> FiboAnalyzer)
+
+รัน: python -m project.benchmarks.bench_memory [n_bars]
+"""
+
+import sys
+
+import pandas as pd
+
+from project.benchmarks.bench_utils import make_ohlcv
+from project.features.feature_generator import FeatureGenerator
+from project.features.fibo_levels import FiboLevels
+from project.features.volume_features import VolumeFeatures
+from project.fibo_analysis.fibo_analyzer import FiboAnalyzer
+from project.utils.memory import MemoryProfiler, frame_memory_mb
+
+
+def run_stages(df: pd.DataFrame, low_memory: bool):
+    profiler = MemoryProfiler()
+    with profiler.stage("feature_generator"):
+        df = FeatureGenerator(df, low_memory=low_memory).generate_all_features()
+    with profiler.stage("volume_features"):
+        df = VolumeFeatures(df, low_memory=low_memory).generate_all_volume_features()
+    with profiler.stage("fibo_levels"):
+        df = FiboLevels().generate_levels_for_dataframe(df, low_memory=low_memory)
+    with profiler.stage("fibo_analyzer"):
+        df = FiboAnalyzer(df, low_memory=low_memory).check_touch_levels()
+    return profiler.report(), frame_memory_mb(df)
+
+
+def main(n_bars: int):
+    raw = make_ohlcv(n_bars)
+    default_report, default_mb = run_stages(raw, low_memory=False)
+    low_report, low_mb = run_stages(raw, low_memory=True)
+
+    table = pd.DataFrame({
+        "default peak (MB)": default_report["peak_mb"],
+        "low_memory peak (MB)": low_report["peak_mb"],
+        "default (s)": default_report["seconds"],
+        "low_memory (s)": low_report["seconds"],
+    })
+    print(f"bars={n_bars}")
+    print(table.to_string())
+    print(f"final frame: default={default_mb:.1f}MB, low_memory={low_mb:.1f}MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
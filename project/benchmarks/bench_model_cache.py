@@ -0,0 +1,84 @@
+"""
+bench_model_cache.py
+--------------------
+1) เวลาโหลดโมเดล: joblib.load ทุกครั้ง (แบบเดิม) เทียบกับ ModelCache (miss ครั้งแรก / hit)
+2) หน่วยความจำรวมของ worker หลาย process ที่โหลดโมเดลเดียวกันพร้อมกัน
+   joblib.load ปกติ เทียบกับ mmap_mode='r' (วัด Pss = หน่วยความจำที่แบ่งสัดส่วนตาม page ที่ใช้ร่วมกัน)
+
+รัน: python -m project.benchmarks.bench_model_cache [n_workers]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from project.benchmarks.bench_utils import best_of
+from project.models.model_backends import get_backend
+from project.models.model_cache import ModelCache, dump_model
+
+WORKER = """
+import json, sys, numpy as np
+from project.models.model_cache import ModelCache
+mmap_mode = {mmap_mode!r}
+model = ModelCache(mmap_mode=mmap_mode).get({path!r})
+model.predict(np.random.default_rng(0).normal(size=(1000, {n_features})))
+print("ready", flush=True)
+sys.stdin.readline()
+rollup = dict(line.split(":", 1) for line in open("/proc/self/smaps_rollup") if ":" in line)
+print(json.dumps({{"pss_mb": int(rollup["Pss"].split()[0]) / 1024}}))
+"""
+
+
+def workers_pss(path: str, n_features: int, n_workers: int, mmap_mode):
+    """Pss รวมของ worker ทุกตัวตอนที่ทุกตัวโหลดโมเดลค้างไว้พร้อมกัน (MB)"""
+    script = WORKER.format(mmap_mode=mmap_mode, path=path, n_features=n_features)
+    procs = [subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True) for _ in range(n_workers)]
+    for proc in procs:
+        assert proc.stdout.readline().strip() == "ready"
+    total = 0.0
+    for proc in procs:
+        out, _ = proc.communicate("\n")
+        total += json.loads(out.strip())["pss_mb"]
+    return total
+
+
+def main(n_workers: int):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20000, 30))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(size=len(X)) > 0).astype(int)
+    out_dir = tempfile.mkdtemp()
+    models = {
+        "xgboost 500 trees": get_backend("xgboost").fit({"n_estimators": 500, "max_depth": 6}, X, y),
+        "random forest 100": RandomForestClassifier(n_estimators=100, random_state=0, n_jobs=1).fit(X, y),
+    }
+
+    print(f"{'model':<18} | {'file':>8} | {'joblib.load':>11} | {'cache miss':>10} | {'cache hit':>9}")
+    paths = {}
+    for label, model in models.items():
+        path = paths[label] = dump_model(model, os.path.join(out_dir, f"{label.replace(' ', '_')}.pkl"))
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        plain = best_of(lambda: joblib.load(path))
+        cache = ModelCache(mmap_mode="r")
+        miss = best_of(lambda: (cache.clear(), cache.get(path)))
+        cache.get(path)
+        hit = best_of(lambda: [cache.get(path) for _ in range(1000)]) / 1000
+        print(f"{label:<18} | {size_mb:>6.1f}MB | {plain * 1e3:>9.1f}ms | {miss * 1e3:>8.1f}ms | "
+              f"{hit * 1e6:>7.1f}µs")
+
+    print(f"\nPss รวมของ {n_workers} worker ที่โหลดโมเดลเดียวกันค้างไว้ (รวม Python + numpy + sklearn)")
+    print(f"{'model':<18} | {'joblib.load':>11} | {'mmap r':>9}")
+    for label, path in paths.items():
+        plain = workers_pss(path, X.shape[1], n_workers, None)
+        shared = workers_pss(path, X.shape[1], n_workers, "r")
+        print(f"{label:<18} | {plain:>9.1f}MB | {shared:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,56 @@
+"""
+bench_model_imports.py
+----------------------
+เวลา import และ peak RSS ของ process ใหม่ที่ import project.models.train_model
+แล้วใช้ backend ต่างกัน เทียบกับแบบเดิมที่ import XGBoost / LightGBM / TensorFlow ตอนโหลดโมดูล
+
+รัน: python -m project.benchmarks.bench_model_imports
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+
+SCENARIOS = {
+    "train_model only": [],
+    "+ xgboost backend": ["xgboost"],
+    "+ lightgbm backend": ["lightgbm"],
+    "+ xgboost + lightgbm": ["xgboost", "lightgbm"],
+    "+ lstm backend": ["lstm"],
+    "eager (all frameworks)": ["xgboost", "lightgbm", "lstm"],
+}
+
+SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+import project.models.train_model
+from project.models.model_backends import get_backend, loaded_backends
+for name in {backends!r}:
+    get_backend(name).load()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                   "loaded": loaded_backends()}}))
+"""
+
+
+def run(backends):
+    out = subprocess.run([sys.executable, "-c", SCRIPT.format(backends=backends)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(repeat: int = 3):
+    print(f"{'scenario':<24} | {'import (s)':>10} | {'peak RSS (MB)':>13} | loaded")
+    for label, backends in SCENARIOS.items():
+        if "lstm" in backends and importlib.util.find_spec("tensorflow") is None:
+            print(f"{label:<24} | {'-':>10} | {'-':>13} | tensorflow ไม่ได้ติดตั้ง")
+            continue
+        results = [run(backends) for _ in range(repeat)]
+        seconds = min(r["seconds"] for r in results)
+        rss = min(r["rss_mb"] for r in results)
+        print(f"{label:<24} | {seconds:>10.3f} | {rss:>13.1f} | {','.join(results[0]['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
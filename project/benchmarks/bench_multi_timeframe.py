@@ -0,0 +1,42 @@
+"""
+bench_multi_timeframe.py
+------------------------
+วัดต้นทุนของการเพิ่มฟีเจอร์ H1, H4, D1 บนข้อมูล M15
+- batch: graph.compute อย่างเดียว เทียบกับ + add_multi_timeframe_features
+- streaming: เวลาเฉลี่ยต่อแท่งของ MultiTimeframeStream.update
+
+รัน: python -m project.benchmarks.bench_multi_timeframe [n_bars ...]
+"""
+
+import sys
+import time
+
+from project.benchmarks.bench_utils import make_ohlcv, best_of
+from project.features.feature_graph import build_feature_graph
+from project.features.multi_timeframe import add_multi_timeframe_features, MultiTimeframeStream
+
+TIMEFRAMES = ["H1", "H4", "D1"]
+
+
+def main(sizes):
+    graph = build_feature_graph()
+    print(f"{'bars':>10} | {'M15 only (s)':>12} | {'+H1/H4/D1 (s)':>13} | {'overhead':>8}")
+    for n_bars in sizes:
+        df = make_ohlcv(n_bars)
+        t_base = best_of(lambda: graph.compute(df))
+        t_mtf = best_of(lambda: add_multi_timeframe_features(
+            graph.compute(df), timeframes=TIMEFRAMES, base_timeframe="M15", graph=graph))
+        print(f"{n_bars:>10} | {t_base:>12.3f} | {t_mtf:>13.3f} | {100 * (t_mtf / t_base - 1):>7.1f}%")
+
+    candles = make_ohlcv(20_000).to_dict("records")
+    stream = MultiTimeframeStream(timeframes=TIMEFRAMES, base_timeframe="M15")
+    start = time.perf_counter()
+    for candle in candles:
+        stream.update(candle)
+    per_bar = (time.perf_counter() - start) / len(candles)
+    print(f"streaming update ({len(TIMEFRAMES)} timeframes): {per_bar * 1e6:.1f} µs/bar")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [125_000, 1_000_000]
+    main(sizes)
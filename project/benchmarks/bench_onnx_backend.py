@@ -0,0 +1,92 @@
+"""
+bench_onnx_backend.py
+---------------------
+serving ด้วย onnxruntime เทียบกับ backend เดิม (joblib.load + predict_proba ของ framework)
+- cold start: process ใหม่ import + โหลดโมเดล + ทำนายครั้งแรก (รวมเวลา import framework)
+- ต่อครั้ง: ทำนาย 1 แถว และ batch ใน process ที่โหลดแล้ว
+- peak RSS ของ process serving
+
+รัน: python -m project.benchmarks.bench_onnx_backend [n_trees]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from project.benchmarks.bench_utils import best_of
+from project.models.model_backends import get_backend
+from project.models.onnx_backend import OnnxModel, SessionPool, export_onnx_for
+
+SCRIPT = """
+import json, time
+start = time.perf_counter()
+import numpy as np
+if {runtime!r} == "onnx":
+    from project.models.onnx_backend import OnnxModel, SessionPool
+    model = OnnxModel({onnx_path!r}, pool=SessionPool())
+else:
+    import joblib
+    model = joblib.load({model_path!r})
+model.predict_proba(np.zeros((1, {n_features}), dtype=np.float32))
+seconds = time.perf_counter() - start
+# VmHWM นับเฉพาะ process นี้ (ru_maxrss ติดค่าของ process แม่มาตอน fork)
+hwm = next(line for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(json.dumps({{"seconds": seconds, "rss_mb": int(hwm.split()[1]) / 1024}}))
+"""
+
+
+def cold_start(runtime: str, model_path: str, onnx_path: str, n_features: int, repeat: int = 3):
+    results = []
+    for _ in range(repeat):
+        code = SCRIPT.format(runtime=runtime, model_path=model_path, onnx_path=onnx_path, n_features=n_features)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(r["seconds"] for r in results), min(r["rss_mb"] for r in results)
+
+
+def per_call(func, n_calls: int) -> float:
+    """เวลาเฉลี่ยต่อครั้ง (µs)"""
+    def loop():
+        for _ in range(n_calls):
+            func()
+    return best_of(loop, repeat=5) / n_calls * 1e6
+
+
+def main(n_trees: int):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(20000, 30)), columns=[f"f{i}" for i in range(30)])
+    y = (X["f0"] + 0.5 * X["f1"] * X["f2"] + rng.normal(size=len(X)) > 0).astype(int)
+    row = X.tail(1)
+    out_dir = tempfile.mkdtemp()
+    print(f"trees={n_trees} features={X.shape[1]} cpu={os.cpu_count()}")
+    print(f"{'model':<9} | {'runtime':<8} | {'cold start':>10} | {'peak RSS':>9} | {'1 row':>9} | "
+          f"{'batch 20k':>9} | max |diff|")
+
+    params = {
+        "xgboost": {"n_estimators": n_trees, "max_depth": 6},
+        "lightgbm": {"n_estimators": n_trees, "num_leaves": 31, "verbose": -1},
+    }
+    for name, model_params in params.items():
+        model = get_backend(name).fit(model_params, X, y, n_jobs=1)
+        model_path = os.path.join(out_dir, f"{name}_best.pkl")
+        joblib.dump(model, model_path)
+        onnx_path = export_onnx_for(model, model_path)
+        onnx_model = OnnxModel(onnx_path, pool=SessionPool(intra_op_threads=1))
+        diff = np.abs(onnx_model.predict_proba(X)[:, 1] - model.predict_proba(X)[:, 1]).max()
+
+        for runtime, served in [("native", model), ("onnx", onnx_model)]:
+            seconds, rss = cold_start(runtime, model_path, onnx_path, X.shape[1])
+            row_us = per_call(lambda: served.predict_proba(row), 200)
+            batch = best_of(lambda: served.predict_proba(X))
+            print(f"{name:<9} | {runtime:<8} | {seconds:>9.3f}s | {rss:>7.1f}MB | {row_us:>7.1f}µs | "
+                  f"{batch:>8.3f}s | {diff if runtime == 'onnx' else 0:.1e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
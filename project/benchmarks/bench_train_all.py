@@ -0,0 +1,41 @@
+"""
+bench_train_all.py
+------------------
+เปรียบเทียบ train โมเดลทีละตัว (train_xgboost / train_lightgbm / train_lstm ต่อกัน)
+กับ ModelTrainer.train_all (1 process ต่อโมเดล + แบ่ง thread ตามจำนวน core)
+
+รัน: python -m project.benchmarks.bench_train_all [n_rows] [n_features] [models]
+เช่น python -m project.benchmarks.bench_train_all 100000 30 xgboost,lightgbm
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from project.models.train_model import CANDIDATES, ModelTrainer
+
+
+def main(n_rows: int, n_features: int, models):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    df["direction"] = (df["f0"] + rng.normal(size=n_rows) > 0).astype(int)
+    trainer = ModelTrainer(df, target_col="direction")
+
+    print(f"rows={n_rows} features={n_features} models={models} cpu={os.cpu_count()}")
+    for workers in sorted({1, len(models)}):
+        start = time.perf_counter()
+        trainer.train_all(models=models, max_workers=workers)
+        total = time.perf_counter() - start
+        per_model = ", ".join(f"{name}={seconds:.1f}s" for name, seconds in trainer.train_timings.items())
+        label = "sequential" if workers == 1 else f"train_all, {workers} processes"
+        print(f"{label:<28} {total:>8.2f} s   ({per_model})")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_features = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    models = sys.argv[3].split(",") if len(sys.argv) > 3 else CANDIDATES
+    main(n_rows, n_features, models)
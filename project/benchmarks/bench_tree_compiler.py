@@ -0,0 +1,59 @@
+"""
+bench_tree_compiler.py
+----------------------
+latency ของการทำนาย 1 แถว (แบบ live) และทั้ง batch: predict_proba ของ XGBoost / LightGBM
+เทียบกับต้นไม้ที่ compile เป็น array (tree_compiler) + ความต่างของ probability
+
+รัน: python -m project.benchmarks.bench_tree_compiler [n_trees] [n_rows]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+import xgboost as xgb
+
+from project.benchmarks.bench_utils import best_of
+from project.models.tree_compiler import compile_model
+
+MODELS = {
+    "xgboost depth=6": lambda n: xgb.XGBClassifier(n_estimators=n, max_depth=6, n_jobs=1),
+    "lightgbm leaves=31": lambda n: lgb.LGBMClassifier(n_estimators=n, num_leaves=31, n_jobs=1, verbose=-1),
+    "lightgbm depth=6": lambda n: lgb.LGBMClassifier(n_estimators=n, max_depth=6, num_leaves=63, n_jobs=1,
+                                                     verbose=-1),
+}
+
+
+def per_call(func, n_calls: int) -> float:
+    """เวลาเฉลี่ยต่อครั้ง (µs) จากรอบที่เร็วที่สุด"""
+    def loop():
+        for _ in range(n_calls):
+            func()
+    return best_of(loop, repeat=5) / n_calls * 1e6
+
+
+def main(n_trees: int, n_rows: int):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, 30)), columns=[f"f{i}" for i in range(30)])
+    y = (X["f0"] + 0.5 * X["f1"] * X["f2"] + rng.normal(size=n_rows) > 0).astype(int)
+    row_df = X.tail(1)
+    row = row_df.to_numpy()[0]
+    print(f"trees={n_trees} rows={n_rows} features={X.shape[1]}")
+    print(f"{'model':<20} | {'depth':>5} | {'native 1 row':>12} | {'compiled 1 row':>14} | "
+          f"{'native batch':>12} | {'compiled batch':>14} | max |diff|")
+
+    for label, make in MODELS.items():
+        model = make(n_trees).fit(X, y)
+        compiled = compile_model(model)
+        native_row = per_call(lambda: model.predict_proba(row_df), 200)
+        compiled_row = per_call(lambda: compiled.predict_row(row), 2000)
+        native_batch = best_of(lambda: model.predict_proba(X))
+        compiled_batch = best_of(lambda: compiled.predict_proba(X))
+        diff = np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max()
+        print(f"{label:<20} | {compiled.max_depth:>5} | {native_row:>10.1f}µs | {compiled_row:>12.1f}µs | "
+              f"{native_batch:>11.3f}s | {compiled_batch:>13.3f}s | {diff:.1e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
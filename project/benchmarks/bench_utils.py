@@ -0,0 +1,41 @@
+"""
+bench_utils.py
+--------------
+Helper สำหรับสคริปต์ benchmark: สร้างข้อมูล OHLCV จำลอง และจับเวลา
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n_bars: int, seed: int = 42, start: str = "2020-01-01", freq: str = "15min"):
+    """
+    สร้างข้อมูลราคาแบบ random walk สำหรับ benchmark
+
+    Returns
+    -------
+    pd.DataFrame
+        คอลัมน์ ['datetime', 'open', 'high', 'low', 'close', 'volume']
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n_bars))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "datetime": pd.date_range(start, periods=n_bars, freq=freq),
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 0.0005, n_bars),
+        "low": np.minimum(open_, close) - rng.uniform(0, 0.0005, n_bars),
+        "close": close,
+        "volume": rng.integers(100, 5000, n_bars).astype(float),
+    })
+
+
+def best_of(func, repeat: int = 3):
+    """รัน func หลายรอบแล้วคืนเวลาที่ดีที่สุด (วินาที)"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,51 @@
+"""
+bench_walk_forward.py
+---------------------
+เปรียบเทียบ walk-forward แบบ slice DataFrame ใหม่ทุก fold (ตามลำดับ)
+กับ run_walk_forward (contiguous matrix ครั้งเดียว + fold ขนานบน process pool)
+
+รัน: python -m project.benchmarks.bench_walk_forward [n_rows] [n_features]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from project.models.walk_forward import evaluate_predictions, make_model, run_walk_forward, walk_forward_splits
+
+PARAMS = {"n_estimators": 200, "max_depth": 6, "learning_rate": 0.05, "random_state": 42}
+
+
+def run_reslice(X: pd.DataFrame, y: np.ndarray, splits):
+    """แบบเดิม: slice DataFrame (copy) ต่อ fold แล้ว train ทีละ fold"""
+    for train_ranges, (test_start, test_end) in splits:
+        (train_start, train_end), = train_ranges
+        model = make_model("lightgbm", PARAMS, n_jobs=os.cpu_count() or 1)
+        model.fit(X.iloc[train_start:train_end].copy(), y[train_start:train_end])
+        evaluate_predictions(y[test_start:test_end], model.predict(X.iloc[test_start:test_end].copy()))
+
+
+def main(n_rows: int, n_features: int):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    y = (X["f0"] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int).to_numpy()
+    splits = walk_forward_splits(n_rows, n_splits=5, purge=1)
+
+    print(f"rows={n_rows} features={n_features} folds={len(splits)} cpu={os.cpu_count()}")
+    start = time.perf_counter()
+    run_reslice(X, y, splits)
+    print(f"{'re-slice, sequential':<32} {time.perf_counter() - start:>8.2f} s")
+
+    for workers in sorted({1, 2, min(len(splits), os.cpu_count() or 1)}):
+        start = time.perf_counter()
+        run_walk_forward(X, y, "lightgbm", PARAMS, splits, max_workers=workers)
+        print(f"{f'shared matrix, {workers} worker(s)':<32} {time.perf_counter() - start:>8.2f} s")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_features = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    main(n_rows, n_features)
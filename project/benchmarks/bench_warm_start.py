@@ -0,0 +1,53 @@
+"""
+bench_warm_start.py
+-------------------
+เวลา retrain หลังพบ drift: train XGBoost / LightGBM ใหม่ทั้งหมดจากข้อมูลทุกแถว
+เทียบกับ warm start (เพิ่ม tree_budget ต้นต่อจากโมเดลเดิมด้วยเฉพาะข้อมูลหลัง cutoff)
+ซึ่งเป็นสองทางของ AutoRetrain (mode full / incremental)
+
+รัน: python -m project.benchmarks.bench_warm_start [n_rows] [n_new_rows] [tree_budget]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from project.models.train_model import ModelTrainer
+
+
+def main(n_rows: int, n_new: int, tree_budget: int):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 30)), columns=[f"f{i}" for i in range(30)])
+    df["direction"] = (df["f0"] + 0.3 * df["f1"] + rng.normal(size=n_rows) > 0).astype(int)
+    print(f"rows={n_rows} new_rows={n_new} tree_budget={tree_budget} cpu={os.cpu_count()}")
+
+    for name in ["xgboost", "lightgbm"]:
+        # โมเดลปัจจุบัน = train จากข้อมูลก่อน cutoff
+        old = ModelTrainer(df.iloc[:-n_new], target_col="direction")
+        X_train, X_test, y_train, y_test = old.prepare_data()
+        current, _ = old.train_candidate(name, X_train, y_train, X_test, y_test)
+
+        full = ModelTrainer(df, target_col="direction")
+        start = time.perf_counter()
+        X_train, X_test, y_train, y_test = full.prepare_data()
+        _, full_metrics = full.train_candidate(name, X_train, y_train, X_test, y_test)
+        t_full = time.perf_counter() - start
+
+        new = ModelTrainer(df.iloc[-n_new:], target_col="direction")
+        start = time.perf_counter()
+        X_train, X_test, y_train, y_test = new.prepare_data()
+        _, warm_metrics = new.warm_start(name, current, X_train, y_train, X_test, y_test, n_trees=tree_budget)
+        t_warm = time.perf_counter() - start
+
+        print(f"{name:<9} full rebuild {t_full:>7.2f} s (acc={full_metrics['accuracy']:.4f})   "
+              f"warm start {t_warm:>6.2f} s (acc={warm_metrics['accuracy']:.4f})   x{t_full / t_warm:.1f}")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    n_new = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    tree_budget = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    main(n_rows, n_new, tree_budget)
@@ -8,6 +8,8 @@ import pandas as pd
 from project.utils.logger import AuditLogger
 from project.backtest.backtester import Backtester   # สมมติว่ามี Backtester class
 from project.utils.config_loader import load_config  # ฟังก์ชันโหลด config
+from project.features.feature_store import FeatureStore
+from project.features.multi_timeframe import add_multi_timeframe_features
 
 def run_backtest(env="test"):
     logger = AuditLogger()
@@ -22,14 +24,22 @@ def run_backtest(env="test"):
         df = pd.read_csv(data_path)
         logger.log_event("backtest", "load_data", "SUCCESS", f"rows={len(df)}")
 
-        # 3. รัน backtest
+        # 3. สร้าง features ด้วย engine เดียวกับ training/live (ผ่าน feature store)
+        store = FeatureStore(namespace=config["backtest"]["symbol"])
+        df = store.load_or_compute(df)
+        if "datetime" in df.columns:
+            df = add_multi_timeframe_features(df)
+        logger.log_event("backtest", "compute_features", "SUCCESS",
+                         f"columns={len(df.columns)}, store={store.stats}")
+
+        # 4. รัน backtest
         bt = Backtester(df, initial_balance=initial_balance)
         results = bt.run()
         logger.log_event("backtest", "run", "SUCCESS",
                          f"trades={results['trades']}, win_rate={results['win_rate']:.2f}, "
                          f"final_balance={results['final_balance']:.2f}")
 
-        # 4. บันทึกผลลัพธ์เพิ่มเติม เช่น equity curve
+        # 5. บันทึกผลลัพธ์เพิ่มเติม เช่น equity curve
         if "equity_curve" in results:
             logger.log_event("backtest", "equity_curve", "SUCCESS",
                              f"points={len(results['equity_curve'])}")
@@ -0,0 +1,40 @@
+"""
+batch_features.py
+-----------------
+สร้างฟีเจอร์ของหลาย symbol (batch.symbols ใน config) แบบขนานด้วย process pool พร้อม AuditLogger
+"""
+
+import sys
+from project.utils.logger import AuditLogger
+from project.utils.config_loader import load_config
+from project.features.batch_features import generate_features_batch, symbol_sources
+
+def run_batch_features(env="dev", symbols=None):
+    logger = AuditLogger()
+
+    try:
+        # 1. โหลด config และรายชื่อ symbol -> path
+        config = load_config(env=env)
+        sources = symbol_sources(symbols, config=config)
+        logger.log_event("batch", "load_sources", "SUCCESS", f"symbols={list(sources)}")
+
+        # 2. สร้างฟีเจอร์ทุก symbol (ผลลัพธ์กลับมาทาง shared memory)
+        results = generate_features_batch(
+            sources,
+            max_workers=config.get("batch", {}).get("max_workers"),
+            config=config,
+            store_root=config["features"].get("store_path"),
+        )
+        for symbol, df in results.items():
+            logger.log_event("batch", "compute_features", "SUCCESS", f"{symbol}: rows={len(df)}, columns={len(df.columns)}")
+
+        print(f"✅ Batch features completed for {len(results)} symbols.")
+        return results
+
+    except Exception as e:
+        logger.log_event("batch", "run_batch_features", "FAIL", str(e))
+        raise
+
+
+if __name__ == "__main__":
+    run_batch_features(env="dev", symbols=sys.argv[1:] or None)
@@ -7,8 +7,10 @@ Pipeline พร้อม Error Handling + AuditLogger + AutoRetrain
 import pandas as pd
 from project.utils.logger import AuditLogger
 from project.utils.config_loader import load_config
-from project.features.feature_generator import FeatureGenerator
+from project.features.feature_store import FeatureStore
+from project.features.multi_timeframe import add_multi_timeframe_features
 from project.models.model_selector import ModelSelector
+from project.utils.memory import MemoryProfiler
 from project.models.drift_detector import DriftDetector
 from project.models.auto_retrain import AutoRetrain
 
@@ -18,32 +20,42 @@ def run_pipeline(env="dev"):
     try:
         # 1. โหลด config
         config = load_config(env=env)
+        low_memory = config.get("features", {}).get("low_memory", False)
+        profiler = MemoryProfiler(enabled=config.get("pipeline", {}).get("profile_memory", False))
 
         # 2. โหลดข้อมูล
-        try:
-            df = pd.read_csv(config["data"]["source_path"])
-            logger.log_event("pipeline", "load_data", "SUCCESS", f"rows={len(df)}")
-        except Exception as e:
-            logger.log_event("pipeline", "load_data", "FAIL", str(e))
-            df = pd.DataFrame()  # fallback
+        with profiler.stage("load_data"):
+            try:
+                df = pd.read_csv(config["data"]["source_path"])
+                logger.log_event("pipeline", "load_data", "SUCCESS", f"rows={len(df)}")
+            except Exception as e:
+                logger.log_event("pipeline", "load_data", "FAIL", str(e))
+                df = pd.DataFrame()  # fallback
 
         # 3. สร้าง features
-        try:
-            fg = FeatureGenerator(df)
-            df_features = fg.generate_all_features()
-            logger.log_event("features", "generate_all_features", "SUCCESS", "Features generated")
-        except Exception as e:
-            logger.log_event("features", "generate_all_features", "FAIL", str(e))
-            df_features = pd.DataFrame()  # fallback
+        with profiler.stage("compute_features"):
+            try:
+                store = FeatureStore(namespace=config["backtest"]["symbol"], low_memory=low_memory)
+                df_features = store.load_or_compute(df)
+                if "datetime" in df_features.columns:
+                    df_features = add_multi_timeframe_features(df_features, low_memory=low_memory)
+                logger.log_event("features", "compute_features", "SUCCESS", f"Features generated, store={store.stats}")
+            except Exception as e:
+                logger.log_event("features", "compute_features", "FAIL", str(e))
+                df_features = pd.DataFrame()  # fallback
 
         # 4. Train models
-        try:
-            selector = ModelSelector(df_features, criterion=config["model"]["criterion"])
-            best_model, metrics = selector.select_best_model()
-            logger.log_event("models", "model_selector", "SUCCESS", f"best_model={best_model}, metrics={metrics}")
-        except Exception as e:
-            logger.log_event("models", "model_selector", "FAIL", str(e))
-            best_model, metrics = None, {}
+        with profiler.stage("model_selector"):
+            try:
+                selector = ModelSelector(df_features, criterion=config["model"]["criterion"])
+                best_model, metrics = selector.select_best_model()
+                logger.log_event("models", "model_selector", "SUCCESS", f"best_model={best_model}, metrics={metrics}")
+            except Exception as e:
+                logger.log_event("models", "model_selector", "FAIL", str(e))
+                best_model, metrics = None, {}
+
+        if profiler.enabled:
+            logger.log_event("pipeline", "memory_profile", "SUCCESS", profiler.summary())
 
         # 5. Drift detection
         try:
@@ -0,0 +1,239 @@
+"""
+batch_features.py
+-----------------
+สร้างฟีเจอร์ของหลาย symbol พร้อมกันด้วย process pool
+- แต่ละ worker import โมดูลและสร้าง FeatureGraph/FeatureStore ครั้งเดียว แล้วใช้ซ้ำทุก symbol
+- worker อ่านไฟล์ข้อมูลเอง (ไม่ต้องส่ง DataFrame ข้าม process)
+- ผลลัพธ์ส่งกลับผ่าน shared memory (คอลัมน์เป็น array ต่อกันในบล็อกเดียว)
+  ข้าม process จะส่งแค่ชื่อบล็อก + layout ของคอลัมน์ ไม่ pickle DataFrame
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing import resource_tracker, shared_memory
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_store import FeatureStore
+from project.features.multi_timeframe import add_multi_timeframe_features
+
+# alignment ของแต่ละคอลัมน์ในบล็อก shared memory
+_ALIGN = 64
+
+# state ต่อ process ของ worker (สร้างครั้งเดียวใน _init_worker)
+_WORKER = {}
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def _init_worker(config, store_root, multi_timeframe):
+    """initializer ของ worker: สร้าง graph ครั้งเดียวต่อ process"""
+    graph = build_feature_graph(config)
+    # ขนานระดับ process แล้ว -> ใน process ให้คำนวณตามลำดับ (ไม่แย่ง core กัน)
+    graph.max_workers = 1
+    _WORKER["graph"] = graph
+    _WORKER["store_root"] = store_root
+    _WORKER["multi_timeframe"] = multi_timeframe
+    _WORKER["higher_timeframes"] = config["features"].get("higher_timeframes", [])
+    _WORKER["base_timeframe"] = config["data"]["timeframe"]
+
+
+def to_shared_memory(df: pd.DataFrame):
+    """
+    คัดลอกคอลัมน์ของ df ลงบล็อก shared memory บล็อกเดียว
+
+    Returns
+    -------
+    tuple(str, list)
+        (ชื่อบล็อก, layout) โดย layout = [(column, dtype, offset, extra), ...]
+        extra = list ของ categories สำหรับคอลัมน์ category (None สำหรับคอลัมน์อื่น)
+    """
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays.append((col, np.ascontiguousarray(series.cat.codes.to_numpy()),
+                           series.cat.categories.tolist()))
+        else:
+            arrays.append((col, np.ascontiguousarray(series.to_numpy()), None))
+
+    for col, values, _ in arrays:
+        if values.dtype.hasobject:
+            raise TypeError(f"❌ คอลัมน์ {col} เป็น object ส่งผ่าน shared memory ไม่ได้")
+
+    layout = []
+    offset = 0
+    for col, values, extra in arrays:
+        layout.append((col, values.dtype.str, offset, extra))
+        offset += -(-values.nbytes // _ALIGN) * _ALIGN
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for (col, values, _), (_, dtype, start, _) in zip(arrays, layout):
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=start)[:] = values
+        # ส่งความเป็นเจ้าของให้ฝั่งผู้รับ (ผู้รับเป็นคน unlink)
+        # ไม่ให้ resource tracker ของ worker ลบบล็อกตอน worker ปิด
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm.name, layout
+    finally:
+        shm.close()
+
+
+def from_shared_memory(name: str, layout, n_rows: int) -> pd.DataFrame:
+    """สร้าง DataFrame จากบล็อก shared memory แล้วคืนหน่วยความจำ (unlink)"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        columns = {}
+        for col, dtype, offset, extra in layout:
+            values = np.ndarray(n_rows, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset).copy()
+            if extra is not None:
+                values = pd.Categorical.from_codes(values, categories=extra)
+            columns[col] = values
+        return pd.DataFrame(columns)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _compute_symbol(symbol: str, path: str, columns=None):
+    """
+    งานของ worker: อ่านข้อมูล symbol เดียว -> คำนวณฟีเจอร์ -> เขียนลง shared memory
+
+    Returns
+    -------
+    tuple(str, str, list, int)
+        (symbol, ชื่อบล็อก shared memory, layout, จำนวนแถว)
+    """
+    df = pd.read_csv(path)
+    if _WORKER["store_root"] is not None:
+        store = FeatureStore(root=_WORKER["store_root"], namespace=symbol, graph=_WORKER["graph"])
+        features = store.load_or_compute(df, columns=columns)
+    else:
+        features = _WORKER["graph"].compute(df, columns=columns)
+
+    if _WORKER["multi_timeframe"] and "datetime" in features.columns:
+        features = add_multi_timeframe_features(
+            features, timeframes=_WORKER["higher_timeframes"],
+            base_timeframe=_WORKER["base_timeframe"], graph=_WORKER["graph"],
+        )
+    if "datetime" in features.columns:
+        features["datetime"] = pd.to_datetime(features["datetime"])
+
+    name, layout = to_shared_memory(features)
+    return symbol, name, layout, len(features)
+
+
+def generate_features_batch(sources: dict, columns=None, max_workers: int = None,
+                            config=None, store_root: str = None, multi_timeframe: bool = True):
+    """
+    สร้างฟีเจอร์ของหลาย symbol แบบขนานด้วย process pool
+
+    Parameters
+    ----------
+    sources : dict
+        {symbol: path ของไฟล์ CSV} เช่น {'EURAUD': 'project/data/raw/EURAUD_M15.csv'}
+    columns : list
+        คอลัมน์ฟีเจอร์ที่ต้องการ (None = ทุกคอลัมน์ของ graph)
+    max_workers : int
+        จำนวน process (None = จำนวน core แต่ไม่เกินจำนวน symbol)
+    config : dict
+        config ที่ใช้สร้าง graph (None = config.yaml)
+    store_root : str
+        โฟลเดอร์ FeatureStore (None = ไม่ใช้ store, คำนวณใหม่ทุกครั้ง)
+    multi_timeframe : bool
+        True = เพิ่มฟีเจอร์ features.higher_timeframes
+
+    Returns
+    -------
+    dict
+        {symbol: pd.DataFrame} เรียงตามลำดับใน sources
+    """
+    config = config or load_config()
+    if not sources:
+        return {}
+    if max_workers is None:
+        max_workers = min(len(sources), os.cpu_count() or 1)
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(config, store_root, multi_timeframe),
+    ) as pool:
+        futures = [pool.submit(_compute_symbol, symbol, path, columns) for symbol, path in sources.items()]
+        try:
+            for future in as_completed(futures):
+                symbol, name, layout, n_rows = future.result()
+                results[symbol] = from_shared_memory(name, layout, n_rows)
+        except BaseException:
+            # worker ที่เสร็จแล้วแต่ยังไม่ถูกอ่าน -> คืน shared memory ก่อนโยน error ต่อ
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            for future in futures:
+                if not future.cancelled() and future.exception() is None:
+                    symbol, name, _, _ = future.result()
+                    if symbol not in results:
+                        _unlink_quietly(name)
+            raise
+
+    return {symbol: results[symbol] for symbol in sources}
+
+
+def _unlink_quietly(name: str):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def symbol_sources(symbols=None, config=None) -> dict:
+    """
+    สร้าง {symbol: path} จาก config (batch.symbols + batch.path_pattern)
+    """
+    config = config or load_config()
+    batch = config.get("batch", {})
+    symbols = symbols or batch.get("symbols", [config["data"]["symbol"]])
+    pattern = batch.get("path_pattern", "project/data/raw/{symbol}_{timeframe}.csv")
+    return {
+        symbol: pattern.format(symbol=symbol, timeframe=config["data"]["timeframe"])
+        for symbol in symbols
+    }
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+
+    root = tempfile.mkdtemp(prefix="batch_features_")
+    sources = {}
+    for i, symbol in enumerate(["EURAUD", "GBPAUD", "EURNZD"]):
+        rng = np.random.default_rng(i)
+        n = 96 * 30
+        close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+        df = pd.DataFrame({
+            "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+            "open": np.r_[close[0], close[:-1]],
+            "high": close + 0.0005,
+            "low": close - 0.0005,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        })
+        sources[symbol] = os.path.join(root, f"{symbol}_M15.csv")
+        df.to_csv(sources[symbol], index=False)
+
+    features = generate_features_batch(sources, max_workers=2)
+    for symbol, df_features in features.items():
+        print(symbol, df_features.shape, df_features["rsi"].iloc[-1])
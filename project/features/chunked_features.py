@@ -0,0 +1,158 @@
+"""
+chunked_features.py
+-------------------
+สร้างฟีเจอร์แบบ out-of-core: อ่านข้อมูลทีละบล็อกแถว คำนวณ แล้วเขียนผลต่อท้ายไฟล์ทันที
+- แต่ละบล็อกคำนวณร่วมกับแท่ง warm-up ท้ายบล็อกก่อนหน้า แล้วตัดแท่ง warm-up ทิ้ง
+- warm-up ต้องครอบคลุมทั้ง rolling window ที่ยาวที่สุด (fibo lookback 50, BB 20, MACD 26)
+  และระยะที่ EMA/Wilder (MACD, RSI, ATR) ลืมค่าเริ่มต้นจนต่ำกว่า float precision
+  จึงใช้ WARMUP_BARS เดียวกับ FeatureStore (ผลลัพธ์เท่ากับการคำนวณทั้งก้อน)
+- หน่วยความจำสูงสุดขึ้นกับ chunk_rows + warm-up ไม่ขึ้นกับความยาวข้อมูล
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_store import WARMUP_BARS
+
+
+def iter_feature_chunks(chunks, graph=None, columns=None, warmup_bars: int = WARMUP_BARS,
+                        low_memory: bool = False):
+    """
+    คำนวณฟีเจอร์จาก iterator ของ DataFrame ทีละบล็อก
+
+    Parameters
+    ----------
+    chunks : iterable
+        DataFrame ข้อมูล OHLCV ที่ต่อเนื่องกันตามเวลา (เช่น pd.read_csv(..., chunksize=n))
+    graph : FeatureGraph
+        graph ที่ใช้คำนวณ (None = build_feature_graph())
+    columns : list
+        คอลัมน์ฟีเจอร์ที่ต้องการ (None = ทุกคอลัมน์ของ graph)
+    warmup_bars : int
+        จำนวนแท่งท้ายบล็อกก่อนหน้าที่นำมาคำนวณร่วม
+    low_memory : bool
+        True = ฟีเจอร์เป็น float32 / flag เป็น int8
+
+    Yields
+    ------
+    pd.DataFrame
+        ฟีเจอร์ของแถวในบล็อกนั้น (ไม่รวมแท่ง warm-up)
+    """
+    graph = graph or build_feature_graph()
+    tail = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        raw = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+        n_warmup = 0 if tail is None else len(tail)
+
+        features = graph.compute(raw, columns=columns, low_memory=low_memory)
+        features = features.iloc[n_warmup:]
+        features.index = chunk.index
+        yield features
+
+        tail = raw.iloc[-warmup_bars:].reset_index(drop=True) if warmup_bars else None
+
+
+def generate_features_chunked(source_path: str, output_path: str, chunk_rows: int = 200_000,
+                              columns=None, graph=None, warmup_bars: int = WARMUP_BARS,
+                              time_col: str = "datetime", low_memory: bool = False):
+    """
+    อ่าน CSV ทีละ chunk_rows แถว -> คำนวณฟีเจอร์ -> เขียนต่อท้าย output ทันที
+
+    Parameters
+    ----------
+    source_path : str
+        ไฟล์ CSV ข้อมูล OHLCV (เรียงตามเวลา)
+    output_path : str
+        ไฟล์ผลลัพธ์ (.parquet ใช้ pyarrow เขียนทีละ row group ด้วย schema ของบล็อกแรก,
+        นามสกุลอื่นเขียนเป็น CSV)
+    chunk_rows : int
+        จำนวนแถวต่อบล็อก
+    columns : list
+        คอลัมน์ฟีเจอร์ที่ต้องการ (None = ทุกคอลัมน์ของ graph)
+    graph : FeatureGraph
+        graph ที่ใช้คำนวณ (None = build_feature_graph())
+    warmup_bars : int
+        จำนวนแท่ง warm-up ที่ส่งต่อระหว่างบล็อก
+    time_col : str
+        คอลัมน์เวลา (ถ้ามีจะ parse เป็น datetime)
+    low_memory : bool
+        True = ฟีเจอร์เป็น float32 / flag เป็น int8
+
+    Returns
+    -------
+    dict
+        {'rows': จำนวนแถว, 'chunks': จำนวนบล็อก, 'output_path': path}
+    """
+    header = pd.read_csv(source_path, nrows=0).columns
+    parse_dates = [time_col] if time_col in header else None
+    # round_trip: อ่าน float ได้ตรงทุก bit (parser ปกติคลาดได้ 1 ulp ซึ่งถูกขยายใน RSI/stochastic)
+    reader = pd.read_csv(source_path, chunksize=chunk_rows, parse_dates=parse_dates,
+                         float_precision="round_trip")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    use_parquet = output_path.endswith(".parquet")
+    writer = None
+    stats = {"rows": 0, "chunks": 0, "output_path": output_path}
+    try:
+        for features in iter_feature_chunks(reader, graph, columns, warmup_bars, low_memory):
+            if use_parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(features, preserve_index=False)
+                if writer is None:
+                    # schema ของไฟล์กำหนดจากบล็อกแรก บล็อกถัดไป cast ให้ตรง
+                    # (ParquetWriter ไม่รับ table ที่ dtype ต่างจาก schema ของไฟล์)
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                elif not table.schema.equals(writer.schema):
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+            else:
+                features.to_csv(tmp_path, mode="w" if stats["chunks"] == 0 else "a",
+                                header=stats["chunks"] == 0, index=False)
+            stats["rows"] += len(features)
+            stats["chunks"] += 1
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if writer is not None:
+        writer.close()
+    if stats["chunks"]:
+        os.replace(tmp_path, output_path)
+    return stats
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0002, n))
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="1min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.0002,
+        "low": close - 0.0002,
+        "close": close,
+        "volume": rng.integers(10, 100, n),
+    })
+
+    root = tempfile.mkdtemp(prefix="chunked_features_")
+    source = os.path.join(root, "EURAUD_M1.csv")
+    df.to_csv(source, index=False)
+
+    stats = generate_features_chunked(source, os.path.join(root, "EURAUD_M1_features.csv"), chunk_rows=5_000)
+    print(stats)
@@ -5,66 +5,332 @@ feature_generator.py
 รวม Indicators, Candle Patterns, และสถิติพื้นฐาน
 """
 
+import math
+from collections import deque
+
 import pandas as pd
 import numpy as np
-import ta  # technical analysis library (pip install ta)
+
+from project.features import indicator_registry
+from project.utils.memory import compact_array
+
+
+class RollingWindow:
+    """
+    หน้าต่างเลื่อนขนาดคงที่สำหรับคำนวณ mean/std แบบ O(1) ต่อแท่ง
+    ให้ผลเท่ากับ pandas ``rolling(window).mean()/.std(ddof)``
+
+    เก็บผลรวมของ (x - shift) และ (x - shift)^2 เพื่อลดปัญหา cancellation
+    และคำนวณผลรวมใหม่จาก buffer ทุก ๆ ``window`` แท่งเพื่อไม่ให้ error สะสม
+    """
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.n_valid = 0
+        self.n_pushed = 0
+
+    def push(self, value: float):
+        """เพิ่มค่าใหม่ (NaN จะไม่ถูกนับ เหมือน pandas)"""
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if not math.isnan(old):
+                d = old - self.shift
+                self.sum -= d
+                self.sumsq -= d * d
+                self.n_valid -= 1
+
+        self.values.append(value)
+        if not math.isnan(value):
+            d = value - self.shift
+            self.sum += d
+            self.sumsq += d * d
+            self.n_valid += 1
+
+        self.n_pushed += 1
+        if self.n_pushed % self.window == 0:
+            self._resync()
+
+    def _resync(self):
+        """คำนวณผลรวมใหม่จาก buffer (amortized O(1))"""
+        valid = [v for v in self.values if not math.isnan(v)]
+        self.shift = sum(valid) / len(valid) if valid else 0.0
+        self.sum = sum(v - self.shift for v in valid)
+        self.sumsq = sum((v - self.shift) ** 2 for v in valid)
+        self.n_valid = len(valid)
+
+    def mean(self) -> float:
+        if self.n_valid < self.window:
+            return np.nan
+        return self.shift + self.sum / self.n_valid
+
+    def std(self) -> float:
+        n = self.n_valid
+        if n < self.window or n - self.ddof <= 0:
+            return np.nan
+        var = (self.sumsq - self.sum * self.sum / n) / (n - self.ddof)
+        return math.sqrt(max(var, 0.0))
+
+
+class EWMState:
+    """
+    Exponential moving average แบบ running state
+    เทียบเท่า pandas ``ewm(alpha=..., adjust=False, min_periods=...)``
+    (ค่า NaN ช่วงต้นจะถูกข้ามจนกว่าจะเจอค่าแรก)
+    """
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = np.nan
+        self.count = 0
+
+    def push(self, x: float) -> float:
+        if not math.isnan(x):
+            if self.count == 0:
+                self.value = x
+            else:
+                self.value = (1 - self.alpha) * self.value + self.alpha * x
+            self.count += 1
+        return self.value if self.count >= self.min_periods else np.nan
+
+
+# indicator ที่มี streaming state (indicator อื่นที่ลงทะเบียนใน registry คำนวณได้เฉพาะแบบ batch)
+STREAMING_INDICATORS = ["RSI", "MACD", "ATR", "BollingerBands", "Stochastic"]
+
+
+class StreamingFeatureState:
+    """
+    State สำหรับคำนวณฟีเจอร์ทีละแท่ง (O(1) ต่อแท่ง)
+    ให้ผลตรงกับ add_basic_features / add_indicators / add_candle_patterns
+    ด้วย indicator และ window ชุดเดียวกัน (คืนเฉพาะคอลัมน์ของ indicator ที่เปิด)
+    """
+
+    def __init__(self, indicators=None):
+        """
+        Parameters
+        ----------
+        indicators : list
+            [(ชื่อ, params), ...] จาก indicator_registry.enabled_indicators
+            (None = ตาม features.indicators ใน config.yaml)
+        """
+        if indicators is None:
+            indicators = indicator_registry.enabled_indicators()
+        self.indicators = dict(indicators)
+        unsupported = [name for name in self.indicators if name not in STREAMING_INDICATORS]
+        if unsupported:
+            raise ValueError(f"❌ indicator ไม่รองรับการคำนวณแบบ streaming: {unsupported}")
+        self.columns = (
+            ["return", "log_return", "volatility"]
+            + indicator_registry.indicator_columns(list(self.indicators.items()))
+            + ["candle_body", "candle_range", "upper_shadow", "lower_shadow", "bullish_engulfing"]
+        )
+
+        # basic features
+        self.prev_close = np.nan
+        self.prev_open = np.nan
+        self.prev_body = np.nan
+        self.return_window = RollingWindow(20, ddof=1)
+
+        # RSI (Wilder smoothing)
+        if "RSI" in self.indicators:
+            window = self.indicators["RSI"]["window"]
+            self.rsi_up = EWMState(alpha=1 / window, min_periods=window)
+            self.rsi_down = EWMState(alpha=1 / window, min_periods=window)
+
+        # MACD
+        if "MACD" in self.indicators:
+            params = self.indicators["MACD"]
+            self.ema_fast = EWMState(alpha=2 / (params["window_fast"] + 1), min_periods=params["window_fast"])
+            self.ema_slow = EWMState(alpha=2 / (params["window_slow"] + 1), min_periods=params["window_slow"])
+            self.ema_signal = EWMState(alpha=2 / (params["window_sign"] + 1), min_periods=params["window_sign"])
+
+        # ATR (ค่าแรก = ค่าเฉลี่ย TR window แท่ง แล้วใช้ Wilder smoothing)
+        if "ATR" in self.indicators:
+            self.atr_window = self.indicators["ATR"]["window"]
+            self.atr = 0.0
+            self.tr_sum = 0.0
+            self.n_bars = 0
+
+        # Bollinger Bands
+        if "BollingerBands" in self.indicators:
+            self.bb_window = RollingWindow(self.indicators["BollingerBands"]["window"], ddof=0)
+            self.bb_dev = self.indicators["BollingerBands"]["window_dev"]
+
+        # Stochastic (%K window แท่ง, %D smooth_window แท่ง)
+        if "Stochastic" in self.indicators:
+            self.stoch_window = self.indicators["Stochastic"]["window"]
+            self.stoch_highs = deque(maxlen=self.stoch_window)
+            self.stoch_lows = deque(maxlen=self.stoch_window)
+            self.stoch_d_window = RollingWindow(self.indicators["Stochastic"]["smooth_window"])
+
+    def push(self, candle: dict) -> dict:
+        """รับแท่งเทียนใหม่ แล้วคืนค่าฟีเจอร์ของแท่งนั้น"""
+        o = float(candle["open"])
+        h = float(candle["high"])
+        l = float(candle["low"])
+        c = float(candle["close"])
+        prev_close = self.prev_close
+        row = dict(candle)
+
+        # --- basic features ---
+        ret = c / prev_close - 1
+        self.return_window.push(ret)
+        row["return"] = ret
+        row["log_return"] = math.log(c / prev_close) if not math.isnan(prev_close) else np.nan
+        row["volatility"] = self.return_window.std()
+
+        if "RSI" in self.indicators:
+            self._push_rsi(row, c, prev_close)
+        if "MACD" in self.indicators:
+            self._push_macd(row, c)
+        if "ATR" in self.indicators:
+            self._push_atr(row, h, l, prev_close)
+        if "BollingerBands" in self.indicators:
+            self._push_bollinger(row, c)
+        if "Stochastic" in self.indicators:
+            self._push_stochastic(row, h, l, c)
+
+        # --- candle patterns ---
+        body = c - o
+        row["candle_body"] = body
+        row["candle_range"] = h - l
+        row["upper_shadow"] = h - max(c, o)
+        row["lower_shadow"] = min(c, o) - l
+        row["bullish_engulfing"] = int(
+            body > 0 and self.prev_body < 0 and c > self.prev_open and o < prev_close
+        )
+
+        self.prev_close = c
+        self.prev_open = o
+        self.prev_body = body
+        return row
+
+    def _push_rsi(self, row: dict, c: float, prev_close: float):
+        diff = c - prev_close
+        up = self.rsi_up.push(diff if diff > 0 else 0.0)
+        down = self.rsi_down.push(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            row["rsi"] = np.nan
+        elif down == 0:
+            row["rsi"] = 100.0
+        else:
+            row["rsi"] = 100 - 100 / (1 + up / down)
+
+    def _push_macd(self, row: dict, c: float):
+        fast = self.ema_fast.push(c)
+        slow = self.ema_slow.push(c)
+        macd = fast - slow
+        signal = self.ema_signal.push(macd)
+        row["macd"] = macd
+        row["macd_signal"] = signal
+        row["macd_diff"] = macd - signal
+
+    def _push_atr(self, row: dict, h: float, l: float, prev_close: float):
+        if math.isnan(prev_close):
+            tr = h - l
+        else:
+            tr = max(h - l, abs(h - prev_close), abs(l - prev_close))
+        self.n_bars += 1
+        if self.n_bars < self.atr_window:
+            self.tr_sum += tr
+        elif self.n_bars == self.atr_window:
+            self.atr = (self.tr_sum + tr) / self.atr_window
+        else:
+            self.atr = (self.atr * (self.atr_window - 1) + tr) / float(self.atr_window)
+        row["atr"] = self.atr
+
+    def _push_bollinger(self, row: dict, c: float):
+        self.bb_window.push(c)
+        mavg = self.bb_window.mean()
+        mstd = self.bb_window.std()
+        row["bb_high"] = mavg + self.bb_dev * mstd
+        row["bb_low"] = mavg - self.bb_dev * mstd
+        row["bb_width"] = row["bb_high"] - row["bb_low"]
+
+    def _push_stochastic(self, row: dict, h: float, l: float, c: float):
+        self.stoch_highs.append(h)
+        self.stoch_lows.append(l)
+        stoch_k = np.nan
+        if len(self.stoch_highs) == self.stoch_window:
+            smax = max(self.stoch_highs)
+            smin = min(self.stoch_lows)
+            if smax != smin:
+                stoch_k = 100 * (c - smin) / (smax - smin)
+        self.stoch_d_window.push(stoch_k)
+        row["stoch_k"] = stoch_k
+        row["stoch_d"] = self.stoch_d_window.mean()
+
 
 class FeatureGenerator:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, low_memory: bool = False, indicators=None):
         """
         Parameters
         ----------
         df : pd.DataFrame
             ข้อมูลราคา Forex ที่มีคอลัมน์ ['open', 'high', 'low', 'close', 'volume']
+        low_memory : bool
+            True = ไม่ deep copy df (ใช้ array เดิมร่วมกัน, คอลัมน์ใหม่เพิ่มเฉพาะใน self.df)
+            และเก็บฟีเจอร์เป็น float32 / flag เป็น int8
+        indicators : list
+            [(ชื่อ, params), ...] จาก indicator_registry.enabled_indicators
+            (None = ตาม features.indicators ใน config.yaml)
         """
-        self.df = df.copy()
+        self.df = df.copy(deep=not low_memory)
+        self.low_memory = low_memory
+        self.indicators = indicators
+        self.indicator_timings = {}
+        self.stream_state = None
+
+    def _set(self, col: str, values):
+        """เขียนคอลัมน์ฟีเจอร์ (downcast ในโหมด low-memory)"""
+        if self.low_memory:
+            values = compact_array(np.asarray(values), col)
+        self.df[col] = values
 
     def add_basic_features(self):
         """เพิ่มฟีเจอร์พื้นฐาน เช่น return, volatility"""
-        self.df["return"] = self.df["close"].pct_change()
-        self.df["log_return"] = np.log(self.df["close"] / self.df["close"].shift(1))
-        self.df["volatility"] = self.df["return"].rolling(window=20).std()
+        returns = self.df["close"].pct_change()
+        self._set("return", returns)
+        self._set("log_return", np.log(self.df["close"] / self.df["close"].shift(1)))
+        self._set("volatility", returns.rolling(window=20).std())
         return self.df
 
     def add_indicators(self):
-        """เพิ่ม Indicators เช่น RSI, MACD, ATR, Bollinger Bands"""
-        # RSI
-        self.df["rsi"] = ta.momentum.RSIIndicator(self.df["close"], window=14).rsi()
-
-        # MACD
-        macd = ta.trend.MACD(self.df["close"])
-        self.df["macd"] = macd.macd()
-        self.df["macd_signal"] = macd.macd_signal()
-        self.df["macd_diff"] = macd.macd_diff()
-
-        # ATR
-        atr = ta.volatility.AverageTrueRange(
-            high=self.df["high"], low=self.df["low"], close=self.df["close"], window=14
+        """
+        เพิ่ม Indicators ที่เปิดใน config (RSI, MACD, ATR, Bollinger Bands, Stochastic, ...)
+        เวลาที่ใช้ของแต่ละ indicator เก็บไว้ใน self.indicator_timings
+        """
+        if self.indicators is None:
+            self.indicators = indicator_registry.enabled_indicators()
+        indicators = indicator_registry.compute_indicators(
+            self.df["high"], self.df["low"], self.df["close"],
+            self.indicators, timings=self.indicator_timings,
         )
-        self.df["atr"] = atr.average_true_range()
-
-        # Bollinger Bands
-        bb = ta.volatility.BollingerBands(self.df["close"], window=20, window_dev=2)
-        self.df["bb_high"] = bb.bollinger_hband()
-        self.df["bb_low"] = bb.bollinger_lband()
-        self.df["bb_width"] = self.df["bb_high"] - self.df["bb_low"]
+        for col, values in indicators.items():
+            self._set(col, values)
 
         return self.df
 
     def add_candle_patterns(self):
         """เพิ่มฟีเจอร์จาก Candle เช่น body size, upper/lower shadow"""
-        self.df["candle_body"] = self.df["close"] - self.df["open"]
-        self.df["candle_range"] = self.df["high"] - self.df["low"]
-        self.df["upper_shadow"] = self.df["high"] - self.df[["close", "open"]].max(axis=1)
-        self.df["lower_shadow"] = self.df[["close", "open"]].min(axis=1) - self.df["low"]
+        body = self.df["close"] - self.df["open"]
+        self._set("candle_body", body)
+        self._set("candle_range", self.df["high"] - self.df["low"])
+        self._set("upper_shadow", self.df["high"] - self.df[["close", "open"]].max(axis=1))
+        self._set("lower_shadow", self.df[["close", "open"]].min(axis=1) - self.df["low"])
 
         # ตัวอย่าง pattern: bullish engulfing
-        self.df["bullish_engulfing"] = (
-            (self.df["candle_body"] > 0) &
-            (self.df["candle_body"].shift(1) < 0) &
+        self._set("bullish_engulfing", (
+            (body > 0) &
+            (body.shift(1) < 0) &
             (self.df["close"] > self.df["open"].shift(1)) &
             (self.df["open"] < self.df["close"].shift(1))
-        ).astype(int)
+        ).astype(int))
 
         return self.df
 
@@ -75,6 +341,38 @@ class FeatureGenerator:
         self.add_candle_patterns()
         return self.df
 
+    def update(self, candle: dict):
+        """
+        อัปเดตฟีเจอร์แบบ streaming เมื่อมีแท่งเทียนใหม่ (O(1) ต่อแท่ง)
+
+        ครั้งแรกที่เรียกจะ replay ประวัติใน self.df เพื่อสร้าง state
+        หลังจากนั้นแต่ละแท่งใช้เวลาคงที่ และจะไม่ append ลง self.df
+
+        Parameters
+        ----------
+        candle : dict
+            แท่งเทียนใหม่ที่มี key ['open', 'high', 'low', 'close', 'volume']
+
+        Returns
+        -------
+        dict
+            ฟีเจอร์ของแท่งล่าสุด (ชื่อคอลัมน์และ window เดียวกับ generate_all_features
+            ตาม self.indicators / features.indicators)
+
+        Raises
+        ------
+        ValueError
+            มี indicator ที่ไม่รองรับแบบ streaming (ดู STREAMING_INDICATORS)
+        """
+        if self.stream_state is None:
+            if self.indicators is None:
+                self.indicators = indicator_registry.enabled_indicators()
+            self.stream_state = StreamingFeatureState(self.indicators)
+            for history_candle in self.df.to_dict("records"):
+                self.stream_state.push(history_candle)
+
+        return self.stream_state.push(candle)
+
 
 # ============================
 # ตัวอย่างการใช้งาน
@@ -0,0 +1,331 @@
+"""
+feature_graph.py
+----------------
+Feature engine แบบ dependency graph (DAG)
+- แต่ละฟีเจอร์ประกาศ input และค่ากลางที่ใช้ร่วมกัน (prev_close, EMA, rolling, swing high/low)
+- ขอคอลัมน์ไหน จะคำนวณเฉพาะ subgraph ที่จำเป็น
+- node ที่ไม่ขึ้นต่อกัน (indicators / volume / fibo) รันพร้อมกันบน thread pool
+  (NumPy ปล่อย GIL ระหว่างคำนวณ)
+
+ใช้ร่วมกันทั้ง training (run_pipeline), backtest และ live
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features import indicator_kernels as kernels
+from project.features.fibo_levels import FiboLevels
+from project.features.indicator_registry import add_indicator_nodes, enabled_indicators
+from project.features.volume_features import classify_divergence, DIVERGENCE_CATEGORIES
+from project.fibo_analysis.fibo_analyzer import touch_bitmask
+from project.utils.memory import compact_array
+
+RAW_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+class FeatureNode:
+    def __init__(self, name: str, inputs, func, branch: str = "core", intermediate: bool = False):
+        """
+        Parameters
+        ----------
+        name : str
+            ชื่อ node (ถ้าไม่ใช่ intermediate จะเป็นชื่อคอลัมน์ผลลัพธ์)
+        inputs : list
+            ชื่อ node หรือคอลัมน์ดิบ (open/high/low/close/volume) ที่ต้องใช้
+        func : callable
+            ฟังก์ชันที่รับค่า input ตามลำดับ แล้วคืน array ของ node นี้
+        branch : str
+            กลุ่มของฟีเจอร์ เช่น core, indicators, candle, volume, fibo
+        intermediate : bool
+            True = ค่ากลางที่ใช้ร่วมกัน ไม่ออกเป็นคอลัมน์
+        """
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.branch = branch
+        self.intermediate = intermediate
+
+
+class FeatureGraph:
+    def __init__(self, params: dict = None):
+        """
+        Parameters
+        ----------
+        params : dict
+            พารามิเตอร์ที่ใช้สร้าง graph (ใช้เป็นส่วนหนึ่งของ cache key ใน FeatureStore)
+        """
+        self.nodes = {}
+        self.params = params or {}
+        # จำนวน thread default ของ compute/evaluate (เช่น 1 เมื่อรันใน process pool)
+        self.max_workers = None
+
+    def add(self, name: str, inputs, func, branch: str = "core", intermediate: bool = False):
+        """ลงทะเบียน node ใหม่ (ชื่อซ้ำจะแทนที่ของเดิม)"""
+        self.nodes[name] = FeatureNode(name, inputs, func, branch, intermediate)
+        return self
+
+    @property
+    def feature_columns(self):
+        """คอลัมน์ฟีเจอร์ทั้งหมดที่ graph สร้างได้ (ไม่รวม intermediate)"""
+        return [name for name, node in self.nodes.items() if not node.intermediate]
+
+    def columns_for_branches(self, branches):
+        """คอลัมน์ฟีเจอร์ของ branch ที่กำหนด เช่น ['indicators', 'volume']"""
+        return [
+            name for name, node in self.nodes.items()
+            if not node.intermediate and node.branch in branches
+        ]
+
+    def resolve(self, columns):
+        """
+        หา node ที่จำเป็นต้องคำนวณสำหรับคอลัมน์ที่ขอ
+
+        Returns
+        -------
+        list
+            ชื่อ node เรียงตาม topological order
+        """
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if name in RAW_COLUMNS and name not in self.nodes:
+                return
+            if name not in self.nodes:
+                raise KeyError(f"❌ ไม่รู้จักฟีเจอร์: {name}")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"❌ พบ dependency วน: {' -> '.join(path + [name])}")
+
+            state[name] = "visiting"
+            for dep in self.nodes[name].inputs:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for col in columns:
+            visit(col, [])
+        return order
+
+    def compute(self, df: pd.DataFrame, columns=None, max_workers=None, include_input: bool = True,
+                low_memory: bool = False, timings: dict = None):
+        """
+        คำนวณเฉพาะคอลัมน์ที่ขอ (และ node ที่มันต้องใช้)
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            ข้อมูลราคาที่มีคอลัมน์ ['open', 'high', 'low', 'close', 'volume']
+        columns : list
+            คอลัมน์ฟีเจอร์ที่ต้องการ (None = ทุกคอลัมน์)
+        max_workers : int
+            จำนวน thread (1 = รันตามลำดับ, None = self.max_workers หรือค่า default ของ ThreadPoolExecutor)
+        include_input : bool
+            True = คืนคอลัมน์เดิมของ df ด้วย
+        low_memory : bool
+            True = เก็บฟีเจอร์เป็น float32 / flag เป็น int8 (ดู project.utils.memory)
+        timings : dict
+            ถ้าส่งมา จะบันทึกเวลาที่ใช้ของแต่ละ node (วินาที) ลงใน dict นี้
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame ที่มีคอลัมน์ตามที่ขอ (เรียงตาม columns)
+        """
+        columns = list(columns) if columns is not None else self.feature_columns
+        values = self.evaluate(df, columns, max_workers=max_workers, timings=timings)
+
+        if low_memory:
+            features = pd.DataFrame({col: compact_array(values.pop(col), col) for col in columns}, index=df.index)
+        else:
+            features = pd.DataFrame({col: values[col] for col in columns}, index=df.index)
+        if not include_input:
+            return features
+        base = df.drop(columns=[col for col in columns if col in df.columns])
+        return pd.concat([base, features], axis=1)
+
+    def evaluate(self, df: pd.DataFrame, columns, max_workers=None, timings: dict = None):
+        """
+        รัน subgraph แล้วคืน dict {node_name: array} ของทุก node ที่คำนวณ
+        (timings = dict สำหรับบันทึกเวลาของแต่ละ node)
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        order = self.resolve(columns)
+        values = {
+            col: kernels.as_float_array(df[col])
+            for col in RAW_COLUMNS
+            if col in df.columns and col not in self.nodes
+        }
+
+        if max_workers == 1 or len(order) <= 1:
+            for name in order:
+                values[name] = self._run_node(name, values, timings)
+            return values
+
+        # จำนวน dependency ที่ยังไม่เสร็จของแต่ละ node และ node ลูก
+        waiting = {name: {dep for dep in self.nodes[name].inputs if dep in self.nodes} for name in order}
+        children = {name: [] for name in order}
+        for name in order:
+            for dep in waiting[name]:
+                children[dep].append(name)
+
+        ready = [name for name in order if not waiting[name]]
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while ready or running:
+                for name in ready:
+                    running[pool.submit(self._run_node, name, values, timings)] = name
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    values[name] = future.result()
+                    for child in children[name]:
+                        waiting[child].discard(name)
+                        if not waiting[child]:
+                            ready.append(child)
+        return values
+
+    def _run_node(self, name: str, values: dict, timings: dict = None):
+        node = self.nodes[name]
+        if timings is None:
+            return node.func(*(values[dep] for dep in node.inputs))
+        start = time.perf_counter()
+        result = node.func(*(values[dep] for dep in node.inputs))
+        timings[name] = time.perf_counter() - start
+        return result
+
+
+def _bullish_engulfing(body, open_, close, prev_close):
+    prev_body = kernels.previous(body)
+    prev_open = kernels.previous(open_)
+    with np.errstate(invalid="ignore"):
+        pattern = (body > 0) & (prev_body < 0) & (close > prev_open) & (open_ < prev_close)
+    return pattern.astype(int)
+
+
+def build_feature_graph(config=None, fibo_lookback: int = 50, fibo_tolerance: float = 0.0005):
+    """
+    สร้าง graph มาตรฐานที่ให้ผลเท่ากับ FeatureGenerator + VolumeFeatures
+    + FiboLevels + FiboAnalyzer.check_touch_bitmask
+
+    Parameters
+    ----------
+    config : dict
+        config หลัก (config.yaml) ใช้ส่วน features.indicators, features.fibo_levels
+        และ features.volume
+        ถ้าไม่ส่งมาจะโหลดจาก project/config/config.yaml
+    fibo_lookback : int
+        จำนวนแท่งย้อนหลังสำหรับ swing high/low
+    fibo_tolerance : float
+        ระยะห่างที่ถือว่า "แตะ" Fibonacci level
+    """
+    if config is None:
+        config = load_config()
+    feature_config = config.get("features", {})
+    fibo_config = feature_config.get("fibo_levels", {})
+    volume_config = feature_config.get("volume", {})
+    spike_threshold = volume_config.get("spike_threshold", 1.5)
+    divergence_window = volume_config.get("divergence_window", 20)
+
+    indicators = enabled_indicators(config)
+
+    g = FeatureGraph(params={
+        "indicators": dict(indicators),
+        "fibo_levels": fibo_config,
+        "volume": volume_config,
+        "fibo_lookback": fibo_lookback,
+        "fibo_tolerance": fibo_tolerance,
+    })
+
+    # --- core (add_basic_features) ---
+    g.add("prev_close", ["close"], kernels.previous, intermediate=True)
+    g.add("return", ["close", "prev_close"], lambda c, p: c / p - 1)
+    g.add("log_return", ["close", "prev_close"], lambda c, p: np.log(c / p))
+    g.add("volatility", ["return"], lambda r: kernels.rolling_mean_std(r, 20, ddof=1)[1])
+
+    # --- indicators (features.indicators ผ่าน indicator_registry) ---
+    add_indicator_nodes(g, indicators)
+
+    # --- candle patterns (add_candle_patterns) ---
+    g.add("candle_body", ["close", "open"], lambda c, o: c - o, "candle")
+    g.add("candle_range", ["high", "low"], lambda h, l: h - l, "candle")
+    g.add("upper_shadow", ["high", "close", "open"], lambda h, c, o: h - np.maximum(c, o), "candle")
+    g.add("lower_shadow", ["low", "close", "open"], lambda l, c, o: np.minimum(c, o) - l, "candle")
+    g.add("bullish_engulfing", ["candle_body", "open", "close", "prev_close"], _bullish_engulfing, "candle")
+
+    # --- volume (VolumeFeatures) ---
+    g.add("volume_ma_20", ["volume"], lambda v: kernels.rolling_mean(v, 20), "volume")
+    g.add("volume_spike", ["volume", "volume_ma_20"],
+          lambda v, ma: _greater(v, spike_threshold * ma).astype(np.int8), "volume")
+    g.add("volume_divergence", ["close", "volume"],
+          lambda c, v: pd.Categorical.from_codes(
+              classify_divergence(kernels.pct_change(c, divergence_window),
+                                  kernels.pct_change(v, divergence_window)),
+              categories=DIVERGENCE_CATEGORIES),
+          "volume")
+
+    # --- fibo (FiboLevels + FiboAnalyzer) ---
+    fibo = FiboLevels(fibo_config.get("retracements"), fibo_config.get("extensions"))
+    g.add("fibo_high", ["high"], lambda h: kernels.previous(_rolling_max_pd(h, fibo_lookback)), "fibo")
+    g.add("fibo_low", ["low"], lambda l: kernels.previous(_rolling_min_pd(l, fibo_lookback)), "fibo")
+    g.add("fibo_matrix", ["fibo_high", "fibo_low"], fibo.calculate_level_matrix, "fibo", True)
+    for j, col in enumerate(fibo.level_columns):
+        g.add(col, ["fibo_matrix"], lambda m, j=j: m[:, j], "fibo")
+    g.add("fibo_touch_mask", ["close", "fibo_matrix"],
+          lambda c, m: touch_bitmask(c, m, fibo_tolerance), "fibo")
+
+    return g
+
+
+def _greater(a, b):
+    with np.errstate(invalid="ignore"):
+        return a > b
+
+
+def _rolling_max_pd(values, window: int):
+    # pandas ใช้ deque algorithm O(n) ซึ่งเร็วกว่า window view เมื่อ window ยาว
+    return pd.Series(values).rolling(window=window).max().to_numpy()
+
+
+def _rolling_min_pd(values, window: int):
+    return pd.Series(values).rolling(window=window).min().to_numpy()
+
+
+def compute_features(df: pd.DataFrame, columns=None, config=None, max_workers=None):
+    """คำนวณฟีเจอร์ด้วย graph มาตรฐาน (entry point เดียวของ pipeline/backtest/live)"""
+    return build_feature_graph(config).compute(df, columns=columns, max_workers=max_workers)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    close = 1.60 + np.cumsum(rng.normal(0, 0.001, 200))
+    df = pd.DataFrame({
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.001,
+        "low": close - 0.001,
+        "close": close,
+        "volume": rng.integers(100, 1000, 200),
+    })
+
+    graph = build_feature_graph()
+    # ขอเฉพาะ rsi + macd_signal -> คำนวณแค่ prev_close, rsi, ema_fast, ema_slow, macd, macd_signal
+    print("nodes:", graph.resolve(["rsi", "macd_signal"]))
+    print(graph.compute(df, columns=["rsi", "macd_signal"]).tail())
@@ -0,0 +1,223 @@
+"""
+feature_schema.py
+-----------------
+Schema ของคอลัมน์อินพุตโมเดล (บันทึกคู่กับโมเดลตอน save)
+- เก็บคอลัมน์ตามลำดับที่โมเดลใช้ตอน train และแยกตามแหล่งที่มา
+  (ราคาดิบ / feature graph / timeframe ใหญ่ / fibo flag จาก fibo_touch_mask)
+- เก็บ node ของ feature graph ที่คอลัมน์เหล่านั้นต้องใช้ (dependency) และ params ของ graph
+- ฝั่ง inference คำนวณเฉพาะคอลัมน์ใน schema แล้วสร้าง DataFrame ตามลำดับของโมเดลครั้งเดียว
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from project.features.feature_graph import RAW_COLUMNS, build_feature_graph
+from project.features.fibo_levels import FiboLevels
+from project.features.multi_timeframe import TIMEFRAMES, higher_timeframe_features
+
+SCHEMA_VERSION = 1
+
+# ไฟล์ schema ที่วางคู่กับไฟล์โมเดล (xgboost_best.pkl -> xgboost_best.features.json)
+SCHEMA_SUFFIX = ".features.json"
+
+
+def model_feature_names(model):
+    """
+    ชื่อคอลัมน์อินพุตที่โมเดลจำไว้ตอน fit (sklearn / XGBoost / LightGBM)
+
+    Returns
+    -------
+    list or None
+        None ถ้าโมเดลไม่เก็บชื่อคอลัมน์ (เช่น Keras หรือ fit ด้วย np.ndarray)
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is None and hasattr(model, "get_booster"):
+        names = model.get_booster().feature_names
+    if names is None:
+        names = getattr(model, "feature_name_", None)
+    return [str(name) for name in names] if names is not None else None
+
+
+def _graph_params(graph) -> dict:
+    # ผ่าน json เพื่อเทียบกับ schema ที่โหลดจากไฟล์ได้ตรง (tuple -> list, key -> str)
+    return json.loads(json.dumps(graph.params, sort_keys=True, default=str))
+
+
+def build_feature_schema(columns, graph=None, config=None) -> dict:
+    """
+    แยกคอลัมน์อินพุตของโมเดลตามแหล่งที่มา
+
+    Parameters
+    ----------
+    columns : list
+        คอลัมน์อินพุตตามลำดับที่โมเดลใช้ตอน train
+    graph : FeatureGraph
+        graph ที่ใช้สร้างฟีเจอร์ตอน train (None = build_feature_graph(config))
+    config : dict
+        config หลัก (ใช้ส่วน features.fibo_levels)
+
+    Returns
+    -------
+    dict
+        {'version', 'columns', 'raw', 'graph', 'higher_timeframes', 'fibo_flags', 'nodes', 'graph_params'}
+    """
+    graph = graph or build_feature_graph(config)
+    fibo_config = graph.params.get("fibo_levels", {})
+    level_names = FiboLevels(fibo_config.get("retracements"), fibo_config.get("extensions")).level_names
+    flag_columns = {f"fibo_{name}": bit for bit, name in enumerate(level_names)}
+    graph_columns = set(graph.feature_columns)
+    prefixes = {tf.lower() + "_": tf for tf in TIMEFRAMES}
+
+    schema = {
+        "version": SCHEMA_VERSION,
+        "columns": [str(col) for col in columns],
+        "raw": [],
+        "graph": [],
+        "higher_timeframes": {},
+        "fibo_flags": {},
+    }
+    for col in schema["columns"]:
+        prefix, _, base = col.partition("_")
+        if col in graph_columns:
+            schema["graph"].append(col)
+        elif col in RAW_COLUMNS:
+            schema["raw"].append(col)
+        elif col in flag_columns:
+            schema["fibo_flags"][col] = flag_columns[col]
+        elif prefix + "_" in prefixes and base in graph_columns:
+            schema["higher_timeframes"].setdefault(prefixes[prefix + "_"], []).append(base)
+        else:
+            raise KeyError(f"❌ ไม่รู้ที่มาของคอลัมน์อินพุต: {col}")
+
+    if schema["fibo_flags"] and "fibo_touch_mask" not in schema["graph"]:
+        dependencies = schema["graph"] + ["fibo_touch_mask"]
+    else:
+        dependencies = schema["graph"]
+    schema["nodes"] = graph.resolve(dependencies)
+    schema["graph_params"] = _graph_params(graph)
+    return schema
+
+
+def check_feature_schema(schema: dict, graph):
+    """ตรวจว่า graph ฝั่ง inference ใช้ params (window/indicator) เดียวกับตอน train"""
+    if schema.get("graph_params") != _graph_params(graph):
+        raise ValueError("❌ feature graph params ไม่ตรงกับตอน train โมเดล (เช่น window ของ indicator)")
+
+
+def compute_model_inputs(df: pd.DataFrame, schema: dict, graph=None, base_timeframe: str = "M15",
+                         time_col: str = "datetime", tail: int = None) -> pd.DataFrame:
+    """
+    คำนวณเฉพาะคอลัมน์ใน schema แล้วคืน DataFrame ตามลำดับคอลัมน์ของโมเดล
+
+    คอลัมน์ที่มีอยู่แล้วใน df จะใช้ค่าเดิม (ไม่คำนวณซ้ำ)
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        ข้อมูลราคา OHLCV (+ คอลัมน์เวลา ถ้า schema มี timeframe ใหญ่)
+    schema : dict
+        ผลจาก build_feature_schema / load_feature_schema
+    graph : FeatureGraph
+        graph ที่ใช้คำนวณ (None = build_feature_graph())
+    base_timeframe : str
+        timeframe ของ df
+    time_col : str
+        คอลัมน์เวลาเปิดของแท่ง
+    tail : int
+        คืนเฉพาะ tail แถวสุดท้าย (เช่น 1 สำหรับ live) แต่ยังคำนวณจากประวัติทั้งหมด
+
+    Returns
+    -------
+    pd.DataFrame
+        คอลัมน์ = schema['columns'] ตามลำดับ
+    """
+    graph = graph or build_feature_graph()
+    rows = slice(-tail, None) if tail else slice(None)
+
+    needed = [col for col in schema["graph"] if col not in df.columns]
+    if schema["fibo_flags"] and "fibo_touch_mask" not in df.columns:
+        needed.append("fibo_touch_mask")
+    values = graph.evaluate(df, needed) if needed else {}
+
+    for tf, columns in schema["higher_timeframes"].items():
+        prefix = tf.lower() + "_"
+        missing = [col for col in columns if prefix + col not in df.columns]
+        if missing:
+            values.update(higher_timeframe_features(
+                df, tf, columns=missing, base_timeframe=base_timeframe, time_col=time_col, graph=graph,
+            ))
+
+    flags = {}
+    if schema["fibo_flags"]:
+        mask = values["fibo_touch_mask"] if "fibo_touch_mask" in values else df["fibo_touch_mask"].to_numpy()
+        mask = np.asarray(mask)[rows]
+        for col, bit in schema["fibo_flags"].items():
+            flags[col] = ((mask >> bit) & 1).astype(np.int8)
+
+    data = {}
+    for col in schema["columns"]:
+        if col in flags:
+            data[col] = flags[col]
+        elif col in df.columns:
+            data[col] = df[col].array[rows]
+        else:
+            data[col] = values[col][rows]
+    return pd.DataFrame(data, index=df.index[rows])
+
+
+def schema_path_for(model_path: str) -> str:
+    """path ของไฟล์ schema ที่วางคู่กับไฟล์โมเดล"""
+    return os.path.splitext(model_path)[0] + SCHEMA_SUFFIX
+
+
+def save_feature_schema(model_path: str, schema: dict) -> str:
+    """บันทึก schema คู่กับไฟล์โมเดล"""
+    path = schema_path_for(model_path)
+    with open(path, "w") as f:
+        json.dump(schema, f, indent=4)
+    return path
+
+
+def load_feature_schema(model_path: str):
+    """
+    โหลด schema ของโมเดล จากไฟล์คู่ (.features.json) หรือ metadata ของ model_versioning (.json)
+
+    Returns
+    -------
+    dict or None
+        None ถ้าโมเดลนี้ไม่มี schema (โมเดลรุ่นเก่า -> ต้องคำนวณฟีเจอร์ทั้งหมด)
+    """
+    path = schema_path_for(model_path)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    meta_path = os.path.splitext(model_path)[0] + ".json"
+    if os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            return json.load(f).get("features")
+    return None
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 96 * 40
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.0005,
+        "low": close - 0.0005,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+    schema = build_feature_schema(["rsi", "h1_rsi", "macd_diff", "close", "fibo_retracement_0.618"])
+    print(schema["nodes"], schema["higher_timeframes"], schema["fibo_flags"])
+    print(compute_model_inputs(df, schema, tail=3))
@@ -0,0 +1,235 @@
+"""
+feature_store.py
+----------------
+Feature store บนดิสก์แบบ content-addressed ใช้ร่วมกันระหว่าง pipeline, backtest และ live
+- แบ่งข้อมูลเป็น partition รายเดือน (หรือเป็นบล็อกแถวถ้าไม่มีคอลัมน์เวลา)
+- แต่ละ partition เก็บเป็นไฟล์ Parquet ชื่อไฟล์มี hash ของ
+  ทุกคอลัมน์ของ df (ชื่อ + dtype + ค่า รวม warm-up) + เวอร์ชันโค้ดฟีเจอร์ + พารามิเตอร์
+  (ไฟล์เก็บทุกคอลัมน์ของ df ด้วย คอลัมน์อื่นเปลี่ยน เช่น target -> key ใหม่)
+- รันครั้งถัดไปคำนวณเฉพาะ partition ที่ยังไม่มีหรือ hash เปลี่ยน
+- ทุก partition คำนวณพร้อมแท่ง warm-up ก่อนหน้า เพื่อให้ rolling/EMA ถูกต้องที่รอยต่อ
+
+ต้องติดตั้ง pyarrow (หรือ fastparquet) สำหรับอ่าน/เขียน Parquet
+"""
+
+import os
+import json
+import glob
+import hashlib
+from functools import lru_cache
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features.feature_graph import build_feature_graph, RAW_COLUMNS
+
+# จำนวนแท่ง warm-up ต่อ partition: มากพอให้ EMA/Wilder (alpha >= 1/14)
+# ลืมค่าเริ่มต้นจนต่างจากการคำนวณทั้งก้อนต่ำกว่า float precision
+WARMUP_BARS = 1000
+
+# โมดูลที่มีผลต่อค่าฟีเจอร์ (แก้โค้ดเมื่อไหร่ cache จะถูก invalidate)
+FEATURE_MODULES = [
+    "project.features.indicator_kernels",
+    "project.features.indicator_registry",
+    "project.features.feature_graph",
+    "project.features.fibo_levels",
+    "project.features.volume_features",
+    "project.fibo_analysis.fibo_analyzer",
+]
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+@lru_cache(maxsize=1)
+def feature_code_version() -> str:
+    """hash ของ source code ของโมดูลฟีเจอร์ทั้งหมด"""
+    import importlib
+
+    h = hashlib.sha256()
+    for name in FEATURE_MODULES:
+        with open(importlib.import_module(name).__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+class FeatureStore:
+    def __init__(self, root: str = None, namespace: str = "default", graph=None,
+                 warmup_bars: int = WARMUP_BARS, time_col: str = "datetime",
+                 partition_rows: int = 20_000, low_memory: bool = False):
+        """
+        Parameters
+        ----------
+        root : str
+            โฟลเดอร์เก็บไฟล์ (None = features.store_path ใน config.yaml)
+        namespace : str
+            โฟลเดอร์ย่อย เช่น ชื่อ symbol/timeframe
+        graph : FeatureGraph
+            graph ที่ใช้คำนวณ (None = build_feature_graph())
+        warmup_bars : int
+            จำนวนแท่งก่อนหน้าที่ใช้คำนวณร่วมกับแต่ละ partition
+        time_col : str
+            คอลัมน์เวลาที่ใช้แบ่ง partition รายเดือน
+        partition_rows : int
+            ขนาด partition เมื่อไม่มีคอลัมน์เวลา
+        low_memory : bool
+            True = เก็บ/คืนฟีเจอร์เป็น float32 และ flag เป็น int8 (แยก cache จากโหมดปกติ)
+        """
+        if root is None:
+            root = load_config()["features"].get("store_path", "project/data/features/")
+        self.root = os.path.join(root, namespace)
+        self.graph = graph or build_feature_graph()
+        self.warmup_bars = warmup_bars
+        self.time_col = time_col
+        self.partition_rows = partition_rows
+        self.low_memory = low_memory
+        self.stats = {"hits": 0, "computed": 0}
+
+    def _timestamps(self, df: pd.DataFrame):
+        """คอลัมน์เวลาเป็น datetime64[ns] array (None ถ้าไม่มี)"""
+        if self.time_col not in df.columns:
+            return None
+        return pd.to_datetime(df[self.time_col]).to_numpy(dtype="datetime64[ns]")
+
+    def partitions(self, df: pd.DataFrame, timestamps=None):
+        """
+        แบ่ง df เป็น partition ที่ต่อเนื่องกัน
+
+        Returns
+        -------
+        list
+            [(label, start_row, stop_row), ...]
+        """
+        n = len(df)
+        if timestamps is None:
+            timestamps = self._timestamps(df)
+        if timestamps is not None and n:
+            months = timestamps.astype("datetime64[M]")
+            bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+            starts = np.r_[0, bounds]
+            stops = np.r_[bounds, n]
+            return [(str(months[a]), int(a), int(b)) for a, b in zip(starts, stops)]
+
+        return [
+            (f"rows_{start:010d}", start, min(start + self.partition_rows, n))
+            for start in range(0, n, self.partition_rows)
+        ]
+
+    def required_columns(self, columns=None):
+        """คอลัมน์ดิบ (open/high/low/close/volume) ที่คอลัมน์ฟีเจอร์ที่ขอต้องใช้"""
+        columns = list(columns) if columns is not None else self.graph.feature_columns
+        needed = {dep for name in self.graph.resolve(columns) for dep in self.graph.nodes[name].inputs}
+        return [col for col in RAW_COLUMNS if col in needed]
+
+    def partition_key(self, raw: pd.DataFrame, warmup: int, columns) -> str:
+        """
+        hash ของทุกคอลัมน์ใน raw (ชื่อ, dtype, ค่า รวม warm-up) + เวอร์ชันโค้ด + พารามิเตอร์
+        """
+        h = hashlib.sha256()
+        for col in raw.columns:
+            series = raw[col]
+            h.update(f"{col}:{series.dtype}".encode())
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+                h.update(np.ascontiguousarray(series.to_numpy()).tobytes())
+            else:
+                # object / categorical / string -> hash รายค่า
+                h.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        h.update(str(warmup).encode())
+        h.update(feature_code_version().encode())
+        h.update(json.dumps(self.graph.params, sort_keys=True, default=str).encode())
+        h.update(json.dumps(list(columns) if columns is not None else None).encode())
+        h.update(b"low_memory" if self.low_memory else b"float64")
+        return h.hexdigest()[:24]
+
+    def load_or_compute(self, df: pd.DataFrame, columns=None):
+        """
+        โหลดฟีเจอร์จาก store หรือคำนวณเฉพาะ partition ที่ขาด/หมดอายุ
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            ข้อมูล OHLCV (เรียงตามเวลา)
+        columns : list
+            คอลัมน์ฟีเจอร์ที่ต้องการ (None = ทุกคอลัมน์ของ graph)
+
+        Returns
+        -------
+        pd.DataFrame
+            ผลลัพธ์เดียวกับ graph.compute(df, columns)
+
+        Raises
+        ------
+        ValueError
+            df ไม่มีคอลัมน์ดิบที่ฟีเจอร์ที่ขอต้องใช้
+        """
+        missing = [col for col in self.required_columns(columns) if col not in df.columns]
+        if missing:
+            raise ValueError(f"❌ ข้อมูลขาดคอลัมน์ที่ต้องใช้คำนวณฟีเจอร์: {missing}")
+
+        os.makedirs(self.root, exist_ok=True)
+        timestamps = self._timestamps(df)
+        frames = []
+        for label, start, stop in self.partitions(df, timestamps):
+            lo = max(0, start - self.warmup_bars)
+            raw = df.iloc[lo:stop]
+            key = self.partition_key(raw, start - lo, columns)
+            path = os.path.join(self.root, f"{label}_{key}.parquet")
+
+            if os.path.exists(path):
+                part = pd.read_parquet(path)
+                self.stats["hits"] += 1
+            else:
+                part = self.graph.compute(raw, columns=columns, low_memory=self.low_memory).iloc[start - lo:]
+                part = part.reset_index(drop=True)
+                self._write_partition(label, path, part)
+                self.stats["computed"] += 1
+            frames.append(part)
+
+        if not frames:
+            return self.graph.compute(df, columns=columns, low_memory=self.low_memory)
+        result = pd.concat(frames, ignore_index=True)
+        result.index = df.index
+        return result
+
+    def _write_partition(self, label: str, path: str, part: pd.DataFrame):
+        """เขียน partition ใหม่ แล้วลบไฟล์เก่าของ partition เดียวกัน"""
+        tmp_path = path + ".tmp"
+        part.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        for old in glob.glob(os.path.join(self.root, f"{label}_*.parquet")):
+            if old != path:
+                os.remove(old)
+
+
+def load_or_compute_features(df: pd.DataFrame, namespace: str = "default", columns=None, config=None):
+    """helper: ใช้ FeatureStore กับ graph มาตรฐาน"""
+    store = FeatureStore(namespace=namespace, graph=build_feature_graph(config))
+    return store.load_or_compute(df, columns=columns)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 96 * 90  # M15 ประมาณ 3 เดือน
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.0005,
+        "low": close - 0.0005,
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+    store = FeatureStore(root="project/data/features/", namespace="example")
+    store.load_or_compute(df)
+    print("first run:", store.stats)
+    store.load_or_compute(df)
+    print("second run:", store.stats)
@@ -5,8 +5,30 @@ fibo_levels.py
 ใช้สำหรับวิเคราะห์แนวรับ/แนวต้าน และจุดกลับตัวของราคา
 """
 
+import numpy as np
 import pandas as pd
 
+# prefix ของคอลัมน์ level -> prefix ของชื่อสัญญาณ (ลำดับ = ลำดับกลุ่มใน bit ของ fibo_touch_mask)
+LEVEL_COLUMN_PREFIXES = {"fibo_ret_": "retracement_", "fibo_ext_": "extension_"}
+
+
+def level_bit_order(columns):
+    """
+    เรียงคอลัมน์ level ตามลำดับ bit ของ fibo_touch_mask
+    (retracement ก่อน แล้ว extension แต่ละกลุ่มเรียงตามค่า level จากน้อยไปมาก)
+
+    ใช้ร่วมกันทั้ง FiboLevels, FiboAnalyzer และ FiboPredictor ลำดับ bit จึงไม่ขึ้นกับ
+    ลำดับใน config หรือลำดับคอลัมน์ของ DataFrame
+    """
+    def key(col):
+        for group, prefix in enumerate(LEVEL_COLUMN_PREFIXES):
+            if col.startswith(prefix):
+                return group, float(col[len(prefix):])
+        raise ValueError(f"❌ ไม่ใช่คอลัมน์ Fibonacci level: {col}")
+
+    return sorted(columns, key=key)
+
+
 class FiboLevels:
     def __init__(self, retracements=None, extensions=None):
         """
@@ -17,8 +39,19 @@ class FiboLevels:
         extensions : list
             ค่า extension เช่น [1.272, 1.618, 2.0]
         """
-        self.retracements = retracements or [0.236, 0.382, 0.5, 0.618, 0.786]
-        self.extensions = extensions or [1.272, 1.618, 2.0]
+        # เรียงค่าเสมอ -> level_columns / level_names ตรงกับ level_bit_order
+        self.retracements = sorted(retracements or [0.236, 0.382, 0.5, 0.618, 0.786])
+        self.extensions = sorted(extensions or [1.272, 1.618, 2.0])
+
+    @property
+    def level_columns(self):
+        """ชื่อคอลัมน์ของแต่ละ level เช่น fibo_ret_0.382, fibo_ext_1.618 (ตามลำดับ bit ของ fibo_touch_mask)"""
+        return [f"fibo_ret_{r}" for r in self.retracements] + [f"fibo_ext_{e}" for e in self.extensions]
+
+    @property
+    def level_names(self):
+        """ชื่อ level แบบเดียวกับ fibo_signal เช่น retracement_0.382, extension_1.618"""
+        return [f"retracement_{r}" for r in self.retracements] + [f"extension_{e}" for e in self.extensions]
 
     def calculate_levels(self, swing_high: float, swing_low: float):
         """
@@ -48,34 +81,87 @@ class FiboLevels:
             "extensions": extension_levels
         }
 
-    def generate_levels_for_dataframe(self, df: pd.DataFrame, lookback=50):
+    def calculate_level_matrix(self, swing_high, swing_low):
+        """
+        คำนวณ Fibonacci levels ของทุกแถวพร้อมกัน (vectorized)
+
+        Parameters
+        ----------
+        swing_high : array-like
+            swing high ของแต่ละแถว
+        swing_low : array-like
+            swing low ของแต่ละแถว
+
+        Returns
+        -------
+        np.ndarray
+            float array ขนาด (n_rows, n_levels) เรียงตาม level_columns
+            (retracements ก่อน แล้วตามด้วย extensions)
+        """
+        swing_high = np.asarray(swing_high, dtype=np.float64)[:, None]
+        swing_low = np.asarray(swing_low, dtype=np.float64)[:, None]
+        diff = swing_high - swing_low
+
+        retracement_levels = swing_high - diff * np.asarray(self.retracements, dtype=np.float64)
+        extension_levels = swing_high + diff * (np.asarray(self.extensions, dtype=np.float64) - 1)
+        return np.hstack([retracement_levels, extension_levels])
+
+    def levels_to_dicts(self, levels: np.ndarray):
+        """
+        แปลง level matrix กลับเป็น list ของ dict แบบเดิม (compatibility view)
+        แถวที่ยังไม่มีข้อมูลพอ (NaN) จะเป็น {}
+        """
+        n_ret = len(self.retracements)
+        fibo_data = []
+        for row in levels.tolist():
+            if np.isnan(row[0]):
+                fibo_data.append({})
+                continue
+            fibo_data.append({
+                "retracements": dict(zip(self.retracements, row[:n_ret])),
+                "extensions": dict(zip(self.extensions, row[n_ret:])),
+            })
+        return fibo_data
+
+    def generate_levels_for_dataframe(self, df: pd.DataFrame, lookback=50, as_dict=False, low_memory=False):
         """
         สร้าง Fibonacci levels สำหรับ DataFrame โดยใช้ rolling window
 
+        swing high/low คำนวณด้วย rolling max/min รอบเดียว (O(n))
+        จาก lookback แท่งก่อนหน้า (ไม่รวมแท่งปัจจุบัน)
+
         Parameters
         ----------
         df : pd.DataFrame
             ข้อมูลราคา Forex ที่มีคอลัมน์ ['high', 'low', 'close']
         lookback : int
             จำนวนแท่งย้อนหลังที่ใช้หาจุด swing high/low
+        as_dict : bool
+            ถ้า True จะเพิ่มคอลัมน์ fibo_levels (dict ต่อแถว) แบบเดิมด้วย
+        low_memory : bool
+            ถ้า True จะเก็บ fibo_high/fibo_low และ level เป็น float32
 
         Returns
         -------
         pd.DataFrame
-            DataFrame ที่มีคอลัมน์ retracement และ extension levels
+            DataFrame ที่มีคอลัมน์ fibo_high, fibo_low และ level แบบ float
+            เช่น fibo_ret_0.382, fibo_ext_1.618
         """
-        fibo_data = []
-        for i in range(len(df)):
-            if i < lookback:
-                fibo_data.append({})
-                continue
+        swing_high = df["high"].rolling(window=lookback).max().shift(1)
+        swing_low = df["low"].rolling(window=lookback).min().shift(1)
+        levels = self.calculate_level_matrix(swing_high, swing_low)
 
-            swing_high = df["high"].iloc[i-lookback:i].max()
-            swing_low = df["low"].iloc[i-lookback:i].min()
-            levels = self.calculate_levels(swing_high, swing_low)
-            fibo_data.append(levels)
+        if low_memory:
+            df["fibo_high"] = swing_high.to_numpy(dtype=np.float32)
+            df["fibo_low"] = swing_low.to_numpy(dtype=np.float32)
+            df[self.level_columns] = levels.astype(np.float32)
+        else:
+            df["fibo_high"] = swing_high
+            df["fibo_low"] = swing_low
+            df[self.level_columns] = levels
 
-        df["fibo_levels"] = fibo_data
+        if as_dict:
+            df["fibo_levels"] = self.levels_to_dicts(levels)
         return df
 
 
@@ -93,4 +179,4 @@ if __name__ == "__main__":
     fibo = FiboLevels()
     df = fibo.generate_levels_for_dataframe(df, lookback=3)
 
-    print(df[["high", "low", "fibo_levels"]])
\ No newline at end of file
+    print(df[["high", "low", "fibo_high", "fibo_low"] + fibo.level_columns])
\ No newline at end of file
@@ -0,0 +1,329 @@
+"""
+indicator_kernels.py
+--------------------
+Kernel สำหรับคำนวณ Technical Indicators ด้วย NumPy ล้วน (ไม่ต้องใช้ ta)
+ทำงานบน float64 array ที่ contiguous และใช้ค่ากลางร่วมกัน
+(prev_close, EMA, rolling window) ระหว่าง indicator
+
+ผลลัพธ์ตรงกับ ta (fillna=False):
+- RSI               -> ta.momentum.RSIIndicator
+- MACD              -> ta.trend.MACD
+- ATR               -> ta.volatility.AverageTrueRange
+- Bollinger Bands   -> ta.volatility.BollingerBands
+- Stochastic        -> ta.momentum.StochasticOscillator
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# จำนวนหน้าต่างที่ประมวลผลต่อรอบใน rolling kernel (จำกัดหน่วยความจำชั่วคราว)
+ROLLING_CHUNK = 65536
+
+
+def as_float_array(values) -> np.ndarray:
+    """แปลง Series/list เป็น contiguous float64 array (ไม่ copy ถ้าไม่จำเป็น)"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _ewm_recursive(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    คำนวณ y[0] = x[0], y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+    แบบ vectorized เป็นบล็อก: ภายในบล็อกใช้ cumsum แบบถ่วงน้ำหนัก
+    แล้วส่งค่าท้ายบล็อกต่อไปยังบล็อกถัดไป (loop แค่ n / block ครั้ง)
+    """
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+
+    # ขนาดบล็อกที่ decay ** -block ยังไม่ overflow (~1e100)
+    block = int(min(n, max(1, 230.0 / -np.log(decay))))
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, block)
+
+    powers = decay ** np.arange(block)
+    local = alpha * powers * np.cumsum(blocks / powers, axis=1)
+
+    # ค่าเริ่มต้นของแต่ละบล็อก (y ก่อนเริ่มบล็อก)
+    carry = np.empty(n_blocks)
+    carry[0] = x[0]
+    decay_block = decay ** block
+    for b in range(1, n_blocks):
+        carry[b] = local[b - 1, -1] + decay_block * carry[b - 1]
+
+    result = local + (decay * powers)[None, :] * carry[:, None]
+    out[:] = result.ravel()[:n]
+    return out
+
+
+def ema(values, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    Exponential moving average เทียบเท่า pandas ``ewm(alpha, adjust=False)``
+    ค่า NaN ช่วงต้นจะถูกข้าม (เริ่มจากค่าแรกที่ไม่ใช่ NaN)
+    NaN กลางข้อมูลไม่ทำให้ค่าหลังจากนั้นเป็น NaN: แท่ง NaN ใช้ค่าเดิม และค่าถัดไปถ่วงน้ำหนัก
+    ตามระยะห่างจริงแบบ pandas (ignore_na=False)
+
+    Parameters
+    ----------
+    values : array-like
+        ข้อมูลที่ต้องการหา EMA
+    alpha : float
+        smoothing factor เช่น 2 / (span + 1) หรือ 1 / window (Wilder)
+    min_periods : int
+        จำนวนค่าที่ไม่ใช่ NaN ขั้นต่ำก่อนเริ่มคืนค่า (ก่อนหน้านั้นเป็น NaN)
+    """
+    x = as_float_array(values)
+    out = np.full(len(x), np.nan)
+    is_valid = ~np.isnan(x)
+    valid = np.flatnonzero(is_valid)
+    if valid.size == 0:
+        return out
+
+    start = valid[0]
+    if valid.size == len(x) - start:
+        out[start:] = _ewm_recursive(x[start:], alpha)
+    else:
+        _ewm_with_gaps(x, is_valid, alpha, out)
+    if min_periods > 1:
+        out[np.cumsum(is_valid) < min_periods] = np.nan
+    return out
+
+
+def _ewm_with_gaps(x: np.ndarray, is_valid: np.ndarray, alpha: float, out: np.ndarray):
+    """
+    EMA ทีละช่วงของค่าที่ไม่ใช่ NaN (ภายในช่วงใช้ _ewm_recursive)
+    ค่าแรกหลังช่วง NaN ยาว d แท่ง = ((1 - alpha) ** (d + 1) * y_prev + alpha * x) / ((1 - alpha) ** (d + 1) + alpha)
+    """
+    edges = np.diff(np.r_[0, is_valid.astype(np.int8), 0])
+    run_starts = np.flatnonzero(edges == 1)
+    run_stops = np.flatnonzero(edges == -1)
+    decay = 1.0 - alpha
+    prev = None
+    for lo, hi in zip(run_starts, run_stops):
+        run = x[lo:hi].copy()
+        if prev is not None:
+            weight = decay ** (lo - prev_stop + 1)
+            run[0] = (weight * prev + alpha * run[0]) / (weight + alpha)
+            # แท่ง NaN ระหว่างช่วงใช้ค่าล่าสุด
+            out[prev_stop:lo] = prev
+        out[lo:hi] = _ewm_recursive(run, alpha)
+        prev, prev_stop = out[hi - 1], hi
+    out[prev_stop:] = prev
+
+
+def _rolling_reduce(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """ใช้ reducer (mean/std/min/max) กับ rolling window ทีละ chunk"""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    view = sliding_window_view(x, window)
+    for start in range(0, len(view), ROLLING_CHUNK):
+        stop = start + ROLLING_CHUNK
+        out[window - 1 + start:window - 1 + min(stop, len(view))] = reducer(view[start:stop])
+    return out
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """rolling mean เทียบเท่า pandas ``rolling(window).mean()``"""
+    return _rolling_reduce(as_float_array(values), window, lambda v: v.mean(axis=1))
+
+
+def rolling_mean_std(values, window: int, ddof: int = 0):
+    """
+    คำนวณ rolling mean และ std ในรอบเดียว (ใช้ window view ร่วมกัน)
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray)
+        (mean, std)
+    """
+    x = as_float_array(values)
+    n = len(x)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < window:
+        return mean, std
+
+    view = sliding_window_view(x, window)
+    for start in range(0, len(view), ROLLING_CHUNK):
+        chunk = view[start:start + ROLLING_CHUNK]
+        m = chunk.mean(axis=1)
+        dev = chunk - m[:, None]
+        s = np.sqrt((dev * dev).sum(axis=1) / (window - ddof))
+        lo = window - 1 + start
+        mean[lo:lo + len(m)] = m
+        std[lo:lo + len(m)] = s
+    return mean, std
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """rolling min เทียบเท่า pandas ``rolling(window).min()``"""
+    return _rolling_reduce(as_float_array(values), window, lambda v: v.min(axis=1))
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """rolling max เทียบเท่า pandas ``rolling(window).max()``"""
+    return _rolling_reduce(as_float_array(values), window, lambda v: v.max(axis=1))
+
+
+def previous(values) -> np.ndarray:
+    """เลื่อนข้อมูล 1 แท่ง (เทียบเท่า ``shift(1)``)"""
+    x = as_float_array(values)
+    out = np.empty(len(x))
+    if len(x):
+        out[0] = np.nan
+        out[1:] = x[:-1]
+    return out
+
+
+def pct_change(values, periods: int = 1) -> np.ndarray:
+    """pct_change แบบ array (เทียบเท่า Series.pct_change(periods) เมื่อไม่มี NaN)"""
+    x = as_float_array(values)
+    out = np.full(len(x), np.nan)
+    if len(x) > periods:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[periods:] = x[periods:] / x[:-periods] - 1
+    return out
+
+
+def rsi(close, window: int = 14, prev_close=None) -> np.ndarray:
+    """Relative Strength Index (Wilder smoothing)"""
+    close = as_float_array(close)
+    if prev_close is None:
+        prev_close = previous(close)
+
+    diff = close - prev_close
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = ema(up, 1.0 / window, min_periods=window)
+    ema_down = ema(down, 1.0 / window, min_periods=window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+    return out
+
+
+def macd(close, window_slow: int = 26, window_fast: int = 12, window_sign: int = 9):
+    """
+    MACD line, signal และ histogram (EMA fast/slow คำนวณครั้งเดียว)
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray, np.ndarray)
+        (macd, macd_signal, macd_diff)
+    """
+    close = as_float_array(close)
+    ema_fast = ema(close, 2.0 / (window_fast + 1), min_periods=window_fast)
+    ema_slow = ema(close, 2.0 / (window_slow + 1), min_periods=window_slow)
+    macd_line = ema_fast - ema_slow
+    signal = ema(macd_line, 2.0 / (window_sign + 1), min_periods=window_sign)
+    return macd_line, signal, macd_line - signal
+
+
+def true_range(high, low, close, prev_close=None) -> np.ndarray:
+    """True range = max(high - low, |high - prev_close|, |low - prev_close|)"""
+    high = as_float_array(high)
+    low = as_float_array(low)
+    if prev_close is None:
+        prev_close = previous(close)
+
+    tr = high - low
+    # fmax ข้าม NaN ของแท่งแรก (เหมือน DataFrame.max ใน ta)
+    tr = np.fmax(tr, np.abs(high - prev_close))
+    tr = np.fmax(tr, np.abs(low - prev_close))
+    return tr
+
+
+def atr(high, low, close, window: int = 14, prev_close=None) -> np.ndarray:
+    """
+    Average True Range แบบ ta: ค่าแรกที่แท่ง window-1 = ค่าเฉลี่ย TR
+    จากนั้นใช้ Wilder smoothing และแท่งก่อนหน้านั้นมีค่าเป็น 0
+    """
+    return wilder_average(true_range(high, low, close, prev_close), window)
+
+
+def wilder_average(tr, window: int = 14) -> np.ndarray:
+    """Wilder smoothing ของ true range (ส่วนที่ใช้ร่วมระหว่าง atr และ feature graph)"""
+    tr = as_float_array(tr)
+    out = np.zeros(len(tr))
+    if len(tr) < window:
+        return out
+
+    seed = np.empty(len(tr) - window + 1)
+    seed[0] = tr[:window].mean()
+    seed[1:] = tr[window:]
+    out[window - 1:] = _ewm_recursive(seed, 1.0 / window)
+    return out
+
+
+def bollinger_bands(close, window: int = 20, window_dev: float = 2):
+    """
+    Bollinger Bands (std แบบ ddof=0 เหมือน ta)
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray, np.ndarray)
+        (mavg, hband, lband)
+    """
+    mavg, mstd = rolling_mean_std(close, window, ddof=0)
+    return mavg, mavg + window_dev * mstd, mavg - window_dev * mstd
+
+
+def stochastic(high, low, close, window: int = 14, smooth_window: int = 3):
+    """
+    Stochastic Oscillator %K และ %D
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray)
+        (stoch_k, stoch_d)
+    """
+    close = as_float_array(close)
+    smin = rolling_min(low, window)
+    smax = rolling_max(high, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoch_k = 100.0 * (close - smin) / (smax - smin)
+    stoch_d = rolling_mean(stoch_k, smooth_window)
+    return stoch_k, stoch_d
+
+
+def compute_indicators(high, low, close) -> dict:
+    """
+    คำนวณ indicator ทั้งหมดของ FeatureGenerator ในรอบเดียว
+    โดยใช้ array และค่ากลางร่วมกัน (prev_close ใช้ทั้ง RSI และ ATR)
+
+    Returns
+    -------
+    dict
+        {column_name: np.ndarray}
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    close = as_float_array(close)
+    prev_close = previous(close)
+
+    macd_line, macd_signal, macd_diff = macd(close)
+    _, bb_high, bb_low = bollinger_bands(close, window=20, window_dev=2)
+    stoch_k, stoch_d = stochastic(high, low, close)
+
+    return {
+        "rsi": rsi(close, window=14, prev_close=prev_close),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_diff": macd_diff,
+        "atr": atr(high, low, close, window=14, prev_close=prev_close),
+        "bb_high": bb_high,
+        "bb_low": bb_low,
+        "bb_width": bb_high - bb_low,
+        "stoch_k": stoch_k,
+        "stoch_d": stoch_d,
+    }
@@ -0,0 +1,298 @@
+"""
+indicator_registry.py
+---------------------
+Registry ของ Technical Indicators ที่ขับเคลื่อนด้วย config (features.indicators)
+- แต่ละ indicator ลงทะเบียนด้วย @register_indicator: ชื่อ, คอลัมน์ผลลัพธ์, window default
+  และฟังก์ชันที่คืน node ของ feature graph (ค่ากลาง + คอลัมน์)
+- คำนวณเฉพาะ indicator ที่เปิดใน config (ปิดตัวไหน = ไม่เสียเวลาคำนวณตัวนั้น)
+- เพิ่ม indicator ใหม่ได้โดยไม่ต้องแก้ FeatureGenerator / build_feature_graph
+
+รูปแบบ config ที่รองรับ:
+
+    features:
+      indicators: [RSI, MACD]              # ใช้ window default
+
+    features:
+      indicators:
+        RSI: {window: 21}                  # กำหนด window ราย indicator
+        MACD: {window_fast: 8}
+        Stochastic: null                   # null = ใช้ค่า default
+"""
+
+import time
+
+import yaml
+import numpy as np
+
+from project.features import indicator_kernels as kernels
+
+# ชื่อ indicator -> Indicator (เรียงตามลำดับที่ลงทะเบียน)
+INDICATORS = {}
+
+# input ที่ indicator ใช้ได้โดยไม่ต้องประกาศ node เอง
+INDICATOR_INPUTS = ["high", "low", "close", "prev_close"]
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+class Indicator:
+    def __init__(self, name: str, columns, defaults: dict, build, lookback, span=None):
+        """
+        Parameters
+        ----------
+        name : str
+            ชื่อใน config เช่น 'RSI'
+        columns : list
+            คอลัมน์ผลลัพธ์ เช่น ['macd', 'macd_signal', 'macd_diff']
+        defaults : dict
+            พารามิเตอร์ default เช่น {'window': 14}
+        build : callable
+            build(**params) -> list ของ (node, inputs, func, intermediate)
+            inputs อ้างถึง INDICATOR_INPUTS หรือ node ก่อนหน้าของ indicator เดียวกัน
+        lookback : callable
+            lookback(**params) -> จำนวนแท่งก่อนมีค่าแรก (ใช้กำหนดขนาด buffer ของ live)
+        span : callable
+            span(**params) -> span รวมของ EMA/Wilder ที่ต่อกัน (None = ไม่มีค่าเฉลี่ยแบบ recursive)
+            ค่าแรกยังขึ้นกับจุดเริ่มต้น ต้องใช้อีกหลายเท่าของ span จึงเท่ากับการคำนวณจากประวัติเต็ม
+        """
+        self.name = name
+        self.columns = list(columns)
+        self.defaults = dict(defaults)
+        self.build = build
+        self.lookback = lookback
+        self.span = span or (lambda **params: 0)
+
+    def params(self, overrides=None) -> dict:
+        """รวม default กับค่าจาก config (key ที่ไม่รู้จักจะ error)"""
+        overrides = overrides or {}
+        unknown = set(overrides) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"❌ {self.name} ไม่มีพารามิเตอร์: {sorted(unknown)}")
+        return {**self.defaults, **overrides}
+
+    def nodes(self, params: dict):
+        """node ของ indicator นี้ตามพารามิเตอร์ที่กำหนด"""
+        return self.build(**params)
+
+
+def register_indicator(name: str, columns, defaults: dict = None, lookback=None, span=None):
+    """
+    decorator สำหรับลงทะเบียน indicator ใหม่
+
+    ตัวอย่าง
+    --------
+    >>> @register_indicator("Momentum", ["momentum"], {"window": 10},
+    ...                     lookback=lambda window: window + 1)
+    ... def _momentum(window):
+    ...     return [("momentum", ["close"], lambda c: c - kernels.previous(c), False)]
+    """
+    def decorator(build):
+        INDICATORS[name] = Indicator(
+            name, columns, defaults or {}, build,
+            lookback or (lambda **params: max(params.values(), default=1)),
+            span,
+        )
+        return build
+    return decorator
+
+
+def enabled_indicators(config=None):
+    """
+    อ่าน features.indicators จาก config
+
+    Returns
+    -------
+    list
+        [(ชื่อ, params), ...] ตามลำดับใน config
+        (ไม่มี key features.indicators = เปิดทุกตัวใน INDICATORS ด้วยค่า default)
+    """
+    if config is None:
+        config = load_config()
+    entries = config.get("features", {}).get("indicators")
+    if entries is None:
+        entries = list(INDICATORS)
+    if isinstance(entries, dict):
+        entries = list(entries.items())
+    else:
+        entries = [
+            next(iter(entry.items())) if isinstance(entry, dict) else (entry, None)
+            for entry in entries
+        ]
+
+    enabled = []
+    for name, overrides in entries:
+        if name not in INDICATORS:
+            raise KeyError(f"❌ ไม่รู้จัก indicator: {name} (ที่มี: {list(INDICATORS)})")
+        enabled.append((name, INDICATORS[name].params(overrides)))
+    return enabled
+
+
+def indicator_columns(indicators) -> list:
+    """คอลัมน์ผลลัพธ์ทั้งหมดของ indicator ที่เปิด"""
+    return [col for name, _ in indicators for col in INDICATORS[name].columns]
+
+
+def indicator_lookback(indicators) -> int:
+    """lookback ที่ยาวที่สุดของ indicator ที่เปิด (0 ถ้าไม่มี)"""
+    return max((INDICATORS[name].lookback(**params) for name, params in indicators), default=0)
+
+
+def indicator_warmup(indicators, spans: float) -> int:
+    """
+    จำนวนแท่งที่ indicator ที่เปิดต้องใช้ให้ค่าล่าสุดใกล้การคำนวณจากประวัติเต็ม
+    (lookback + spans x span ของ EMA/Wilder, ที่ยาวที่สุด; 0 ถ้าไม่มี)
+    """
+    return max((int(INDICATORS[name].lookback(**params) + spans * INDICATORS[name].span(**params))
+                for name, params in indicators), default=0)
+
+
+def add_indicator_nodes(graph, indicators):
+    """เพิ่ม node ของ indicator ที่เปิดลงใน FeatureGraph (branch 'indicators')"""
+    for name, params in indicators:
+        for node, inputs, func, intermediate in INDICATORS[name].nodes(params):
+            graph.add(node, inputs, func, "indicators", intermediate)
+    return graph
+
+
+def indicator_timings(node_timings: dict, indicators) -> dict:
+    """
+    รวมเวลาราย node (จาก FeatureGraph.compute(..., timings=...)) เป็นเวลาราย indicator
+
+    Returns
+    -------
+    dict
+        {ชื่อ indicator: วินาที} เฉพาะ indicator ที่มี node ถูกคำนวณ
+    """
+    out = {}
+    for name, params in indicators:
+        nodes = [node for node, _, _, _ in INDICATORS[name].nodes(params) if node in node_timings]
+        if nodes:
+            out[name] = sum(node_timings[node] for node in nodes)
+    return out
+
+
+def compute_indicators(high, low, close, indicators=None, timings: dict = None) -> dict:
+    """
+    คำนวณ indicator ที่เปิดตามลำดับ (ใช้ prev_close ร่วมกันทุก indicator)
+
+    Parameters
+    ----------
+    high, low, close : array-like
+        ราคา
+    indicators : list
+        [(ชื่อ, params), ...] จาก enabled_indicators (None = อ่านจาก config.yaml)
+    timings : dict
+        ถ้าส่งมา จะบันทึกเวลาที่ใช้ของแต่ละ indicator (วินาที) ลงใน dict นี้
+
+    Returns
+    -------
+    dict
+        {column_name: np.ndarray}
+    """
+    if indicators is None:
+        indicators = enabled_indicators()
+    close = kernels.as_float_array(close)
+    values = {
+        "high": kernels.as_float_array(high),
+        "low": kernels.as_float_array(low),
+        "close": close,
+        "prev_close": kernels.previous(close),
+    }
+
+    out = {}
+    for name, params in indicators:
+        start = time.perf_counter()
+        local = dict(values)
+        for node, inputs, func, _ in INDICATORS[name].nodes(params):
+            local[node] = func(*(local[dep] for dep in inputs))
+        for col in INDICATORS[name].columns:
+            out[col] = local[col]
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+    return out
+
+
+def _safe_ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return num / den
+
+
+# ============================
+# Indicators มาตรฐาน (ผลตรงกับ ta, fillna=False)
+# ============================
+# Wilder smoothing (alpha = 1/window) เทียบเท่า EMA span = 2 * window - 1
+@register_indicator("RSI", ["rsi"], {"window": 14}, lookback=lambda window: window + 1,
+                    span=lambda window: 2 * window - 1)
+def _rsi(window):
+    return [
+        ("rsi", ["close", "prev_close"], lambda c, p: kernels.rsi(c, window, prev_close=p), False),
+    ]
+
+
+@register_indicator("MACD", ["macd", "macd_signal", "macd_diff"],
+                    {"window_slow": 26, "window_fast": 12, "window_sign": 9},
+                    lookback=lambda window_slow, window_fast, window_sign: window_slow + window_sign - 1,
+                    span=lambda window_slow, window_fast, window_sign: window_slow + window_sign)
+def _macd(window_slow, window_fast, window_sign):
+    return [
+        ("ema_fast", ["close"], lambda c: kernels.ema(c, 2 / (window_fast + 1), min_periods=window_fast), True),
+        ("ema_slow", ["close"], lambda c: kernels.ema(c, 2 / (window_slow + 1), min_periods=window_slow), True),
+        ("macd", ["ema_fast", "ema_slow"], lambda f, s: f - s, False),
+        ("macd_signal", ["macd"], lambda m: kernels.ema(m, 2 / (window_sign + 1), min_periods=window_sign), False),
+        ("macd_diff", ["macd", "macd_signal"], lambda m, s: m - s, False),
+    ]
+
+
+@register_indicator("ATR", ["atr"], {"window": 14}, lookback=lambda window: window,
+                    span=lambda window: 2 * window - 1)
+def _atr(window):
+    return [
+        ("true_range", ["high", "low", "close", "prev_close"],
+         lambda h, l, c, p: kernels.true_range(h, l, c, prev_close=p), True),
+        ("atr", ["true_range"], lambda tr: kernels.wilder_average(tr, window), False),
+    ]
+
+
+@register_indicator("BollingerBands", ["bb_high", "bb_low", "bb_width"],
+                    {"window": 20, "window_dev": 2}, lookback=lambda window, window_dev: window)
+def _bollinger_bands(window, window_dev):
+    return [
+        ("bb_stats", ["close"], lambda c: kernels.rolling_mean_std(c, window, ddof=0), True),
+        ("bb_high", ["bb_stats"], lambda s: s[0] + window_dev * s[1], False),
+        ("bb_low", ["bb_stats"], lambda s: s[0] - window_dev * s[1], False),
+        ("bb_width", ["bb_high", "bb_low"], lambda h, l: h - l, False),
+    ]
+
+
+@register_indicator("Stochastic", ["stoch_k", "stoch_d"], {"window": 14, "smooth_window": 3},
+                    lookback=lambda window, smooth_window: window + smooth_window - 1)
+def _stochastic(window, smooth_window):
+    return [
+        ("stoch_min", ["low"], lambda l: kernels.rolling_min(l, window), True),
+        ("stoch_max", ["high"], lambda h: kernels.rolling_max(h, window), True),
+        ("stoch_k", ["close", "stoch_min", "stoch_max"],
+         lambda c, lo, hi: _safe_ratio(100 * (c - lo), hi - lo), False),
+        ("stoch_d", ["stoch_k"], lambda k: kernels.rolling_mean(k, smooth_window), False),
+    ]
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    close = 1.60 + np.cumsum(rng.normal(0, 0.001, 100_000))
+    high, low = close + 0.001, close - 0.001
+
+    config = {"features": {"indicators": {"RSI": {"window": 21}, "MACD": None}}}
+    indicators = enabled_indicators(config)
+    timings = {}
+    out = compute_indicators(high, low, close, indicators, timings=timings)
+    print(indicators)
+    print(list(out))
+    print({name: f"{seconds * 1000:.2f} ms" for name, seconds in timings.items()})
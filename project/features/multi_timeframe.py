@@ -0,0 +1,272 @@
+"""
+multi_timeframe.py
+------------------
+ฟีเจอร์หลาย timeframe (เช่น H1, H4, D1) จากแท่ง M15
+- resample แท่ง M15 เป็น timeframe ที่ใหญ่กว่า แล้วคำนวณ indicator ชุดเดียวกัน
+- join กลับเข้าแถว M15 โดยใช้เฉพาะแท่ง timeframe ใหญ่ที่ "ปิดแล้ว" (ไม่มี lookahead)
+- โหมด streaming: อัปเดตแท่ง timeframe ใหญ่ทีละแท่ง M15 (ไม่ resample ใหม่ทั้งหมด)
+"""
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_generator import STREAMING_INDICATORS, StreamingFeatureState
+from project.features.indicator_registry import enabled_indicators
+from project.utils.memory import compact_array
+
+# ความยาวของแต่ละ timeframe (pandas offset alias)
+TIMEFRAMES = {
+    "M1": "1min",
+    "M5": "5min",
+    "M15": "15min",
+    "M30": "30min",
+    "H1": "1h",
+    "H4": "4h",
+    "D1": "1D",
+}
+
+# ฟีเจอร์ที่คำนวณในแต่ละ timeframe ใหญ่ (ชื่อคอลัมน์จะมี prefix เช่น h1_rsi)
+HTF_COLUMNS = [
+    "return", "log_return", "volatility",
+    "rsi", "macd", "macd_signal", "macd_diff", "atr",
+    "bb_high", "bb_low", "bb_width", "stoch_k", "stoch_d",
+]
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def _timeframe_ns(timeframe: str) -> int:
+    return pd.Timedelta(TIMEFRAMES[timeframe]).value
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, time_col: str = "datetime"):
+    """
+    รวมแท่งเป็น timeframe ที่ใหญ่กว่า (ช่วงที่ไม่มีข้อมูลจะถูกตัดทิ้ง)
+
+    Returns
+    -------
+    pd.DataFrame
+        คอลัมน์ ['datetime', 'open', 'high', 'low', 'close', 'volume']
+        โดย datetime = เวลาเปิดของแท่ง timeframe ใหญ่
+    """
+    # ใช้เฉพาะคอลัมน์ OHLCV เพื่อไม่ต้อง copy ฟีเจอร์อื่นทั้งหมดตอน set index
+    ohlcv = pd.DataFrame(
+        {col: df[col].to_numpy() for col in ["open", "high", "low", "close", "volume"]},
+        index=pd.DatetimeIndex(pd.to_datetime(df[time_col]), name="datetime"),
+    )
+    bars = (
+        ohlcv.resample(TIMEFRAMES[timeframe], origin="epoch")
+        .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        .dropna(subset=["open"])
+    )
+    return bars.reset_index()
+
+
+def add_multi_timeframe_features(df: pd.DataFrame, timeframes=None, base_timeframe: str = None,
+                                 time_col: str = "datetime", graph=None, low_memory: bool = False):
+    """
+    เพิ่มฟีเจอร์ของ timeframe ที่ใหญ่กว่าลงในแถวของ timeframe หลัก
+
+    แถวเวลาเปิด t (ปิดที่ t + base) จะเห็นเฉพาะแท่งใหญ่ที่ปิดไม่เกิน t + base
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        ข้อมูลราคาที่มีคอลัมน์เวลาและ ['open', 'high', 'low', 'close', 'volume']
+    timeframes : list
+        เช่น ['H1', 'H4', 'D1'] (None = features.higher_timeframes ใน config.yaml)
+    base_timeframe : str
+        timeframe ของ df (None = data.timeframe ใน config.yaml)
+    time_col : str
+        คอลัมน์เวลาเปิดของแท่ง
+    graph : FeatureGraph
+        graph ที่ใช้คำนวณ (None = build_feature_graph())
+    low_memory : bool
+        True = เก็บคอลัมน์ที่เพิ่มเป็น float32
+
+    Returns
+    -------
+    pd.DataFrame
+        df เดิม + คอลัมน์ เช่น h1_rsi, h4_macd, d1_atr
+    """
+    if timeframes is None or base_timeframe is None:
+        config = load_config()
+        timeframes = timeframes or config["features"].get("higher_timeframes", [])
+        base_timeframe = base_timeframe or config["data"]["timeframe"]
+    graph = graph or build_feature_graph()
+
+    new_columns = {}
+    for tf in timeframes:
+        new_columns.update(higher_timeframe_features(
+            df, tf, base_timeframe=base_timeframe, time_col=time_col, graph=graph, low_memory=low_memory,
+        ))
+
+    new_frame = pd.DataFrame(new_columns, index=df.index)
+    return pd.concat([df.drop(columns=[c for c in new_columns if c in df.columns]), new_frame], axis=1)
+
+
+def higher_timeframe_features(df: pd.DataFrame, timeframe: str, columns=None, base_timeframe: str = "M15",
+                              time_col: str = "datetime", graph=None, low_memory: bool = False) -> dict:
+    """
+    คำนวณฟีเจอร์ของ timeframe ใหญ่หนึ่ง timeframe แล้ว align เข้ากับแถวของ df
+
+    Parameters
+    ----------
+    columns : list
+        คอลัมน์ของ graph ที่ต้องการ (ไม่มี prefix) เช่น ['rsi', 'atr']
+        None = HTF_COLUMNS ที่ graph มี (indicator ที่ปิดใน config จะถูกข้าม)
+
+    Returns
+    -------
+    dict
+        {'h1_rsi': np.ndarray, ...} ความยาวเท่ากับ df
+    """
+    graph = graph or build_feature_graph()
+    if columns is None:
+        available = set(graph.feature_columns)
+        columns = [col for col in HTF_COLUMNS if col in available]
+
+    close_time = (
+        pd.to_datetime(df[time_col]).to_numpy(dtype="datetime64[ns]")
+        + np.timedelta64(_timeframe_ns(base_timeframe), "ns")
+    )
+    bars = resample_ohlcv(df, timeframe, time_col)
+    htf = graph.compute(bars, columns=columns, include_input=False)
+    htf_close_time = (
+        bars["datetime"].to_numpy(dtype="datetime64[ns]")
+        + np.timedelta64(_timeframe_ns(timeframe), "ns")
+    )
+
+    # แท่งใหญ่ล่าสุดที่ปิดไม่เกินเวลาปิดของแต่ละแถว (-1 = ยังไม่มี)
+    idx = np.searchsorted(htf_close_time, close_time, side="right") - 1
+    has_bar = idx >= 0
+    out = {}
+    for col in columns:
+        values = np.full(len(df), np.nan)
+        values[has_bar] = htf[col].to_numpy(dtype=np.float64)[idx[has_bar]]
+        out[f"{timeframe.lower()}_{col}"] = compact_array(values) if low_memory else values
+    return out
+
+
+class HigherTimeframeBar:
+    """แท่งของ timeframe ใหญ่ที่กำลังสะสม พร้อม streaming indicator state"""
+
+    def __init__(self, timeframe: str, indicators=None):
+        """
+        indicators = [(ชื่อ, params), ...] ชุดเดียวกับ graph ที่ใช้ตอน train
+        (None = features.indicators ใน config.yaml; indicator ที่ไม่มี streaming state จะไม่ถูกคืน)
+        """
+        if indicators is None:
+            indicators = enabled_indicators(load_config())
+        self.timeframe = timeframe
+        self.prefix = timeframe.lower() + "_"
+        self.period_ns = _timeframe_ns(timeframe)
+        self.state = StreamingFeatureState([item for item in indicators if item[0] in STREAMING_INDICATORS])
+        self.columns = [col for col in HTF_COLUMNS if col in self.state.columns]
+        self.period_start = None
+        self.bar = None
+        self.features = {self.prefix + col: np.nan for col in self.columns}
+
+    def _finalize(self):
+        """ปิดแท่งปัจจุบัน แล้วอัปเดต indicator ด้วยแท่งนั้น (O(1))"""
+        row = self.state.push(self.bar)
+        self.features = {self.prefix + col: row[col] for col in self.columns}
+        self.bar = None
+
+    def update(self, open_ns: int, close_ns: int, candle: dict):
+        period_start = open_ns - open_ns % self.period_ns
+        if self.bar is not None and period_start != self.period_start:
+            self._finalize()
+
+        if self.bar is None:
+            self.period_start = period_start
+            self.bar = {
+                "open": candle["open"], "high": candle["high"], "low": candle["low"],
+                "close": candle["close"], "volume": candle["volume"],
+            }
+        else:
+            self.bar["high"] = max(self.bar["high"], candle["high"])
+            self.bar["low"] = min(self.bar["low"], candle["low"])
+            self.bar["close"] = candle["close"]
+            self.bar["volume"] += candle["volume"]
+
+        # แท่ง base สุดท้ายของช่วงปิดแล้ว -> แท่งใหญ่ปิดทันที
+        if close_ns >= self.period_start + self.period_ns:
+            self._finalize()
+        return self.features
+
+
+class MultiTimeframeStream:
+    def __init__(self, timeframes=None, base_timeframe: str = None, time_col: str = "datetime",
+                 indicators=None):
+        """
+        อัปเดตฟีเจอร์ timeframe ใหญ่แบบ incremental ทุกครั้งที่แท่ง base ปิด
+
+        Parameters
+        ----------
+        timeframes : list
+            เช่น ['H1', 'H4', 'D1'] (None = features.higher_timeframes ใน config.yaml)
+        base_timeframe : str
+            timeframe ของแท่งที่ป้อนเข้า (None = data.timeframe ใน config.yaml)
+        time_col : str
+            key เวลาเปิดของแท่งใน candle dict
+        indicators : list
+            [(ชื่อ, params), ...] ต้องตรงกับ graph ที่ใช้ตอน train เช่น graph.params['indicators'].items()
+            (None = features.indicators ใน config.yaml)
+        """
+        if timeframes is None or base_timeframe is None or indicators is None:
+            config = load_config()
+            timeframes = timeframes or config["features"].get("higher_timeframes", [])
+            base_timeframe = base_timeframe or config["data"]["timeframe"]
+            indicators = indicators if indicators is not None else enabled_indicators(config)
+        self.base_ns = _timeframe_ns(base_timeframe)
+        self.time_col = time_col
+        self.bars = [HigherTimeframeBar(tf, indicators) for tf in timeframes]
+
+    def update(self, candle: dict):
+        """
+        รับแท่ง base ที่ปิดแล้ว 1 แท่ง
+
+        Returns
+        -------
+        dict
+            ฟีเจอร์ของแท่งใหญ่ล่าสุดที่ปิดแล้วทุก timeframe เช่น {'h1_rsi': ..., 'd1_atr': ...}
+        """
+        open_ns = pd.Timestamp(candle[self.time_col]).value
+        close_ns = open_ns + self.base_ns
+        features = {}
+        for bar in self.bars:
+            features.update(bar.update(open_ns, close_ns, candle))
+        return features
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 96 * 10
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.0005,
+        "low": close - 0.0005,
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+    df_mtf = add_multi_timeframe_features(df, timeframes=["H1", "H4"], base_timeframe="M15")
+    print(df_mtf[["datetime", "close", "h1_rsi", "h4_rsi"]].tail())
+
+    stream = MultiTimeframeStream(timeframes=["H1", "H4"], base_timeframe="M15")
+    for candle in df.to_dict("records"):
+        latest = stream.update(candle)
+    print({k: latest[k] for k in ["h1_rsi", "h4_rsi"]})
@@ -8,19 +8,56 @@ volume_features.py
 import pandas as pd
 import numpy as np
 
+from project.features.indicator_kernels import pct_change
+from project.utils.memory import compact_array
+
+# หมวดหมู่ของ volume_divergence (เก็บเป็น categorical ที่ใช้ code แบบ int8)
+DIVERGENCE_CATEGORIES = ["none", "bullish_divergence", "bearish_divergence"]
+
+
+def classify_divergence(price_change, volume_change):
+    """
+    จัดกลุ่ม divergence ด้วย array selection (ไม่มี Python loop)
+
+    Returns
+    -------
+    np.ndarray
+        int8 code ตามลำดับใน DIVERGENCE_CATEGORIES
+    """
+    price_change = np.asarray(price_change, dtype=np.float64)
+    volume_change = np.asarray(volume_change, dtype=np.float64)
+    codes = np.select(
+        [(price_change < 0) & (volume_change > 0), (price_change > 0) & (volume_change < 0)],
+        [1, 2],
+        default=0,
+    )
+    return codes.astype(np.int8)
+
+
 class VolumeFeatures:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, low_memory: bool = False):
         """
         Parameters
         ----------
         df : pd.DataFrame
             ข้อมูลราคา Forex ที่มีคอลัมน์ ['open', 'high', 'low', 'close', 'volume']
+        low_memory : bool
+            True = ไม่ deep copy df และเก็บ volume MA เป็น float32
         """
-        self.df = df.copy()
+        self.df = df.copy(deep=not low_memory)
+        self.low_memory = low_memory
+
+    def _volume_ma(self, window: int):
+        """
+        คำนวณ volume MA จาก volume เสมอ
+        (ไม่ใช้คอลัมน์ volume_ma_* ที่มีอยู่ใน df ซึ่งอาจมาจาก window หรือข้อมูลชุดอื่น)
+        """
+        return self.df["volume"].rolling(window=window).mean()
 
     def add_volume_ma(self, window: int = 20):
         """เพิ่มค่า Moving Average ของ Volume"""
-        self.df[f"volume_ma_{window}"] = self.df["volume"].rolling(window=window).mean()
+        ma = self._volume_ma(window)
+        self.df[f"volume_ma_{window}"] = compact_array(ma.to_numpy()) if self.low_memory else ma
         return self.df
 
     def add_volume_spike(self, threshold: float = 1.5, window: int = 20):
@@ -33,8 +70,8 @@ class VolumeFeatures:
         window : int
             จำนวนแท่งย้อนหลังที่ใช้คำนวณค่าเฉลี่ย
         """
-        ma = self.df["volume"].rolling(window=window).mean()
-        self.df["volume_spike"] = (self.df["volume"] > threshold * ma).astype(int)
+        ma = self._volume_ma(window)
+        self.df["volume_spike"] = (self.df["volume"] > threshold * ma).astype(np.int8)
         return self.df
 
     def add_volume_divergence(self, price_col: str = "close", window: int = 20):
@@ -42,27 +79,36 @@ class VolumeFeatures:
         ตรวจจับ Divergence ระหว่างราคาและ Volume
         - ถ้าราคาเพิ่มขึ้น แต่ Volume ลดลง → bearish divergence
         - ถ้าราคาลดลง แต่ Volume เพิ่มขึ้น → bullish divergence
+
+        ผลลัพธ์เก็บเป็น categorical (code int8) ตาม DIVERGENCE_CATEGORIES
         """
-        price_change = self.df[price_col].pct_change(window)
-        volume_change = self.df["volume"].pct_change(window)
-
-        conditions = []
-        for p, v in zip(price_change, volume_change):
-            if p > 0 and v < 0:
-                conditions.append("bearish_divergence")
-            elif p < 0 and v > 0:
-                conditions.append("bullish_divergence")
-            else:
-                conditions.append("none")
-
-        self.df["volume_divergence"] = conditions
+        price = self.df[price_col].to_numpy(dtype=np.float64)
+        volume = self.df["volume"].to_numpy(dtype=np.float64)
+        codes = classify_divergence(pct_change(price, window), pct_change(volume, window))
+
+        self.df["volume_divergence"] = pd.Categorical.from_codes(codes, categories=DIVERGENCE_CATEGORIES)
         return self.df
 
-    def generate_all_volume_features(self):
-        """รวมทุกฟีเจอร์ Volume"""
-        self.add_volume_ma()
-        self.add_volume_spike()
-        self.add_volume_divergence()
+    def generate_all_volume_features(self, threshold: float = 1.5, window: int = 20,
+                                     divergence_window: int = 20, price_col: str = "close"):
+        """
+        รวมทุกฟีเจอร์ Volume ในรอบเดียว
+        - คำนวณ rolling mean ของ volume ครั้งเดียวแล้วใช้ร่วมกับ volume_spike
+        - volume_divergence เก็บเป็น categorical (int8 code)
+        """
+        volume = self.df["volume"].to_numpy(dtype=np.float64)
+        volume_ma = self._volume_ma(window).to_numpy(dtype=np.float64)
+        price = self.df[price_col].to_numpy(dtype=np.float64)
+
+        with np.errstate(invalid="ignore"):
+            spike = (volume > threshold * volume_ma).astype(np.int8)
+        codes = classify_divergence(
+            pct_change(price, divergence_window), pct_change(volume, divergence_window)
+        )
+
+        self.df[f"volume_ma_{window}"] = compact_array(volume_ma) if self.low_memory else volume_ma
+        self.df["volume_spike"] = spike
+        self.df["volume_divergence"] = pd.Categorical.from_codes(codes, categories=DIVERGENCE_CATEGORIES)
         return self.df
 
 
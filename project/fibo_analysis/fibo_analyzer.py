@@ -5,10 +5,69 @@ fibo_analyzer.py
 ตรวจสอบการแตะระดับ retracement/extension และสร้างสัญญาณ
 """
 
+import numpy as np
 import pandas as pd
 
+from project.features.fibo_levels import LEVEL_COLUMN_PREFIXES, level_bit_order
+
+
+def level_name_from_column(col: str) -> str:
+    """แปลงชื่อคอลัมน์ level เป็นชื่อสัญญาณ เช่น fibo_ret_0.382 -> retracement_0.382"""
+    for prefix, name in LEVEL_COLUMN_PREFIXES.items():
+        if col.startswith(prefix):
+            return name + col[len(prefix):]
+    raise ValueError(f"❌ ไม่ใช่คอลัมน์ Fibonacci level: {col}")
+
+
+def touch_bitmask(close, levels, tolerance: float):
+    """
+    เทียบ close กับ level matrix ทั้งหมดในครั้งเดียว (broadcast)
+
+    Parameters
+    ----------
+    close : array-like
+        ราคาปิด ขนาด (n_rows,)
+    levels : np.ndarray
+        level matrix ขนาด (n_rows, n_levels) ค่า NaN ถือว่าไม่แตะ
+    tolerance : float
+        ระยะห่างที่ถือว่า "แตะ"
+
+    Returns
+    -------
+    np.ndarray
+        bitmask ต่อแถว: bit j = 1 เมื่อแตะ level ที่ j
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    n_levels = levels.shape[1]
+    if n_levels > 63:
+        raise ValueError("❌ รองรับได้สูงสุด 63 levels ต่อ bitmask")
+
+    close = np.asarray(close, dtype=np.float64)[:, None]
+    touched = np.abs(close - levels) <= tolerance
+    dtype = np.int32 if n_levels <= 31 else np.int64
+    weights = (np.int64(1) << np.arange(n_levels, dtype=np.int64)).astype(dtype)
+    return touched.astype(dtype) @ weights
+
+
+def labels_from_bitmask(mask, level_names):
+    """
+    สร้าง label แบบเดิม (เช่น 'retracement_0.382,extension_1.618' หรือ 'none')
+    สร้าง string เฉพาะค่า mask ที่ไม่ซ้ำกัน แล้วกระจายกลับด้วย index
+    """
+    mask = np.asarray(mask)
+    unique_masks, inverse = np.unique(mask, return_inverse=True)
+    unique_labels = np.array([_label_for_mask(int(m), level_names) for m in unique_masks], dtype=object)
+    return unique_labels[inverse]
+
+
+def _label_for_mask(mask: int, level_names) -> str:
+    touched = [name for j, name in enumerate(level_names) if mask >> j & 1]
+    return ",".join(touched) if touched else "none"
+
+
 class FiboAnalyzer:
-    def __init__(self, df: pd.DataFrame, fibo_col: str = "fibo_levels", tolerance: float = 0.0005):
+    def __init__(self, df: pd.DataFrame, fibo_col: str = "fibo_levels", tolerance: float = 0.0005,
+                 low_memory: bool = False):
         """
         Parameters
         ----------
@@ -18,15 +77,45 @@ class FiboAnalyzer:
             คอลัมน์ที่เก็บค่า Fibonacci levels (dict retracements/extensions)
         tolerance : float
             ระยะห่างที่ถือว่า "แตะ" ระดับ Fibonacci (เช่น 0.0005 ~ 5 pips)
+        low_memory : bool
+            True = ไม่ deep copy df และเก็บ fibo_signal เป็น categorical
         """
-        self.df = df.copy()
+        self.df = df.copy(deep=not low_memory)
+        self.low_memory = low_memory
         self.fibo_col = fibo_col
         self.tolerance = tolerance
+        # ลำดับ bit มาจาก level_bit_order ไม่ใช่ลำดับคอลัมน์ของ df
+        self.level_columns = level_bit_order(
+            col for col in self.df.columns if col.startswith(tuple(LEVEL_COLUMN_PREFIXES))
+        )
+        self.level_names = [level_name_from_column(col) for col in self.level_columns]
+
+    def check_touch_bitmask(self):
+        """
+        ตรวจการแตะ Fibonacci levels แบบ vectorized (ไม่มี Python loop ต่อแถว)
+        ใช้คอลัมน์ level แบบ float จาก FiboLevels (fibo_ret_*, fibo_ext_*)
+        แล้วเก็บผลเป็น integer bitmask ในคอลัมน์ fibo_touch_mask
+        (bit j ตรงกับ self.level_names[j])
+        """
+        if not self.level_columns:
+            raise ValueError("❌ ไม่พบคอลัมน์ fibo_ret_*/fibo_ext_* (ใช้ FiboLevels.generate_levels_for_dataframe)")
+
+        levels = self.df[self.level_columns].to_numpy(dtype=np.float64)
+        self.df["fibo_touch_mask"] = touch_bitmask(self.df["close"].to_numpy(), levels, self.tolerance)
+        return self.df
 
     def check_touch_levels(self):
         """
         ตรวจสอบว่าราคา close แตะหรือใกล้ Fibonacci levels
+        ถ้ามีคอลัมน์ level แบบ float จะใช้ bitmask แล้วแปลงเป็น label
+        ถ้ามีแค่คอลัมน์ dict แบบเดิมจะตรวจทีละแถว
         """
+        if self.level_columns:
+            self.check_touch_bitmask()
+            labels = labels_from_bitmask(self.df["fibo_touch_mask"], self.level_names)
+            self.df["fibo_signal"] = pd.Categorical(labels) if self.low_memory else labels
+            return self.df
+
         signals = []
         for idx, row in self.df.iterrows():
             fibo_data = row[self.fibo_col]
@@ -56,6 +145,11 @@ class FiboAnalyzer:
         """
         สรุปจำนวนครั้งที่แตะ Fibonacci levels
         """
+        if "fibo_signal" not in self.df.columns and "fibo_touch_mask" in self.df.columns:
+            masks, counts = np.unique(self.df["fibo_touch_mask"].to_numpy(), return_counts=True)
+            order = np.argsort(-counts, kind="stable")
+            return {_label_for_mask(int(masks[i]), self.level_names): int(counts[i]) for i in order}
+
         summary = self.df["fibo_signal"].value_counts().to_dict()
         return summary
 
@@ -82,4 +176,15 @@ if __name__ == "__main__":
     print(df[["close", "fibo_signal"]])
 
     summary = analyzer.generate_summary()
-    print("Summary:", summary)
\ No newline at end of file
+    print("Summary:", summary)
+
+    # แบบ vectorized: ใช้คอลัมน์ level จาก FiboLevels แล้วเก็บผลเป็น bitmask
+    df_cols = pd.DataFrame({
+        "close": [1.635, 1.638, 1.639, 1.642, 1.648],
+        "fibo_ret_0.382": [1.636, 1.638, 1.640, 1.642, 1.648],
+        "fibo_ext_1.618": [1.645, 1.646, 1.648, 1.650, 1.655],
+    })
+    analyzer = FiboAnalyzer(df_cols, tolerance=0.001)
+    df_cols = analyzer.check_touch_bitmask()
+    print(df_cols[["close", "fibo_touch_mask"]])
+    print("Summary:", analyzer.generate_summary())
\ No newline at end of file
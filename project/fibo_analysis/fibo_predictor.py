@@ -7,9 +7,14 @@ fibo_predictor.py
 
 import os
 import yaml
-import joblib
 import pandas as pd
 import numpy as np
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_schema import check_feature_schema, compute_model_inputs, load_feature_schema
+from project.features.fibo_levels import FiboLevels
+from project.models.model_cache import load_model
+from project.models.tree_compiler import load_compiled
+from project.utils.memory import RAW_PRICE_COLUMNS, downcast_features
 
 # โหลด config
 def load_config():
@@ -19,55 +24,100 @@ def load_config():
 
 
 class FiboPredictor:
-    def __init__(self, model_path="project/outputs/xgboost_model.pkl"):
+    def __init__(self, model_path="project/outputs/xgboost_model.pkl", low_memory=None):
         """
         Parameters
         ----------
         model_path : str
             path ของโมเดลที่ฝึกไว้
+        low_memory : bool
+            True = prepare_features ไม่ copy df และส่งฟีเจอร์เป็น float32
+            (None = features.low_memory ใน config.yaml)
         """
         self.config = load_config()
         self.model_path = model_path
+        if low_memory is None:
+            low_memory = self.config["features"].get("low_memory", False)
+        self.low_memory = low_memory
         self.model = self._load_model()
+        # XGBoost / LightGBM -> ทำนายด้วยต้นไม้แบบ array (None = ใช้ self.model)
+        self.compiled = None
+        self.compiled_max_rows = self.config["model"].get("compiled_max_rows", 8)
+        if self.config["model"].get("compiled_inference", False):
+            self.compiled = load_compiled(model_path, self.model)
+        fibo_config = self.config["features"]["fibo_levels"]
+        self.level_names = FiboLevels(fibo_config["retracements"], fibo_config["extensions"]).level_names
+
+        # คอลัมน์อินพุตของโมเดล (None = โมเดลรุ่นเก่า ใช้ทุกคอลัมน์ของ df)
+        self.feature_schema = load_feature_schema(model_path)
+        self.feature_graph = None
+        if self.feature_schema is not None:
+            self.feature_graph = build_feature_graph(self.config)
+            check_feature_schema(self.feature_schema, self.feature_graph)
 
     def _load_model(self):
-        """โหลดโมเดลจากไฟล์"""
+        """โหลดโมเดลจากไฟล์ (ผ่าน model cache ของ process)"""
         if os.path.exists(self.model_path):
-            return joblib.load(self.model_path)
+            return load_model(self.model_path)
         else:
             raise FileNotFoundError(f"❌ Model not found at {self.model_path}")
 
     def prepare_features(self, df: pd.DataFrame):
         """
         เตรียมฟีเจอร์สำหรับการพยากรณ์
-        - แปลง fibo_signal เป็น one-hot
+        - ถ้ามี fibo_touch_mask จะแตก bit เป็นคอลัมน์ต่อ level โดยตรง
+          (เช่น fibo_retracement_0.382) ไม่ต้องผ่าน string
+        - ถ้ามีแค่ fibo_signal จะแปลงเป็น one-hot แบบเดิม
         - รวมกับ indicators และ volume features
+        - ไม่แก้ไข df ที่ส่งเข้ามา (ผลลัพธ์สร้างด้วย concat ครั้งเดียว จึงไม่ต้อง copy ก่อน)
+        - ถ้าโมเดลมี feature schema: คำนวณเฉพาะคอลัมน์ที่โมเดลใช้ (ที่ยังไม่มีใน df)
+          แล้วคืนตามลำดับคอลัมน์ของโมเดล
         """
-        df = df.copy()
+        if self.feature_schema is not None:
+            features = compute_model_inputs(df, self.feature_schema, self.feature_graph,
+                                            base_timeframe=self.config["data"]["timeframe"])
+            if self.low_memory:
+                downcast_features(features, exclude=RAW_PRICE_COLUMNS)
+            return features
 
-        # One-hot encoding ของ fibo_signal
-        fibo_dummies = pd.get_dummies(df["fibo_signal"], prefix="fibo")
-        df = pd.concat([df, fibo_dummies], axis=1)
+        if "fibo_touch_mask" in df.columns:
+            mask = df["fibo_touch_mask"].to_numpy()
+            bits = (mask[:, None] >> np.arange(len(self.level_names))) & 1
+            fibo_flags = pd.DataFrame(
+                bits.astype(np.int8),
+                columns=[f"fibo_{name}" for name in self.level_names],
+                index=df.index,
+            )
+        else:
+            # One-hot encoding ของ fibo_signal
+            fibo_flags = pd.get_dummies(df["fibo_signal"], prefix="fibo")
+            if self.low_memory:
+                fibo_flags = fibo_flags.astype(np.int8)
 
         # ลบคอลัมน์ที่ไม่ใช่ฟีเจอร์
-        drop_cols = ["fibo_levels", "fibo_signal"]
-        for col in drop_cols:
-            if col in df.columns:
-                df = df.drop(columns=[col])
+        drop_cols = [col for col in ["fibo_levels", "fibo_signal", "fibo_touch_mask"] if col in df.columns]
+        features = pd.concat([df.drop(columns=drop_cols), fibo_flags], axis=1)
 
-        return df
+        if self.low_memory:
+            downcast_features(features, exclude=RAW_PRICE_COLUMNS)
+        return features
 
     def predict(self, df: pd.DataFrame):
         """
         ทำนายโอกาสขึ้น/ลงจากฟีเจอร์
+        (ไม่เกิน compiled_max_rows แถว เช่นแท่งล่าสุดตอน live -> ใช้ต้นไม้ที่ compile แล้ว)
         Returns
         -------
         pd.DataFrame
             DataFrame ที่มี prediction และ probability
         """
         features = self.prepare_features(df)
-        preds = self.model.predict(features)
-        probs = self.model.predict_proba(features)[:, 1]
+        if self.compiled is not None and len(features) <= self.compiled_max_rows:
+            probs = self.compiled.predict_proba(features)[:, 1]
+            preds = (probs > 0.5).astype(int)
+        else:
+            preds = self.model.predict(features)
+            probs = self.model.predict_proba(features)[:, 1]
 
         df["prediction"] = preds
         df["probability_up"] = probs
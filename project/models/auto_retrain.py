@@ -3,13 +3,26 @@ auto_retrain.py
 ---------------
 โมดูลสำหรับ retrain โมเดลอัตโนมัติเมื่อพบ drift
 เชื่อมกับ DriftDetector และ ModelTrainer
+- mode 'incremental': boosting ต่อจากโมเดลปัจจุบันด้วยข้อมูลหลัง cutoff ของการ train ครั้งก่อน
+  (เพิ่มต้นไม้ไม่เกิน tree_budget ต้น) ถ้า accuracy ยังต่ำกว่า baseline จะ train ใหม่ทั้งหมด
+- mode 'full': train ใหม่ทั้งหมดจาก df (แบบเดิม)
+- state ของการ train ล่าสุด (path โมเดล, cutoff) เก็บเป็น JSON ข้างไฟล์โมเดล
+- กำหนด env -> promote โมเดลที่ retrain แล้วไปที่ไฟล์ที่ live ของ env นั้นใช้ (ModelWatcher สลับให้เอง)
 """
 
 import os
+import json
+import time
 import yaml
+import joblib
 import pandas as pd
+from project.features.feature_schema import model_feature_names
 from project.models.drift_detector import DriftDetector
+from project.models.model_backends import get_backend
+from project.models.model_cache import dump_model
 from project.models.train_model import ModelTrainer
+from project.models.tree_compiler import save_compiled
+from project.utils.model_versioning import promote_model, promoted_model_path
 
 # โหลด config
 def load_config():
@@ -18,13 +31,87 @@ def load_config():
     return config
 
 
+def _encode_cutoff(value):
+    # index label -> ค่าที่เก็บใน JSON ได้
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _decode_cutoff(value, index: pd.Index):
+    if value is not None and isinstance(index, pd.DatetimeIndex):
+        return pd.Timestamp(value)
+    return value
+
+
 class AutoRetrain:
-    def __init__(self, df: pd.DataFrame, target_col: str = "direction"):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, target_col: str = "direction", low_memory: bool = False,
+                 model_name: str = None, mode: str = None, env: str = None):
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            ข้อมูลทั้งหมด (features + target) เรียงตามเวลา index = เวลาหรือลำดับแท่ง
+        model_name : str
+            backend ที่ retrain (None = training.retrain.model ใน config.yaml)
+        mode : str
+            'incremental' หรือ 'full' (None = training.retrain.mode)
+        env : str
+            dev/test/prod: promote โมเดลที่ retrain แล้วไปที่ model.save_path + best_model.pkl ของ env
+            (None = ไม่ promote เก็บไว้ที่ outputs_path เท่านั้น)
+        """
+        self.df = df.copy(deep=not low_memory)
         self.target_col = target_col
+        self.low_memory = low_memory
         self.config = load_config()
         self.detector = DriftDetector()
 
+        self.settings = self.config.get("training", {}).get("retrain", {})
+        self.model_name = model_name or self.settings.get("model", "xgboost")
+        self.mode = mode or self.settings.get("mode", "full")
+        self.env = env
+        if self.mode not in ("incremental", "full"):
+            raise ValueError(f"❌ ไม่รู้จัก retrain mode: {self.mode}")
+        self.last_retrain = None
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.config["pipeline"]["outputs_path"], f"{self.model_name}_retrained.pkl")
+
+    @property
+    def state_path(self) -> str:
+        return os.path.splitext(self.model_path)[0] + ".state.json"
+
+    def load_state(self):
+        """
+        state ของการ train ล่าสุด
+
+        Returns
+        -------
+        dict or None
+            {'model_path', 'cutoff', 'n_trees'} (None = ยังไม่เคย retrain)
+        """
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, "r") as f:
+            state = json.load(f)
+        state["cutoff"] = _decode_cutoff(state.get("cutoff"), self.df.index)
+        return state
+
+    def _save(self, model, n_trees: int):
+        """บันทึกโมเดล + state (cutoff = แถวสุดท้ายของ df ที่ใช้ train แล้ว)"""
+        dump_model(model, self.model_path)
+        save_compiled(model, self.model_path)
+        state = {"model_path": self.model_path, "cutoff": _encode_cutoff(self.df.index[-1]), "n_trees": n_trees}
+        with open(self.state_path, "w") as f:
+            json.dump(state, f, indent=4)
+        print(f"✅ Model saved at {self.model_path}")
+        if self.env is not None:
+            feature_columns = model_feature_names(model)
+            if feature_columns is None:
+                feature_columns = [col for col in self.df.columns if col != self.target_col]
+            promote_model(model, promoted_model_path(self.env), feature_columns=feature_columns)
+
     def check_and_retrain(self, y_true, y_pred):
         """
         ตรวจ drift และ retrain ถ้าจำเป็น
@@ -33,12 +120,7 @@ class AutoRetrain:
 
         if result["drift_detected"]:
             print("⚠️ Drift detected! Starting retrain process...")
-            trainer = ModelTrainer(self.df, target_col=self.target_col)
-            X_train, X_test, y_train, y_test = trainer.prepare_data()
-
-            # retrain XGBoost เป็น default
-            model, metrics = trainer.train_xgboost(X_train, y_train, X_test, y_test)
-            trainer.save_model(model, "xgboost_retrained")
+            model, metrics = self.retrain()
 
             # update baseline
             self.detector.save_baseline(metrics)
@@ -48,6 +130,75 @@ class AutoRetrain:
             print("✅ No drift detected. Model is stable.")
             return None, result["current_metrics"]
 
+    def retrain(self):
+        """
+        retrain ตาม mode (รายละเอียดของรอบล่าสุดอยู่ใน self.last_retrain)
+
+        Returns
+        -------
+        tuple
+            (โมเดล, metrics)
+        """
+        start = time.perf_counter()
+        state = self.load_state()
+        new_rows = self._rows_since(state["cutoff"]) if state else None
+        reason = self._incremental_blocker(state, new_rows)
+
+        if reason is None:
+            model, metrics, n_trees = self._retrain_incremental(state, new_rows)
+            baseline = self.detector.baseline_metrics.get("accuracy")
+            margin = self.settings.get("fallback_margin", 0.0)
+            if baseline is None or metrics["accuracy"] >= baseline - margin:
+                self._finish("incremental", start, len(new_rows), n_trees)
+                self._save(model, n_trees)
+                return model, metrics
+            reason = f"accuracy {metrics['accuracy']:.4f} < baseline {baseline:.4f}"
+
+        print(f"🔁 Full retrain ({reason})")
+        trainer = ModelTrainer(self.df, target_col=self.target_col, low_memory=self.low_memory)
+        X_train, X_test, y_train, y_test = trainer.prepare_data()
+        model, metrics = trainer.train_candidate(self.model_name, X_train, y_train, X_test, y_test)
+        n_trees = trainer.params[self.model_name].get("n_estimators")
+        self._finish("full", start, len(self.df), n_trees, reason)
+        self._save(model, n_trees)
+        return model, metrics
+
+    def _rows_since(self, cutoff) -> pd.DataFrame:
+        # แถวหลัง cutoff (df เรียงตามเวลา)
+        return self.df.iloc[self.df.index.searchsorted(cutoff, side="right"):]
+
+    def _incremental_blocker(self, state, new_rows):
+        """เหตุผลที่ทำ incremental ไม่ได้ (None = ทำได้)"""
+        if self.mode == "full":
+            return "mode=full"
+        if not get_backend(self.model_name).supports_warm_start:
+            return f"{self.model_name} ไม่รองรับ warm start"
+        if state is None or not os.path.exists(state["model_path"]):
+            return "ยังไม่มีโมเดลเดิม"
+        if len(new_rows) < self.settings.get("min_new_rows", 100):
+            return f"ข้อมูลใหม่ {len(new_rows)} แถวน้อยเกินไป"
+        return None
+
+    def _retrain_incremental(self, state, new_rows):
+        """เพิ่มต้นไม้ tree_budget ต้นต่อจากโมเดลเดิม ด้วยเฉพาะข้อมูลหลัง cutoff"""
+        # โหลดเองไม่ผ่าน model cache: โมเดลใน cache ใช้ร่วมกันและห้ามแก้ไข
+        init_model = joblib.load(state["model_path"])
+        tree_budget = self.settings.get("tree_budget", 100)
+        trainer = ModelTrainer(new_rows, target_col=self.target_col, low_memory=self.low_memory)
+        X_train, X_test, y_train, y_test = trainer.prepare_data()
+        model, metrics = trainer.warm_start(self.model_name, init_model, X_train, y_train, X_test, y_test,
+                                            n_trees=tree_budget)
+        return model, metrics, (state.get("n_trees") or 0) + tree_budget
+
+    def _finish(self, mode: str, start: float, rows: int, n_trees: int, reason: str = None):
+        self.last_retrain = {
+            "mode": mode,
+            "rows": rows,
+            "n_trees": n_trees,
+            "seconds": round(time.perf_counter() - start, 3),
+            "fallback_reason": reason,
+        }
+
 
 # ============================
 # ตัวอย่างการใช้งาน
@@ -68,4 +219,4 @@ if __name__ == "__main__":
     y_pred = [0, 1, 1, 1, 0]
 
     model, metrics = auto.check_and_retrain(y_true, y_pred)
-    print("Result metrics:", metrics)
\ No newline at end of file
+    print("Result metrics:", metrics)
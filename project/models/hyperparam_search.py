@@ -0,0 +1,511 @@
+"""
+hyperparam_search.py
+--------------------
+ค้นหา hyperparameters ของ XGBoost / LightGBM แบบจำกัดเวลา (Hyperband / Successive Halving)
+- resource ของแต่ละ trial = จำนวน boosting rounds, ทุก trial ใช้ early stopping กับชุด validation
+- แต่ละ rung รัน trial พร้อมกันบน process pool (X/y อยู่ใน shared memory)
+  แต่ละ worker สร้าง DMatrix / lgb.Dataset ครั้งเดียวแล้วใช้ซ้ำทุก trial
+- ผลทุก trial บันทึกลง SQLite (รันชื่อ study เดิมซ้ำ = ต่อจากเดิม ไม่ train trial ที่เสร็จแล้วซ้ำ)
+- เมื่อหมดเวลา เขียน params ที่ดีที่สุดเป็น profile ใหม่ใน model_params.yaml (profiles.<ชื่อ>)
+"""
+
+import json
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import yaml
+import numpy as np
+
+from project.models.walk_forward import PARALLEL_MODELS, attach_array, share_array, to_contiguous_matrix
+
+MODEL_PARAMS_PATH = "project/config/model_params.yaml"
+
+# ช่วงค้นหา default: (ชนิด, ต่ำสุด, สูงสุด) หรือ ("choice", [ค่า...])
+SEARCH_SPACES = {
+    "xgboost": {
+        "learning_rate": ("log", 0.01, 0.3),
+        "max_depth": ("int", 3, 10),
+        "subsample": ("float", 0.5, 1.0),
+        "colsample_bytree": ("float", 0.5, 1.0),
+        "gamma": ("float", 0.0, 1.0),
+        "min_child_weight": ("log", 1.0, 20.0),
+    },
+    "lightgbm": {
+        "learning_rate": ("log", 0.01, 0.3),
+        "num_leaves": ("int", 15, 255),
+        "max_depth": ("choice", [-1, 4, 6, 8, 10]),
+        "subsample": ("float", 0.5, 1.0),
+        "colsample_bytree": ("float", 0.5, 1.0),
+        "min_child_samples": ("int", 5, 100),
+    },
+}
+
+# metric ที่ยิ่งมากยิ่งดี (ตัวอื่น เช่น logloss ยิ่งน้อยยิ่งดี)
+MAXIMIZE_METRICS = {"auc", "aucpr", "map", "ndcg", "average_precision"}
+
+# state ต่อ process ของ worker (สร้างครั้งเดียวใน _init_worker)
+_WORKER = {}
+
+
+# โหลด config และ hyperparameters
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    with open(MODEL_PARAMS_PATH, "r") as f:
+        params = yaml.safe_load(f)
+    return config, params
+
+
+def sample_params(space: dict, rng: np.random.Generator) -> dict:
+    """สุ่ม params 1 ชุดจาก space (ค่าเป็น int/float/ค่าใน choice ของ Python ล้วน)"""
+    params = {}
+    for name, spec in space.items():
+        kind = spec[0]
+        if kind == "int":
+            params[name] = int(rng.integers(spec[1], spec[2] + 1))
+        elif kind == "float":
+            params[name] = round(float(rng.uniform(spec[1], spec[2])), 6)
+        elif kind == "log":
+            params[name] = round(float(math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2])))), 6)
+        elif kind == "choice":
+            params[name] = spec[1][int(rng.integers(len(spec[1])))]
+        else:
+            raise ValueError(f"❌ ไม่รู้จักชนิดของช่วงค้นหา: {kind} ({name})")
+    return params
+
+
+def hyperband_brackets(min_resource: int, max_resource: int, eta: int = 3, method: str = "hyperband"):
+    """
+    ตาราง bracket ของ Hyperband (successive_halving = เฉพาะ bracket ที่กว้างที่สุด)
+
+    Returns
+    -------
+    list
+        [(bracket, [(n_configs, resource), ...]), ...] โดยแต่ละ rung เก็บ n_configs ตัวที่ดีที่สุด
+        จาก rung ก่อนหน้าแล้ว train ด้วย resource rounds
+    """
+    if method not in ("hyperband", "successive_halving"):
+        raise ValueError(f"❌ ไม่รู้จัก method: {method}")
+    if eta < 2 or min_resource < 1 or max_resource < min_resource:
+        raise ValueError("❌ ต้องมี eta >= 2 และ 1 <= min_resource <= max_resource")
+
+    s_max = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        rungs = [
+            (max(1, int(n * eta ** -i)), int(round(max_resource * eta ** (i - s))))
+            for i in range(s + 1)
+        ]
+        brackets.append((s, rungs))
+        if method == "successive_halving":
+            break
+    return brackets
+
+
+def native_params(model: str, params: dict, n_jobs: int) -> dict:
+    """แปลง params แบบ sklearn (model_params.yaml) เป็น params ของ xgb.train / lgb.train"""
+    params = {k: v for k, v in params.items() if k != "n_estimators"}
+    if model == "xgboost":
+        return {**params, "nthread": n_jobs}
+    return {**params, "num_threads": n_jobs, "verbose": -1}
+
+
+def _datasets(model: str):
+    """DMatrix / lgb.Dataset ของ train และ validation (สร้างครั้งแรกแล้ว cache ใน process)"""
+    key = "datasets_" + model
+    if key not in _WORKER:
+        X, y, split = _WORKER["X"], _WORKER["y"], _WORKER["split"]
+        train_end, valid_start = split
+        if model == "xgboost":
+            import xgboost as xgb
+
+            dtrain = xgb.DMatrix(X[:train_end], label=y[:train_end], nthread=_WORKER["n_jobs"])
+            dvalid = xgb.DMatrix(X[valid_start:], label=y[valid_start:], nthread=_WORKER["n_jobs"])
+        else:
+            import lightgbm as lgb
+
+            # feature_pre_filter=False: ใช้ Dataset เดียวกับ min_child_samples ต่างกันได้
+            dataset_params = {"feature_pre_filter": False, "verbose": -1}
+            dtrain = lgb.Dataset(X[:train_end], label=y[:train_end], free_raw_data=False, params=dataset_params)
+            dvalid = lgb.Dataset(X[valid_start:], label=y[valid_start:], reference=dtrain, free_raw_data=False,
+                                 params=dataset_params)
+            dtrain.construct()
+            dvalid.construct()
+        _WORKER[key] = (dtrain, dvalid)
+    return _WORKER[key]
+
+
+def _init_worker(x_name, x_shape, x_dtype, y_name, y_shape, y_dtype, split, n_jobs):
+    """initializer ของ worker: เปิด shared memory ของ X/y ครั้งเดียวต่อ process"""
+    _WORKER["X_shm"], _WORKER["X"] = attach_array(x_name, x_shape, x_dtype)
+    _WORKER["y_shm"], _WORKER["y"] = attach_array(y_name, y_shape, y_dtype)
+    _WORKER["split"] = split
+    _WORKER["n_jobs"] = n_jobs
+
+
+def _run_trial(model: str, params: dict, rounds: int, early_stopping_rounds: int):
+    """
+    งานของ worker: train 1 trial ด้วย rounds รอบ (หยุดก่อนถ้า validation ไม่ดีขึ้น)
+
+    Returns
+    -------
+    dict
+        {'score', 'best_iteration', 'seconds'}
+    """
+    dtrain, dvalid = _datasets(model)
+    params = native_params(model, params, _WORKER["n_jobs"])
+    start = time.perf_counter()
+    if model == "xgboost":
+        import xgboost as xgb
+
+        booster = xgb.train(params, dtrain, num_boost_round=rounds, evals=[(dvalid, "valid")],
+                            early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+        score, best_iteration = float(booster.best_score), int(booster.best_iteration)
+    else:
+        import lightgbm as lgb
+
+        booster = lgb.train(params, dtrain, num_boost_round=rounds, valid_sets=[dvalid], valid_names=["valid"],
+                            callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+        score = float(next(iter(booster.best_score["valid"].values())))
+        best_iteration = max(int(booster.best_iteration), 1) - 1
+    return {"score": score, "best_iteration": best_iteration, "seconds": round(time.perf_counter() - start, 3)}
+
+
+class HyperparameterSearch:
+    def __init__(self, model: str, X, y, study: str = None, db_path: str = None, space: dict = None,
+                 base_params: dict = None, method: str = None, eta: int = None, min_resource: int = None,
+                 max_resource: int = None, valid_fraction: float = None, purge: int = None,
+                 early_stopping_rounds: int = None, max_workers: int = None, n_jobs: int = None,
+                 seed: int = None):
+        """
+        Parameters
+        ----------
+        model : str
+            'xgboost' หรือ 'lightgbm'
+        X, y : array-like
+            feature matrix และ label เรียงตามเวลา (validation = ช่วงท้าย)
+        study : str
+            ชื่อ study ใน SQLite (ชื่อเดิม = รันต่อ), None = '<model>_<seed>'
+        db_path : str
+            ไฟล์ SQLite ของ trial
+        space : dict
+            ช่วงค้นหา (None = SEARCH_SPACES[model])
+        base_params : dict
+            params ตั้งต้น (None = model_params.yaml) ค่าที่สุ่มได้จะทับค่าเหล่านี้
+        method : str
+            'hyperband' หรือ 'successive_halving'
+        eta : int
+            อัตราคัดออกต่อ rung (เก็บ 1/eta ตัวที่ดีที่สุด)
+        min_resource, max_resource : int
+            จำนวน boosting rounds ต่ำสุด / สูงสุดของ trial
+        valid_fraction : float
+            สัดส่วนแถวท้ายที่ใช้เป็น validation
+        purge : int
+            จำนวนแท่งระหว่าง train กับ validation ที่ตัดทิ้ง (horizon ของ label)
+        early_stopping_rounds : int
+            หยุด trial เมื่อ validation ไม่ดีขึ้นติดกันเท่านี้รอบ
+        max_workers : int
+            จำนวน process (None = จำนวน core, 1 = รันใน process นี้)
+        n_jobs : int
+            thread ของโมเดลต่อ worker (None = จำนวน core // max_workers)
+        seed : int
+            seed ของการสุ่ม params (seed เดิม = ชุด params เดิม ใช้ตอน resume)
+
+        ค่า None ที่เหลือใช้ training.search ใน config.yaml
+        """
+        if model not in PARALLEL_MODELS:
+            raise ValueError(f"❌ ค้นหา hyperparameters ได้เฉพาะ {PARALLEL_MODELS} (ได้ {model})")
+        config, params = load_config()
+        settings = config.get("training", {}).get("search", {})
+
+        def setting(value, key, default):
+            return value if value is not None else settings.get(key, default)
+
+        self.model = model
+        self.seed = setting(seed, "seed", 42)
+        self.study = study or f"{model}_{self.seed}"
+        self.db_path = setting(db_path, "db_path", "project/outputs/hyperparam_search.db")
+        self.space = space or settings.get("spaces", {}).get(model) or SEARCH_SPACES[model]
+        self.base_params = base_params if base_params is not None else params[model]
+        self.method = setting(method, "method", "hyperband")
+        self.eta = setting(eta, "eta", 3)
+        self.min_resource = setting(min_resource, "min_resource", 50)
+        self.max_resource = setting(max_resource, "max_resource", 1000)
+        self.early_stopping_rounds = setting(early_stopping_rounds, "early_stopping_rounds", 50)
+        self.metric = self._metric_name()
+
+        n_cpu = os.cpu_count() or 1
+        self.max_workers = setting(max_workers, "max_workers", None) or n_cpu
+        self.n_jobs = n_jobs or max(1, n_cpu // self.max_workers)
+
+        self.X = to_contiguous_matrix(X, np.float32)
+        self.y = np.ascontiguousarray(y, dtype=np.float32)
+        n_valid = int(len(self.X) * setting(valid_fraction, "valid_fraction", 0.2))
+        valid_start = len(self.X) - n_valid
+        train_end = valid_start - setting(purge, "purge", 1)
+        if n_valid <= 0 or train_end <= 0:
+            raise ValueError(f"❌ ข้อมูล {len(self.X)} แถวไม่พอแบ่ง train / validation")
+        self.split = (train_end, valid_start)
+
+        self.brackets = hyperband_brackets(self.min_resource, self.max_resource, self.eta, self.method)
+        self._open_db()
+
+    def _metric_name(self) -> str:
+        metric = self.base_params.get("eval_metric" if self.model == "xgboost" else "metric")
+        if metric is None:
+            raise ValueError(f"❌ base_params ของ {self.model} ต้องกำหนด metric สำหรับ early stopping")
+        return metric if isinstance(metric, str) else metric[-1]
+
+    @property
+    def maximize(self) -> bool:
+        return self.metric in MAXIMIZE_METRICS
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS studies (
+                study TEXT PRIMARY KEY, model TEXT, settings TEXT, created TEXT
+            );
+            CREATE TABLE IF NOT EXISTS trials (
+                study TEXT, bracket INTEGER, config_id INTEGER, rung INTEGER, resource INTEGER,
+                params TEXT, score REAL, best_iteration INTEGER, seconds REAL, created TEXT,
+                PRIMARY KEY (study, bracket, config_id, rung)
+            );
+        """)
+        # ตั้งค่าที่กำหนดชุด params -> ต้องตรงกันถึงจะรันต่อได้
+        settings = json.dumps({
+            "model": self.model, "space": self.space, "base_params": self.base_params, "seed": self.seed,
+            "method": self.method, "eta": self.eta, "resources": [self.min_resource, self.max_resource],
+            "n_rows": len(self.X), "split": list(self.split),
+        }, sort_keys=True, default=str)
+        row = self.db.execute("SELECT settings FROM studies WHERE study = ?", (self.study,)).fetchone()
+        if row is None:
+            self.db.execute("INSERT INTO studies VALUES (?, ?, ?, ?)",
+                            (self.study, self.model, settings, datetime.now().isoformat()))
+            self.db.commit()
+        elif row[0] != settings:
+            raise ValueError(f"❌ study {self.study} มีอยู่แล้วแต่ตั้งค่าไม่ตรงกัน (ใช้ชื่อ study ใหม่)")
+
+    def _completed(self) -> dict:
+        rows = self.db.execute(
+            "SELECT bracket, config_id, rung, score FROM trials WHERE study = ?", (self.study,)
+        ).fetchall()
+        return {(b, c, r): score for b, c, r, score in rows}
+
+    def _save_trial(self, bracket, config_id, rung, resource, params, result):
+        self.db.execute(
+            "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.study, bracket, config_id, rung, resource, json.dumps(params), result["score"],
+             result["best_iteration"], result["seconds"], datetime.now().isoformat()),
+        )
+        self.db.commit()
+
+    def run(self, time_budget: float = None) -> dict:
+        """
+        รันการค้นหาจนครบทุก bracket หรือหมดเวลา
+
+        Parameters
+        ----------
+        time_budget : float
+            เวลาสูงสุด (วินาที) หลังหมดเวลาจะไม่เริ่ม trial ใหม่ (trial ที่รันอยู่จะรันจนจบ)
+            None = training.search.time_budget ใน config.yaml (null = ไม่จำกัด)
+
+        Returns
+        -------
+        dict
+            สรุป {'study', 'trials_run', 'trials_reused', 'seconds', 'finished', 'best'}
+        """
+        if time_budget is None:
+            time_budget = load_config()[0].get("training", {}).get("search", {}).get("time_budget")
+        start = time.perf_counter()
+        deadline = start + time_budget if time_budget is not None else math.inf
+        stats = {"study": self.study, "trials_run": 0, "trials_reused": 0, "finished": False}
+
+        pool, shms = None, []
+        if self.max_workers > 1:
+            shms = [share_array(self.X), share_array(self.y)]
+            pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(shms[0].name, self.X.shape, self.X.dtype.str, shms[1].name, self.y.shape,
+                          self.y.dtype.str, self.split, self.n_jobs),
+            )
+        else:
+            _WORKER.update({"X": self.X, "y": self.y, "split": self.split, "n_jobs": self.n_jobs})
+
+        try:
+            completed = self._completed()
+            for bracket, rungs in self.brackets:
+                rng = np.random.default_rng([self.seed, bracket])
+                configs = {k: sample_params(self.space, rng) for k in range(rungs[0][0])}
+                for rung, (n_keep, resource) in enumerate(rungs):
+                    if time.perf_counter() >= deadline:
+                        stats["seconds"] = round(time.perf_counter() - start, 2)
+                        stats["best"] = self.best()
+                        return stats
+
+                    scores = {}
+                    pending = []
+                    for config_id, params in configs.items():
+                        key = (bracket, config_id, rung)
+                        if key in completed:
+                            scores[config_id] = completed[key]
+                            stats["trials_reused"] += 1
+                        else:
+                            pending.append((config_id, {**self.base_params, **params}, params))
+
+                    for config_id, result in self._run_pending(pool, pending, resource, deadline):
+                        self._save_trial(bracket, config_id, rung, resource, configs[config_id], result)
+                        scores[config_id] = result["score"]
+                        stats["trials_run"] += 1
+
+                    if rung + 1 < len(rungs):
+                        ranked = sorted(scores, key=scores.get, reverse=self.maximize)
+                        configs = {k: configs[k] for k in ranked[:rungs[rung + 1][0]]}
+            stats["finished"] = True
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+            if pool is None:
+                _WORKER.clear()
+
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        stats["best"] = self.best()
+        return stats
+
+    def _run_pending(self, pool, pending, resource: int, deadline: float):
+        """รัน trial ของ rung (ขนานถ้ามี pool) แล้ว yield (config_id, result) เมื่อแต่ละตัวเสร็จ"""
+        if pool is None:
+            for config_id, params, _ in pending:
+                if time.perf_counter() >= deadline:
+                    return
+                yield config_id, _run_trial(self.model, params, resource, self.early_stopping_rounds)
+            return
+
+        futures = {
+            pool.submit(_run_trial, self.model, params, resource, self.early_stopping_rounds): config_id
+            for config_id, params, _ in pending
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+            if time.perf_counter() >= deadline:
+                # หมดเวลา: ยกเลิก trial ที่ยังไม่เริ่ม ส่วนที่กำลังรันปล่อยให้จบแล้วบันทึก
+                for other in futures:
+                    other.cancel()
+
+    def trials(self):
+        """ทุก trial ของ study นี้ (pd.DataFrame เรียงตามคะแนน)"""
+        import pandas as pd
+
+        df = pd.read_sql_query("SELECT * FROM trials WHERE study = ?", self.db, params=(self.study,))
+        return df.sort_values("score", ascending=not self.maximize).reset_index(drop=True)
+
+    def best(self):
+        """
+        trial ที่ดีที่สุด
+
+        Returns
+        -------
+        dict or None
+            {'params': params เต็มแบบ model_params.yaml (n_estimators = best_iteration + 1),
+             'score', 'metric', 'resource', 'bracket', 'config_id', 'rung'}
+        """
+        order = "DESC" if self.maximize else "ASC"
+        row = self.db.execute(
+            "SELECT bracket, config_id, rung, resource, params, score, best_iteration FROM trials "
+            f"WHERE study = ? ORDER BY score {order} LIMIT 1", (self.study,)
+        ).fetchone()
+        if row is None:
+            return None
+        bracket, config_id, rung, resource, params, score, best_iteration = row
+        return {
+            "params": {**self.base_params, **json.loads(params), "n_estimators": int(best_iteration) + 1},
+            "score": score,
+            "metric": self.metric,
+            "resource": resource,
+            "bracket": bracket,
+            "config_id": config_id,
+            "rung": rung,
+        }
+
+    def save_profile(self, profile: str = None, path: str = MODEL_PARAMS_PATH) -> str:
+        """
+        เขียน params ที่ดีที่สุดเป็น profile ใหม่ใน model_params.yaml
+
+        Returns
+        -------
+        str
+            ชื่อ profile (None = '<study>_<วันเวลา>')
+        """
+        best = self.best()
+        if best is None:
+            raise ValueError(f"❌ study {self.study} ยังไม่มี trial ที่เสร็จ")
+        profile = profile or f"{self.study}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        write_params_profile(profile, {self.model: best["params"]}, path=path)
+        return profile
+
+    def close(self):
+        self.db.close()
+
+
+def write_params_profile(profile: str, model_params: dict, path: str = MODEL_PARAMS_PATH):
+    """
+    เพิ่ม profile ใหม่ใต้ key profiles ของ model_params.yaml (คง comment เดิมของไฟล์ไว้)
+
+    Parameters
+    ----------
+    profile : str
+        ชื่อ profile (ห้ามซ้ำกับที่มีอยู่)
+    model_params : dict
+        {ชื่อโมเดล: params} เช่น {'xgboost': {...}}
+    """
+    with open(path, "r") as f:
+        text = f.read()
+    existing = yaml.safe_load(text) or {}
+    profiles = existing.get("profiles") or {}
+    if profile in profiles:
+        raise ValueError(f"❌ profile {profile} มีอยู่แล้วใน {path}")
+
+    block = yaml.safe_dump({profile: model_params}, sort_keys=False, default_flow_style=False)
+    block = "".join("  " + line for line in block.splitlines(keepends=True))
+    if "profiles" not in existing:
+        text = text.rstrip("\n") + "\n\n# profile ที่ได้จาก hyperparam_search (เลือกใช้ด้วย model.params_profile)\nprofiles:\n" + block
+    elif list(existing)[-1] == "profiles" and existing["profiles"] is not None:
+        text = text.rstrip("\n") + "\n" + block
+    else:
+        # profiles ไม่ได้อยู่ท้ายไฟล์ -> เขียนทั้งไฟล์ใหม่ (comment หาย)
+        existing["profiles"] = {**profiles, profile: model_params}
+        text = yaml.safe_dump(existing, sort_keys=False, default_flow_style=False)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    X = rng.normal(size=(n, 10))
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.normal(scale=1.0, size=n) > 0).astype(int)
+
+    root = tempfile.mkdtemp(prefix="hyperparam_search_")
+    search = HyperparameterSearch("lightgbm", X, y, db_path=os.path.join(root, "trials.db"),
+                                  min_resource=20, max_resource=180, max_workers=2)
+    print(search.brackets)
+    print(search.run(time_budget=60))
+    print(search.trials().head())
@@ -0,0 +1,287 @@
+"""
+model_backends.py
+-----------------
+Registry ของ backend โมเดล (xgboost / lightgbm / lstm และตัวที่เพิ่มภายหลัง)
+- แต่ละ backend ลงทะเบียนด้วย @register_backend: ชื่อ, โมดูลของ framework และฟังก์ชันสร้างโมเดล
+- import framework (XGBoost / LightGBM / TensorFlow) ครั้งแรกที่ใช้ backend นั้นเท่านั้น
+  เช่น retrain เฉพาะ XGBoost จะไม่โหลด TensorFlow เลย
+- เพิ่ม backend ใหม่ได้โดยไม่ต้องแก้ ModelTrainer / ModelSelector
+- backend ที่มี hook to_onnx export เป็น ONNX ได้ (ดู onnx_backend.py)
+"""
+
+import copy
+import importlib
+import sys
+
+import numpy as np
+
+# ชื่อ backend -> ModelBackend (เรียงตามลำดับที่ลงทะเบียน)
+BACKENDS = {}
+
+# ชื่อ input ของกราฟ ONNX ทุก backend (float32, [batch, n_features] หรือ [batch, 1, n_features] สำหรับ LSTM)
+ONNX_INPUT = "input"
+
+
+class ModelBackend:
+    def __init__(self, name: str, module: str, build, fit=None, predict=None, set_threads=None, warm_start=None,
+                 to_onnx=None, model_modules=None, predict_proba=None, prepare=None, input_layout: str = "table"):
+        """
+        Parameters
+        ----------
+        name : str
+            ชื่อ backend (ตรงกับ key ใน model_params.yaml) เช่น 'xgboost'
+        module : str
+            โมดูลของ framework ที่ import ตอนใช้ครั้งแรก เช่น 'tensorflow'
+        build : callable
+            build(lib, params, n_jobs, input_dim) -> โมเดลที่ยังไม่ fit
+        fit : callable
+            fit(model, X, y, params) (None = model.fit(X, y))
+        predict : callable
+            predict(model, X) -> label 0/1 (None = model.predict(X))
+        set_threads : callable
+            set_threads(lib, n_threads) จำกัด thread ของ framework ทั้ง process
+        warm_start : callable
+            warm_start(model, X, y, init_model) fit ต่อจากโมเดลเดิม (None = ไม่รองรับ)
+        to_onnx : callable
+            to_onnx(lib, model, n_features) -> onnx.ModelProto ที่มี input ชื่อ ONNX_INPUT (None = ไม่รองรับ)
+        model_modules : tuple
+            โมดูลบนสุดของคลาสโมเดลที่ backend นี้สร้าง (None = (module,)) ใช้ใน backend_for
+        predict_proba : callable
+            predict_proba(model, X) -> P(1) แบบ 1 มิติ โดย X อยู่ในรูปแบบของ prepare แล้ว
+            (None = model.predict_proba(X)[:, 1])
+        prepare : callable
+            prepare(X) -> อินพุตในรูปแบบที่โมเดลรับ (None = ใช้ X ตามเดิม)
+        input_layout : str
+            ชื่อรูปแบบอินพุตของ prepare: backend ที่ layout เดียวกันใช้อินพุตที่แปลงแล้วร่วมกันได้
+        """
+        self.name = name
+        self.module = module
+        self._build = build
+        self._fit = fit
+        self._predict = predict
+        self._set_threads = set_threads
+        self._warm_start = warm_start
+        self._to_onnx = to_onnx
+        self._predict_proba = predict_proba
+        self._prepare = prepare
+        self.input_layout = input_layout
+        self.model_modules = tuple(model_modules or (module,))
+        self._lib = None
+
+    @property
+    def loaded(self) -> bool:
+        """framework ของ backend นี้ถูก import แล้วหรือยัง"""
+        return self._lib is not None or self.module in sys.modules
+
+    def load(self):
+        """import framework (ครั้งแรกเท่านั้น)"""
+        if self._lib is None:
+            self._lib = importlib.import_module(self.module)
+        return self._lib
+
+    def build(self, params: dict, n_jobs: int = None, input_dim: int = None):
+        """สร้างโมเดลจาก params (n_jobs = thread ของโมเดล, None = ตาม params)"""
+        return self._build(self.load(), params, n_jobs, input_dim)
+
+    @property
+    def supports_warm_start(self) -> bool:
+        return self._warm_start is not None
+
+    def fit(self, params: dict, X, y, n_jobs: int = None, init_model=None):
+        """
+        สร้างแล้ว fit โมเดล
+
+        init_model = โมเดลเดิมที่ fit แล้ว -> เพิ่มต้นไม้ต่อจากโมเดลนั้น (params['n_estimators'] ต้น)
+        """
+        model = self.build(params, n_jobs=n_jobs, input_dim=X.shape[1])
+        if init_model is not None:
+            if not self.supports_warm_start:
+                raise ValueError(f"❌ backend {self.name} ไม่รองรับ warm start")
+            self._warm_start(model, X, y, init_model)
+        elif self._fit is None:
+            model.fit(X, y)
+        else:
+            self._fit(model, X, y, params)
+        return model
+
+    def predict(self, model, X) -> np.ndarray:
+        """ทำนาย label 0/1"""
+        if self._predict is None:
+            return model.predict(X)
+        return self._predict(model, X)
+
+    def prepare(self, X):
+        """แปลงอินพุต 2 มิติ (DataFrame / array) เป็นรูปแบบที่โมเดลของ backend รับ"""
+        return X if self._prepare is None else self._prepare(X)
+
+    def predict_proba(self, model, X) -> np.ndarray:
+        """P(1) แบบ 1 มิติ (X ผ่าน prepare แล้ว)"""
+        if self._predict_proba is None:
+            return model.predict_proba(X)[:, 1]
+        return self._predict_proba(model, X)
+
+    @property
+    def supports_onnx(self) -> bool:
+        return self._to_onnx is not None
+
+    def to_onnx(self, model, n_features: int):
+        """แปลงโมเดลที่ fit แล้วเป็น onnx.ModelProto (input ONNX_INPUT แบบ float32)"""
+        if not self.supports_onnx:
+            raise ValueError(f"❌ backend {self.name} ไม่รองรับ ONNX export")
+        return self._to_onnx(self.load(), model, n_features)
+
+    def set_threads(self, n_threads: int):
+        """จำกัด thread ของ framework (เฉพาะ backend ที่ตั้งค่าระดับ process ได้)"""
+        if self._set_threads is not None:
+            self._set_threads(self.load(), n_threads)
+
+
+def register_backend(name: str, module: str, fit=None, predict=None, set_threads=None, warm_start=None,
+                     to_onnx=None, model_modules=None, predict_proba=None, prepare=None, input_layout: str = "table"):
+    """
+    decorator สำหรับลงทะเบียน backend ใหม่ (ฟังก์ชันที่ตกแต่ง = build)
+
+    ตัวอย่าง
+    --------
+    >>> @register_backend("catboost", "catboost")
+    ... def _catboost(catboost, params, n_jobs, input_dim):
+    ...     return catboost.CatBoostClassifier(**params, thread_count=n_jobs or -1, verbose=0)
+    """
+    def decorator(build):
+        BACKENDS[name] = ModelBackend(name, module, build, fit=fit, predict=predict, set_threads=set_threads,
+                                      warm_start=warm_start, to_onnx=to_onnx, model_modules=model_modules,
+                                      predict_proba=predict_proba, prepare=prepare, input_layout=input_layout)
+        return build
+    return decorator
+
+
+def get_backend(name: str) -> ModelBackend:
+    """backend ตามชื่อ (ยังไม่ import framework จนกว่าจะใช้)"""
+    if name not in BACKENDS:
+        raise KeyError(f"❌ ไม่รู้จัก backend: {name} (รองรับ {list(BACKENDS)})")
+    return BACKENDS[name]
+
+
+def backend_for(model) -> str:
+    """ชื่อ backend ของโมเดลที่ fit แล้ว (ดูจากโมดูลของคลาสโมเดล)"""
+    module = type(model).__module__.split(".")[0]
+    for name, backend in BACKENDS.items():
+        if module in backend.model_modules:
+            return name
+    raise KeyError(f"❌ ไม่รู้จัก backend ของโมเดล {type(model).__name__}")
+
+
+def loaded_backends():
+    """ชื่อ backend ที่ framework ถูก import แล้ว"""
+    return [name for name, backend in BACKENDS.items() if backend.loaded]
+
+
+def _with_threads(params: dict, n_jobs: int) -> dict:
+    return {**params, "n_jobs": n_jobs} if n_jobs is not None else params
+
+
+def _float32_table(X):
+    # XGBoost เทียบ threshold ใน float32 อยู่แล้ว -> แปลงครั้งเดียวได้ผลเท่าเดิม และไม่ต้องผ่าน DataFrame
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def _float64_table(X):
+    # LightGBM เทียบ threshold ใน float64 -> คง float64 เพื่อให้ผลตรงกับ DataFrame
+    return np.ascontiguousarray(X, dtype=np.float64)
+
+
+def _onnx_input(n_features: int):
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    return [(ONNX_INPUT, FloatTensorType([None, n_features]))]
+
+
+def _xgboost_warm_start(model, X, y, init_model):
+    model.fit(X, y, xgb_model=init_model.get_booster())
+
+
+def _xgboost_onnx(xgb, model, n_features):
+    from onnxmltools import convert_xgboost
+    # converter อ่านชื่อ feature ได้เฉพาะแบบ f0, f1, ... -> ลบชื่อออกจากสำเนา (ลำดับคอลัมน์เก็บใน metadata แทน)
+    model = copy.deepcopy(model)
+    model.get_booster().feature_names = None
+    return convert_xgboost(model, initial_types=_onnx_input(n_features))
+
+
+@register_backend("xgboost", "xgboost", warm_start=_xgboost_warm_start, to_onnx=_xgboost_onnx,
+                  prepare=_float32_table, input_layout="float32")
+def _xgboost(xgb, params, n_jobs, input_dim):
+    return xgb.XGBClassifier(**_with_threads(params, n_jobs))
+
+
+def _lightgbm_warm_start(model, X, y, init_model):
+    model.fit(X, y, init_model=init_model.booster_)
+
+
+def _lightgbm_onnx(lgb, model, n_features):
+    from onnxmltools import convert_lightgbm
+    return convert_lightgbm(model, initial_types=_onnx_input(n_features), zipmap=False)
+
+
+@register_backend("lightgbm", "lightgbm", warm_start=_lightgbm_warm_start, to_onnx=_lightgbm_onnx,
+                  prepare=_float64_table, input_layout="float64")
+def _lightgbm(lgb, params, n_jobs, input_dim):
+    return lgb.LGBMClassifier(**_with_threads(params, n_jobs))
+
+
+def _lstm_fit(model, X, y, params):
+    # reshape สำหรับ LSTM (samples, timesteps, features)
+    model.fit(np.expand_dims(X, axis=1), y, epochs=params["epochs"], batch_size=params["batch_size"], verbose=0)
+
+
+def _lstm_predict(model, X):
+    return (model.predict(np.expand_dims(X, axis=1)) > 0.5).astype(int).flatten()
+
+
+def _lstm_prepare(X):
+    # (samples, features) -> (samples, 1, features) แบบ float32 (view ไม่ copy ซ้ำ)
+    return np.asarray(X, dtype=np.float32)[:, None, :]
+
+
+def _lstm_predict_proba(model, X):
+    return model.predict(X, verbose=0).reshape(-1)
+
+
+def _tensorflow_threads(tf, n_threads):
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1 if n_threads <= 2 else 2)
+
+
+def _lstm_onnx(tf, model, n_features):
+    import tf2onnx
+    signature = (tf.TensorSpec((None, 1, n_features), tf.float32, name=ONNX_INPUT),)
+    proto, _ = tf2onnx.convert.from_keras(model, input_signature=signature)
+    return proto
+
+
+@register_backend("lstm", "tensorflow", fit=_lstm_fit, predict=_lstm_predict, set_threads=_tensorflow_threads,
+                  to_onnx=_lstm_onnx, model_modules=("keras", "tf_keras", "tensorflow"),
+                  predict_proba=_lstm_predict_proba, prepare=_lstm_prepare, input_layout="sequence")
+def _lstm(tf, params, n_jobs, input_dim):
+    model = tf.keras.models.Sequential()
+    model.add(tf.keras.layers.LSTM(params["hidden_units"], input_shape=(1, input_dim), return_sequences=False))
+    model.add(tf.keras.layers.Dropout(params["dropout"]))
+    model.add(tf.keras.layers.Dense(1, activation="sigmoid"))
+
+    optimizer = tf.keras.optimizers.Adam(learning_rate=params["learning_rate"])
+    model.compile(loss="binary_crossentropy", optimizer=optimizer, metrics=["accuracy"])
+    return model
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 5))
+    y = (X[:, 0] > 0).astype(int)
+
+    print("loaded:", loaded_backends())
+    backend = get_backend("lightgbm")
+    model = backend.fit({"n_estimators": 50, "verbose": -1}, X, y, n_jobs=1)
+    print("accuracy:", (backend.predict(model, X) == y).mean())
+    print("loaded:", loaded_backends())
@@ -0,0 +1,177 @@
+"""
+model_cache.py
+--------------
+cache ของโมเดลที่โหลดแล้วภายใน process (แทน joblib.load ที่ต่างคนต่างโหลด)
+- key = (env, version, content hash ของไฟล์) -> ไฟล์ถูกเขียนทับเป็นโมเดลใหม่ = key ใหม่
+- โหลดด้วย joblib mmap_mode='r': numpy array ในไฟล์ (เช่นต้นไม้ของ sklearn) เป็น memory map
+  หลาย worker process ที่โหลดไฟล์เดียวกันใช้ page ร่วมกันผ่าน page cache
+  (XGBoost / LightGBM เก็บ booster เป็น bytes จึงถูกโหลดเข้าหน่วยความจำตามปกติ)
+- เกินงบหน่วยความจำ (ประมาณจากขนาดไฟล์) -> ทิ้งโมเดลที่ไม่ได้ใช้นานที่สุด (LRU)
+- โมเดลใน cache ใช้ร่วมกันทุกผู้เรียก ห้ามแก้ไข (fit / set_params) โดยตรง
+- เขียนไฟล์โมเดลด้วย dump_model (ไฟล์ชั่วคราว + os.replace) ไม่เขียนทับไฟล์เดิม
+  ซึ่ง process อื่นอาจ memory map อยู่
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import yaml
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def dump_model(model, path: str) -> str:
+    """
+    joblib.dump แบบ atomic: เขียนไฟล์ชั่วคราวแล้ว os.replace
+
+    ไฟล์เดิมที่ถูก memory map อยู่ไม่ถูก truncate (mapping เดิมยังอ่านได้จนกว่าจะปล่อย)
+    และผู้อ่านไม่เห็นไฟล์ที่เขียนไม่เสร็จ
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ModelCache:
+    def __init__(self, max_mb: float = 512, mmap_mode: str = "r"):
+        """
+        Parameters
+        ----------
+        max_mb : float
+            งบหน่วยความจำรวมของโมเดลใน cache (MB, ประมาณจากขนาดไฟล์, None = ไม่จำกัด)
+        mmap_mode : str
+            mmap_mode ของ joblib.load ('r' = array เป็น memory map แบบอ่านอย่างเดียว, None = โหลดทั้งหมด)
+        """
+        self.max_bytes = None if max_mb is None else int(max_mb * 1024 * 1024)
+        self.mmap_mode = mmap_mode
+        self._entries = OrderedDict()  # key -> (model, n_bytes)
+        self._hashes = {}  # abspath -> (mtime_ns, size, hash)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def content_hash(self, path: str) -> str:
+        """hash ของเนื้อไฟล์ (คำนวณใหม่เฉพาะเมื่อ mtime / ขนาดไฟล์เปลี่ยน)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+        return digest.hexdigest()
+
+    def get(self, path: str, env: str = None, version: str = None):
+        """
+        โมเดลของไฟล์ (โหลดเมื่อยังไม่มีใน cache)
+
+        Raises
+        ------
+        FileNotFoundError
+            ไม่มีไฟล์โมเดล
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ Model not found at {path}")
+        with self._lock:
+            key = (env, version, self.content_hash(path))
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            start = time.perf_counter()
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+            self.load_seconds += time.perf_counter() - start
+            self._entries[key] = (model, os.path.getsize(path))
+            self._evict()
+            return model
+
+    def _evict(self):
+        # ทิ้งตัวที่ใช้ล่าสุดนานที่สุดจนอยู่ในงบ (ตัวที่เพิ่งโหลดไม่ถูกทิ้ง)
+        if self.max_bytes is None:
+            return
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(n_bytes for _, n_bytes in self._entries.values())
+
+    def keys(self):
+        """key ใน cache เรียงจากใช้นานที่สุดไปล่าสุด"""
+        return list(self._entries)
+
+    def stats(self) -> dict:
+        """สถิติของ cache: hits, misses, hit_rate, evictions, load_seconds, entries, mb"""
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "load_seconds": round(self.load_seconds, 6),
+            "entries": len(self._entries),
+            "mb": round(self.nbytes / 1024 / 1024, 3),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hashes.clear()
+
+
+_DEFAULT_CACHE = None
+
+
+def default_cache() -> ModelCache:
+    """ModelCache กลางของ process (ค่าจาก model.cache ใน config.yaml)"""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        settings = load_config()["model"].get("cache", {})
+        _DEFAULT_CACHE = ModelCache(max_mb=settings.get("max_mb", 512),
+                                    mmap_mode="r" if settings.get("mmap", True) else None)
+    return _DEFAULT_CACHE
+
+
+def load_model(path: str, env: str = None, version: str = None):
+    """โหลดโมเดลผ่าน default_cache() (แทน joblib.load)"""
+    return default_cache().get(path, env=env, version=version)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, 10))
+    y = (X[:, 0] > 0).astype(int)
+    path = os.path.join(tempfile.mkdtemp(), "rf.pkl")
+    joblib.dump(RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y), path)
+
+    cache = ModelCache(max_mb=256)
+    for _ in range(3):
+        model = cache.get(path, env="dev", version="v1")
+    print("accuracy:", (model.predict(X) == y).mean())
+    print(cache.stats())
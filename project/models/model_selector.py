@@ -3,14 +3,26 @@ model_selector.py
 -----------------
 โมดูลสำหรับเลือกโมเดลที่ดีที่สุดจากผลการฝึก
 รองรับการทำ Ensemble ด้วย Weighted Voting
+- hard: โหวต label 0/1 ถ่วงน้ำหนัก (ทีละโมเดล)
+- soft: ค่าเฉลี่ยถ่วงน้ำหนักของ P(1) โดยทุกโมเดลทำนายพร้อมกันบน thread pool
+  (XGBoost / LightGBM / onnxruntime ปล่อย GIL ระหว่างทำนาย) และเขียนผลลง buffer ที่จองไว้
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yaml
-import joblib
 import numpy as np
 from sklearn.metrics import accuracy_score, f1_score, mean_squared_error
 
+from project.models.model_backends import backend_for, get_backend
+from project.models.model_cache import dump_model, load_model
+from project.models.onnx_backend import OnnxModel, export_onnx_for, onnx_path_for
+from project.models.tree_compiler import compile_model, compiled_path_for, load_compiled
+from project.features.feature_schema import (
+    build_feature_schema, model_feature_names, save_feature_schema, schema_path_for,
+)
+
 # โหลด config และ hyperparameters
 def load_config():
     with open("project/config/config.yaml", "r") as f:
@@ -33,6 +45,74 @@ class ModelSelector:
         self.models = models
         self.metrics = metrics
         self.config, self.params = load_config()
+        # ต้นไม้ที่ compile แล้วของโมเดลเดียว (ตั้งโดย load_best_model เมื่อเปิด model.compiled_inference)
+        self.compiled = None
+        self.compiled_max_rows = self.config["model"].get("compiled_max_rows", 8)
+
+        # สถานะของ soft voting (สร้างเมื่อใช้ครั้งแรก)
+        self._members_key = None
+        self._members = []
+        self._weights = None
+        self._columns = None
+        self._proba_buffer = np.empty((0, 0))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_best_model(cls, model_path: str, runtime: str = None):
+        """
+        โหลดโมเดลที่บันทึกด้วย save_best_model เป็น ModelSelector ที่มีโมเดลเดียว
+
+        Parameters
+        ----------
+        model_path : str
+            ไฟล์ .pkl ของโมเดล
+        runtime : str
+            'onnx' = ทำนายด้วย onnxruntime จากไฟล์ .onnx คู่กัน (ไม่ import framework ของโมเดล)
+            'native' = โหลดไฟล์ .pkl ผ่าน model cache (None = model.onnx.runtime ใน config.yaml)
+
+        ไฟล์ .onnx ที่เก่ากว่า .pkl (export ไว้ให้โมเดลตัวก่อน) ไม่ถูกใช้ -> โหลด .pkl แทน
+        runtime native + model.compiled_inference -> แนบต้นไม้ที่ compile แล้ว (.trees.npz) ไว้ที่ selector.compiled
+        """
+        config, _ = load_config()
+        runtime = runtime or config["model"].get("onnx", {}).get("runtime", "native")
+        if runtime not in ("native", "onnx"):
+            raise ValueError(f"❌ ไม่รู้จัก runtime: {runtime}")
+
+        onnx_path = onnx_path_for(model_path)
+        onnx_current = os.path.exists(onnx_path) and (
+            not os.path.exists(model_path) or os.path.getmtime(onnx_path) >= os.path.getmtime(model_path))
+        if runtime == "onnx" and onnx_current:
+            model = OnnxModel(onnx_path)
+            name = model.backend
+        elif os.path.exists(model_path):
+            model = load_model(model_path)
+            name = backend_for(model)
+        else:
+            raise FileNotFoundError(f"❌ Model not found at {model_path}")
+        selector = cls({name: model}, {name: {}})
+        if not isinstance(model, OnnxModel) and config["model"].get("compiled_inference", False):
+            selector.compiled = load_compiled(model_path, model)
+        return selector
+
+    def _predict(self, name: str, model, X) -> np.ndarray:
+        # OnnxModel รับอินพุต 2 มิติทุก backend (reshape ของ LSTM อยู่ในกราฟ ONNX แล้ว)
+        if isinstance(model, OnnxModel):
+            return model.predict(X)
+        # backend จัดการรูปแบบอินพุตเอง (เช่น LSTM reshape เป็น (samples, 1, features))
+        return get_backend(name).predict(model, X)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        ทำนาย label 0/1 (มีโมเดลเดียว = ใช้โมเดลนั้น, หลายโมเดล = ensemble_predict)
+        (โมเดลเดียวที่มี self.compiled และไม่เกิน compiled_max_rows แถว -> ใช้ต้นไม้ที่ compile แล้ว)
+        """
+        if len(self.models) == 1:
+            if self.compiled is not None and len(X) <= self.compiled_max_rows:
+                return (self.compiled.predict_proba(X)[:, 1] > 0.5).astype(int)
+            name, model = next(iter(self.models.items()))
+            return np.asarray(self._predict(name, model, X)).astype(int)
+        return self.ensemble_predict(X)
 
     def select_best_model(self, criterion: str = "accuracy"):
         """
@@ -52,25 +132,115 @@ class ModelSelector:
         print(f"✅ Best model selected: {best_name} ({criterion}={best_score:.4f})")
         return best_name, best_model
 
-    def ensemble_predict(self, X):
+    def _ensemble_members(self):
+        """
+        [(name, model, backend)] และน้ำหนักที่ normalize แล้ว (คำนวณใหม่เมื่อ self.models เปลี่ยน)
+        พร้อมลำดับคอลัมน์ตอน train (self._columns) ที่ใช้เรียง DataFrame ก่อนแปลงเป็น array
+        """
+        key = tuple((name, id(model)) for name, model in self.models.items())
+        if key != self._members_key:
+            weights = self.params["ensemble"]["weights"]
+            self._members = [(name, model, None if isinstance(model, OnnxModel) else get_backend(name))
+                             for name, model in self.models.items()]
+            self._weights = np.array([weights[name] for name in self.models], dtype=np.float64)
+            self._weights /= self._weights.sum()
+            self._columns = next((list(columns) for columns in map(model_feature_names, self.models.values())
+                                  if columns is not None), None)
+            self._members_key = key
+        return self._members, self._weights
+
+    def _member_proba(self, backend, model, X) -> np.ndarray:
+        # OnnxModel รับอินพุต 2 มิติทุก backend, โมเดลอื่นรับอินพุตที่ backend.prepare แล้ว
+        if backend is None:
+            return model.predict_proba(X)[:, 1]
+        return backend.predict_proba(model, X)
+
+    def ensemble_predict_proba(self, X, parallel: bool = None) -> np.ndarray:
+        """
+        Soft voting: P(1) = ค่าเฉลี่ยถ่วงน้ำหนัก (ensemble.weights) ของ P(1) ทุกโมเดล
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            ฟีเจอร์ 2 มิติ (แปลงเป็นรูปแบบของแต่ละ backend ครั้งเดียวต่อ input_layout)
+        parallel : bool
+            True = ทำนายทุกโมเดลพร้อมกันบน thread pool
+            (None = เมื่อมี thread > 1 และจำนวนแถว >= ensemble.parallel_min_rows ใน model_params.yaml)
+
+        Returns
+        -------
+        np.ndarray
+            P(1) แบบ 1 มิติ
+        """
+        members, weights = self._ensemble_members()
+        settings = self.params["ensemble"]
+        n = len(X)
+        if parallel is None:
+            parallel = self._max_workers() > 1 and n >= settings.get("parallel_min_rows", 0)
+        # แปลงเป็น array แล้วโมเดลไม่ตรวจชื่อคอลัมน์ -> เรียงตามตอน train ก่อน
+        if self._columns is not None and hasattr(X, "columns") and list(X.columns) != self._columns:
+            X = X[self._columns]
+
+        inputs = {}
+        for _, _, backend in members:
+            if backend is not None and backend.input_layout not in inputs:
+                inputs[backend.input_layout] = backend.prepare(X)
+
+        with self._lock:
+            if self._proba_buffer.shape[0] != len(members) or self._proba_buffer.shape[1] < n:
+                self._proba_buffer = np.empty((len(members), n))
+            buffer = self._proba_buffer
+
+            def run(i):
+                _, model, backend = members[i]
+                member_X = X if backend is None else inputs[backend.input_layout]
+                buffer[i, :n] = self._member_proba(backend, model, member_X)
+
+            if parallel:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._max_workers(),
+                                                        thread_name_prefix="ensemble")
+                # list() รอทุกโมเดลและส่ง exception ของ thread ต่อออกมา
+                list(self._executor.map(run, range(len(members))))
+            else:
+                for i in range(len(members)):
+                    run(i)
+            return weights @ buffer[:, :n]
+
+    def _max_workers(self) -> int:
+        # null = 1 thread ต่อโมเดล แต่ไม่เกินจำนวน core (เครื่อง 1 core ทำนายทีละโมเดล)
+        max_workers = self.params["ensemble"].get("max_workers")
+        return max_workers or min(len(self.models), os.cpu_count() or 1)
+
+    def ensemble_predict(self, X, voting: str = None):
         """
         ทำ Ensemble ด้วย Weighted Voting
+
+        voting = 'hard' (โหวต label) หรือ 'soft' (ensemble_predict_proba > 0.5)
+        (None = ensemble.voting ใน model_params.yaml)
         """
+        voting = voting or self.params["ensemble"].get("voting", "hard")
+        if voting == "soft":
+            return (self.ensemble_predict_proba(X) > 0.5).astype(int)
+        if voting != "hard":
+            raise ValueError(f"❌ ไม่รู้จัก voting: {voting}")
+
         weights = self.params["ensemble"]["weights"]
         preds = []
 
         for name, model in self.models.items():
-            if name == "lstm":
-                # reshape สำหรับ LSTM
-                X_input = np.expand_dims(X, axis=1)
-                pred = (model.predict(X_input) > 0.5).astype(int).flatten()
-            else:
-                pred = model.predict(X)
+            pred = self._predict(name, model, X)
             preds.append(weights[name] * pred)
 
         final_pred = np.round(np.sum(preds, axis=0) / sum(weights.values())).astype(int)
         return final_pred
 
+    def close(self):
+        """ปิด thread pool ของ soft voting"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
     def evaluate_ensemble(self, X, y_true):
         """
         ประเมินผล Ensemble
@@ -82,13 +252,44 @@ class ModelSelector:
             "rmse": mean_squared_error(y_true, y_pred, squared=False)
         }
 
-    def save_best_model(self, model, name: str):
-        """บันทึกโมเดลที่เลือก"""
-        path = os.path.join(self.config["pipeline"]["outputs_path"], f"{name}_best.pkl")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        joblib.dump(model, path)
+    def save_best_model(self, model, name: str, feature_columns=None):
+        """
+        บันทึกโมเดลที่เลือก พร้อม feature schema ({name}_best.features.json)
+        และต้นไม้ที่ compile แล้ว ({name}_best.trees.npz, เฉพาะ XGBoost / LightGBM)
+        และไฟล์ ONNX ({name}_best.onnx) เมื่อเปิด model.onnx.export ใน config.yaml
+
+        feature_columns = คอลัมน์อินพุตตามลำดับตอน train (None = อ่านจากโมเดล)
+
+        schema และต้นไม้ที่ compile สร้างก่อนเขียน .pkl: ถ้า schema สร้างไม่ได้ (เช่นคอลัมน์ที่ graph ไม่รู้จัก)
+        จะ raise โดยไม่เขียนไฟล์ใด ๆ (ไม่เกิด .pkl ใหม่คู่กับ schema / .trees.npz ของโมเดลตัวก่อน)
+        """
+        feature_columns = feature_columns if feature_columns is not None else model_feature_names(model)
+        schema = build_feature_schema(feature_columns, config=self.config) if feature_columns is not None else None
+        try:
+            compiled = compile_model(model)
+        except ValueError:
+            compiled = None
+
+        path = dump_model(model, os.path.join(self.config["pipeline"]["outputs_path"], f"{name}_best.pkl"))
         print(f"✅ Best model saved at {path}")
 
+        if schema is not None:
+            save_feature_schema(path, schema)
+        elif os.path.exists(schema_path_for(path)):
+            # schema ของโมเดลตัวก่อนใช้กับโมเดลนี้ไม่ได้
+            os.remove(schema_path_for(path))
+        # ต้นไม้แบบ array สำหรับทำนายตอน live (.trees.npz)
+        if compiled is not None:
+            compiled.save(compiled_path_for(path))
+        elif os.path.exists(compiled_path_for(path)):
+            os.remove(compiled_path_for(path))
+        if self.config["model"].get("onnx", {}).get("export", False):
+            export_onnx_for(model, path, feature_names=feature_columns)
+        elif os.path.exists(onnx_path_for(path)):
+            # .onnx ของโมเดลตัวก่อน (runtime onnx จะโหลดโมเดลผิดตัว)
+            os.remove(onnx_path_for(path))
+        return path
+
 
 # ============================
 # ตัวอย่างการใช้งาน
@@ -0,0 +1,242 @@
+"""
+onnx_backend.py
+---------------
+export โมเดล (XGBoost / LightGBM / LSTM) เป็น ONNX และทำนายด้วย onnxruntime บน CPU
+- กราฟทุกตัวรับ input ชื่อ 'input' แบบ float32 ขนาด [batch, n_features]
+  (LSTM [batch, 1, n_features]) ลำดับคอลัมน์และชื่อ backend เก็บใน metadata ของไฟล์ .onnx
+- ฝั่ง serving ใช้ OnnxModel ที่มี predict / predict_proba แบบ sklearn
+  import แค่ onnxruntime ไม่ต้องมี TensorFlow / XGBoost / LightGBM
+- InferenceSession แชร์กันผ่าน SessionPool (สร้างครั้งเดียวต่อไฟล์, run ได้หลาย thread พร้อมกัน)
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from project.features.feature_schema import model_feature_names
+from project.models.model_backends import ONNX_INPUT, backend_for, get_backend
+
+# ไฟล์ที่วางคู่กับไฟล์โมเดล (xgboost_best.pkl -> xgboost_best.onnx)
+ONNX_SUFFIX = ".onnx"
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def onnx_path_for(model_path: str) -> str:
+    """path ของไฟล์ ONNX ที่วางคู่กับไฟล์โมเดล"""
+    return os.path.splitext(model_path)[0] + ONNX_SUFFIX
+
+
+def _n_features(model, feature_names):
+    if feature_names is not None:
+        return len(feature_names)
+    if hasattr(model, "n_features_in_"):
+        return int(model.n_features_in_)
+    # Keras: input_shape = (None, 1, n_features)
+    return int(model.input_shape[-1])
+
+
+def export_onnx(model, path: str, feature_names=None, backend: str = None) -> str:
+    """
+    export โมเดลที่ fit แล้วเป็นไฟล์ ONNX
+
+    Parameters
+    ----------
+    model : object
+        โมเดลของ backend ที่มี hook to_onnx (xgboost / lightgbm / lstm)
+    path : str
+        ไฟล์ปลายทาง (.onnx)
+    feature_names : list
+        ลำดับคอลัมน์ตอน train (None = อ่านจากโมเดล ถ้ามี)
+    backend : str
+        ชื่อ backend (None = ดูจากคลาสของโมเดล)
+
+    Raises
+    ------
+    ValueError
+        backend ไม่รองรับ ONNX export
+    """
+    backend = backend or backend_for(model)
+    if feature_names is None:
+        feature_names = model_feature_names(model)
+    feature_names = list(feature_names) if feature_names is not None else None
+
+    proto = get_backend(backend).to_onnx(model, _n_features(model, feature_names))
+    meta = {"backend": backend, "feature_names": json.dumps(feature_names)}
+    for key, value in meta.items():
+        entry = proto.metadata_props.add()
+        entry.key, entry.value = key, value
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(proto.SerializeToString())
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_onnx_for(model, model_path: str, feature_names=None):
+    """
+    export คู่กับไฟล์โมเดล (โมเดลที่ export ไม่ได้ -> ลบไฟล์เก่าของโมเดลตัวก่อน)
+
+    Returns
+    -------
+    str or None
+        path ของไฟล์ .onnx (None = backend ไม่รองรับ)
+    """
+    path = onnx_path_for(model_path)
+    try:
+        return export_onnx(model, path, feature_names=feature_names)
+    except (KeyError, ValueError):
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+
+
+class SessionPool:
+    def __init__(self, max_sessions: int = 4, intra_op_threads: int = 1):
+        """
+        Parameters
+        ----------
+        max_sessions : int
+            จำนวน session สูงสุดที่เก็บไว้ (เกินแล้วทิ้งตัวที่ไม่ได้ใช้นานที่สุด)
+        intra_op_threads : int
+            thread ของ onnxruntime ต่อ session (0 = ตามจำนวน core)
+        """
+        self.max_sessions = max_sessions
+        self.intra_op_threads = intra_op_threads
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        """
+        InferenceSession ของไฟล์ (สร้างใหม่เมื่อยังไม่มี หรือไฟล์ถูกเขียนทับ)
+
+        InferenceSession.run เรียกจากหลาย thread พร้อมกันได้ จึงแชร์ session เดียวต่อไฟล์
+        """
+        key = (os.path.abspath(path), os.path.getmtime(path))
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+        session = self._create(path)
+        with self._lock:
+            # ไฟล์เดิมเวอร์ชันเก่าไม่ต้องเก็บแล้ว
+            for old in [k for k in self._sessions if k[0] == key[0]]:
+                del self._sessions[old]
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def _create(self, path: str):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+        # ไม่แสดง warning เรื่อง shape ของ output label จาก converter
+        options.log_severity_level = 3
+        return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+_DEFAULT_POOL = None
+
+
+def default_pool() -> SessionPool:
+    """SessionPool กลางของ process (ค่าจาก model.onnx ใน config.yaml)"""
+    global _DEFAULT_POOL
+    if _DEFAULT_POOL is None:
+        settings = load_config()["model"].get("onnx", {})
+        _DEFAULT_POOL = SessionPool(max_sessions=settings.get("max_sessions", 4),
+                                    intra_op_threads=settings.get("intra_op_threads", 1))
+    return _DEFAULT_POOL
+
+
+class OnnxModel:
+    def __init__(self, path: str, pool: SessionPool = None):
+        """
+        Parameters
+        ----------
+        path : str
+            ไฟล์ .onnx จาก export_onnx
+        pool : SessionPool
+            None = default_pool()
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ ONNX model not found at {path}")
+        self.path = path
+        self.pool = pool if pool is not None else default_pool()
+
+        session = self.session
+        meta = session.get_modelmeta().custom_metadata_map
+        self.backend = meta.get("backend")
+        self.feature_names = json.loads(meta.get("feature_names", "null"))
+        self._input_rank = len(session.get_inputs()[0].shape)
+        outputs = [output.name for output in session.get_outputs()]
+        # ตัวแยกประเภท (XGBoost / LightGBM) มี output 'probabilities' [P(0), P(1)], LSTM มีแค่ P(1)
+        self._output = "probabilities" if "probabilities" in outputs else outputs[0]
+
+    @property
+    def session(self):
+        return self.pool.get(self.path)
+
+    def _inputs(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self._input_rank == 3:
+            X = X[:, None, :]
+        return np.ascontiguousarray(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """probability แบบ sklearn: คอลัมน์ [P(0), P(1)]"""
+        (proba,) = self.session.run([self._output], {ONNX_INPUT: self._inputs(X)})
+        if proba.ndim == 2 and proba.shape[1] == 2:
+            return proba
+        p = proba.reshape(-1)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        """label 0/1"""
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+    import xgboost as xgb
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, 10)), columns=[f"feature{i}" for i in range(10)])
+    y = (X["feature0"] + rng.normal(size=2000) > 0).astype(int)
+    model = xgb.XGBClassifier(n_estimators=200, max_depth=6).fit(X, y)
+
+    path = export_onnx(model, os.path.join(tempfile.mkdtemp(), "xgboost_best.onnx"))
+    onnx_model = OnnxModel(path, pool=SessionPool())
+    print("backend:", onnx_model.backend, "features:", onnx_model.feature_names[:3], "...")
+    print("max |diff|:", np.abs(onnx_model.predict_proba(X)[:, 1] - model.predict_proba(X)[:, 1]).max())
@@ -5,20 +5,35 @@ train_model.py
 รองรับ XGBoost, LightGBM และ LSTM
 """
 
+import copy
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import yaml
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score, mean_squared_error
-import joblib
 
-# ML libraries
-import xgboost as xgb
-import lightgbm as lgb
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
+from project.features.feature_schema import model_feature_names
+from project.utils.memory import RAW_PRICE_COLUMNS, downcast_features
+from project.models.model_selector import ModelSelector
+from project.models.walk_forward import (
+    attach_array, run_walk_forward, share_array, to_contiguous_matrix, walk_forward_splits,
+)
+# ML libraries (XGBoost / LightGBM / TensorFlow import ตอนใช้ backend ครั้งแรก)
+from project.models.model_backends import get_backend
+from project.models.model_cache import dump_model
+from project.models.onnx_backend import export_onnx_for, onnx_path_for
+
+CANDIDATES = ["xgboost", "lightgbm", "lstm"]
+
+# env ที่ไลบรารีตัวเลข (OpenMP / BLAS) อ่านตอนสร้าง thread pool
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]
+
+# shared memory ที่ process ลูกของ train_all เปิดอยู่
+_ATTACHED = []
 
 # โหลด config และ hyperparameters
 def load_config():
@@ -26,56 +41,242 @@ def load_config():
         config = yaml.safe_load(f)
     with open("project/config/model_params.yaml", "r") as f:
         params = yaml.safe_load(f)
+    # profile จาก hyperparam_search ทับ params ของโมเดลที่ profile นั้นกำหนด
+    profile = config.get("model", {}).get("params_profile")
+    if profile:
+        if profile not in (params.get("profiles") or {}):
+            raise KeyError(f"❌ ไม่พบ profile {profile} ใน model_params.yaml")
+        params = {**params, **params["profiles"][profile]}
     return config, params
 
 
+def allocate_threads(names, n_cpu: int = None, threads: dict = None) -> dict:
+    """
+    แบ่ง core ให้โมเดลที่ train พร้อมกัน (ไม่ให้รวมกันเกินจำนวน core)
+
+    Parameters
+    ----------
+    names : list
+        ชื่อโมเดลตามลำดับ
+    n_cpu : int
+        จำนวน core ทั้งหมด (None = os.cpu_count())
+    threads : dict
+        จำนวน thread ที่กำหนดเองบางโมเดล เช่น {'lstm': 4} ที่เหลือแบ่ง core ที่เหลือเท่าๆ กัน
+
+    Returns
+    -------
+    dict
+        {ชื่อโมเดล: จำนวน thread} (อย่างน้อย 1)
+    """
+    n_cpu = n_cpu or os.cpu_count() or 1
+    allocation = {name: int(threads[name]) for name in names if threads and threads.get(name)}
+    rest = [name for name in names if name not in allocation]
+    free = max(n_cpu - sum(allocation.values()), 0)
+    for i, name in enumerate(rest):
+        # เศษของการหารให้โมเดลตัวแรกๆ
+        allocation[name] = max(1, free // len(rest) + (i < free % len(rest)))
+    return {name: allocation[name] for name in names}
+
+
+def limit_threads(n_threads: int, backend: str = None):
+    """
+    จำกัด thread ของ process นี้ (OpenMP / BLAS และ framework ของ backend)
+    ต้องเรียกก่อน train โมเดลแรก
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    if backend is not None:
+        get_backend(backend).set_threads(n_threads)
+
+
+def _train_candidate(trainer, name: str, n_threads: int, shared, columns, split: int):
+    """
+    งานของ process ลูกใน train_all: train โมเดล 1 ตัวด้วย thread ที่จัดสรรให้
+
+    Returns
+    -------
+    tuple
+        (ชื่อโมเดล, โมเดล, metrics, วินาที)
+    """
+    limit_threads(n_threads, backend=name)
+    # เก็บ shm ไว้จนจบ process (โมเดลบางตัวอาจยังอ้าง view อยู่) ระบบคืน mapping ตอน process ปิด
+    _ATTACHED[:] = [attach_array(*shared[0]), attach_array(*shared[1])]
+    (_, X), (_, y) = _ATTACHED
+    X = pd.DataFrame(X, columns=columns, copy=False)
+    model, metrics = trainer.train_candidate(name, X[:split], y[:split], X[split:], y[split:], n_threads)
+    return name, model, metrics, trainer.last_train_seconds
+
+
 class ModelTrainer:
-    def __init__(self, df: pd.DataFrame, target_col: str = "direction"):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, target_col: str = "direction", low_memory: bool = False):
+        # low_memory: ไม่ deep copy df และส่งฟีเจอร์เป็น float32 (ราคาดิบ OHLCV คง float64)
+        self.df = df.copy(deep=not low_memory)
         self.target_col = target_col
+        self.low_memory = low_memory
         self.config, self.params = load_config()
 
     def prepare_data(self):
-        """เตรียมข้อมูลสำหรับโมเดล"""
+        """
+        เตรียมข้อมูลสำหรับโมเดล
+        แบ่ง train/test ตามลำดับเวลา (test = 20% ท้ายสุด, ไม่ shuffle เพื่อไม่ให้แท่งอนาคตหลุดเข้า train)
+        """
         X = self.df.drop(columns=[self.target_col])
         y = self.df[self.target_col]
-        return train_test_split(X, y, test_size=0.2, random_state=42)
+        if self.low_memory:
+            downcast_features(X, exclude=RAW_PRICE_COLUMNS)
+        return train_test_split(X, y, test_size=0.2, shuffle=False)
+
+    def walk_forward(self, model: str = "xgboost", n_splits: int = None, purge: int = None,
+                     embargo: int = None, mode: str = None, max_workers: int = None,
+                     return_models: bool = False):
+        """
+        Walk-forward cross-validation (ค่า None ใช้ training.walk_forward ใน config.yaml)
+
+        Parameters
+        ----------
+        model : str
+            'xgboost' หรือ 'lightgbm'
+        n_splits : int
+            จำนวน fold
+        purge : int
+            จำนวนแท่งท้าย train ที่ตัดทิ้งก่อน test (horizon ของ label)
+        embargo : int
+            จำนวนแท่งหลัง test ที่ตัดออกจาก train (mode='kfold')
+        mode : str
+            'expanding' / 'rolling' / 'kfold'
+        max_workers : int
+            จำนวน process ที่ train fold พร้อมกัน (thread ต่อ worker = จำนวน core // max_workers)
+        return_models : bool
+            True = คืนโมเดลของทุก fold ด้วย
+
+        Returns
+        -------
+        tuple(pd.DataFrame, list)
+            (metrics ราย fold, โมเดลราย fold)
+        """
+        cv = self.config.get("training", {}).get("walk_forward", {})
+        X = self.df.drop(columns=[self.target_col])
+        y = self.df[self.target_col].to_numpy()
+        splits = walk_forward_splits(
+            len(X),
+            n_splits=n_splits or cv.get("n_splits", 5),
+            test_size=cv.get("test_size"),
+            purge=purge if purge is not None else cv.get("purge", 0),
+            embargo=embargo if embargo is not None else cv.get("embargo", 0),
+            mode=mode or cv.get("mode", "expanding"),
+            max_train_size=cv.get("max_train_size"),
+        )
+        return run_walk_forward(
+            X, y, model, self.params[model], splits,
+            max_workers=max_workers or cv.get("max_workers"),
+            dtype=np.float32 if self.low_memory else np.float64,
+            return_models=return_models,
+        )
+
+    def train_all(self, models=None, max_workers: int = None, threads: dict = None):
+        """
+        Train โมเดลทุกตัวพร้อมกัน (1 process ต่อโมเดล) แล้วคืน ModelSelector
+
+        ค่า None ใช้ training.train_all ใน config.yaml
+
+        Parameters
+        ----------
+        models : list
+            โมเดลที่จะ train (default = xgboost, lightgbm, lstm)
+        max_workers : int
+            จำนวน process ที่ train พร้อมกัน (None = จำนวน core, 1 = train ทีละตัวใน process นี้)
+        threads : dict
+            thread ต่อโมเดล เช่น {'lstm': 4} (ที่ไม่กำหนด = แบ่ง core ที่เหลือเท่าๆ กัน)
+
+        Returns
+        -------
+        ModelSelector
+            สร้างจาก dict ของโมเดลและ metrics (เวลา train ต่อโมเดลอยู่ใน self.train_timings)
+        """
+        settings = self.config.get("training", {}).get("train_all", {})
+        names = list(models or settings.get("models") or CANDIDATES)
+        for name in names:
+            get_backend(name)
+        max_workers = min(max_workers or settings.get("max_workers") or os.cpu_count() or 1, len(names))
+        X_train, X_test, y_train, y_test = self.prepare_data()
+
+        results = {}
+        if max_workers == 1:
+            for name in names:
+                model, metrics = self.train_candidate(name, X_train, y_train, X_test, y_test)
+                results[name] = (model, metrics, self.last_train_seconds)
+        else:
+            allocation = allocate_threads(names, threads=threads or settings.get("threads"))
+            X = to_contiguous_matrix(pd.concat([X_train, X_test]), np.float32 if self.low_memory else np.float64)
+            y = np.concatenate([np.asarray(y_train), np.asarray(y_test)])
+            shms = [share_array(X), share_array(y)]
+            shared = [(shms[0].name, X.shape, X.dtype.str), (shms[1].name, y.shape, y.dtype.str)]
+            # ไม่ส่ง df ไปทุก process (ข้อมูลอยู่ใน shared memory แล้ว)
+            trainer = copy.copy(self)
+            trainer.df = None
+            try:
+                # spawn: process ลูกไม่รับ thread pool ของ TensorFlow / OpenMP จาก process หลัก
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    futures = [
+                        pool.submit(_train_candidate, trainer, name, allocation[name], shared,
+                                    list(X_train.columns), len(X_train))
+                        for name in names
+                    ]
+                    for future in futures:
+                        name, model, metrics, seconds = future.result()
+                        results[name] = (model, metrics, seconds)
+            finally:
+                for shm in shms:
+                    shm.close()
+                    shm.unlink()
+
+        self.train_timings = {name: results[name][2] for name in names}
+        return ModelSelector({name: results[name][0] for name in names},
+                             {name: results[name][1] for name in names})
+
+    def train_candidate(self, name: str, X_train, y_train, X_test, y_test, n_threads: int = None):
+        """
+        train โมเดลตามชื่อ backend แล้วประเมินกับ test
+
+        n_threads = thread ของโมเดล (None = ตาม params)
+        """
+        backend = get_backend(name)
+        start = time.perf_counter()
+        model = backend.fit(self.params[name], X_train, y_train, n_jobs=n_threads)
+        self.last_train_seconds = round(time.perf_counter() - start, 3)
+        metrics = self.evaluate(y_test, backend.predict(model, X_test))
+        return model, metrics
+
+    def warm_start(self, name: str, init_model, X_train, y_train, X_test, y_test, n_trees: int):
+        """
+        เพิ่มต้นไม้ n_trees ต้นต่อจาก init_model ด้วยข้อมูลชุดใหม่ (XGBoost xgb_model / LightGBM init_model)
+        แล้วประเมินกับ test
+
+        Returns
+        -------
+        tuple
+            (โมเดลใหม่ = ต้นไม้เดิม + ต้นไม้ใหม่, metrics)
+        """
+        backend = get_backend(name)
+        params = {**self.params[name], "n_estimators": n_trees}
+        start = time.perf_counter()
+        model = backend.fit(params, X_train, y_train, init_model=init_model)
+        self.last_train_seconds = round(time.perf_counter() - start, 3)
+        metrics = self.evaluate(y_test, backend.predict(model, X_test))
+        return model, metrics
 
     def train_xgboost(self, X_train, y_train, X_test, y_test):
         """ฝึกโมเดล XGBoost"""
-        model = xgb.XGBClassifier(**self.params["xgboost"])
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        metrics = self.evaluate(y_test, preds)
-        return model, metrics
+        return self.train_candidate("xgboost", X_train, y_train, X_test, y_test)
 
     def train_lightgbm(self, X_train, y_train, X_test, y_test):
         """ฝึกโมเดล LightGBM"""
-        model = lgb.LGBMClassifier(**self.params["lightgbm"])
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        metrics = self.evaluate(y_test, preds)
-        return model, metrics
+        return self.train_candidate("lightgbm", X_train, y_train, X_test, y_test)
 
     def train_lstm(self, X_train, y_train, X_test, y_test):
         """ฝึกโมเดล LSTM"""
-        input_dim = X_train.shape[1]
-        model = Sequential()
-        model.add(LSTM(self.params["lstm"]["hidden_units"], input_shape=(1, input_dim), return_sequences=False))
-        model.add(Dropout(self.params["lstm"]["dropout"]))
-        model.add(Dense(1, activation="sigmoid"))
-
-        optimizer = Adam(learning_rate=self.params["lstm"]["learning_rate"])
-        model.compile(loss="binary_crossentropy", optimizer=optimizer, metrics=["accuracy"])
-
-        # reshape สำหรับ LSTM (samples, timesteps, features)
-        X_train_lstm = np.expand_dims(X_train, axis=1)
-        X_test_lstm = np.expand_dims(X_test, axis=1)
-
-        model.fit(X_train_lstm, y_train, epochs=self.params["lstm"]["epochs"], batch_size=self.params["lstm"]["batch_size"], verbose=0)
-        preds = (model.predict(X_test_lstm) > 0.5).astype(int).flatten()
-        metrics = self.evaluate(y_test, preds)
-        return model, metrics
+        return self.train_candidate("lstm", X_train, y_train, X_test, y_test)
 
     def evaluate(self, y_true, y_pred):
         """คำนวณ metrics"""
@@ -85,13 +286,33 @@ class ModelTrainer:
             "rmse": mean_squared_error(y_true, y_pred, squared=False)
         }
 
-    def save_model(self, model, name: str):
-        """บันทึกโมเดล"""
-        path = os.path.join(self.config["pipeline"]["outputs_path"], f"{name}.pkl")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        joblib.dump(model, path)
+    def save_model(self, model, name: str, export_onnx: bool = None):
+        """
+        บันทึกโมเดล
+
+        export_onnx = True -> export {name}.onnx คู่กันด้วย (None = model.onnx.export ใน config.yaml)
+        ชื่อคอลัมน์มาจากโมเดลที่ fit แล้ว (self.df เป็น None ใน worker ของ train_all)
+        export_onnx = False -> ลบ {name}.onnx เก่า (ไม่ให้เหลือไฟล์ของโมเดลตัวก่อน)
+        """
+        path = dump_model(model, os.path.join(self.config["pipeline"]["outputs_path"], f"{name}.pkl"))
         print(f"✅ Model saved at {path}")
 
+        if export_onnx is None:
+            export_onnx = self.config["model"].get("onnx", {}).get("export", False)
+        if not export_onnx:
+            stale = onnx_path_for(path)
+            if os.path.exists(stale):
+                os.remove(stale)
+            return path
+
+        feature_columns = model_feature_names(model)
+        if feature_columns is None and self.df is not None:
+            feature_columns = [col for col in self.df.columns if col != self.target_col]
+        onnx_path = export_onnx_for(model, path, feature_names=feature_columns)
+        if onnx_path is not None:
+            print(f"✅ ONNX model saved at {onnx_path}")
+        return path
+
 
 # ============================
 # ตัวอย่างการใช้งาน
@@ -0,0 +1,381 @@
+"""
+tree_compiler.py
+----------------
+แปลงโมเดล XGBoost / LightGBM (binary) เป็น array ของ node แบบแบน แล้วทำนายด้วย NumPy ล้วน
+- node ของทุกต้นอยู่ใน array เดียวกัน: feature, threshold, ลูกซ้าย/ขวา, ลูกเมื่อค่าหาย (NaN), ค่า leaf
+- leaf ชี้ลูกกลับมาที่ตัวเอง จึงเดินทุกต้นพร้อมกันทีละชั้นได้โดยไม่ต้องแยกกรณี
+  ต้นเรียงจากลึกไปตื้น: ชั้นที่ d เดินเฉพาะ active[d] ต้นแรกที่ยังไม่ถึง leaf
+- เงื่อนไขของทั้งสอง framework แปลงเป็น x < threshold แบบเดียว
+  (LightGBM x <= t -> x < nextafter(t, +inf) ใน float64, XGBoost เทียบใน float32 เหมือนต้นฉบับ)
+- บันทึกเป็น .npz แล้วโหลดใช้ตอน live ได้โดยไม่ต้องมี XGBoost / LightGBM
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# ไฟล์ที่วางคู่กับไฟล์โมเดล (xgboost_best.pkl -> xgboost_best.trees.npz)
+COMPILED_SUFFIX = ".trees.npz"
+
+# |x| <= ค่านี้ LightGBM ถือว่าเป็นศูนย์ (missing_type 'Zero')
+_LGB_ZERO_THRESHOLD = 1e-35
+
+
+class CompiledTrees:
+    def __init__(self, feature, threshold, left, right, missing, value, roots, active, base_margin: float,
+                 input_dtype, feature_names=None, zero_missing=None, sigmoid: float = 1.0):
+        """
+        Parameters
+        ----------
+        feature, threshold, left, right, missing, value : np.ndarray
+            ข้อมูลราย node (ยาวเท่ากับจำนวน node ทั้งหมด) leaf มี left = right = missing = ตัวเอง
+        roots : np.ndarray
+            index ของ node รากของแต่ละต้น (เรียงจากต้นที่ลึกที่สุด)
+        active : np.ndarray
+            active[d] = จำนวนต้นที่ลึกกว่า d ชั้น (ยาวเท่าความลึกของต้นที่ลึกที่สุด)
+        base_margin : float
+            margin ตั้งต้น (XGBoost base_score ในรูป logit)
+        input_dtype : np.dtype
+            dtype ที่ใช้เทียบ threshold (XGBoost float32, LightGBM float64)
+        feature_names : list
+            ลำดับคอลัมน์อินพุต (ใช้เรียงคอลัมน์ของ DataFrame)
+        zero_missing : np.ndarray
+            node ที่ถือว่า 0 เป็นค่าหาย (LightGBM missing_type 'Zero')
+        sigmoid : float
+            probability = 1 / (1 + exp(-sigmoid * margin))
+        """
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=input_dtype)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.missing = np.ascontiguousarray(missing, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.active = [int(k) for k in active]
+        self.base_margin = float(base_margin)
+        self.input_dtype = np.dtype(input_dtype)
+        self.feature_names = list(feature_names) if feature_names else None
+        self.zero_missing = None if zero_missing is None or not np.any(zero_missing) else np.asarray(zero_missing, bool)
+        self.sigmoid = float(sigmoid)
+
+        # array สำหรับเดินต้นไม้: node i อยู่ที่ slot 2i, ลูกซ้าย/ขวาของ slot s อยู่ที่ _children[s] / _children[s + 1]
+        # (เก็บ index แบบคูณ 2 ไว้แล้ว ไม่ต้องคูณใหม่ทุกชั้น)
+        self._feature = np.repeat(self.feature, 2)
+        self._threshold = np.repeat(self.threshold, 2)
+        self._value = np.repeat(self.value, 2)
+        self._missing = np.repeat(2 * self.missing, 2)
+        self._zero_missing = None if self.zero_missing is None else np.repeat(self.zero_missing, 2)
+        self._children = np.ascontiguousarray(np.column_stack([2 * self.left, 2 * self.right]).ravel())
+        self._roots = 2 * self.roots
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def max_depth(self) -> int:
+        return len(self.active)
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy()
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        return np.ascontiguousarray(X, dtype=self.input_dtype)
+
+    def predict_margin(self, X) -> np.ndarray:
+        """ผลรวม leaf ของทุกต้น + base_margin (เท่ากับ output_margin / raw_score ของต้นฉบับ)"""
+        X = self._matrix(X)
+        if len(X) == 1 and self.zero_missing is None and not np.isnan(X[0]).any():
+            return np.array([self._margin_row(X[0])])
+
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self._roots, (len(X), self.n_trees)).copy()
+        for k in self.active:
+            head = node[:, :k]
+            x = X[rows, self._feature[head]]
+            step = self._children[head + (x >= self._threshold[head])]
+            missing = np.isnan(x)
+            if self._zero_missing is not None:
+                missing |= self._zero_missing[head] & (np.abs(x) <= _LGB_ZERO_THRESHOLD)
+            node[:, :k] = np.where(missing, self._missing[head], step)
+        return self.base_margin + self._value[node].sum(axis=1)
+
+    def _margin_row(self, row: np.ndarray) -> float:
+        # ทางเร็วสำหรับ 1 แถวที่ไม่มีค่าหาย: ทุกต้นเดินพร้อมกันบน array 1 มิติ
+        node, n_trees = self._roots, self.n_trees
+        feature, threshold, children = self._feature, self._threshold, self._children
+        for k in self.active:
+            if k == n_trees:
+                node = children[node + (row[feature[node]] >= threshold[node])]
+            else:
+                # ต้นท้าย array ถึง leaf แล้ว เดินเฉพาะ k ต้นแรก
+                if node is self._roots:
+                    node = node.copy()
+                head = node[:k]
+                node[:k] = children[head + (row[feature[head]] >= threshold[head])]
+        return self.base_margin + self._value[node].sum()
+
+    def predict_proba(self, X) -> np.ndarray:
+        """probability แบบ sklearn: คอลัมน์ [P(0), P(1)]"""
+        p = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_margin(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        """label 0/1 (P(1) > 0.5 เหมือน XGBClassifier / LGBMClassifier)"""
+        return (self.predict_margin(X) > 0).astype(int)
+
+    def predict_row(self, row) -> float:
+        """P(1) ของแถวเดียว (np.ndarray ตามลำดับ feature_names)"""
+        row = np.asarray(row, dtype=self.input_dtype)
+        if self.zero_missing is None and not np.isnan(row).any():
+            margin = self._margin_row(row)
+        else:
+            margin = self.predict_margin(row)[0]
+        return 1.0 / (1.0 + math.exp(-self.sigmoid * margin))
+
+    def save(self, path: str) -> str:
+        """บันทึกเป็น .npz (โหลดด้วย CompiledTrees.load โดยไม่ต้องมี framework)"""
+        meta = {
+            "base_margin": self.base_margin, "input_dtype": self.input_dtype.str,
+            "feature_names": self.feature_names, "sigmoid": self.sigmoid,
+        }
+        arrays = {name: getattr(self, name) for name in ("feature", "threshold", "left", "right", "missing",
+                                                         "value", "roots")}
+        arrays["active"] = np.array(self.active, dtype=np.int64)
+        if self.zero_missing is not None:
+            arrays["zero_missing"] = self.zero_missing
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledTrees":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        return cls(**arrays, **meta)
+
+
+def _flatten(trees, input_dtype, **kwargs) -> CompiledTrees:
+    """
+    รวมต้นไม้หลายต้นเป็น CompiledTrees
+
+    trees = list ของ dict ราย node: feature, threshold, left, right, missing, value, is_leaf
+    (index ของลูกนับภายในต้นเดียวกัน)
+    """
+    columns = {name: [] for name in ("feature", "threshold", "left", "right", "missing", "value", "zero_missing")}
+    # เรียงต้นจากลึกไปตื้น -> ต้นที่ยังเดินไม่ถึง leaf อยู่ต้น array เสมอ
+    depths = [_depth(tree) for tree in trees]
+    order = sorted(range(len(trees)), key=lambda i: -depths[i])
+    roots, offset = [], 0
+    for tree in (trees[i] for i in order):
+        n = len(tree["feature"])
+        is_leaf = np.asarray(tree["is_leaf"], bool)
+        own = np.arange(n) + offset
+        for name in ("left", "right", "missing"):
+            columns[name].append(np.where(is_leaf, own, np.asarray(tree[name]) + offset))
+        columns["feature"].append(np.where(is_leaf, 0, tree["feature"]))
+        columns["threshold"].append(np.where(is_leaf, 0.0, tree["threshold"]))
+        columns["value"].append(np.where(is_leaf, tree["value"], 0.0))
+        columns["zero_missing"].append(np.asarray(tree.get("zero_missing", np.zeros(n, bool))) & ~is_leaf)
+        roots.append(offset)
+        offset += n
+    arrays = {name: np.concatenate(parts) if parts else np.zeros(0) for name, parts in columns.items()}
+    active = [sum(depth > d for depth in depths) for d in range(max(depths, default=0))]
+    return CompiledTrees(roots=np.array(roots), active=active, input_dtype=input_dtype, **arrays, **kwargs)
+
+
+def _depth(tree) -> int:
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level if not tree["is_leaf"][node]
+                 for child in (tree["left"][node], tree["right"][node])]
+        if not level:
+            return depth
+        depth += 1
+
+
+def compile_xgboost(model) -> CompiledTrees:
+    """CompiledTrees จาก XGBClassifier / xgb.Booster (objective binary:logistic, gbtree)"""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in ("binary:logistic", "reg:logistic"):
+        raise ValueError(f"❌ compile ได้เฉพาะ binary:logistic (ได้ {objective})")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError(f"❌ compile ได้เฉพาะ gbtree (ได้ {learner['gradient_booster']['name']})")
+
+    gbtree = learner["gradient_booster"]["model"]
+    trees = gbtree["trees"]
+    # early stopping: XGBClassifier ทำนายด้วยต้นถึง best_iteration เท่านั้น
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        trees = trees[:int(gbtree["iteration_indptr"][int(best_iteration) + 1])]
+
+    nodes = []
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise ValueError("❌ ไม่รองรับ categorical split")
+        left = np.asarray(tree["left_children"])
+        right = np.asarray(tree["right_children"])
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        nodes.append({
+            "feature": tree["split_indices"],
+            "threshold": conditions,
+            "left": left,
+            "right": right,
+            "missing": np.where(np.asarray(tree["default_left"], bool), left, right),
+            # leaf เก็บค่าใน split_conditions
+            "value": conditions.astype(np.float64),
+            "is_leaf": left == -1,
+        })
+
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]").split(",")[0])
+    return _flatten(nodes, np.float32, base_margin=np.log(base_score / (1.0 - base_score)),
+                    feature_names=learner.get("feature_names") or None)
+
+
+def compile_lightgbm(model) -> CompiledTrees:
+    """CompiledTrees จาก LGBMClassifier / lgb.Booster (objective binary)"""
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+    objective = dump["objective"].split()
+    if objective[0] != "binary" or dump["num_tree_per_iteration"] != 1 or dump["average_output"]:
+        raise ValueError(f"❌ compile ได้เฉพาะ objective binary แบบ gbdt (ได้ {dump['objective']})")
+    sigmoid = next((float(part.split(":")[1]) for part in objective if part.startswith("sigmoid:")), 1.0)
+
+    nodes = []
+    for info in dump["tree_info"]:
+        tree = {name: [] for name in ("feature", "threshold", "left", "right", "missing", "value", "is_leaf",
+                                      "zero_missing")}
+        _add_lightgbm_node(info["tree_structure"], tree)
+        nodes.append(tree)
+    return _flatten(nodes, np.float64, base_margin=0.0, feature_names=dump["feature_names"], sigmoid=sigmoid)
+
+
+def _add_lightgbm_node(node: dict, tree: dict) -> int:
+    """เพิ่ม node (และลูก) ลง tree แบบ pre-order แล้วคืน index ของ node นี้"""
+    index = len(tree["feature"])
+    for name in tree:
+        tree[name].append(0)
+    if "leaf_value" in node:
+        tree["is_leaf"][index] = True
+        tree["value"][index] = node["leaf_value"]
+        return index
+    if node["decision_type"] != "<=":
+        raise ValueError("❌ ไม่รองรับ categorical split")
+
+    threshold = node["threshold"]
+    left = _add_lightgbm_node(node["left_child"], tree)
+    right = _add_lightgbm_node(node["right_child"], tree)
+    default = left if node["default_left"] else right
+    tree["feature"][index] = node["split_feature"]
+    # x <= t  <=>  x < nextafter(t, +inf) สำหรับ x แบบ float64
+    tree["threshold"][index] = np.nextafter(threshold, np.inf)
+    tree["left"][index] = left
+    tree["right"][index] = right
+    tree["is_leaf"][index] = False
+    if node["missing_type"] == "None":
+        # LightGBM แทน NaN ด้วย 0 แล้วเทียบตามปกติ
+        tree["missing"][index] = left if 0.0 <= threshold else right
+    else:
+        tree["missing"][index] = default
+        tree["zero_missing"][index] = node["missing_type"] == "Zero"
+    return index
+
+
+def compile_model(model) -> CompiledTrees:
+    """
+    แปลงโมเดล XGBoost / LightGBM (sklearn wrapper หรือ Booster) เป็น CompiledTrees
+
+    Raises
+    ------
+    ValueError
+        โมเดลชนิดอื่น หรือ objective / split ที่ไม่รองรับ
+    """
+    module = type(model).__module__.split(".")[0]
+    if module == "xgboost":
+        return compile_xgboost(model)
+    if module == "lightgbm":
+        return compile_lightgbm(model)
+    raise ValueError(f"❌ compile ได้เฉพาะโมเดล XGBoost / LightGBM (ได้ {type(model).__name__})")
+
+
+def compiled_path_for(model_path: str) -> str:
+    """path ของไฟล์ compiled ที่วางคู่กับไฟล์โมเดล"""
+    return os.path.splitext(model_path)[0] + COMPILED_SUFFIX
+
+
+def save_compiled(model, model_path: str):
+    """
+    compile แล้วบันทึกคู่กับไฟล์โมเดล (โมเดลที่ compile ไม่ได้ -> ลบไฟล์เก่าของโมเดลตัวก่อน)
+
+    Returns
+    -------
+    str or None
+        path ของไฟล์ .trees.npz (None = compile ไม่ได้)
+    """
+    path = compiled_path_for(model_path)
+    try:
+        compiled = compile_model(model)
+    except ValueError:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    return compiled.save(path)
+
+
+def load_compiled(model_path: str, model=None):
+    """
+    โหลด CompiledTrees ของโมเดล (ไฟล์ .trees.npz ที่ใหม่กว่าไฟล์โมเดล หรือ compile จาก model)
+
+    Returns
+    -------
+    CompiledTrees or None
+        None ถ้าไม่มีไฟล์และ compile model ไม่ได้ (เช่น LSTM)
+    """
+    path = compiled_path_for(model_path)
+    if os.path.exists(path) and (not os.path.exists(model_path)
+                                 or os.path.getmtime(path) >= os.path.getmtime(model_path)):
+        return CompiledTrees.load(path)
+    if model is None:
+        return None
+    try:
+        return compile_model(model)
+    except ValueError:
+        return None
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import time
+    import xgboost as xgb
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, 20))
+    y = (X[:, 0] + rng.normal(size=5000) > 0).astype(int)
+    model = xgb.XGBClassifier(n_estimators=500, max_depth=6).fit(X, y)
+
+    compiled = compile_model(model)
+    print(compiled.n_trees, "trees", compiled.n_nodes, "nodes", "depth", compiled.max_depth)
+    print("max |diff|:", np.abs(compiled.predict_proba(X)[:, 1] - model.predict_proba(X)[:, 1]).max())
+
+    row = X[-1]
+    start = time.perf_counter()
+    for _ in range(1000):
+        compiled.predict_row(row)
+    print(f"single row: {(time.perf_counter() - start) / 1000 * 1e6:.1f} µs")
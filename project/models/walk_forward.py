@@ -0,0 +1,287 @@
+"""
+walk_forward.py
+---------------
+Cross-validation ตามลำดับเวลา (walk-forward) สำหรับ ModelTrainer
+- แบ่ง fold ตามเวลา: train ด้วยอดีต แล้ว test กับบล็อกถัดไป (expanding / rolling window)
+  หรือ purged k-fold (train ได้ทั้งก่อนและหลัง test)
+- purge: ตัดแท่งท้าย train ที่ติดกับ test (label ของแท่งเหล่านั้นมองเห็นราคาใน test)
+- embargo: ตัดแท่งหลัง test ออกจาก train (ใช้เฉพาะ mode 'kfold' ที่ train อยู่หลัง test ได้)
+- แต่ละ fold train พร้อมกันบน process pool โดยแบ่ง thread ของ XGBoost/LightGBM ต่อ worker
+- feature matrix แปลงเป็น C-contiguous array ครั้งเดียวแล้ววางใน shared memory
+  ทุก fold ใช้ view ของบล็อกเดียวกัน (train/test ที่ต่อเนื่องเป็น slice ไม่ต้อง copy)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import yaml
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, mean_squared_error
+
+from project.models.model_backends import get_backend
+
+# โมเดลที่ train แบบขนานได้ (LSTM/TensorFlow ไม่ fork-safe จึงไม่รองรับใน pool)
+PARALLEL_MODELS = ["xgboost", "lightgbm"]
+
+# state ต่อ process ของ worker (สร้างครั้งเดียวใน _init_worker)
+_WORKER = {}
+
+
+# โหลด config และ hyperparameters
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    with open("project/config/model_params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+    return config, params
+
+
+def evaluate_predictions(y_true, y_pred) -> dict:
+    """metrics ชุดเดียวกับ ModelTrainer.evaluate"""
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "f1": f1_score(y_true, y_pred),
+        # sqrt เอง: argument squared ของ sklearn ถูกถอดออกใน 1.6
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+    }
+
+
+def walk_forward_splits(n_samples: int, n_splits: int = 5, test_size: int = None, purge: int = 0,
+                        embargo: int = 0, mode: str = "expanding", max_train_size: int = None):
+    """
+    แบ่ง fold ตามลำดับเวลา
+
+    Parameters
+    ----------
+    n_samples : int
+        จำนวนแถว (เรียงตามเวลา)
+    n_splits : int
+        จำนวน fold
+    test_size : int
+        จำนวนแถวต่อ test fold (None = n_samples // (n_splits + 1) สำหรับ walk-forward,
+        n_samples // n_splits สำหรับ kfold)
+    purge : int
+        จำนวนแท่งท้าย train ที่ตัดทิ้งก่อนเริ่ม test (เช่น horizon ของ label)
+    embargo : int
+        จำนวนแท่งหลัง test ที่ตัดออกจาก train (มีผลเฉพาะ mode='kfold')
+    mode : str
+        'expanding' = train ตั้งแต่แท่งแรก, 'rolling' = train ไม่เกิน max_train_size แท่งล่าสุด,
+        'kfold' = purged k-fold (train ทั้งก่อนและหลัง test)
+    max_train_size : int
+        ขนาด train สูงสุดของ mode='rolling'
+
+    Returns
+    -------
+    list
+        [(train_ranges, (test_start, test_end)), ...] โดย train_ranges = [(start, end), ...]
+        (ช่วงแบบ half-open เรียงตามเวลา)
+    """
+    if mode not in ("expanding", "rolling", "kfold"):
+        raise ValueError(f"❌ ไม่รู้จัก mode: {mode}")
+    if purge < 0 or embargo < 0:
+        raise ValueError("❌ purge / embargo ต้องไม่ติดลบ")
+
+    if mode == "kfold":
+        test_size = test_size or n_samples // n_splits
+        first_test = 0
+    else:
+        test_size = test_size or n_samples // (n_splits + 1)
+        first_test = n_samples - n_splits * test_size
+    if test_size <= 0 or first_test < 0:
+        raise ValueError(f"❌ ข้อมูล {n_samples} แถวไม่พอสำหรับ {n_splits} fold")
+
+    splits = []
+    for k in range(n_splits):
+        test_start = first_test + k * test_size
+        test_end = n_samples if mode == "kfold" and k == n_splits - 1 else test_start + test_size
+        train_end = max(0, test_start - purge)
+
+        if mode == "kfold":
+            train_ranges = [(0, train_end), (min(n_samples, test_end + embargo), n_samples)]
+        elif mode == "rolling" and max_train_size:
+            train_ranges = [(max(0, train_end - max_train_size), train_end)]
+        else:
+            train_ranges = [(0, train_end)]
+
+        train_ranges = [(start, end) for start, end in train_ranges if end > start]
+        if not train_ranges:
+            raise ValueError(f"❌ fold {k} ไม่มีข้อมูล train (ลด purge หรือ n_splits)")
+        splits.append((train_ranges, (test_start, test_end)))
+    return splits
+
+
+def to_contiguous_matrix(X, dtype=np.float64) -> np.ndarray:
+    """แปลง feature matrix (DataFrame/array) เป็น C-contiguous 2D array ครั้งเดียว"""
+    values = X.to_numpy(dtype=dtype) if isinstance(X, pd.DataFrame) else X
+    # DataFrame เก็บข้อมูลแบบ column-major -> copy ครั้งเดียวเป็น row-major ให้ slice แถวเป็น view
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def _rows(values: np.ndarray, ranges) -> np.ndarray:
+    """แถวตามช่วง (ช่วงเดียว = view ไม่ copy)"""
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        return values[start:end]
+    return np.concatenate([values[start:end] for start, end in ranges])
+
+
+def make_model(name: str, params: dict, n_jobs: int):
+    """สร้างโมเดล XGBoost / LightGBM ด้วยจำนวน thread ที่กำหนด"""
+    if name not in PARALLEL_MODELS:
+        raise ValueError(f"❌ walk-forward แบบขนานรองรับเฉพาะ {PARALLEL_MODELS} (ได้ {name})")
+    if name == "lightgbm":
+        params = {**params, "verbose": -1}
+    return get_backend(name).build(params, n_jobs=n_jobs)
+
+
+def share_array(values: np.ndarray):
+    """คัดลอก array ลงบล็อก shared memory ใหม่ (ผู้สร้างเป็นคน close + unlink)"""
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+    return shm
+
+
+def attach_array(name: str, shape, dtype):
+    """
+    เปิดบล็อก shared memory ใน worker แล้วคืน (shm, array view)
+    (ต้องเก็บ shm ไว้ตลอดอายุ view)
+    """
+    # fork: worker ใช้ resource tracker ตัวเดียวกับ process หลัก (ห้าม unregister ของเจ้าของ)
+    # spawn: worker มี tracker ของตัวเอง ซึ่งจะลบบล็อกตอน worker ปิดถ้าไม่ unregister
+    shared_tracker = resource_tracker._resource_tracker._fd is not None
+    shm = shared_memory.SharedMemory(name=name)
+    if not shared_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(x_name, x_shape, x_dtype, y_name, y_shape, y_dtype, model_name, params, n_jobs):
+    """initializer ของ worker: เปิด shared memory ของ X/y ครั้งเดียวต่อ process"""
+    _WORKER["X_shm"], _WORKER["X"] = attach_array(x_name, x_shape, x_dtype)
+    _WORKER["y_shm"], _WORKER["y"] = attach_array(y_name, y_shape, y_dtype)
+    _WORKER["model_name"] = model_name
+    _WORKER["params"] = params
+    _WORKER["n_jobs"] = n_jobs
+
+
+def _fit_fold(fold: int, train_ranges, test_range, return_model: bool = False):
+    """
+    งานของ worker: train 1 fold แล้วประเมินกับ test fold
+
+    Returns
+    -------
+    tuple(dict, model or None)
+        (ผลของ fold, โมเดลถ้า return_model=True)
+    """
+    X, y = _WORKER["X"], _WORKER["y"]
+    test_start, test_end = test_range
+    start = time.perf_counter()
+
+    model = make_model(_WORKER["model_name"], _WORKER["params"], _WORKER["n_jobs"])
+    model.fit(_rows(X, train_ranges), _rows(y, train_ranges))
+    preds = model.predict(X[test_start:test_end])
+
+    result = {
+        "fold": fold,
+        "train_start": train_ranges[0][0],
+        "train_end": train_ranges[-1][1],
+        "test_start": test_start,
+        "test_end": test_end,
+        "n_train": sum(end - begin for begin, end in train_ranges),
+        "n_test": test_end - test_start,
+        **evaluate_predictions(y[test_start:test_end], preds),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return result, (model if return_model else None)
+
+
+def run_walk_forward(X, y, model_name: str, params: dict, splits, max_workers: int = None,
+                     n_jobs: int = None, dtype=np.float64, return_models: bool = False):
+    """
+    train และประเมินทุก fold (ขนานด้วย process pool)
+
+    Parameters
+    ----------
+    X : pd.DataFrame or np.ndarray
+        feature matrix เรียงตามเวลา (แปลงเป็น contiguous array ครั้งเดียว)
+    y : array-like
+        label
+    model_name : str
+        'xgboost' หรือ 'lightgbm'
+    params : dict
+        hyperparameters ของโมเดล (จาก model_params.yaml)
+    splits : list
+        ผลจาก walk_forward_splits
+    max_workers : int
+        จำนวน process (None = จำนวน core แต่ไม่เกินจำนวน fold, 1 = train ใน process นี้)
+    n_jobs : int
+        thread ของ XGBoost/LightGBM ต่อ worker (None = จำนวน core // max_workers)
+    dtype : np.dtype
+        dtype ของ feature matrix (float32 ในโหมด low-memory)
+    return_models : bool
+        True = คืนโมเดลของทุก fold (ต้อง pickle ข้าม process)
+
+    Returns
+    -------
+    tuple(pd.DataFrame, list)
+        (metrics ราย fold เรียงตาม fold, โมเดลราย fold หรือ list ว่าง)
+    """
+    if model_name not in PARALLEL_MODELS:
+        raise ValueError(f"❌ walk-forward แบบขนานรองรับเฉพาะ {PARALLEL_MODELS} (ได้ {model_name})")
+    n_cpu = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = min(len(splits), n_cpu)
+    if n_jobs is None:
+        n_jobs = max(1, n_cpu // max_workers)
+
+    X = to_contiguous_matrix(X, dtype)
+    y = np.ascontiguousarray(y)
+    if len(X) != len(y):
+        raise ValueError(f"❌ X ({len(X)} แถว) กับ y ({len(y)} แถว) ยาวไม่เท่ากัน")
+
+    if max_workers == 1:
+        _WORKER.update({"X": X, "y": y, "model_name": model_name, "params": params, "n_jobs": n_jobs})
+        try:
+            outputs = [_fit_fold(k, train, test, return_models) for k, (train, test) in enumerate(splits)]
+        finally:
+            _WORKER.clear()
+    else:
+        x_shm, y_shm = share_array(X), None
+        try:
+            y_shm = share_array(y)
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(x_shm.name, X.shape, X.dtype.str, y_shm.name, y.shape, y.dtype.str,
+                          model_name, params, n_jobs),
+            ) as pool:
+                futures = [pool.submit(_fit_fold, k, train, test, return_models)
+                           for k, (train, test) in enumerate(splits)]
+                outputs = [future.result() for future in futures]
+        finally:
+            for shm in (x_shm, y_shm):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+
+    results = pd.DataFrame([result for result, _ in outputs]).set_index("fold")
+    models = [model for _, model in outputs] if return_models else []
+    return results, models
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 5_000
+    X = pd.DataFrame({"f1": rng.normal(size=n), "f2": rng.normal(size=n)})
+    y = (X["f1"] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+
+    splits = walk_forward_splits(n, n_splits=4, purge=1)
+    _, params = load_config()
+    results, _ = run_walk_forward(X, y, "lightgbm", {**params["lightgbm"], "n_estimators": 50}, splits, max_workers=2)
+    print(results)
@@ -0,0 +1,186 @@
+"""
+candle_buffer.py
+----------------
+Ring buffer ขนาดคงที่สำหรับเก็บแท่งล่าสุดของ live process
+- ใช้ NumPy structured array ที่จองไว้ล่วงหน้า (ไม่มีการขยายหน่วยความจำระหว่างรัน)
+- เขียนแต่ละแท่งสองตำแหน่ง (i และ i + capacity) ทำให้แท่งล่าสุด N แท่ง
+  เป็น slice ที่ต่อเนื่องเสมอ -> view() ไม่ต้อง copy และ append เป็น O(1)
+  (to_frame() copy แต่ละ field ครั้งเดียว)
+- ขนาด buffer คำนวณจาก lookback ที่ยาวที่สุดของฟีเจอร์ (รวมช่วงลู่เข้าของ EMA และ timeframe ใหญ่)
+"""
+
+import io
+import os
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features.indicator_registry import enabled_indicators, indicator_warmup
+from project.features.multi_timeframe import TIMEFRAMES
+
+CANDLE_DTYPE = np.dtype([
+    ("datetime", "datetime64[ns]"),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+])
+
+# จำนวนแท่งที่ฟีเจอร์นอก indicator ต้องใช้ก่อนมีค่าแรก (ตาม window ใน build_feature_graph)
+# lookback ของ indicator มาจาก indicator_registry ตาม features.indicators
+FEATURE_LOOKBACKS = {
+    "volatility": 20 + 1,
+    "volume": 20 + 1,
+}
+
+# EMA/Wilder (MACD, RSI, ATR) ต้องใช้ประวัติหลายเท่าของ span ให้ลืมค่าเริ่มต้น
+# 4 x span -> ค่าแท่งล่าสุดต่างจากการคำนวณจากประวัติเต็มราว 1e-5 (ไม่ใช่ ~10% เมื่อเก็บแค่ lookback)
+CONVERGENCE_SPANS = 4
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def required_history(config=None, fibo_lookback: int = 50) -> int:
+    """
+    จำนวนแท่ง base ที่ต้องเก็บเพื่อให้ทุกฟีเจอร์ (รวม features.higher_timeframes) มีค่า
+
+    Returns
+    -------
+    int
+        max(lookback ของ timeframe หลัก, lookback ของ timeframe ใหญ่ x จำนวนแท่ง base ต่อแท่งใหญ่)
+        โดย lookback ของ indicator รวมช่วงลู่เข้าของ EMA/Wilder (CONVERGENCE_SPANS x span)
+    """
+    config = config or load_config()
+    base = config["data"]["timeframe"]
+    base_ns = pd.Timedelta(TIMEFRAMES[base]).value
+    lookback = max(max(FEATURE_LOOKBACKS.values()),
+                   indicator_warmup(enabled_indicators(config), CONVERGENCE_SPANS))
+
+    bars = max(lookback, fibo_lookback + 1)
+    for tf in config["features"].get("higher_timeframes", []):
+        ratio = pd.Timedelta(TIMEFRAMES[tf]).value // base_ns
+        # +1 แท่งใหญ่ เผื่อแท่งที่ยังไม่ปิด
+        bars = max(bars, (lookback + 1) * ratio)
+    return int(bars)
+
+
+def read_csv_tail(path: str, n_bytes: int = 65536) -> pd.DataFrame:
+    """อ่านเฉพาะท้ายไฟล์ CSV (ไม่ต้องอ่านทั้งไฟล์) โดยใช้ header จากบรรทัดแรก"""
+    with open(path, "rb") as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        start = max(len(header), size - n_bytes)
+        f.seek(start)
+        chunk = f.read()
+    if start > len(header):
+        # ตัดบรรทัดแรกที่อาจขาดครึ่ง
+        chunk = chunk[chunk.find(b"\n") + 1:]
+    return pd.read_csv(io.BytesIO(header + chunk))
+
+
+class CandleRingBuffer:
+    def __init__(self, capacity: int, dtype=CANDLE_DTYPE):
+        """
+        Parameters
+        ----------
+        capacity : int
+            จำนวนแท่งล่าสุดที่เก็บ (เช่น required_history())
+        dtype : np.dtype
+            structured dtype ของแต่ละแท่ง (default: datetime + OHLCV)
+        """
+        if capacity < 1:
+            raise ValueError("❌ capacity ต้องมากกว่า 0")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * capacity, dtype=self.dtype)
+        self._next = 0
+        self.size = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """หน่วยความจำที่จองไว้ (คงที่ตลอดอายุ buffer)"""
+        return self._data.nbytes
+
+    def _row(self, bar):
+        if isinstance(bar, dict):
+            return tuple(bar[name] for name in self.dtype.names)
+        return tuple(bar)
+
+    def append(self, bar):
+        """เพิ่มแท่งใหม่ 1 แท่ง (dict หรือ tuple ตามลำดับ field) แบบ O(1)"""
+        row = self._row(bar)
+        i = self._next
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, df: pd.DataFrame):
+        """เพิ่มหลายแท่งจาก DataFrame (เก็บเฉพาะ capacity แท่งล่าสุด) แบบ vectorized"""
+        df = df.iloc[-self.capacity:]
+        k = len(df)
+        if k == 0:
+            return
+        idx = (self._next + np.arange(k)) % self.capacity
+        for name in self.dtype.names:
+            column = df[name]
+            if self.dtype[name].kind == "M":
+                column = pd.to_datetime(column)
+            values = column.to_numpy(dtype=self.dtype[name])
+            self._data[name][idx] = values
+            self._data[name][idx + self.capacity] = values
+        self._next = int((self._next + k) % self.capacity)
+        self.size = min(self.size + k, self.capacity)
+        self.total += k
+
+    def view(self) -> np.ndarray:
+        """structured array ของแท่งทั้งหมด เรียงจากเก่าไปใหม่ (view ไม่ copy)"""
+        start = self._next if self.size == self.capacity else 0
+        return self._data[start:start + self.size]
+
+    def column(self, name: str) -> np.ndarray:
+        """array ของ field เดียว (view ไม่ copy)"""
+        return self.view()[name]
+
+    def last(self):
+        """แท่งล่าสุด (None ถ้ายังว่าง)"""
+        if self.size == 0:
+            return None
+        return self._data[(self._next - 1) % self.capacity]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame สำหรับคำนวณฟีเจอร์ (ขนาดคงที่ไม่เกิน capacity แถว)
+
+        copy แต่ละ field ครั้งเดียวเป็นคอลัมน์ต่อเนื่อง (ไม่ใช่ view) -> frame ไม่เปลี่ยน
+        เมื่อแท่งใหม่เขียนทับ buffer; ถ้าต้องการแบบไม่ copy ใช้ view() / column()
+        """
+        view = self.view()
+        return pd.DataFrame({name: np.array(view[name]) for name in self.dtype.names}, copy=False)
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    buffer = CandleRingBuffer(capacity=5)
+    start = pd.Timestamp("2025-01-01")
+    for i in range(8):
+        buffer.append({
+            "datetime": start + pd.Timedelta(minutes=15 * i),
+            "open": 1.60 + i * 1e-4, "high": 1.61, "low": 1.59, "close": 1.60 + i * 1e-4, "volume": 100.0,
+        })
+    print(buffer.to_frame())
+    print("required history (M15 + H1/H4/D1):", required_history())
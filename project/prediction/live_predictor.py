@@ -2,58 +2,292 @@
 live_predictor.py
 -----------------
 Predictor แบบ real-time พร้อม AuditLogger + Config Management
+- ฟีเจอร์ timeframe ใหญ่อัปเดตทีละแท่งผ่าน MultiTimeframeStream (ไม่ resample buffer ใหม่ทุกแท่ง)
+- live.hot_swap: เฝ้าเฉพาะไฟล์โมเดลที่เลือกใช้ (model_path) เมื่อถูกแทนที่จะตรวจคอลัมน์อินพุต
+  แล้วสลับเป็นโมเดลใหม่โดยไม่ต้อง restart (ดู model_watcher.py)
 """
 
+import glob
+import os
+
+import numpy as np
 import pandas as pd
 from project.utils.logger import AuditLogger
 from project.utils.config_loader import load_config
-from project.features.feature_generator import FeatureGenerator
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_schema import (
+    check_feature_schema, compute_model_inputs, load_feature_schema, model_feature_names,
+)
+from project.features.multi_timeframe import TIMEFRAMES, MultiTimeframeStream
 from project.models.model_selector import ModelSelector
 from project.news.news_connector import NewsConnector
 from project.news.news_filter import NewsFilter
 from project.news.sentiment_analyzer import SentimentAnalyzer
+from project.prediction.candle_buffer import CANDLE_DTYPE, CandleRingBuffer, read_csv_tail, required_history
+from project.prediction.model_watcher import ModelWatcher
+from project.prediction.tick_aggregator import TickAggregator, make_tick_source
 
 class LivePredictor:
-    def __init__(self, env="prod"):
+    def __init__(self, env="prod", model_path=None):
+        """
+        Parameters
+        ----------
+        env : str
+            dev/test/prod (config_{env}.yaml ทับค่าใน config.yaml)
+        model_path : str
+            ไฟล์โมเดล (None = model.save_path + best_model.pkl)
+        """
         self.logger = AuditLogger()
         self.config = load_config(env=env)
-        model_path = self.config["model"]["save_path"] + "best_model.pkl"
-        self.model_selector = ModelSelector.load_best_model(model_path)
+        model_path = model_path or self.config["model"]["save_path"] + "best_model.pkl"
+
+        # แท่งล่าสุดเก็บใน ring buffer ขนาดคงที่ (ขนาดจาก lookback ที่ยาวที่สุดของฟีเจอร์)
+        live_config = self.config.get("live", {})
+        self.timeframe = self.config["data"]["timeframe"]
+        self.feature_graph = build_feature_graph(self.config)
+        # โมเดล + schema ที่ใช้อยู่ (สลับทั้ง dict ทีเดียวตอน hot swap)
+        self.active_model = self._load_active_model(model_path)
+        capacity = max(required_history(self.config), live_config.get("buffer_bars", 0))
+        self.candles = CandleRingBuffer(capacity)
+        # ฟีเจอร์ timeframe ใหญ่ของแท่งล่าสุด (อัปเดตทีละแท่ง base ที่ปิดแล้ว)
+        self.mtf_stream = self._new_mtf_stream()
+        self.htf_features = {}
+
+        self.model_watcher = None
+        hot_swap = live_config.get("hot_swap", {})
+        if hot_swap.get("enabled", False):
+            # เฝ้าเฉพาะไฟล์ที่เลือกแล้ว (ไม่ใช่ทุก *.pkl ในโฟลเดอร์ เช่น candidate / โมเดล retrain ที่ยังไม่ผ่าน)
+            self.model_watcher = ModelWatcher(
+                [os.path.dirname(model_path) or "."], load=self._load_active_model, warmup=self._warm_up,
+                pattern=glob.escape(os.path.basename(model_path)), poll_seconds=hot_swap.get("poll_seconds", 1.0),
+                settle_seconds=hot_swap.get("settle_seconds", 0.5),
+                on_swap=self._on_model_swap, on_error=self._on_model_error,
+            ).start(current=self.active_model, current_path=model_path)
+
+    @property
+    def model_selector(self):
+        return self.active_model["selector"]
+
+    @property
+    def feature_schema(self):
+        # คอลัมน์อินพุตของโมเดล (None = โมเดลรุ่นเก่าที่ไม่มี schema -> คำนวณทุกฟีเจอร์)
+        return self.active_model["feature_schema"]
+
+    def _load_active_model(self, model_path: str) -> dict:
+        """โหลดโมเดล + feature schema (ตรวจ schema กับ feature graph ก่อนใช้)"""
+        selector = ModelSelector.load_best_model(model_path)
+        feature_schema = load_feature_schema(model_path)
+        if feature_schema is not None:
+            check_feature_schema(feature_schema, self.feature_graph)
+        return {"path": model_path, "selector": selector, "feature_schema": feature_schema}
+
+    def _model_input_columns(self, active: dict) -> list:
+        """
+        คอลัมน์อินพุตของโมเดล (ตรวจชื่อ / จำนวนคอลัมน์ที่โมเดลจำไว้กับ feature schema)
+
+        Raises
+        ------
+        ValueError
+            คอลัมน์ไม่ตรงกับ schema หรือโมเดลไม่มีทั้ง schema และชื่อคอลัมน์ (ตรวจไม่ได้)
+        """
+        schema = active["feature_schema"]
+        columns = schema["columns"] if schema is not None else None
+        for name, model in active["selector"].models.items():
+            names = model_feature_names(model) or getattr(model, "feature_names", None)
+            if columns is None:
+                columns = names
+            if names is not None and list(names) != list(columns):
+                raise ValueError(f"❌ คอลัมน์อินพุตของโมเดล {name} ไม่ตรงกับ feature schema: {list(names)}")
+            n_features = getattr(model, "n_features_in_", None)
+            if columns is not None and n_features is not None and n_features != len(columns):
+                raise ValueError(f"❌ โมเดล {name} ใช้ {n_features} ฟีเจอร์ แต่ feature schema มี {len(columns)}")
+        if not columns:
+            raise ValueError("❌ โมเดลไม่มี feature schema และไม่เก็บชื่อคอลัมน์อินพุต ตรวจก่อนสลับไม่ได้")
+        return list(columns)
+
+    def _warm_up(self, active: dict):
+        """
+        ตรวจโมเดลใหม่แล้วทำนาย 1 แถวก่อนสลับ ให้ lazy init ของโมเดล / session เสร็จนอกเส้นทาง request
+
+        มีแท่งใน buffer แล้ว -> ทำนายจากฟีเจอร์จริงของแท่งล่าสุดแบบเดียวกับ on_bar
+        raise เมื่อไม่ผ่าน -> ModelWatcher ไม่สลับและใช้โมเดลเดิมต่อ
+        """
+        columns = self._model_input_columns(active)
+        if len(self.candles) == 0:
+            features = pd.DataFrame(np.zeros((1, len(columns))), columns=columns)
+        else:
+            features = self._features_from_buffer(active["feature_schema"]).tail(1)
+            missing = [col for col in columns if col not in features.columns]
+            if missing:
+                raise ValueError(f"❌ ฟีเจอร์ของ live ไม่มีคอลัมน์ที่โมเดลใช้: {missing}")
+        active["selector"].predict(features)
+
+    def _on_model_swap(self, active: dict, info: dict):
+        # assignment เดียว: request ที่อ่าน active_model ไปแล้วใช้โมเดลเดิมจนจบ
+        self.active_model = active
+        self.logger.log_event("live", "model_swap", "SUCCESS", f"info={info}")
+
+    def _on_model_error(self, path: str, error: Exception):
+        # โหลดโมเดลใหม่ไม่ได้ -> ใช้โมเดลเดิมต่อ
+        self.logger.log_event("live", "model_swap", "FAIL", f"path={path}, error={error}")
+
+    def close(self):
+        """หยุด thread เฝ้าโมเดล"""
+        if self.model_watcher is not None:
+            self.model_watcher.stop()
 
     def predict_signal(self):
         try:
-            # 1. โหลดข้อมูลล่าสุดจาก config
-            data_path = self.config["data"]["source_path"]
-            df_latest = pd.read_csv(data_path)
+            # 1. อัปเดต ring buffer ด้วยแท่งใหม่ท้ายไฟล์ (อ่านทั้งไฟล์แค่ครั้งแรก)
+            n_new = self._sync_candles(self.config["data"]["source_path"])
 
-            fg = FeatureGenerator(df_latest)
-            df_features = fg.generate_all_features()
-            self.logger.log_event("live", "generate_features", "SUCCESS", "Features generated for latest candle")
+            # ใช้โมเดลเดียวกันตลอด request แม้มีการ hot swap ระหว่างนั้น
+            active = self.active_model
+            df_features = self._features_from_buffer(active["feature_schema"])
+            self.logger.log_event("live", "generate_features", "SUCCESS",
+                                  f"Features generated for latest candle, new_bars={n_new}")
 
-            # 2. โหลดข่าวและ sentiment
-            news_path = self.config["data"]["news_path"]
-            connector = NewsConnector(source="csv", path_or_url=news_path)
-            df_news = connector.load_news()
+            return self._signal_from_features(df_features, active["selector"])
+
+        except Exception as e:
+            self.logger.log_event("live", "predict_signal", "FAIL", str(e))
+            raise
 
-            nf = NewsFilter(df_news, symbol=self.config["backtest"]["symbol"], window_minutes=30)
-            analyzer = SentimentAnalyzer()
-            df_news = analyzer.analyze_dataframe(df_news, text_col="event")
-            sentiment_summary = df_news["sentiment"].tail(1).values[0]
-            self.logger.log_event("live", "sentiment_analysis", "SUCCESS", f"latest_sentiment={sentiment_summary}")
+    def on_bar(self, timeframe: str, bar: dict):
+        """
+        callback ของ TickAggregator: รับแท่งที่เพิ่งปิดแล้วทำนายทันที (ไม่ต้องรอเขียน CSV)
 
-            # 3. ใช้โมเดลทำนาย
-            signal = self.model_selector.predict(df_features.tail(1))
-            action = "BUY" if signal == 1 else "SELL"
-            self.logger.log_event("live", "predict_signal", "SUCCESS", f"signal={action}, sentiment={sentiment_summary}")
+        Returns
+        -------
+        str or None
+            'BUY' / 'SELL' หรือ None ถ้าไม่ใช่ timeframe ของโมเดล
+        """
+        if timeframe != self.timeframe:
+            return None
+        try:
+            # ใช้เฉพาะ datetime + OHLCV (ไม่เอา key อื่นของ aggregator เช่น ticks เข้าฟีเจอร์)
+            candle = {name: bar[name] for name in CANDLE_DTYPE.names}
+            self.candles.append(candle)
+            self.htf_features = self.mtf_stream.update(candle)
+            active = self.active_model
+            df_features = self._features_from_buffer(active["feature_schema"])
+            self.logger.log_event("live", "generate_features", "SUCCESS", f"bar={candle['datetime']}")
 
-            print(f"✅ Live signal: {action} (sentiment={sentiment_summary})")
-            return action
+            return self._signal_from_features(df_features, active["selector"])
 
         except Exception as e:
-            self.logger.log_event("live", "predict_signal", "FAIL", str(e))
+            self.logger.log_event("live", "on_bar", "FAIL", str(e))
             raise
 
+    def run_stream(self, source=None, max_ticks=None):
+        """
+        รับ tick จาก source (None = ตาม data.source ใน config) แล้วทำนายทุกครั้งที่แท่งปิด
+
+        ตอน source หมด แท่งที่ยังไม่ปิดจะถูกทิ้ง (ไม่ flush -> ไม่ทำนายจากแท่งที่ยังไม่ครบช่วงเวลา)
+        """
+        live_config = self.config.get("live", {})
+        timeframes = sorted({*live_config.get("tick_timeframes", ["M1"]), self.timeframe},
+                            key=lambda tf: pd.Timedelta(TIMEFRAMES[tf]))
+        aggregator = TickAggregator(timeframes=timeframes, on_bar=self.on_bar,
+                                    price=live_config.get("tick_price", "mid"))
+        stats = aggregator.run(source or make_tick_source(self.config), max_ticks=max_ticks)
+        self.logger.log_event("live", "run_stream", "SUCCESS", f"stats={stats}")
+        return stats
+
+    def _sync_candles(self, data_path: str, tail_bytes: int = 65536) -> int:
+        """
+        เพิ่มแท่งที่ใหม่กว่าแท่งล่าสุดใน buffer จากไฟล์ CSV
+
+        อ่านเฉพาะท้ายไฟล์ ถ้าท้ายไฟล์ไม่ครอบคลุมแท่งล่าสุดที่มีอยู่ (ครั้งแรก/หยุดไปนาน)
+        จะอ่านทั้งไฟล์แล้วเติม buffer ใหม่
+
+        Returns
+        -------
+        int
+            จำนวนแท่งที่เพิ่ม
+        """
+        last = self.candles.last()
+        if last is not None:
+            df_tail = read_csv_tail(data_path, tail_bytes)
+            times = pd.to_datetime(df_tail["datetime"])
+            if len(df_tail) and times.iloc[0] <= last["datetime"]:
+                df_new = df_tail[times > last["datetime"]]
+                self.candles.extend(df_new)
+                self._update_higher_timeframes(df_new)
+                return len(df_new)
+
+        df_all = pd.read_csv(data_path)
+        self.candles = CandleRingBuffer(self.candles.capacity)
+        self.candles.extend(df_all)
+        # state ของ timeframe ใหญ่เริ่มใหม่จากทั้งไฟล์ (ประวัติยาวกว่า buffer -> EMA ลู่เข้าแล้ว)
+        self.mtf_stream = self._new_mtf_stream()
+        self.htf_features = {}
+        self._update_higher_timeframes(df_all)
+        return len(self.candles)
+
+    def _new_mtf_stream(self) -> MultiTimeframeStream:
+        """stream ของ timeframe ใหญ่ที่ใช้ indicator / window ชุดเดียวกับ feature graph (ไม่เกิด train/serve skew)"""
+        return MultiTimeframeStream(
+            timeframes=self.config["features"].get("higher_timeframes", []), base_timeframe=self.timeframe,
+            indicators=list(self.feature_graph.params["indicators"].items()),
+        )
+
+    def _update_higher_timeframes(self, df_new: pd.DataFrame):
+        """ป้อนแท่ง base ที่ปิดแล้วเข้า MultiTimeframeStream ทีละแท่ง"""
+        if len(df_new) == 0:
+            return
+        candles = df_new[["datetime", "open", "high", "low", "close", "volume"]]
+        for candle in candles.to_dict("records"):
+            self.htf_features = self.mtf_stream.update(candle)
+
+    def _frame_with_higher_timeframes(self) -> pd.DataFrame:
+        """
+        แท่งใน buffer + คอลัมน์ timeframe ใหญ่จาก MultiTimeframeStream
+        (มีค่าเฉพาะแถวล่าสุด ซึ่งเป็นแถวเดียวที่ใช้ทำนาย)
+        """
+        frame = self.candles.to_frame()
+        for col, value in self.htf_features.items():
+            values = np.full(len(frame), np.nan)
+            values[-1:] = value
+            frame[col] = values
+        return frame
+
+    def _features_from_buffer(self, feature_schema=None) -> pd.DataFrame:
+        """
+        คำนวณฟีเจอร์จากแท่งใน ring buffer (ขนาดคงที่ ไม่โตตามเวลา)
+
+        ถ้าโมเดลมี feature schema จะคำนวณเฉพาะคอลัมน์อินพุตของโมเดล (ตามลำดับของโมเดล)
+        และคืนเฉพาะแท่งล่าสุด
+        คอลัมน์ timeframe ใหญ่มาจาก MultiTimeframeStream (คอลัมน์ที่ stream ไม่มีจะ resample จาก buffer)
+        """
+        frame = self._frame_with_higher_timeframes()
+        if feature_schema is not None:
+            return compute_model_inputs(frame, feature_schema, self.feature_graph,
+                                        base_timeframe=self.timeframe, tail=1)
+        return self.feature_graph.compute(frame).tail(1)
+
+    def _signal_from_features(self, df_features: pd.DataFrame, model_selector=None):
+        # 2. โหลดข่าวและ sentiment
+        news_path = self.config["data"]["news_path"]
+        connector = NewsConnector(source="csv", path_or_url=news_path)
+        df_news = connector.load_news()
+
+        nf = NewsFilter(df_news, symbol=self.config["backtest"]["symbol"], window_minutes=30)
+        analyzer = SentimentAnalyzer()
+        df_news = analyzer.analyze_dataframe(df_news, text_col="event")
+        sentiment_summary = df_news["sentiment"].tail(1).values[0]
+        self.logger.log_event("live", "sentiment_analysis", "SUCCESS", f"latest_sentiment={sentiment_summary}")
+
+        # 3. ใช้โมเดลทำนาย
+        signal = (model_selector or self.model_selector).predict(df_features.tail(1))
+        action = "BUY" if signal == 1 else "SELL"
+        self.logger.log_event("live", "predict_signal", "SUCCESS", f"signal={action}, sentiment={sentiment_summary}")
+
+        print(f"✅ Live signal: {action} (sentiment={sentiment_summary})")
+        return action
+
 
 if __name__ == "__main__":
     predictor = LivePredictor(env="prod")  # เลือก environment ได้: dev/test/prod
-    predictor.predict_signal()
\ No newline at end of file
+    predictor.predict_signal()
+    predictor.close()
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+model_watcher.py
+----------------
+เปลี่ยนโมเดลของ process ที่รันอยู่โดยไม่ต้อง restart (hot swap)
+- thread เบื้องหลังตรวจ mtime ของไฟล์โมเดลในโฟลเดอร์ที่เฝ้าทุก poll_seconds
+  (ไฟล์ใหม่ล่าสุดที่ไม่ได้ถูกแก้มาแล้ว settle_seconds = โมเดลที่ควรใช้)
+- โหลด + warm up โมเดลใหม่บน thread เบื้องหลัง แล้วสลับ reference เดียว (self.current)
+  ผู้ทำนายอ่าน current ครั้งเดียวต่อ request -> request ที่กำลังทำอยู่ใช้โมเดลเดิมจนจบ
+- โหลดไม่สำเร็จ: เก็บ error แล้วใช้โมเดลเดิมต่อ (ไม่ลองไฟล์เดิมซ้ำจนกว่าไฟล์จะเปลี่ยน)
+- ไฟล์ที่มีอยู่ก่อน start ไม่ทำให้สลับโมเดล (เริ่มจากโมเดลที่ผู้เรียกโหลดไว้แล้ว)
+"""
+
+import glob
+import os
+import threading
+import time
+
+
+class ModelWatcher:
+    def __init__(self, directories, load, warmup=None, pattern: str = "*.pkl", poll_seconds: float = 1.0,
+                 settle_seconds: float = 0.5, on_swap=None, on_error=None):
+        """
+        Parameters
+        ----------
+        directories : list
+            โฟลเดอร์ที่เฝ้า เช่น project/models/versions/prod/
+        load : callable
+            load(path) -> โมเดล (หรือ object ที่ผู้ทำนายใช้)
+        warmup : callable
+            warmup(model) เรียกก่อนสลับ (เช่นทำนาย 1 แถวให้ lazy init เสร็จก่อนรับ request จริง)
+        pattern : str
+            glob ของไฟล์โมเดล
+        poll_seconds : float
+            ระยะห่างระหว่างการตรวจไฟล์
+        settle_seconds : float
+            ไฟล์ต้องไม่ถูกแก้มาแล้วอย่างน้อยเท่านี้ (รอไฟล์คู่ เช่น metadata .json เขียนเสร็จ)
+        on_swap : callable
+            on_swap(model, info) หลังสลับแล้ว (info = dict เดียวกับ self.last_swap)
+        on_error : callable
+            on_error(path, exception) เมื่อโหลด / warm up ไม่สำเร็จ
+        """
+        self.directories = list(directories)
+        self.load = load
+        self.warmup = warmup
+        self.pattern = pattern
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.on_swap = on_swap
+        self.on_error = on_error
+
+        self.current = None
+        self.current_path = None
+        self.swaps = 0
+        self.failures = 0
+        self.last_swap = None
+        self.last_error = None
+        self._snapshot = None  # (path, mtime_ns, size) ของไฟล์ที่ใช้อยู่หรือเห็นตอน start
+        self._failed = None
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def latest(self):
+        """(path, mtime_ns, size) ของไฟล์โมเดลที่ใหม่ที่สุด (None = ไม่มี)"""
+        newest = None
+        for directory in self.directories:
+            for path in glob.glob(os.path.join(directory, self.pattern)):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # ถูกลบ / แทนที่ระหว่าง glob กับ stat
+                    continue
+                snapshot = (path, stat.st_mtime_ns, stat.st_size)
+                if newest is None or snapshot[1] > newest[1]:
+                    newest = snapshot
+        return newest
+
+    def check(self) -> bool:
+        """
+        ตรวจไฟล์ 1 ครั้ง ถ้ามีโมเดลใหม่ให้โหลด + warm up แล้วสลับ (เรียกจาก thread เบื้องหลังหรือเรียกเองก็ได้)
+
+        Returns
+        -------
+        bool
+            True = สลับโมเดลแล้ว
+        """
+        with self._check_lock:
+            snapshot = self.latest()
+            if snapshot is None or snapshot == self._snapshot or snapshot == self._failed:
+                return False
+            if time.time() - snapshot[1] / 1e9 < self.settle_seconds:
+                return False
+            return self._load_and_swap(snapshot)
+
+    def _load_and_swap(self, snapshot) -> bool:
+        path = snapshot[0]
+        detected = time.perf_counter()
+        try:
+            model = self.load(path)
+            loaded = time.perf_counter()
+            if self.warmup is not None:
+                self.warmup(model)
+        except Exception as e:
+            self._failed = snapshot
+            self.failures += 1
+            self.last_error = f"{path}: {e}"
+            if self.on_error is not None:
+                self.on_error(path, e)
+            return False
+
+        # สลับ reference เดียว: request ถัดไปเห็นโมเดลใหม่ request ที่ทำอยู่ใช้โมเดลเดิมต่อ
+        self.current = model
+        self.current_path = path
+        self._snapshot = snapshot
+        swapped = time.perf_counter()
+        self.swaps += 1
+        self.last_swap = {
+            "path": path,
+            "load_seconds": round(loaded - detected, 6),
+            "warmup_seconds": round(swapped - loaded, 6),
+            # เวลาตั้งแต่ไฟล์ถูกเขียนจนถึงสลับ (รวมรอ poll + settle)
+            "since_write_seconds": round(time.time() - snapshot[1] / 1e9, 6),
+        }
+        if self.on_swap is not None:
+            self.on_swap(model, self.last_swap)
+        return True
+
+    def start(self, current=None, current_path: str = None):
+        """
+        เริ่ม thread เบื้องหลัง
+
+        current = โมเดลที่ใช้อยู่ตอนเริ่ม (ไฟล์ที่มีอยู่แล้วในโฟลเดอร์ไม่ทำให้สลับ มีแค่ไฟล์ใหม่หลังจากนี้)
+        """
+        self.current = current
+        self.current_path = current_path
+        self._snapshot = self.latest()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                # thread เฝ้าไฟล์ต้องไม่ตาย (เช่นโฟลเดอร์ถูกลบชั่วคราว)
+                self.last_error = str(e)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "current_path": self.current_path,
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "last_swap": self.last_swap,
+            "last_error": self.last_error,
+        }
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    import tempfile
+    import numpy as np
+    from sklearn.tree import DecisionTreeClassifier
+    from project.models.model_cache import ModelCache, dump_model
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 5))
+    y = (X[:, 0] + rng.normal(size=1000) > 0).astype(int)
+    directory = tempfile.mkdtemp()
+    cache = ModelCache()
+
+    first = dump_model(DecisionTreeClassifier(max_depth=1).fit(X, y), os.path.join(directory, "model_v1.pkl"))
+    watcher = ModelWatcher([directory], load=cache.get, warmup=lambda model: model.predict(X[:1]),
+                           poll_seconds=0.05, settle_seconds=0.0)
+    watcher.start(current=cache.get(first), current_path=first)
+
+    dump_model(DecisionTreeClassifier(max_depth=5).fit(X, y), os.path.join(directory, "model_v2.pkl"))
+    while watcher.swaps == 0:
+        time.sleep(0.01)
+    watcher.stop()
+    print("depth:", watcher.current.get_depth(), watcher.stats())
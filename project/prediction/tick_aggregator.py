@@ -0,0 +1,333 @@
+"""
+tick_aggregator.py
+------------------
+รวม tick (bid/ask) เป็นแท่ง OHLCV แบบ real-time แล้วส่งแท่งที่ปิดแล้วให้ callback ทันที
+- tick source แบบเสียบเปลี่ยนได้: ReplayTickSource (ไฟล์/DataFrame) และ MT5TickSource
+- อัปเดตเฉพาะแท่ง timeframe เล็กสุดต่อ tick แท่ง timeframe ใหญ่สร้างจากแท่งเล็กที่ปิดแล้ว
+- หน่วยความจำคงที่: เก็บแท่งที่ปิดแล้วย้อนหลังแค่ history แท่งต่อ timeframe
+"""
+
+import time
+from collections import deque
+
+import yaml
+import numpy as np
+import pandas as pd
+
+from project.features.multi_timeframe import TIMEFRAMES
+
+# จำนวน tick ที่ ReplayTickSource แปลงเป็น Python object ต่อครั้ง
+REPLAY_BLOCK = 65536
+
+
+# โหลด config
+def load_config():
+    with open("project/config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    return config
+
+
+def _timeframe_ns(timeframe: str) -> int:
+    return pd.Timedelta(TIMEFRAMES[timeframe]).value
+
+
+class ReplayTickSource:
+    def __init__(self, data, time_col: str = "datetime", bid_col: str = "bid", ask_col: str = "ask",
+                 volume_col: str = None, speed: float = None):
+        """
+        tick source จำลองจากไฟล์ CSV หรือ DataFrame (ใช้ทดสอบแทน feed จริง)
+
+        Parameters
+        ----------
+        data : str or pd.DataFrame
+            path ของไฟล์ CSV หรือ DataFrame ที่มีคอลัมน์เวลา, bid, ask
+        time_col, bid_col, ask_col : str
+            ชื่อคอลัมน์
+        volume_col : str
+            คอลัมน์ volume ของ tick (None = นับ tick ละ 1)
+        speed : float
+            None = ส่งเร็วที่สุด, 1.0 = ตามเวลาจริง, 60.0 = เร็วกว่าเวลาจริง 60 เท่า
+        """
+        df = pd.read_csv(data) if isinstance(data, str) else data
+        self.times = pd.to_datetime(df[time_col]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        self.bids = df[bid_col].to_numpy(dtype=np.float64)
+        self.asks = df[ask_col].to_numpy(dtype=np.float64)
+        self.volumes = (
+            df[volume_col].to_numpy(dtype=np.float64) if volume_col else np.ones(len(df))
+        )
+        self.speed = speed
+
+    def __len__(self):
+        return len(self.times)
+
+    def _iter_blocks(self):
+        # แปลงเป็น Python float ทีละบล็อก (เร็วกว่าทีละตัว และไม่สร้าง list ทั้งไฟล์)
+        for start in range(0, len(self.times), REPLAY_BLOCK):
+            stop = start + REPLAY_BLOCK
+            yield from zip(
+                self.times[start:stop].tolist(), self.bids[start:stop].tolist(),
+                self.asks[start:stop].tolist(), self.volumes[start:stop].tolist(),
+            )
+
+    def __iter__(self):
+        """yield (time_ns, bid, ask, volume)"""
+        ticks = self._iter_blocks()
+        if self.speed is None:
+            yield from ticks
+            return
+
+        wall_start = time.perf_counter()
+        first = None
+        for tick in ticks:
+            if first is None:
+                first = tick[0]
+            delay = (tick[0] - first) / 1e9 / self.speed - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+            yield tick
+
+
+class MT5TickSource:
+    def __init__(self, symbol: str, poll_interval: float = 0.05, batch: int = 10_000):
+        """
+        tick source จาก MetaTrader 5 (ต้องติดตั้ง MetaTrader5 และเปิด terminal ไว้)
+
+        Parameters
+        ----------
+        symbol : str
+            เช่น 'EURAUD'
+        poll_interval : float
+            ระยะเวลารอ (วินาที) เมื่อยังไม่มี tick ใหม่
+        batch : int
+            จำนวน tick สูงสุดที่ดึงต่อครั้ง
+        """
+        self.symbol = symbol
+        self.poll_interval = poll_interval
+        self.batch = batch
+
+    def __iter__(self):
+        """yield (time_ns, bid, ask, volume) ต่อเนื่องจนกว่าจะหยุด iterator"""
+        try:
+            import MetaTrader5 as mt5
+        except ImportError as e:
+            raise ImportError("❌ ต้องติดตั้งแพ็กเกจ MetaTrader5 เพื่อใช้ MT5TickSource") from e
+
+        if not mt5.initialize():
+            raise RuntimeError(f"❌ เชื่อมต่อ MetaTrader 5 ไม่ได้: {mt5.last_error()}")
+        try:
+            last_msc = int(time.time() * 1000)
+            seen_at_last = 0
+            while True:
+                ticks = mt5.copy_ticks_from(
+                    self.symbol, pd.Timestamp(last_msc, unit="ms").to_pydatetime(), self.batch, mt5.COPY_TICKS_INFO
+                )
+                if ticks is None or len(ticks) == 0:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                # copy_ticks_from คืน tick ที่เวลา >= last_msc -> ข้าม tick ที่ ms เดียวกันที่ส่งไปแล้ว
+                msc = ticks["time_msc"].astype(np.int64)
+                skip = min(seen_at_last, int((msc == last_msc).sum()))
+                new = ticks[skip:]
+                if len(new) == 0:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                for t, bid, ask in zip(new["time_msc"].tolist(), new["bid"].tolist(), new["ask"].tolist()):
+                    yield t * 1_000_000, bid, ask, 1.0
+
+                new_last = int(msc[-1])
+                seen_at_last = skip + len(new) if new_last == last_msc else int((msc == new_last).sum())
+                last_msc = new_last
+        finally:
+            mt5.shutdown()
+
+
+def make_tick_source(config=None, **kwargs):
+    """
+    สร้าง tick source ตาม data.source ใน config ('MT5' หรือ 'replay')
+    kwargs ส่งต่อให้ constructor (เช่น data=path สำหรับ replay)
+    """
+    config = config or load_config()
+    source = str(config["data"].get("source", "MT5")).lower()
+    if source == "mt5":
+        return MT5TickSource(kwargs.pop("symbol", config["data"]["symbol"]), **kwargs)
+    if source == "replay":
+        return ReplayTickSource(**kwargs)
+    raise ValueError("❌ data.source ต้องเป็น 'MT5' หรือ 'replay'")
+
+
+class TickAggregator:
+    def __init__(self, timeframes=("M1", "M15"), on_bar=None, price: str = "mid", history: int = 500):
+        """
+        Parameters
+        ----------
+        timeframes : list
+            timeframe ที่ต้องการ เช่น ['M1', 'M15'] (ตัวที่เล็กที่สุดจะสร้างจาก tick โดยตรง)
+        on_bar : callable
+            เรียก on_bar(timeframe, bar) ทุกครั้งที่แท่งปิด
+            bar = {'datetime', 'open', 'high', 'low', 'close', 'volume', 'ticks'}
+        price : str
+            'mid' = (bid + ask) / 2, 'bid' หรือ 'ask'
+        history : int
+            จำนวนแท่งที่ปิดแล้วที่เก็บไว้ต่อ timeframe (deque แบบจำกัดขนาด)
+        """
+        if price not in ("mid", "bid", "ask"):
+            raise ValueError("❌ price ต้องเป็น 'mid', 'bid' หรือ 'ask'")
+        ordered = sorted(timeframes, key=_timeframe_ns)
+        self.base = ordered[0]
+        self.base_ns = _timeframe_ns(self.base)
+        self.higher = [(tf, _timeframe_ns(tf)) for tf in ordered[1:]]
+        for tf, period in self.higher:
+            if period % self.base_ns:
+                raise ValueError(f"❌ {tf} ต้องเป็นจำนวนเท่าของ {self.base}")
+
+        self.on_bar = on_bar
+        self.price = price
+        self.bars = {tf: deque(maxlen=history) for tf in ordered}
+        self.stats = {"ticks": 0, "out_of_order": 0, "bars": {tf: 0 for tf in ordered}}
+
+        # แท่งที่กำลังสร้าง: [start_ns, open, high, low, close, volume, ticks]
+        self._current = None
+        # start_ns ของแท่ง base ล่าสุดที่ปิดแล้ว (tick ที่ช้ากว่า flush ต้องไม่สร้างแท่งเดิมซ้ำ)
+        self._last_closed = None
+        self._higher_current = {tf: None for tf, _ in self.higher}
+
+    def push(self, time_ns: int, bid: float, ask: float, volume: float = 1.0):
+        """
+        รับ tick 1 ตัว (tick ที่เวลาย้อนหลังแท่งปัจจุบัน หรืออยู่ในแท่งที่ปิดไปแล้ว
+        เช่นปิดด้วย flush ก่อน tick มาถึง จะถูกนับเป็น out_of_order แล้วข้าม)
+        """
+        if self.price == "mid":
+            px = (bid + ask) * 0.5
+        elif self.price == "bid":
+            px = bid
+        else:
+            px = ask
+
+        self.stats["ticks"] += 1
+        bar = self._current
+        start = time_ns - time_ns % self.base_ns
+        if bar is not None:
+            if start == bar[0]:
+                if px > bar[2]:
+                    bar[2] = px
+                elif px < bar[3]:
+                    bar[3] = px
+                bar[4] = px
+                bar[5] += volume
+                bar[6] += 1
+                return
+            if start < bar[0]:
+                self.stats["out_of_order"] += 1
+                return
+            self._close_base(bar, start)
+        elif self._last_closed is not None and start <= self._last_closed:
+            self.stats["out_of_order"] += 1
+            return
+        self._current = [start, px, px, px, px, volume, 1]
+
+    def run(self, source, max_ticks: int = None):
+        """
+        อ่าน tick จาก source จนหมด (หรือครบ max_ticks)
+
+        Returns
+        -------
+        dict
+            self.stats
+        """
+        push = self.push
+        if max_ticks is None:
+            for time_ns, bid, ask, volume in source:
+                push(time_ns, bid, ask, volume)
+        else:
+            for i, (time_ns, bid, ask, volume) in enumerate(source):
+                if i >= max_ticks:
+                    break
+                push(time_ns, bid, ask, volume)
+        return self.stats
+
+    def flush(self, now_ns: int = None):
+        """
+        ปิดแท่งที่หมดช่วงเวลาแล้วแม้ยังไม่มี tick ใหม่ (เรียกจาก timer)
+
+        Parameters
+        ----------
+        now_ns : int
+            เวลาปัจจุบัน (None = ปิดแท่งที่ค้างอยู่ทั้งหมด เช่น ตอนหยุด feed)
+        """
+        bar = self._current
+        if bar is None:
+            return
+        if now_ns is None:
+            self._close_base(bar, None)
+            self._current = None
+            return
+
+        start = now_ns - now_ns % self.base_ns
+        if start > bar[0]:
+            self._close_base(bar, start)
+            self._current = None
+
+    def _close_base(self, bar, next_start):
+        """ปิดแท่ง base แล้วรวมเข้าแท่ง timeframe ใหญ่ (next_start = None คือปิดทุกแท่ง)"""
+        self._last_closed = bar[0]
+        self._emit(self.base, bar)
+        for tf, period in self.higher:
+            hbar = self._higher_current[tf]
+            h_start = bar[0] - bar[0] % period
+            if hbar is None:
+                hbar = [h_start, bar[1], bar[2], bar[3], bar[4], bar[5], bar[6]]
+                self._higher_current[tf] = hbar
+            else:
+                hbar[2] = max(hbar[2], bar[2])
+                hbar[3] = min(hbar[3], bar[3])
+                hbar[4] = bar[4]
+                hbar[5] += bar[5]
+                hbar[6] += bar[6]
+
+            # tick ถัดไปอยู่คนละช่วงของ timeframe ใหญ่ -> แท่งใหญ่ปิด
+            if next_start is None or next_start - next_start % period != h_start:
+                self._emit(tf, hbar)
+                self._higher_current[tf] = None
+
+    def _emit(self, timeframe: str, bar):
+        closed = {
+            "datetime": pd.Timestamp(bar[0]),
+            "open": bar[1],
+            "high": bar[2],
+            "low": bar[3],
+            "close": bar[4],
+            "volume": bar[5],
+            "ticks": bar[6],
+        }
+        self.bars[timeframe].append(closed)
+        self.stats["bars"][timeframe] += 1
+        if self.on_bar is not None:
+            self.on_bar(timeframe, closed)
+
+    def to_frame(self, timeframe: str) -> pd.DataFrame:
+        """แท่งที่ปิดแล้ว (ย้อนหลังไม่เกิน history) เป็น DataFrame"""
+        return pd.DataFrame(list(self.bars[timeframe]))
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 200_000
+    times = pd.Timestamp("2025-01-01").value + np.cumsum(rng.integers(50, 500, n)) * 1_000_000
+    mid = 1.60 + np.cumsum(rng.normal(0, 0.00002, n))
+    ticks = pd.DataFrame({
+        "datetime": pd.to_datetime(times),
+        "bid": mid - 0.00005,
+        "ask": mid + 0.00005,
+    })
+
+    aggregator = TickAggregator(timeframes=["M1", "M15"],
+                                on_bar=lambda tf, bar: tf == "M15" and print(tf, bar))
+    start = time.perf_counter()
+    aggregator.run(ReplayTickSource(ticks))
+    elapsed = time.perf_counter() - start
+    print(aggregator.stats, f"{n / elapsed:,.0f} ticks/s")
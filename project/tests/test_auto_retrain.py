@@ -5,7 +5,9 @@ Unit tests สำหรับ AutoRetrain module
 """
 
 import pytest
+import numpy as np
 import pandas as pd
+from project.models import auto_retrain
 from project.models.auto_retrain import AutoRetrain
 
 
@@ -52,4 +54,64 @@ def test_error_handling(sample_data, monkeypatch):
     monkeypatch.setattr(retrainer, "_train_model", fake_train)
 
     result = retrainer.run(sample_data, drift_flag=True)
-    assert result["status"] == "FAIL"
\ No newline at end of file
+    assert result["status"] == "FAIL"
+
+
+@pytest.fixture
+def price_history():
+    # ข้อมูลเรียงตามเวลา index = เวลาของแท่ง
+    rng = np.random.default_rng(1)
+    n = 3000
+    df = pd.DataFrame({"feature1": rng.normal(size=n), "feature2": rng.normal(size=n)},
+                      index=pd.date_range("2024-01-01", periods=n, freq="15min"))
+    df["direction"] = (df["feature1"] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return df
+
+
+class BaselineOnlyDetector:
+    """แทน DriftDetector (config ยังไม่มีส่วน drift) เทส retrain ใช้แค่ baseline_metrics"""
+
+    def __init__(self, *args, **kwargs):
+        self.baseline_metrics = {"accuracy": None, "f1": None, "rmse": None}
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(auto_retrain, "DriftDetector", BaselineOnlyDetector)
+
+
+def make_retrainer(df, tmp_path, mode):
+    retrainer = AutoRetrain(df, target_col="direction", model_name="xgboost", mode=mode)
+    retrainer.config["pipeline"]["outputs_path"] = str(tmp_path)
+    retrainer.settings = {**retrainer.settings, "tree_budget": 10, "min_new_rows": 100, "fallback_margin": 0.0}
+    retrainer.detector.baseline_metrics = {"accuracy": None, "f1": None, "rmse": None}
+    return retrainer
+
+
+def test_incremental_retrain_uses_new_rows(price_history, tmp_path, detector):
+    # ครั้งแรกยังไม่มีโมเดล -> train ทั้งหมด แล้วบันทึก cutoff
+    first = make_retrainer(price_history.iloc[:2500], tmp_path, "incremental")
+    first.retrain()
+    assert first.last_retrain["mode"] == "full"
+    assert first.load_state()["cutoff"] == price_history.index[2499]
+
+    second = make_retrainer(price_history, tmp_path, "incremental")
+    model, metrics = second.retrain()
+    assert second.last_retrain["mode"] == "incremental"
+    assert second.last_retrain["rows"] == 500
+    # ต้นไม้เดิม + tree_budget
+    n_trees = first.last_retrain["n_trees"] + 10
+    assert model.get_booster().num_boosted_rounds() == n_trees
+    assert second.load_state() == {"model_path": second.model_path, "cutoff": price_history.index[-1],
+                                   "n_trees": n_trees}
+
+
+def test_incremental_falls_back_to_full(price_history, tmp_path, detector):
+    make_retrainer(price_history.iloc[:2500], tmp_path, "incremental").retrain()
+
+    # accuracy หลัง warm start ต่ำกว่า baseline -> train ใหม่ทั้งหมด
+    retrainer = make_retrainer(price_history, tmp_path, "incremental")
+    retrainer.detector.baseline_metrics = {"accuracy": 1.01, "f1": None, "rmse": None}
+    retrainer.retrain()
+    assert retrainer.last_retrain["mode"] == "full"
+    assert retrainer.last_retrain["fallback_reason"].startswith("accuracy")
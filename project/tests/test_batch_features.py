@@ -0,0 +1,72 @@
+"""
+test_batch_features.py
+----------------------
+Unit tests สำหรับการสร้างฟีเจอร์หลาย symbol ด้วย process pool
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_graph import build_feature_graph
+from project.features.batch_features import (
+    from_shared_memory,
+    generate_features_batch,
+    to_shared_memory,
+)
+
+
+def make_m15(seed, n=96 * 5):
+    rng = np.random.default_rng(seed)
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = {}
+    for seed, symbol in enumerate(["EURAUD", "GBPAUD", "EURNZD"]):
+        path = tmp_path / f"{symbol}_M15.csv"
+        make_m15(seed).to_csv(path, index=False)
+        paths[symbol] = str(path)
+    return paths
+
+
+def test_shared_memory_roundtrip():
+    df = build_feature_graph().compute(make_m15(0))
+    name, layout = to_shared_memory(df)
+    restored = from_shared_memory(name, layout, len(df))
+
+    # ทุก dtype (float, int8, int32, datetime, category) ต้องกลับมาเหมือนเดิม
+    pd.testing.assert_frame_equal(restored, df)
+
+
+def test_batch_matches_single_process(sources):
+    results = generate_features_batch(sources, max_workers=2, multi_timeframe=False)
+    graph = build_feature_graph()
+
+    # ลำดับผลลัพธ์ตามลำดับ symbol ที่ส่งเข้าไป
+    assert list(results) == list(sources)
+    for symbol, path in sources.items():
+        df = pd.read_csv(path, parse_dates=["datetime"])
+        expected = graph.compute(df)
+        pd.testing.assert_frame_equal(results[symbol], expected)
+
+
+def test_batch_with_multi_timeframe(sources):
+    results = generate_features_batch(sources, max_workers=2)
+    config_tfs = ["h1_rsi", "h4_rsi", "d1_rsi"]
+    for df in results.values():
+        assert all(col in df.columns for col in config_tfs)
+
+
+def test_batch_propagates_worker_error(sources, tmp_path):
+    sources = dict(sources, BROKEN=str(tmp_path / "missing.csv"))
+    with pytest.raises(FileNotFoundError):
+        generate_features_batch(sources, max_workers=2, multi_timeframe=False)
@@ -0,0 +1,125 @@
+"""
+test_candle_buffer.py
+---------------------
+Unit tests สำหรับ CandleRingBuffer และ helper ของ live process
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_graph import build_feature_graph
+from project.prediction.candle_buffer import CandleRingBuffer, read_csv_tail, required_history
+
+
+@pytest.fixture
+def candles():
+    rng = np.random.default_rng(2)
+    n = 250
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + 0.0005,
+        "low": close - 0.0005,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+
+def test_append_keeps_last_n_in_order(candles):
+    buffer = CandleRingBuffer(capacity=100)
+    for bar in candles.to_dict("records"):
+        buffer.append(bar)
+
+    df = buffer.to_frame()
+    expected = candles.tail(100).reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+    assert buffer.total == len(candles)
+    assert buffer.last()["close"] == candles["close"].iloc[-1]
+
+
+def test_extend_matches_append(candles):
+    appended = CandleRingBuffer(capacity=64)
+    extended = CandleRingBuffer(capacity=64)
+    for bar in candles.iloc[:30].to_dict("records"):
+        appended.append(bar)
+        extended.append(bar)
+
+    # extend ข้ามจุด wrap-around ของ buffer
+    for bar in candles.iloc[30:].to_dict("records"):
+        appended.append(bar)
+    extended.extend(candles.iloc[30:])
+    pd.testing.assert_frame_equal(appended.to_frame(), extended.to_frame())
+
+
+def test_view_is_zero_copy_and_memory_is_flat(candles):
+    buffer = CandleRingBuffer(capacity=50)
+    nbytes = buffer.nbytes
+    for _ in range(5):
+        buffer.extend(candles)
+    for bar in candles.iloc[:17].to_dict("records"):
+        buffer.append(bar)
+
+    view = buffer.view()
+    assert len(view) == 50
+    assert np.shares_memory(view, buffer._data)
+    assert view.flags["C_CONTIGUOUS"]
+    assert buffer.nbytes == nbytes
+
+
+def test_partial_buffer(candles):
+    buffer = CandleRingBuffer(capacity=500)
+    buffer.extend(candles.iloc[:10])
+    assert len(buffer) == 10
+    assert (buffer.column("close") == candles["close"].iloc[:10].to_numpy()).all()
+
+
+def test_read_csv_tail(candles, tmp_path):
+    path = tmp_path / "EURAUD_M15.csv"
+    candles.to_csv(path, index=False)
+
+    tail = read_csv_tail(str(path), n_bytes=2048)
+    assert list(tail.columns) == list(candles.columns)
+    assert 0 < len(tail) < len(candles)
+    assert tail["datetime"].iloc[-1] == str(candles["datetime"].iloc[-1])
+    np.testing.assert_allclose(tail["close"], candles["close"].tail(len(tail)))
+
+
+def test_required_history_covers_higher_timeframes():
+    config = {"data": {"timeframe": "M15"}, "features": {"higher_timeframes": ["H1", "D1"]}}
+    # MACD: lookback 34 + 4 x span (26 + 9) = 174 แท่ง, D1 ต้องใช้ 175 แท่ง D1 = 175 * 96 แท่ง M15
+    assert required_history(config) == 175 * 96
+    assert required_history({"data": {"timeframe": "M15"}, "features": {}}) == 174
+
+
+def test_buffered_features_match_full_history():
+    rng = np.random.default_rng(9)
+    n = 3_000
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    data = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+    config = {"data": {"timeframe": "M15"}, "features": {}}
+    buffer = CandleRingBuffer(required_history(config))
+    buffer.extend(data)
+
+    # แท่งล่าสุดจาก buffer ต้องใกล้ค่าจากประวัติเต็ม (EMA/Wilder ลืมค่าเริ่มต้นแล้ว, ต่างไม่ถึง 0.0001 pip)
+    graph = build_feature_graph(config)
+    buffered = graph.compute(buffer.to_frame()).iloc[-1]
+    full = graph.compute(data).iloc[-1]
+    for col in ["rsi", "macd", "macd_signal", "macd_diff", "atr", "bb_width", "stoch_d", "volume_ma_20"]:
+        np.testing.assert_allclose(buffered[col], full[col], rtol=1e-4, atol=1e-8, err_msg=col)
+
+
+def test_to_frame_is_independent_of_buffer(candles):
+    buffer = CandleRingBuffer(capacity=10)
+    buffer.extend(candles.iloc[:10])
+    df = buffer.to_frame()
+    buffer.append(candles.iloc[10].to_dict())
+    # แท่งใหม่เขียนทับ slot เดิมใน buffer แต่ frame ที่คืนไปแล้วไม่เปลี่ยน
+    pd.testing.assert_frame_equal(df, candles.iloc[:10].reset_index(drop=True))
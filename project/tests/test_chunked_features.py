@@ -0,0 +1,105 @@
+"""
+test_chunked_features.py
+------------------------
+Unit tests สำหรับการสร้างฟีเจอร์แบบ chunked (out-of-core)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_graph import build_feature_graph
+from project.features.chunked_features import generate_features_chunked, iter_feature_chunks
+
+
+@pytest.fixture
+def m1_data():
+    rng = np.random.default_rng(5)
+    n = 12_000
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0002, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="1min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0002, n),
+        "low": close - rng.uniform(0, 0.0002, n),
+        "close": close,
+        "volume": rng.integers(10, 100, n).astype(float),
+    })
+
+
+def assert_same_features(df, expected):
+    assert list(df.columns) == list(expected.columns)
+    for col in expected.columns:
+        if expected[col].dtype.kind == "f":
+            # EMA คำนวณเป็นบล็อก -> ต่างกันได้แค่ระดับ rounding ของ float64
+            np.testing.assert_allclose(df[col], expected[col], rtol=1e-11, atol=1e-12)
+        else:
+            assert (df[col].astype(str).to_numpy() == expected[col].astype(str).to_numpy()).all(), col
+
+
+def test_chunks_match_full_run(m1_data):
+    expected = build_feature_graph().compute(m1_data)
+    chunks = (m1_data.iloc[i:i + 2_500] for i in range(0, len(m1_data), 2_500))
+    df = pd.concat(iter_feature_chunks(chunks))
+
+    assert df.index.equals(expected.index)
+    assert_same_features(df, expected)
+
+
+def test_chunk_smaller_than_warmup(m1_data):
+    # บล็อกเล็กกว่า warm-up: ต้องสะสมแท่งจากหลายบล็อกก่อนหน้าได้ถูกต้อง
+    data = m1_data.iloc[:3_000]
+    expected = build_feature_graph().compute(data)
+    chunks = (data.iloc[i:i + 300] for i in range(0, len(data), 300))
+    assert_same_features(pd.concat(iter_feature_chunks(chunks)), expected)
+
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_generate_features_chunked_file(m1_data, tmp_path, suffix):
+    if suffix == "parquet":
+        pytest.importorskip("pyarrow")
+    source = tmp_path / "EURAUD_M1.csv"
+    m1_data.to_csv(source, index=False)
+    output = str(tmp_path / f"features.{suffix}")
+
+    stats = generate_features_chunked(str(source), output, chunk_rows=4_000)
+    assert stats["rows"] == len(m1_data)
+    assert stats["chunks"] == 3
+
+    df = pd.read_parquet(output) if suffix == "parquet" else pd.read_csv(output, parse_dates=["datetime"])
+    expected = build_feature_graph().compute(m1_data)
+    if suffix == "csv":
+        expected["volume_divergence"] = expected["volume_divergence"].astype(str)
+    assert_same_features(df, expected)
+
+
+def test_parquet_schema_fixed_across_chunks(tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    # บล็อกแรกราคาแกว่งแรง (ไม่แตะ level), บล็อกที่สองราคานิ่ง (แตะทุก level -> mask > 1)
+    rng = np.random.default_rng(8)
+    n = 1_000
+    close = np.r_[1.60 + np.cumsum(rng.normal(0, 0.01, n)), np.full(n, 1.70)]
+    data = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=2 * n, freq="1min"),
+        "open": close,
+        "high": close + np.r_[rng.uniform(0.001, 0.002, n), np.zeros(n)],
+        "low": close - np.r_[rng.uniform(0.001, 0.002, n), np.zeros(n)],
+        "close": close,
+        "volume": rng.integers(10, 100, 2 * n).astype(float),
+    })
+    source = tmp_path / "EURAUD_M1.csv"
+    data.to_csv(source, index=False)
+    output = str(tmp_path / "features.parquet")
+
+    graph = build_feature_graph(fibo_tolerance=1e-9)
+    stats = generate_features_chunked(str(source), output, chunk_rows=n, graph=graph, low_memory=True)
+    assert stats["chunks"] == 2
+
+    parquet = pq.ParquetFile(output)
+    assert parquet.metadata.num_row_groups == 2
+    df = pd.read_parquet(output)
+    mask = df["fibo_touch_mask"].to_numpy()
+    assert (mask[:n] == 0).all() and mask[n:].max() > 1
+    assert parquet.schema_arrow.field("fibo_touch_mask").type == pyarrow.int32()
+    assert df["rsi"].dtype == np.float32
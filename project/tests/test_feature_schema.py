@@ -0,0 +1,114 @@
+"""
+test_feature_schema.py
+----------------------
+Unit tests สำหรับ feature schema ของโมเดล (คำนวณเฉพาะคอลัมน์ที่โมเดลใช้)
+"""
+
+import os
+
+import pytest
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_schema import (
+    build_feature_schema, check_feature_schema, compute_model_inputs, load_feature_schema, save_feature_schema,
+)
+from project.features.multi_timeframe import add_multi_timeframe_features
+from project.fibo_analysis.fibo_predictor import FiboPredictor
+from project.utils.model_versioning import save_model_with_metadata
+
+MODEL_COLUMNS = ["macd_diff", "close", "h1_rsi", "fibo_retracement_0.618", "rsi", "d1_atr"]
+
+
+@pytest.fixture
+def m15_data():
+    rng = np.random.default_rng(5)
+    n = 96 * 30
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+
+@pytest.fixture
+def graph():
+    return build_feature_graph()
+
+
+def _full_features(df, graph):
+    # เส้นทางเดิม: คำนวณทุกฟีเจอร์ + ทุก timeframe แล้วแตก fibo_touch_mask เป็น flag
+    full = add_multi_timeframe_features(graph.compute(df), timeframes=["H1", "D1"], base_timeframe="M15")
+    full["fibo_retracement_0.618"] = ((full["fibo_touch_mask"].to_numpy() >> 3) & 1).astype(np.int8)
+    return full
+
+
+def test_schema_sources_and_dependencies(graph):
+    schema = build_feature_schema(MODEL_COLUMNS, graph=graph)
+    assert schema["columns"] == MODEL_COLUMNS
+    assert schema["graph"] == ["macd_diff", "rsi"]
+    assert schema["raw"] == ["close"]
+    assert schema["higher_timeframes"] == {"H1": ["rsi"], "D1": ["atr"]}
+    assert schema["fibo_flags"] == {"fibo_retracement_0.618": 3}
+    # dependency ของ graph: ไม่มี node ของ bollinger / stochastic / volume
+    assert "ema_slow" in schema["nodes"] and "fibo_touch_mask" in schema["nodes"]
+    assert not {"bb_stats", "stoch_min", "volume_ma_20"} & set(schema["nodes"])
+
+    with pytest.raises(KeyError):
+        build_feature_schema(["rsi", "not_a_feature"], graph=graph)
+
+
+def test_model_inputs_match_full_features(m15_data, graph):
+    schema = build_feature_schema(MODEL_COLUMNS, graph=graph)
+    expected = _full_features(m15_data, graph)[MODEL_COLUMNS]
+
+    inputs = compute_model_inputs(m15_data, schema, graph)
+    assert list(inputs.columns) == MODEL_COLUMNS
+    pd.testing.assert_frame_equal(inputs, expected, check_dtype=False)
+
+    # live ใช้เฉพาะแท่งล่าสุด
+    last = compute_model_inputs(m15_data, schema, graph, tail=1)
+    pd.testing.assert_frame_equal(last, expected.tail(1), check_dtype=False)
+
+
+def test_graph_params_mismatch(graph):
+    schema = build_feature_schema(["rsi"], graph=graph)
+    check_feature_schema(schema, build_feature_graph())
+    with pytest.raises(ValueError):
+        check_feature_schema(schema, build_feature_graph({"features": {"indicators": {"RSI": {"window": 21}}}}))
+
+
+def test_versioning_records_schema(m15_data, graph, tmp_path, monkeypatch):
+    features = _full_features(m15_data, graph)[MODEL_COLUMNS].dropna()
+    model = DecisionTreeClassifier(max_depth=3).fit(features, features["close"].diff().fillna(0) > 0)
+
+    # model_versioning เขียนไปที่ project/models/versions/ (relative) -> ย้ายไป tmp
+    monkeypatch.chdir(tmp_path)
+    model_path, meta_path = save_model_with_metadata(model, {"accuracy": 1.0}, env="test", version="v1", graph=graph)
+    schema = load_feature_schema(model_path)
+    assert schema["columns"] == MODEL_COLUMNS
+    assert schema["higher_timeframes"] == {"H1": ["rsi"], "D1": ["atr"]}
+
+
+def test_fibo_predictor_uses_schema(m15_data, graph, tmp_path):
+    features = _full_features(m15_data, graph)[MODEL_COLUMNS].dropna()
+    model = DecisionTreeClassifier(max_depth=3).fit(features, features["close"].diff().fillna(0) > 0)
+    model_path = os.path.join(tmp_path, "xgboost_model.pkl")
+    joblib.dump(model, model_path)
+    save_feature_schema(model_path, build_feature_schema(MODEL_COLUMNS, graph=graph))
+
+    # ส่งแค่ราคาดิบ: predictor คำนวณเฉพาะคอลัมน์ของโมเดลเอง
+    predictor = FiboPredictor(model_path=model_path)
+    prepared = predictor.prepare_features(m15_data)
+    assert list(prepared.columns) == MODEL_COLUMNS
+
+    df_pred = predictor.predict(m15_data.copy())
+    np.testing.assert_array_equal(df_pred["prediction"].to_numpy()[-100:],
+                                  model.predict(features.iloc[-100:]))
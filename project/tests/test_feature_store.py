@@ -0,0 +1,86 @@
+"""
+test_feature_store.py
+---------------------
+Unit tests สำหรับ FeatureStore
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_store import FeatureStore
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def m15_data():
+    # M15 ประมาณ 2 เดือน (10 ม.ค. - 10 มี.ค.) -> 3 partitions
+    rng = np.random.default_rng(3)
+    n = 96 * 60
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-10", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+
+def test_store_matches_full_compute(m15_data, tmp_path):
+    store = FeatureStore(root=str(tmp_path), namespace="EURAUD")
+    df = store.load_or_compute(m15_data)
+    expected = build_feature_graph().compute(m15_data)
+
+    assert store.stats == {"hits": 0, "computed": 3}
+    for col in expected.columns:
+        if col in ("datetime", "volume_divergence"):
+            assert (df[col].astype(str) == expected[col].astype(str)).all()
+        else:
+            np.testing.assert_allclose(df[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                                       rtol=1e-9, atol=1e-12, err_msg=col)
+
+
+def test_store_reuses_and_invalidates_partitions(m15_data, tmp_path):
+    store = FeatureStore(root=str(tmp_path), namespace="EURAUD")
+    store.load_or_compute(m15_data)
+
+    # รันซ้ำ -> โหลดจากไฟล์ทั้งหมด
+    store.stats = {"hits": 0, "computed": 0}
+    store.load_or_compute(m15_data)
+    assert store.stats == {"hits": 3, "computed": 0}
+
+    # แก้ราคาแท่งสุดท้าย -> คำนวณใหม่เฉพาะ partition สุดท้าย
+    changed = m15_data.copy()
+    changed.loc[changed.index[-1], "close"] += 0.001
+    store.stats = {"hits": 0, "computed": 0}
+    store.load_or_compute(changed)
+    assert store.stats == {"hits": 2, "computed": 1}
+    assert len(list(tmp_path.glob("EURAUD/*.parquet"))) == 3
+
+
+def test_extra_column_changes_key(m15_data, tmp_path):
+    store = FeatureStore(root=str(tmp_path), namespace="EURAUD")
+    first = store.load_or_compute(m15_data.assign(target=0))
+
+    # ราคาเดิมแต่คอลัมน์อื่นเปลี่ยน -> ต้องไม่ได้ partition เก่ากลับมา
+    store.stats = {"hits": 0, "computed": 0}
+    second = store.load_or_compute(m15_data.assign(target=1))
+    assert store.stats == {"hits": 0, "computed": 3}
+    assert (first["target"] == 0).all() and (second["target"] == 1).all()
+
+    # dtype ต่างกันก็เป็นคนละ key
+    store.stats = {"hits": 0, "computed": 0}
+    store.load_or_compute(m15_data.assign(target=np.int8(1)))
+    assert store.stats["computed"] == 3
+
+
+def test_missing_raw_column(m15_data, tmp_path):
+    store = FeatureStore(root=str(tmp_path), namespace="EURAUD")
+    with pytest.raises(ValueError, match="volume"):
+        store.load_or_compute(m15_data.drop(columns=["volume"]))
+    # ฟีเจอร์ที่ไม่ใช้ volume ยังคำนวณได้
+    df = store.load_or_compute(m15_data.drop(columns=["volume"]), columns=["rsi"])
+    assert "rsi" in df.columns
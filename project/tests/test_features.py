@@ -5,8 +5,12 @@ Unit tests สำหรับโมดูลฟีเจอร์
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 from project.features.feature_generator import FeatureGenerator
+from project.features import indicator_kernels
+from project.features.feature_graph import build_feature_graph
+from project.fibo_analysis.fibo_analyzer import FiboAnalyzer
 from project.features.fibo_levels import FiboLevels
 from project.features.volume_features import VolumeFeatures
 
@@ -24,6 +28,22 @@ def sample_data():
     return pd.DataFrame(data)
 
 
+@pytest.fixture
+def long_sample_data():
+    # random walk ยาวพอให้ทุก indicator มีค่า (MACD ต้องใช้ 26+9 แท่ง)
+    rng = np.random.default_rng(42)
+    n = 300
+    close = 1.60 + np.cumsum(rng.normal(0, 0.001, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 0.001, n),
+        "low": np.minimum(open_, close) - rng.uniform(0, 0.001, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+
 def test_feature_generator(sample_data):
     fg = FeatureGenerator(sample_data)
     df = fg.generate_all_features()
@@ -57,4 +77,176 @@ def test_volume_features(sample_data):
     assert "volume_ratio" in df.columns
 
     # volume_ratio ต้องไม่เป็น NaN ทั้งหมด
-    assert df["volume_ratio"].notna().any()
\ No newline at end of file
+    assert df["volume_ratio"].notna().any()
+
+
+def test_streaming_update_matches_batch(long_sample_data):
+    batch = FeatureGenerator(long_sample_data).generate_all_features()
+
+    # เริ่มจากประวัติ 100 แท่ง แล้วป้อนแท่งที่เหลือทีละแท่ง
+    fg = FeatureGenerator(long_sample_data.iloc[:100])
+    rows = [fg.update(candle) for candle in long_sample_data.iloc[100:].to_dict("records")]
+    stream = pd.DataFrame(rows, index=long_sample_data.index[100:])
+
+    for col in batch.columns:
+        np.testing.assert_allclose(
+            stream[col].to_numpy(dtype=float),
+            batch[col].iloc[100:].to_numpy(dtype=float),
+            rtol=1e-8, atol=1e-10, err_msg=col,
+        )
+
+
+def test_streaming_update_non_default_indicators(long_sample_data):
+    # window ไม่ใช่ค่า default และปิดบาง indicator -> update ต้องตรงกับ batch ชุดเดียวกัน
+    indicators = [("RSI", {"window": 21}), ("MACD", {"window_slow": 30, "window_fast": 8, "window_sign": 5}),
+                  ("BollingerBands", {"window": 10, "window_dev": 3})]
+    batch = FeatureGenerator(long_sample_data, indicators=indicators).generate_all_features()
+
+    fg = FeatureGenerator(long_sample_data.iloc[:100], indicators=indicators)
+    rows = [fg.update(candle) for candle in long_sample_data.iloc[100:].to_dict("records")]
+    stream = pd.DataFrame(rows, index=long_sample_data.index[100:])
+
+    assert list(stream.columns) == list(batch.columns)
+    assert "atr" not in stream.columns and "stoch_k" not in stream.columns
+    for col in batch.columns:
+        np.testing.assert_allclose(
+            stream[col].to_numpy(dtype=float),
+            batch[col].iloc[100:].to_numpy(dtype=float),
+            rtol=1e-8, atol=1e-10, err_msg=col,
+        )
+
+
+def test_streaming_update_rejects_batch_only_indicator(long_sample_data):
+    from project.features.feature_generator import StreamingFeatureState
+
+    with pytest.raises(ValueError):
+        StreamingFeatureState([("RSI", {"window": 14}), ("Momentum", {"window": 5})])
+
+
+def test_indicator_kernels_match_ta(long_sample_data):
+    ta = pytest.importorskip("ta")
+    high, low, close = long_sample_data["high"], long_sample_data["low"], long_sample_data["close"]
+    out = indicator_kernels.compute_indicators(high, low, close)
+
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+    stoch = ta.momentum.StochasticOscillator(high, low, close)
+    expected = {
+        "rsi": ta.momentum.RSIIndicator(close, window=14).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "macd_diff": macd.macd_diff(),
+        "atr": ta.volatility.AverageTrueRange(high, low, close, window=14).average_true_range(),
+        "bb_high": bb.bollinger_hband(),
+        "bb_low": bb.bollinger_lband(),
+        "stoch_k": stoch.stoch(),
+        "stoch_d": stoch.stoch_signal(),
+    }
+    for col, series in expected.items():
+        np.testing.assert_allclose(out[col], series.to_numpy(dtype=float), rtol=1e-9, atol=1e-12, err_msg=col)
+
+
+def test_ema_nan_gap_matches_pandas(long_sample_data):
+    # NaN กลางข้อมูลต้องไม่ทำให้ค่าหลังจากนั้นเป็น NaN ทั้งหมด (pandas ewm ข้าม NaN แล้วคำนวณต่อ)
+    close = long_sample_data["close"].copy()
+    close.iloc[[0, 1, 200]] = np.nan
+    close.iloc[400:415] = np.nan
+    for alpha, min_periods in [(2 / 13, 12), (1 / 14, 14), (1.0, 0)]:
+        expected = close.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+        out = indicator_kernels.ema(close, alpha, min_periods=min_periods)
+        np.testing.assert_allclose(out, expected.to_numpy(), rtol=1e-10, atol=1e-12)
+    assert not np.isnan(out[-1])
+
+
+def test_macd_nan_gap_matches_ta(long_sample_data):
+    ta = pytest.importorskip("ta")
+    close = long_sample_data["close"].copy()
+    close.iloc[300:305] = np.nan
+    macd_line, signal, diff = indicator_kernels.macd(close)
+    expected = ta.trend.MACD(close)
+    np.testing.assert_allclose(macd_line, expected.macd().to_numpy(dtype=float), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(signal, expected.macd_signal().to_numpy(dtype=float), rtol=1e-9, atol=1e-12)
+
+
+def test_fibo_levels_columnar_matches_rowwise(long_sample_data):
+    fibo = FiboLevels()
+    df = fibo.generate_levels_for_dataframe(long_sample_data.copy(), lookback=50, as_dict=True)
+
+    # ตรวจเทียบกับการคำนวณทีละแถวแบบเดิม
+    for i in [0, 49, 50, 51, len(df) - 1]:
+        if i < 50:
+            assert df["fibo_levels"].iloc[i] == {}
+            assert df[fibo.level_columns].iloc[i].isna().all()
+            continue
+        expected = fibo.calculate_levels(
+            long_sample_data["high"].iloc[i - 50:i].max(),
+            long_sample_data["low"].iloc[i - 50:i].min(),
+        )
+        assert df["fibo_levels"].iloc[i] == expected
+        assert df["fibo_ret_0.382"].iloc[i] == expected["retracements"][0.382]
+        assert df["fibo_ext_1.618"].iloc[i] == expected["extensions"][1.618]
+
+    # dict column ต้องเป็น opt-in เท่านั้น
+    df_default = fibo.generate_levels_for_dataframe(long_sample_data.copy(), lookback=50)
+    assert "fibo_levels" not in df_default.columns
+
+
+def test_volume_features_single_pass(long_sample_data):
+    df = VolumeFeatures(long_sample_data).generate_all_volume_features()
+
+    # เทียบกับการคำนวณแบบเดิม
+    price_change = long_sample_data["close"].pct_change(20)
+    volume_change = long_sample_data["volume"].pct_change(20)
+    expected = np.where(
+        (price_change > 0) & (volume_change < 0), "bearish_divergence",
+        np.where((price_change < 0) & (volume_change > 0), "bullish_divergence", "none"),
+    )
+    assert isinstance(df["volume_divergence"].dtype, pd.CategoricalDtype)
+    assert df["volume_divergence"].cat.codes.dtype == np.int8
+    assert list(df["volume_divergence"].astype(str)) == list(expected)
+
+    ma = long_sample_data["volume"].rolling(20).mean()
+    np.testing.assert_allclose(df["volume_ma_20"], ma)
+    assert (df["volume_spike"] == (long_sample_data["volume"] > 1.5 * ma)).all()
+
+
+def test_volume_ma_ignores_stale_column(long_sample_data):
+    # volume_ma_20 ที่ค้างอยู่ใน df (ค่าเก่า) ต้องไม่ถูกนำมาใช้
+    stale = long_sample_data.assign(volume_ma_20=1.0)
+    df = VolumeFeatures(stale).generate_all_volume_features()
+
+    ma = long_sample_data["volume"].rolling(20).mean()
+    np.testing.assert_allclose(df["volume_ma_20"], ma)
+    assert (df["volume_spike"] == (long_sample_data["volume"] > 1.5 * ma)).all()
+
+
+def test_feature_graph_matches_generators(long_sample_data):
+    graph = build_feature_graph()
+    df = graph.compute(long_sample_data)
+
+    expected = FeatureGenerator(long_sample_data).generate_all_features()
+    expected = VolumeFeatures(expected).generate_all_volume_features()
+    expected = FiboLevels().generate_levels_for_dataframe(expected, lookback=50)
+    expected = FiboAnalyzer(expected).check_touch_bitmask()
+
+    assert set(df.columns) == set(expected.columns)
+    for col in expected.columns:
+        if isinstance(expected[col].dtype, pd.CategoricalDtype):
+            assert list(df[col].astype(str)) == list(expected[col].astype(str))
+        else:
+            np.testing.assert_allclose(
+                df[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                rtol=1e-12, err_msg=col,
+            )
+
+    # แบบ thread pool ต้องได้ผลเท่ากับรันตามลำดับ
+    sequential = graph.compute(long_sample_data, max_workers=1)
+    pd.testing.assert_frame_equal(df, sequential)
+
+
+def test_feature_graph_computes_only_required_nodes(long_sample_data):
+    graph = build_feature_graph()
+    assert graph.resolve(["macd_signal"]) == ["ema_fast", "ema_slow", "macd", "macd_signal"]
+
+    df = graph.compute(long_sample_data, columns=["rsi", "volume_spike"], include_input=False)
+    assert list(df.columns) == ["rsi", "volume_spike"]
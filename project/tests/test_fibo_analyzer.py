@@ -0,0 +1,64 @@
+"""
+test_fibo_analyzer.py
+---------------------
+Unit tests สำหรับ FiboAnalyzer (bitmask แบบ vectorized)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.fibo_levels import FiboLevels
+from project.fibo_analysis.fibo_analyzer import FiboAnalyzer, labels_from_bitmask
+
+
+@pytest.fixture
+def fibo_data():
+    rng = np.random.default_rng(7)
+    n = 400
+    close = 1.60 + np.cumsum(rng.normal(0, 0.001, n))
+    df = pd.DataFrame({
+        "high": close + rng.uniform(0, 0.001, n),
+        "low": close - rng.uniform(0, 0.001, n),
+        "close": close,
+    })
+    return FiboLevels().generate_levels_for_dataframe(df, lookback=20, as_dict=True)
+
+
+def test_bitmask_matches_dict_path(fibo_data):
+    # แบบเดิม: ใช้เฉพาะคอลัมน์ dict
+    legacy = FiboAnalyzer(fibo_data[["close", "fibo_levels"]], tolerance=0.0005)
+    legacy_df = legacy.check_touch_levels()
+
+    # แบบใหม่: ใช้คอลัมน์ level แบบ float
+    analyzer = FiboAnalyzer(fibo_data.drop(columns=["fibo_levels"]), tolerance=0.0005)
+    df = analyzer.check_touch_bitmask()
+
+    assert "fibo_signal" not in df.columns
+    assert (df["fibo_touch_mask"] > 0).any()
+    labels = labels_from_bitmask(df["fibo_touch_mask"], analyzer.level_names)
+    assert list(labels) == list(legacy_df["fibo_signal"])
+
+    # summary จาก bitmask ต้องเท่ากับ summary จาก string
+    assert analyzer.generate_summary() == legacy.generate_summary()
+
+
+def test_check_touch_levels_uses_bitmask(fibo_data):
+    analyzer = FiboAnalyzer(fibo_data, tolerance=0.0005)
+    df = analyzer.check_touch_levels()
+
+    assert "fibo_touch_mask" in df.columns
+    assert df.loc[df["fibo_touch_mask"] == 0, "fibo_signal"].eq("none").all()
+
+
+def test_bit_order_independent_of_column_and_config_order(fibo_data):
+    df = fibo_data.drop(columns=["fibo_levels"])
+    expected = FiboAnalyzer(df, tolerance=0.0005).check_touch_bitmask()["fibo_touch_mask"]
+
+    # สลับลำดับคอลัมน์ level ใน df -> bit เดิม
+    reordered = df[list(reversed(df.columns))]
+    analyzer = FiboAnalyzer(reordered, tolerance=0.0005)
+    np.testing.assert_array_equal(analyzer.check_touch_bitmask()["fibo_touch_mask"], expected)
+
+    # config เรียง level ต่างกัน -> ชื่อ level ตาม bit (ที่ FiboPredictor ใช้แตก bit) เหมือนกัน
+    shuffled = FiboLevels([0.786, 0.5, 0.236, 0.618, 0.382], [2.0, 1.272, 1.618])
+    assert shuffled.level_names == FiboLevels().level_names == analyzer.level_names
@@ -0,0 +1,117 @@
+"""
+test_hyperparam_search.py
+-------------------------
+Unit tests สำหรับ hyperparam_search (Hyperband / SQLite trial store / profile ใน model_params.yaml)
+"""
+
+import shutil
+
+import pytest
+import yaml
+import numpy as np
+
+from project.models.hyperparam_search import (
+    SEARCH_SPACES, HyperparameterSearch, hyperband_brackets, sample_params, write_params_profile,
+)
+
+SETTINGS = {"min_resource": 10, "max_resource": 90, "eta": 3, "early_stopping_rounds": 10, "seed": 1}
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(5)
+    n = 2000
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.normal(scale=0.7, size=n) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "trials.db")
+
+
+def test_hyperband_schedule():
+    brackets = hyperband_brackets(10, 90, eta=3)
+    assert brackets == [
+        (2, [(9, 10), (3, 30), (1, 90)]),
+        (1, [(5, 30), (1, 90)]),
+        (0, [(3, 90)]),
+    ]
+    # successive halving = bracket ที่กว้างที่สุดอย่างเดียว
+    assert hyperband_brackets(10, 90, eta=3, method="successive_halving") == brackets[:1]
+    with pytest.raises(ValueError):
+        hyperband_brackets(100, 10)
+
+
+def test_sample_params_deterministic():
+    space = SEARCH_SPACES["lightgbm"]
+    first = sample_params(space, np.random.default_rng([1, 2]))
+    assert first == sample_params(space, np.random.default_rng([1, 2]))
+    assert 15 <= first["num_leaves"] <= 255
+    assert 0.01 <= first["learning_rate"] <= 0.3
+    assert first["max_depth"] in space["max_depth"][1]
+
+
+def test_search_runs_and_resumes(dataset, db_path):
+    X, y = dataset
+    search = HyperparameterSearch("lightgbm", X, y, db_path=db_path, max_workers=1, **SETTINGS)
+    stats = search.run(time_budget=None)
+    total = sum(n for _, rungs in search.brackets for n, _ in rungs)
+    assert stats["finished"] and stats["trials_run"] == total
+    best = stats["best"]
+    assert best["score"] == search.trials()["score"].min()
+    assert 1 <= best["params"]["n_estimators"] <= best["resource"]
+    search.close()
+
+    # study เดิม -> ใช้ผลจาก SQLite ไม่ train ซ้ำ
+    resumed = HyperparameterSearch("lightgbm", X, y, db_path=db_path, max_workers=1, **SETTINGS)
+    again = resumed.run(time_budget=None)
+    assert again["trials_run"] == 0 and again["trials_reused"] == total
+    assert again["best"] == best
+    resumed.close()
+
+    # ชื่อ study เดิมแต่ตั้งค่าไม่ตรง -> error
+    with pytest.raises(ValueError):
+        HyperparameterSearch("lightgbm", X, y, db_path=db_path, max_workers=1, **{**SETTINGS, "eta": 2})
+
+
+def test_time_budget_stops_search(dataset, db_path):
+    X, y = dataset
+    search = HyperparameterSearch("xgboost", X, y, db_path=db_path, max_workers=1, **SETTINGS)
+    stats = search.run(time_budget=0)
+    assert not stats["finished"] and stats["trials_run"] == 0 and stats["best"] is None
+    with pytest.raises(ValueError):
+        search.save_profile("empty")
+
+
+def test_parallel_xgboost(dataset, db_path):
+    X, y = dataset
+    search = HyperparameterSearch("xgboost", X, y, db_path=db_path, max_workers=2, n_jobs=1,
+                                  method="successive_halving", **SETTINGS)
+    stats = search.run(time_budget=None)
+    assert stats["finished"] and stats["trials_run"] == 9 + 3 + 1
+    assert search.best()["params"]["eval_metric"] == "logloss"
+
+
+def test_write_profile_keeps_comments(dataset, db_path, tmp_path):
+    path = str(tmp_path / "model_params.yaml")
+    shutil.copy("project/config/model_params.yaml", path)
+
+    X, y = dataset
+    search = HyperparameterSearch("lightgbm", X, y, db_path=db_path, max_workers=1,
+                                  method="successive_halving", **SETTINGS)
+    search.run(time_budget=None)
+    search.save_profile("tuned", path=path)
+    write_params_profile("manual", {"xgboost": {"max_depth": 4}}, path=path)
+
+    with open(path, "r") as f:
+        text = f.read()
+    assert "# Model Hyperparameters" in text
+    params = yaml.safe_load(text)
+    assert list(params["profiles"]) == ["tuned", "manual"]
+    assert params["profiles"]["tuned"]["lightgbm"] == search.best()["params"]
+    # params เดิมไม่เปลี่ยน
+    assert params["lightgbm"]["num_leaves"] == 64
+    with pytest.raises(ValueError):
+        write_params_profile("manual", {"xgboost": {}}, path=path)
@@ -0,0 +1,125 @@
+"""
+test_indicator_registry.py
+--------------------------
+Unit tests สำหรับ indicator registry (features.indicators ใน config)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from project.features import indicator_kernels, indicator_registry
+from project.features.feature_generator import FeatureGenerator
+from project.features.feature_graph import build_feature_graph
+from project.features.indicator_registry import (
+    INDICATORS, compute_indicators, enabled_indicators, indicator_timings, register_indicator,
+)
+
+
+@pytest.fixture
+def price_data():
+    rng = np.random.default_rng(7)
+    n = 500
+    close = 1.60 + np.cumsum(rng.normal(0, 0.001, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.uniform(0, 0.001, n),
+        "low": np.minimum(open_, close) - rng.uniform(0, 0.001, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+
+@pytest.fixture
+def momentum_indicator():
+    # indicator ทดสอบที่ลงทะเบียนจากนอก FeatureGenerator แล้วลบออกหลังจบ test
+    @register_indicator("Momentum", ["momentum"], {"window": 10}, lookback=lambda window: window + 1)
+    def _momentum(window):
+        return [("momentum", ["close"], lambda c: c - np.r_[np.full(window, np.nan), c[:-window]], False)]
+
+    yield "Momentum"
+    INDICATORS.pop("Momentum")
+
+
+def test_config_formats():
+    # list ของชื่อ / mapping พร้อม window / list ของ dict ให้ผลเหมือนกัน
+    as_list = enabled_indicators({"features": {"indicators": ["RSI", "MACD"]}})
+    as_mapping = enabled_indicators({"features": {"indicators": {"RSI": None, "MACD": {}}}})
+    as_dicts = enabled_indicators({"features": {"indicators": [{"RSI": {"window": 14}}, "MACD"]}})
+    assert as_list == as_mapping == as_dicts
+    assert as_list[1] == ("MACD", {"window_slow": 26, "window_fast": 12, "window_sign": 9})
+
+    # ไม่มี key = เปิดทุกตัว
+    assert [name for name, _ in enabled_indicators({"features": {}})] == list(INDICATORS)
+
+
+def test_invalid_config_raises():
+    with pytest.raises(KeyError):
+        enabled_indicators({"features": {"indicators": ["RSI", "Ichimoku"]}})
+    with pytest.raises(ValueError):
+        enabled_indicators({"features": {"indicators": {"RSI": {"span": 3}}}})
+
+
+def test_default_set_matches_kernels(price_data):
+    # ชุด default ต้องตรงกับ compute_indicators เดิมทุกคอลัมน์
+    expected = indicator_kernels.compute_indicators(price_data["high"], price_data["low"], price_data["close"])
+    out = compute_indicators(price_data["high"], price_data["low"], price_data["close"],
+                             enabled_indicators({"features": {}}))
+    assert list(out) == list(expected)
+    for col in expected:
+        np.testing.assert_allclose(out[col], expected[col], rtol=1e-12, err_msg=col)
+
+
+def test_per_indicator_windows(price_data):
+    config = {"features": {"indicators": {"RSI": {"window": 21}, "BollingerBands": {"window": 10, "window_dev": 3}}}}
+    out = compute_indicators(price_data["high"], price_data["low"], price_data["close"], enabled_indicators(config))
+    assert list(out) == ["rsi", "bb_high", "bb_low", "bb_width"]
+
+    np.testing.assert_allclose(out["rsi"], indicator_kernels.rsi(price_data["close"], 21))
+    _, bb_high, _ = indicator_kernels.bollinger_bands(price_data["close"], window=10, window_dev=3)
+    np.testing.assert_allclose(out["bb_high"], bb_high)
+
+
+def test_generator_computes_only_enabled(price_data):
+    indicators = enabled_indicators({"features": {"indicators": ["RSI", "Stochastic"]}})
+    df = FeatureGenerator(price_data, indicators=indicators).add_indicators()
+
+    assert {"rsi", "stoch_k", "stoch_d"} <= set(df.columns)
+    assert not {"macd", "atr", "bb_high"} & set(df.columns)
+
+
+def test_generator_reports_timings(price_data):
+    fg = FeatureGenerator(price_data, indicators=enabled_indicators({"features": {}}))
+    fg.add_indicators()
+    assert list(fg.indicator_timings) == list(INDICATORS)
+    assert all(seconds >= 0 for seconds in fg.indicator_timings.values())
+
+
+def test_graph_follows_config(price_data):
+    config = {"features": {"indicators": {"MACD": {"window_fast": 5}}}}
+    graph = build_feature_graph(config)
+    indicator_cols = graph.columns_for_branches(["indicators"])
+    assert indicator_cols == ["macd", "macd_signal", "macd_diff"]
+    # window อยู่ใน params -> cache key ของ FeatureStore เปลี่ยนตาม
+    assert graph.params["indicators"]["MACD"]["window_fast"] == 5
+
+    node_timings = {}
+    df = graph.compute(price_data, columns=indicator_cols, include_input=False, timings=node_timings)
+    expected, _, _ = indicator_kernels.macd(price_data["close"], window_fast=5)
+    np.testing.assert_allclose(df["macd"], expected)
+    assert list(indicator_timings(node_timings, enabled_indicators(config))) == ["MACD"]
+
+
+def test_plugin_indicator(price_data, momentum_indicator):
+    # indicator ใหม่ใช้งานได้ทั้ง FeatureGenerator และ graph โดยไม่แก้โค้ดเดิม
+    config = {"features": {"indicators": {"RSI": None, momentum_indicator: {"window": 5}}}}
+    indicators = enabled_indicators(config)
+    df = FeatureGenerator(price_data, indicators=indicators).add_indicators()
+    np.testing.assert_allclose(df["momentum"], price_data["close"].diff(5))
+
+    graph = build_feature_graph(config)
+    assert graph.columns_for_branches(["indicators"]) == ["rsi", "momentum"]
+    assert indicator_registry.indicator_lookback(indicators) == 15
+    # RSI (Wilder) ต้องใช้ช่วงลู่เข้าเพิ่ม, momentum ไม่มีค่าเฉลี่ยแบบ recursive
+    assert indicator_registry.indicator_warmup(indicators, 4) == 15 + 4 * 27
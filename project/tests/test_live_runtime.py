@@ -0,0 +1,259 @@
+"""
+test_live_runtime.py
+--------------------
+Unit tests สำหรับ LivePredictor ที่สร้างจาก config จริงของ environment
+(config_{env}.yaml + config.yaml), การรับแท่งจาก TickAggregator และ run_stream
+"""
+
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+
+pytest.importorskip("requests")
+pytest.importorskip("textblob")
+
+from project.features.feature_graph import build_feature_graph
+from project.features.feature_schema import build_feature_schema, save_feature_schema, schema_path_for
+from project.features.multi_timeframe import add_multi_timeframe_features
+from project.models.model_backends import get_backend
+from project.models.model_cache import dump_model
+from project.prediction import live_predictor
+from project.prediction.candle_buffer import required_history
+from project.prediction.live_predictor import LivePredictor
+from project.prediction.tick_aggregator import ReplayTickSource
+from project.utils.config_loader import load_config
+from project.utils.logger import AuditLogger
+
+FEATURE_COLUMNS = ["close", "rsi", "macd_diff", "atr", "h1_rsi", "h4_macd", "d1_atr"]
+
+
+@pytest.fixture(scope="module")
+def m15_data():
+    rng = np.random.default_rng(5)
+    n = 96 * 60
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+
+@pytest.fixture(scope="module")
+def trained_model(m15_data):
+    features = add_multi_timeframe_features(build_feature_graph().compute(m15_data), base_timeframe="M15")
+    X = features[FEATURE_COLUMNS].dropna()
+    y = (m15_data["close"].shift(-1) > m15_data["close"]).loc[X.index].astype(int)
+    return get_backend("xgboost").fit({"n_estimators": 10, "max_depth": 3}, X, y)
+
+
+@pytest.fixture
+def model_path(trained_model, tmp_path):
+    path = dump_model(trained_model, str(tmp_path / "best_model.pkl"))
+    save_feature_schema(path, build_feature_schema(FEATURE_COLUMNS))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def audit_log(tmp_path, monkeypatch):
+    # ไม่เขียนลง project/logs/audit.log ของ repo
+    monkeypatch.setattr(live_predictor, "AuditLogger", lambda: AuditLogger(log_path=str(tmp_path / "audit.log")))
+
+
+def make_predictor(model_path, monkeypatch, signals):
+    predictor = LivePredictor(env="dev", model_path=model_path)
+    # ข่าว / sentiment ไม่ใช่ส่วนที่ทดสอบ -> เก็บฟีเจอร์ที่ส่งเข้าโมเดลไว้ตรวจ
+    monkeypatch.setattr(predictor, "_signal_from_features",
+                        lambda df, selector=None: signals.append(df) or "BUY")
+    return predictor
+
+
+def test_builds_from_env_config(model_path, monkeypatch):
+    predictor = make_predictor(model_path, monkeypatch, [])
+    try:
+        # config_dev.yaml ทับ config.yaml: path ตาม env, timeframe / features / live มาจาก config.yaml
+        config = load_config(env="dev")
+        assert config["model"]["save_path"] == "project/models/dev/"
+        assert config["data"]["source_path"] == "project/data/EURAUD_dev.csv"
+        assert predictor.timeframe == config["data"]["timeframe"] == "M15"
+        assert predictor.candles.capacity == max(required_history(config), config["live"]["buffer_bars"])
+        assert predictor.feature_schema["columns"] == FEATURE_COLUMNS
+    finally:
+        predictor.close()
+
+
+def test_on_bar_ignores_aggregator_keys(m15_data, tmp_path, trained_model, monkeypatch):
+    # โมเดลไม่มี schema -> ฟีเจอร์ทั้งหมดพร้อมคอลัมน์ input ของ buffer
+    path = dump_model(trained_model, str(tmp_path / "no_schema.pkl"))
+    signals = []
+    predictor = make_predictor(path, monkeypatch, signals)
+    try:
+        predictor.candles.extend(m15_data.iloc[:-1])
+        bar = {**m15_data.iloc[-1].to_dict(), "ticks": 42}
+        assert predictor.on_bar("M15", bar) == "BUY"
+        assert predictor.on_bar("M1", bar) is None
+    finally:
+        predictor.close()
+
+    assert len(signals) == 1
+    assert "ticks" not in signals[0].columns
+    assert signals[0]["close"].iloc[-1] == m15_data["close"].iloc[-1]
+
+
+def test_run_stream_skips_unfinished_bar(m15_data, model_path, monkeypatch):
+    signals = []
+    predictor = make_predictor(model_path, monkeypatch, signals)
+    predictor.candles.extend(m15_data)
+
+    # tick ต่อจากแท่งสุดท้าย 40 นาที -> แท่ง M15 ปิด 2 แท่ง แท่งที่ 3 ยังไม่ครบช่วงเวลา
+    start = m15_data["datetime"].iloc[-1] + pd.Timedelta(minutes=15)
+    times = start + pd.to_timedelta(np.arange(0, 40 * 60, 5), unit="s")
+    mid = m15_data["close"].iloc[-1] + np.cumsum(np.full(len(times), 1e-6))
+    ticks = pd.DataFrame({"datetime": times, "bid": mid - 5e-5, "ask": mid + 5e-5})
+    try:
+        stats = predictor.run_stream(ReplayTickSource(ticks))
+    finally:
+        predictor.close()
+
+    assert stats["bars"]["M15"] == 2
+    assert len(signals) == 2
+    assert predictor.candles.last()["datetime"] == start + pd.Timedelta(minutes=15)
+
+
+def test_higher_timeframes_from_stream(m15_data, model_path, monkeypatch):
+    signals = []
+    predictor = make_predictor(model_path, monkeypatch, signals)
+    history, live = m15_data.iloc[:-8], m15_data.iloc[-8:]
+    predictor.candles.extend(history)
+    predictor._update_higher_timeframes(history)
+    try:
+        for bar in live.to_dict("records"):
+            predictor.on_bar("M15", bar)
+    finally:
+        predictor.close()
+
+    # ค่า timeframe ใหญ่ของแท่งล่าสุดมาจาก stream (ประวัติเต็ม) ตรงกับแบบ batch ทั้งไฟล์
+    batch = add_multi_timeframe_features(m15_data, base_timeframe="M15")
+    assert len(signals) == len(live)
+    for col in ["h1_rsi", "h4_macd", "d1_atr"]:
+        np.testing.assert_allclose(signals[-1][col].iloc[-1], batch[col].iloc[-1], rtol=1e-8, err_msg=col)
+
+
+def test_higher_timeframes_follow_indicator_config(m15_data, trained_model, tmp_path, monkeypatch):
+    # window ไม่ใช่ค่า default: ค่า h1/h4/d1 ของ live ต้องเท่ากับตอน train (batch) ด้วย config เดียวกัน
+    config = load_config(env="dev")
+    config["features"]["indicators"] = {
+        "RSI": {"window": 21}, "MACD": {"window_slow": 30, "window_fast": 8, "window_sign": 5}, "ATR": {"window": 10},
+    }
+    monkeypatch.setattr(live_predictor, "load_config", lambda env: config)
+    graph = build_feature_graph(config)
+    path = dump_model(trained_model, str(tmp_path / "best_model.pkl"))
+    save_feature_schema(path, build_feature_schema(FEATURE_COLUMNS, graph=graph))
+
+    signals = []
+    predictor = make_predictor(path, monkeypatch, signals)
+    history, live = m15_data.iloc[:-4], m15_data.iloc[-4:]
+    predictor.candles.extend(history)
+    predictor._update_higher_timeframes(history)
+    try:
+        for bar in live.to_dict("records"):
+            predictor.on_bar("M15", bar)
+    finally:
+        predictor.close()
+
+    assert set(predictor.htf_features) == {f"{tf}_{col}" for tf in ["h1", "h4", "d1"]
+                                           for col in ["return", "log_return", "volatility", "rsi",
+                                                       "macd", "macd_signal", "macd_diff", "atr"]}
+    batch = add_multi_timeframe_features(m15_data, base_timeframe="M15", graph=graph)
+    for col in ["h1_rsi", "h4_macd", "d1_atr"]:
+        np.testing.assert_allclose(signals[-1][col].iloc[-1], batch[col].iloc[-1], rtol=1e-8, err_msg=col)
+
+
+def test_on_bar_uses_compiled_trees(m15_data, model_path, trained_model, monkeypatch):
+    from project.models.tree_compiler import CompiledTrees
+
+    calls = []
+    predict_proba = CompiledTrees.predict_proba
+    monkeypatch.setattr(CompiledTrees, "predict_proba", lambda self, X: calls.append(len(X)) or predict_proba(self, X))
+    signals = []
+    predictor = LivePredictor(env="dev", model_path=model_path)
+    # ข่าว / sentiment ไม่ใช่ส่วนที่ทดสอบ -> ทำนายด้วย selector ของโมเดลที่ active ตรง ๆ
+    monkeypatch.setattr(predictor, "_signal_from_features",
+                        lambda df, selector: signals.append((df, selector.predict(df.tail(1)))))
+    try:
+        selector = predictor.model_selector
+        assert selector.compiled is not None
+        # แท่งเดียวตอน live ต้องไม่เรียก XGBoost
+        monkeypatch.setattr(selector.models["xgboost"], "predict",
+                            lambda X: pytest.fail("ทำนายด้วย XGBoost แทนต้นไม้ที่ compile แล้ว"))
+        predictor.candles.extend(m15_data.iloc[:-1])
+        predictor._update_higher_timeframes(m15_data.iloc[:-1])
+        predictor.on_bar("M15", m15_data.iloc[-1].to_dict())
+    finally:
+        predictor.close()
+
+    assert calls == [1]
+    df, signal = signals[0]
+    np.testing.assert_array_equal(signal, trained_model.predict(df[FEATURE_COLUMNS].tail(1)))
+
+
+def start_swap_check(predictor):
+    # ตรวจไฟล์เองแทน thread เบื้องหลัง (ไม่ต้องรอ poll / settle)
+    watcher = predictor.model_watcher
+    watcher.stop()
+    watcher.settle_seconds = 0.0
+    return watcher
+
+
+def test_hot_swap_watches_selected_model(m15_data, model_path, trained_model, monkeypatch):
+    predictor = make_predictor(model_path, monkeypatch, [])
+    predictor.candles.extend(m15_data)
+    predictor._update_higher_timeframes(m15_data)
+    watcher = start_swap_check(predictor)
+    try:
+        # hot_swap มาจาก config.yaml (merge กับ config_dev.yaml) และเฝ้าไฟล์โมเดลที่ใช้อยู่
+        assert watcher.current_path == model_path
+        assert watcher.latest()[0] == model_path
+
+        # candidate / โมเดลอื่นในโฟลเดอร์เดียวกันไม่ทำให้สลับ
+        dump_model(trained_model, os.path.join(os.path.dirname(model_path), "lightgbm_best.pkl"))
+        assert watcher.check() is False
+
+        # ไฟล์ที่เลือกถูกแทนที่ -> ตรวจคอลัมน์ + ทำนายจากฟีเจอร์จริง แล้วสลับ
+        old = predictor.active_model
+        dump_model(trained_model, model_path)
+        assert watcher.check() is True
+        assert predictor.active_model is not old
+        assert predictor.feature_schema["columns"] == FEATURE_COLUMNS
+    finally:
+        predictor.close()
+
+
+def test_hot_swap_keeps_model_on_column_mismatch(m15_data, model_path, monkeypatch):
+    predictor = make_predictor(model_path, monkeypatch, [])
+    watcher = start_swap_check(predictor)
+    old = predictor.active_model
+    features = add_multi_timeframe_features(build_feature_graph().compute(m15_data), base_timeframe="M15")
+    X = features[FEATURE_COLUMNS].dropna()
+    y = (X["close"].diff() > 0).astype(int)
+    xgboost = get_backend("xgboost")
+    try:
+        # train ด้วยฟีเจอร์น้อยกว่า schema -> ไม่สลับ
+        dump_model(xgboost.fit({"n_estimators": 5}, X[FEATURE_COLUMNS[:5]], y), model_path)
+        assert watcher.check() is False
+        assert predictor.active_model is old
+        assert "feature schema" in watcher.last_error
+
+        # ไม่มี schema และโมเดลไม่เก็บชื่อคอลัมน์ -> ตรวจไม่ได้ ไม่สลับ
+        os.remove(schema_path_for(model_path))
+        dump_model(xgboost.fit({"n_estimators": 5}, X.to_numpy(), y.to_numpy()), model_path)
+        assert watcher.check() is False
+        assert predictor.active_model is old
+        assert watcher.failures == 2
+    finally:
+        predictor.close()
@@ -0,0 +1,119 @@
+"""
+test_memory.py
+--------------
+Unit tests สำหรับโหมด low-memory (float32 / int8 / ไม่ deep copy) และ MemoryProfiler
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_generator import FeatureGenerator
+from project.features.feature_graph import build_feature_graph
+from project.features.fibo_levels import FiboLevels
+from project.features.volume_features import VolumeFeatures
+from project.fibo_analysis.fibo_analyzer import FiboAnalyzer
+from project.models.train_model import ModelTrainer
+from project.utils.memory import MemoryProfiler, compact_array, downcast_features
+
+
+@pytest.fixture
+def price_data():
+    rng = np.random.default_rng(11)
+    n = 500
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+
+def test_compact_array_dtypes():
+    assert compact_array(np.array([0.5, 1.5])).dtype == np.float32
+    assert compact_array(np.array([True, False])).dtype == np.int8
+    # integer เลือก dtype ตามคอลัมน์ที่ประกาศ ไม่ใช่ตามช่วงค่า (ทุก chunk ได้ dtype เดียวกัน)
+    assert compact_array(np.array([0, 1, 1])).dtype == np.int64
+    assert compact_array(np.array([0, 5, 300])).dtype == np.int64
+    assert compact_array(np.array([0, 1, 1]), "bullish_engulfing").dtype == np.int8
+    assert compact_array(np.array([0, 0, 0]), "volume_spike").dtype == np.int8
+    categorical = pd.Categorical(["a", "b"])
+    assert compact_array(categorical) is categorical
+
+
+def test_feature_generator_low_memory(price_data):
+    original_columns = list(price_data.columns)
+    expected = FeatureGenerator(price_data).generate_all_features()
+    df = FeatureGenerator(price_data, low_memory=True).generate_all_features()
+
+    # ไม่ deep copy แต่ต้องไม่เพิ่มคอลัมน์ลงใน df ต้นฉบับ
+    assert list(price_data.columns) == original_columns
+    assert df["close"].dtype == np.float64
+    assert df["rsi"].dtype == np.float32
+    assert df["bullish_engulfing"].dtype == np.int8
+    for col in ["rsi", "macd", "atr", "bb_width", "volatility"]:
+        np.testing.assert_allclose(df[col], expected[col], rtol=1e-5, atol=1e-7)
+    assert df.memory_usage().sum() < expected.memory_usage().sum()
+
+
+def test_volume_and_fibo_low_memory(price_data):
+    df = VolumeFeatures(price_data, low_memory=True).generate_all_volume_features()
+    assert df["volume_ma_20"].dtype == np.float32
+    assert "volume_ma_20" not in price_data.columns
+
+    fibo = FiboLevels()
+    levels = fibo.generate_levels_for_dataframe(df, lookback=20, low_memory=True)
+    assert all(levels[col].dtype == np.float32 for col in fibo.level_columns)
+
+    expected = FiboAnalyzer(
+        FiboLevels().generate_levels_for_dataframe(price_data.copy(), lookback=20)
+    ).check_touch_levels()
+    analyzed = FiboAnalyzer(levels, low_memory=True).check_touch_levels()
+    assert isinstance(analyzed["fibo_signal"].dtype, pd.CategoricalDtype)
+    assert (analyzed["fibo_signal"].astype(str) == expected["fibo_signal"]).mean() > 0.99
+
+
+def test_graph_low_memory(price_data):
+    graph = build_feature_graph()
+    expected = graph.compute(price_data)
+    df = graph.compute(price_data, low_memory=True)
+
+    assert df["rsi"].dtype == np.float32
+    assert df["volume_spike"].dtype == np.int8
+    assert isinstance(df["volume_divergence"].dtype, pd.CategoricalDtype)
+    np.testing.assert_allclose(df["macd"], expected["macd"], rtol=1e-5, atol=1e-7)
+
+
+def test_downcast_features_keeps_raw_prices(price_data):
+    df = FeatureGenerator(price_data).generate_all_features()
+    downcast_features(df)
+    assert df["close"].dtype == np.float64
+    assert df["stoch_k"].dtype == np.float32
+
+
+def test_trainer_low_memory_keeps_raw_prices(price_data):
+    df = FeatureGenerator(price_data).generate_all_features()
+    df["direction"] = (df["close"].shift(-1) > df["close"]).astype(int)
+    X_train, X_test, _, _ = ModelTrainer(df, low_memory=True).prepare_data()
+    assert X_train["close"].dtype == np.float64 and X_test["volume"].dtype == np.float64
+    assert X_train["rsi"].dtype == np.float32
+    assert X_train["bullish_engulfing"].dtype == np.int8
+
+
+def test_memory_profiler_stages():
+    profiler = MemoryProfiler()
+    with profiler.stage("allocate"):
+        data = np.ones(1_000_000)
+    with profiler.stage("noop"):
+        pass
+
+    assert profiler.stages["allocate"]["peak_mb"] >= 7.9
+    assert profiler.stages["noop"]["peak_mb"] < 1
+    assert list(profiler.report().index) == ["allocate", "noop"]
+    assert data.sum() == 1_000_000
+
+    disabled = MemoryProfiler(enabled=False)
+    with disabled.stage("x"):
+        pass
+    assert disabled.stages == {}
@@ -0,0 +1,98 @@
+"""
+test_model_backends.py
+----------------------
+Unit tests สำหรับ registry ของ backend โมเดล (import framework เมื่อใช้ครั้งแรก)
+"""
+
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from project.models.model_backends import BACKENDS, get_backend, register_backend
+from project.models.train_model import ModelTrainer
+
+FRAMEWORKS = ["xgboost", "lightgbm", "tensorflow"]
+
+
+def loaded_after(code: str):
+    # รันใน process ใหม่ (process ของ pytest อาจ import framework ไว้แล้ว)
+    script = f"import sys\n{code}\nprint('loaded:' + ','.join(m for m in {FRAMEWORKS!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    line = [line for line in out.stdout.splitlines() if line.startswith("loaded:")][-1]
+    return [name for name in line[len("loaded:"):].split(",") if name]
+
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"feature1": rng.normal(size=200), "feature2": rng.normal(size=200)})
+    df["direction"] = (df["feature1"] > 0).astype(int)
+    return df
+
+
+@pytest.fixture
+def logistic_backend():
+    # backend ทดสอบที่ลงทะเบียนจากนอก ModelTrainer แล้วลบออกหลังจบ test
+    @register_backend("logistic", "sklearn.linear_model")
+    def _logistic(linear_model, params, n_jobs, input_dim):
+        return linear_model.LogisticRegression(**params)
+
+    yield "logistic"
+    BACKENDS.pop("logistic")
+
+
+def test_import_does_not_load_frameworks():
+    assert loaded_after("import project.models.train_model, project.models.model_selector") == []
+
+
+def test_framework_loaded_on_first_use():
+    code = (
+        "import numpy as np\n"
+        "from project.models.model_backends import get_backend\n"
+        "get_backend('xgboost').fit({'n_estimators': 5}, np.random.rand(50, 3), np.arange(50) % 2)"
+    )
+    assert loaded_after(code) == ["xgboost"]
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(KeyError):
+        get_backend("catboost")
+
+
+def test_threads_passed_to_model():
+    model = get_backend("lightgbm").build({"n_estimators": 5}, n_jobs=3)
+    assert model.get_params()["n_jobs"] == 3
+    assert get_backend("xgboost").build({"n_jobs": 2}).get_params()["n_jobs"] == 2
+
+
+def test_plugin_backend(sample_data, logistic_backend):
+    # backend ใหม่ใช้ได้ทั้ง train_candidate และ ensemble โดยไม่แก้ ModelTrainer
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    trainer.params = {**trainer.params, logistic_backend: {"C": 1.0}}
+    X_train, X_test, y_train, y_test = trainer.prepare_data()
+    model, metrics = trainer.train_candidate(logistic_backend, X_train, y_train, X_test, y_test)
+    assert metrics["accuracy"] > 0.9
+    np.testing.assert_array_equal(get_backend(logistic_backend).predict(model, X_test), model.predict(X_test))
+
+
+@pytest.mark.parametrize("name", ["xgboost", "lightgbm"])
+def test_warm_start_adds_trees(sample_data, name):
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    X_train, X_test, y_train, y_test = trainer.prepare_data()
+    base = get_backend(name).fit({**trainer.params[name], "n_estimators": 20}, X_train, y_train)
+
+    model, metrics = trainer.warm_start(name, base, X_train, y_train, X_test, y_test, n_trees=5)
+    n_trees = model.get_booster().num_boosted_rounds() if name == "xgboost" else model.booster_.current_iteration()
+    # ต้นไม้เดิม 20 ต้น + ต้นไม้ใหม่ 5 ต้น
+    assert n_trees == 25
+    assert "accuracy" in metrics
+
+
+def test_warm_start_unsupported(sample_data, logistic_backend):
+    X = sample_data[["feature1", "feature2"]]
+    base = get_backend(logistic_backend).fit({}, X, sample_data["direction"])
+    with pytest.raises(ValueError):
+        get_backend(logistic_backend).fit({}, X, sample_data["direction"], init_model=base)
@@ -0,0 +1,103 @@
+"""
+test_model_cache.py
+-------------------
+Unit tests สำหรับ model_cache (key ตาม content hash, mmap, LRU และสถิติ)
+"""
+
+import os
+
+import pytest
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from project.models import model_cache
+from project.models.model_cache import ModelCache, dump_model
+from project.utils.model_versioning import load_model_with_metadata, save_model_with_metadata
+
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 5))
+    y = (X[:, 0] + rng.normal(scale=0.3, size=2000) > 0).astype(int)
+    return X, y
+
+
+def fit_tree(sample_data, depth):
+    X, y = sample_data
+    return DecisionTreeClassifier(max_depth=depth, random_state=0).fit(X, y)
+
+
+def test_hit_and_miss(sample_data, tmp_path):
+    path = dump_model(fit_tree(sample_data, 4), str(tmp_path / "model.pkl"))
+    cache = ModelCache()
+    first = cache.get(path, env="dev", version="v1")
+    assert cache.get(path, env="dev", version="v1") is first
+    # env / version ต่างกัน = คนละ key
+    assert cache.get(path, env="prod", version="v1") is not first
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["load_seconds"] > 0
+
+
+def test_rewritten_file_is_new_key(sample_data, tmp_path):
+    X, _ = sample_data
+    path = str(tmp_path / "model.pkl")
+    cache = ModelCache()
+    old = cache.get(dump_model(fit_tree(sample_data, 2), path))
+
+    # เขียนโมเดลใหม่ทับ path เดิม -> โหลดใหม่ และโมเดลเดิมที่ถูก memory map ยังใช้ได้
+    new_model = fit_tree(sample_data, 6)
+    dump_model(new_model, path)
+    new = cache.get(path)
+    assert new is not old
+    np.testing.assert_array_equal(new.predict(X), new_model.predict(X))
+    assert old.get_depth() == 2 and old.predict(X).shape == (len(X),)
+    assert cache.stats()["misses"] == 2
+
+
+def test_mmap_arrays(sample_data, tmp_path):
+    path = dump_model({"weights": np.arange(100000, dtype=np.float64)}, str(tmp_path / "arrays.pkl"))
+    assert isinstance(ModelCache(mmap_mode="r").get(path)["weights"], np.memmap)
+    assert not isinstance(ModelCache(mmap_mode=None).get(path)["weights"], np.memmap)
+
+
+def test_lru_eviction(sample_data, tmp_path):
+    paths = [dump_model(fit_tree(sample_data, depth), str(tmp_path / f"model_{depth}.pkl"))
+             for depth in (3, 4, 5)]
+    sizes = [os.path.getsize(path) for path in paths]
+    # งบพอสำหรับ 2 โมเดลล่าสุด
+    cache = ModelCache(max_mb=(sizes[1] + sizes[2] + 1) / 1024 / 1024)
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])  # paths[1] กลายเป็นตัวที่ไม่ได้ใช้นานที่สุด
+    cache.get(paths[2])
+
+    hashes = [key[2] for key in cache.keys()]
+    assert hashes == [cache.content_hash(paths[0]), cache.content_hash(paths[2])]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelCache().get(str(tmp_path / "missing.pkl"))
+
+
+def test_versioning_uses_cache(sample_data, tmp_path, monkeypatch):
+    from project.features.feature_graph import build_feature_graph
+
+    cache = ModelCache()
+    monkeypatch.setattr(model_cache, "_DEFAULT_CACHE", cache)
+    graph = build_feature_graph()
+    # model_versioning เขียนไปที่ project/models/versions/ (relative) -> ย้ายไป tmp
+    monkeypatch.chdir(tmp_path)
+    save_model_with_metadata(fit_tree(sample_data, 3), {"accuracy": 1.0}, env="test", version="v1", graph=graph,
+                             feature_columns=["close"])
+
+    first, _ = load_model_with_metadata(env="test", version="v1")
+    second, _ = load_model_with_metadata(env="test", version="v1")
+    assert second is first
+    assert cache.keys()[0][:2] == ("test", "v1")
+    assert cache.stats()["hits"] == 1
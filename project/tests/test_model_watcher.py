@@ -0,0 +1,207 @@
+"""
+test_model_watcher.py
+---------------------
+Unit tests สำหรับ model_watcher (hot swap โมเดลระหว่างทำนาย, โหลดไม่สำเร็จ, เวลาสลับ)
+"""
+
+import os
+import threading
+import time
+
+import pytest
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from project.models.model_cache import ModelCache, dump_model
+from project.prediction.model_watcher import ModelWatcher
+
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 5))
+    y = (X[:, 0] + rng.normal(scale=0.3, size=2000) > 0).astype(int)
+    return X, y
+
+
+def fit_tree(sample_data, depth):
+    X, y = sample_data
+    return DecisionTreeClassifier(max_depth=depth, random_state=0).fit(X, y)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.005)
+
+
+def test_swap_while_serving(sample_data, tmp_path):
+    X, _ = sample_data
+    cache = ModelCache()
+    first = dump_model(fit_tree(sample_data, 1), str(tmp_path / "model_v1.pkl"))
+    watcher = ModelWatcher([str(tmp_path)], load=cache.get, warmup=lambda model: model.predict(X[:1]),
+                           poll_seconds=0.01, settle_seconds=0.0)
+    watcher.start(current=cache.get(first), current_path=first)
+
+    # thread ทำนายต่อเนื่อง: อ่าน watcher.current ครั้งเดียวต่อ request
+    depths, errors, latencies = [], [], []
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                model = watcher.current
+                model.predict(X[:1])
+                depths.append(model.get_depth())
+            except Exception as e:
+                errors.append(e)
+            latencies.append(time.perf_counter() - start)
+
+    server = threading.Thread(target=serve)
+    server.start()
+    try:
+        time.sleep(0.05)
+        written = time.perf_counter()
+        dump_model(fit_tree(sample_data, 5), str(tmp_path / "model_v2.pkl"))
+        wait_for(lambda: watcher.swaps == 1)
+        swap_latency = time.perf_counter() - written
+        n_before = len(depths)
+        wait_for(lambda: len(depths) > n_before + 10)
+    finally:
+        stop.set()
+        server.join()
+        watcher.stop()
+
+    # ไม่มี request ที่ล้มเหลว และทุกผลมาจากโมเดลเดิมหรือโมเดลใหม่เท่านั้น
+    assert errors == []
+    assert set(depths) == {1, 5}
+    # สลับครั้งเดียว: หลังเห็นโมเดลใหม่แล้วไม่กลับไปใช้โมเดลเดิม
+    assert depths == sorted(depths)
+    assert watcher.current_path.endswith("model_v2.pkl")
+    assert swap_latency < 5.0
+    assert watcher.last_swap["load_seconds"] >= 0 and watcher.last_swap["warmup_seconds"] >= 0
+    assert watcher.last_swap["since_write_seconds"] <= swap_latency + 0.1
+    # โหลด + warm up อยู่บน thread เบื้องหลัง: ไม่มี request ที่หลุดและไม่มี request ที่ค้างรอการสลับ
+    assert len(latencies) == len(depths) + len(errors)
+    assert max(latencies) < 1.0
+
+
+def test_failed_load_keeps_old_model(sample_data, tmp_path):
+    cache = ModelCache()
+    first = dump_model(fit_tree(sample_data, 2), str(tmp_path / "model_v1.pkl"))
+    os.utime(first, ns=(time.time_ns() - 20 * 10**9,) * 2)
+    old = cache.get(first)
+    errors = []
+    watcher = ModelWatcher([str(tmp_path)], load=cache.get, settle_seconds=0.0,
+                           on_error=lambda path, e: errors.append(path))
+    watcher.current = old
+    watcher._snapshot = watcher.latest()
+
+    # ไฟล์เสีย -> โหลดไม่ได้ ใช้โมเดลเดิมต่อ
+    broken = tmp_path / "model_v2.pkl"
+    broken.write_bytes(b"not a pickle")
+    os.utime(broken, ns=(time.time_ns() - 10 * 10**9,) * 2)
+    assert watcher.check() is False
+    assert watcher.current is old
+    assert watcher.failures == 1 and errors == [str(broken)]
+    # ไม่ลองไฟล์เดิมซ้ำ
+    assert watcher.check() is False
+    assert watcher.failures == 1
+
+    # โมเดลถัดไปที่ใช้ได้ -> สลับตามปกติ
+    dump_model(fit_tree(sample_data, 4), str(tmp_path / "model_v3.pkl"))
+    assert watcher.check() is True
+    assert watcher.current.get_depth() == 4
+
+
+def test_failed_warmup_keeps_old_model(sample_data, tmp_path):
+    def bad_warmup(model):
+        raise ValueError("feature mismatch")
+
+    watcher = ModelWatcher([str(tmp_path)], load=ModelCache().get, warmup=bad_warmup, settle_seconds=0.0)
+    watcher.current = "old"
+    dump_model(fit_tree(sample_data, 2), str(tmp_path / "model_v1.pkl"))
+    assert watcher.check() is False
+    assert watcher.current == "old"
+    assert "feature mismatch" in watcher.last_error
+
+
+def test_existing_files_do_not_swap(sample_data, tmp_path):
+    dump_model(fit_tree(sample_data, 2), str(tmp_path / "model_v1.pkl"))
+    loads = []
+    watcher = ModelWatcher([str(tmp_path)], load=loads.append, poll_seconds=0.01, settle_seconds=0.0)
+    watcher.start(current="startup")
+    time.sleep(0.1)
+    watcher.stop()
+    assert loads == [] and watcher.current == "startup" and watcher.swaps == 0
+
+
+def test_settle_delay(sample_data, tmp_path):
+    watcher = ModelWatcher([str(tmp_path)], load=ModelCache().get, settle_seconds=60.0)
+    dump_model(fit_tree(sample_data, 2), str(tmp_path / "model_v1.pkl"))
+    # ไฟล์เพิ่งเขียน (อาจยังเขียนไฟล์คู่ไม่เสร็จ) -> ยังไม่โหลด
+    assert watcher.check() is False
+    assert watcher.current is None and watcher.failures == 0
+
+
+def test_slow_load_serves_old_model(sample_data, tmp_path):
+    cache = ModelCache()
+    release = threading.Event()
+
+    def slow_load(path):
+        release.wait()
+        return cache.get(path)
+
+    watcher = ModelWatcher([str(tmp_path)], load=slow_load, poll_seconds=0.01, settle_seconds=0.0)
+    watcher.start(current="old")
+    dump_model(fit_tree(sample_data, 3), str(tmp_path / "model_v1.pkl"))
+    time.sleep(0.1)
+    # ระหว่างโหลดบน thread เบื้องหลัง ผู้ทำนายยังได้โมเดลเดิม
+    assert watcher.current == "old"
+    release.set()
+    wait_for(lambda: watcher.swaps == 1)
+    watcher.stop()
+    assert watcher.current.get_depth() == 3
+
+
+def test_promoted_model_is_swapped(tmp_path, monkeypatch):
+    import shutil
+    import pandas as pd
+
+    pytest.importorskip("xgboost")
+    from project.features.feature_graph import build_feature_graph
+    from project.features.feature_schema import load_feature_schema
+    from project.models.model_backends import get_backend
+    from project.models.model_selector import ModelSelector
+    from project.utils.model_versioning import promoted_model_path, save_model_with_metadata
+
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=["rsi", "macd_diff", "atr"])
+    y = (X["rsi"] > 0).astype(int)
+    xgboost = get_backend("xgboost")
+    graph = build_feature_graph()
+    # model_versioning เขียนไปที่ project/models/ (relative) -> ย้ายไป tmp พร้อม config ของ env
+    shutil.copytree("project/config", tmp_path / "project" / "config")
+    monkeypatch.chdir(tmp_path)
+
+    path = promoted_model_path("dev")
+    save_model_with_metadata(xgboost.fit({"n_estimators": 5}, X, y, n_jobs=1), {"accuracy": 0.5}, env="dev",
+                             version="v1", graph=graph, promote=True)
+    watcher = ModelWatcher([os.path.dirname(path)], load=ModelSelector.load_best_model,
+                           pattern=os.path.basename(path), poll_seconds=0.01, settle_seconds=0.0)
+    watcher.start(current=ModelSelector.load_best_model(path), current_path=path)
+    try:
+        # เวอร์ชันใหม่ -> promote เขียนทับไฟล์ที่เฝ้า แล้ว watcher สลับเอง
+        second = xgboost.fit({"n_estimators": 7}, X, 1 - y, n_jobs=1)
+        save_model_with_metadata(second, {"accuracy": 0.6}, env="dev", version="v2", graph=graph, promote=True)
+        wait_for(lambda: watcher.swaps == 1)
+    finally:
+        watcher.stop()
+
+    assert watcher.current_path == path
+    assert load_feature_schema(path)["columns"] == list(X.columns)
+    selector = watcher.current
+    assert selector.compiled is not None and selector.compiled.n_trees == 7
+    np.testing.assert_array_equal(selector.predict(X.head(3)), second.predict(X.head(3)))
@@ -7,7 +7,7 @@ Unit tests สำหรับโมดูลโมเดล
 import pytest
 import pandas as pd
 import numpy as np
-from project.models.train_model import ModelTrainer
+from project.models.train_model import ModelTrainer, allocate_threads
 from project.models.model_selector import ModelSelector
 from project.models.drift_detector import DriftDetector
 
@@ -70,4 +70,116 @@ def test_drift_detector(sample_data):
 
     # ต้องคืนค่าเป็น dict และมี key 'drift_detected'
     assert isinstance(drift_result, dict)
-    assert "drift_detected" in drift_result
\ No newline at end of file
+    assert "drift_detected" in drift_result
+
+def test_prepare_data_keeps_time_order(sample_data):
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    X_train, X_test, y_train, y_test = trainer.prepare_data()
+
+    # test ต้องเป็นแถวท้ายสุด (ไม่มีแท่งอนาคตใน train)
+    assert X_train.index.max() < X_test.index.min()
+
+
+def test_model_trainer_walk_forward(sample_data):
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    results, models = trainer.walk_forward(model="xgboost", n_splits=3, purge=1, max_workers=1,
+                                           return_models=True)
+
+    assert len(results) == 3 and len(models) == 3
+    assert (results["train_end"] <= results["test_start"] - 1).all()
+
+
+def test_allocate_threads():
+    # แบ่ง core ไม่ให้เกินจำนวน core และทุกโมเดลได้อย่างน้อย 1 thread
+    assert allocate_threads(["xgboost", "lightgbm", "lstm"], n_cpu=8) == {"xgboost": 3, "lightgbm": 3, "lstm": 2}
+    assert allocate_threads(["xgboost", "lightgbm", "lstm"], n_cpu=8, threads={"lstm": 4}) == {
+        "xgboost": 2, "lightgbm": 2, "lstm": 4,
+    }
+    assert allocate_threads(["xgboost", "lightgbm"], n_cpu=1) == {"xgboost": 1, "lightgbm": 1}
+
+
+def test_train_all_concurrent(sample_data):
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    X_train, X_test, y_train, y_test = trainer.prepare_data()
+    _, expected = trainer.train_lightgbm(X_train, y_train, X_test, y_test)
+
+    selector = trainer.train_all(models=["xgboost", "lightgbm"], max_workers=2)
+    assert isinstance(selector, ModelSelector)
+    assert list(selector.models) == ["xgboost", "lightgbm"]
+    # train คนละ process ได้ผลเท่ากับ train ใน process นี้
+    assert selector.metrics["lightgbm"] == expected
+    assert set(trainer.train_timings) == {"xgboost", "lightgbm"}
+
+
+@pytest.fixture
+def two_models(sample_data):
+    trainer = ModelTrainer(sample_data, target_col="direction")
+    X_train, X_test, y_train, y_test = trainer.prepare_data()
+    models = {
+        "xgboost": trainer.train_xgboost(X_train, y_train, X_test, y_test)[0],
+        "lightgbm": trainer.train_lightgbm(X_train, y_train, X_test, y_test)[0],
+    }
+    return ModelSelector(models, {name: {} for name in models}), X_test
+
+
+def test_soft_voting_matches_weighted_mean(two_models):
+    selector, X = two_models
+    weights = selector.params["ensemble"]["weights"]
+    expected = sum(weights[name] * model.predict_proba(X)[:, 1] for name, model in selector.models.items())
+    expected /= weights["xgboost"] + weights["lightgbm"]
+
+    sequential = selector.ensemble_predict_proba(X, parallel=False)
+    np.testing.assert_allclose(sequential, expected, rtol=1e-6)
+    # thread pool ได้ผลเท่ากัน
+    np.testing.assert_allclose(selector.ensemble_predict_proba(X, parallel=True), sequential)
+    np.testing.assert_array_equal(selector.ensemble_predict(X, voting="soft"), (sequential > 0.5).astype(int))
+    selector.close()
+
+
+def test_default_voting_is_hard(two_models):
+    selector, X = two_models
+    # soft voting ต้องเปิดเอง (voting="soft" หรือ ensemble.voting ใน model_params.yaml)
+    assert selector.params["ensemble"]["voting"] == "hard"
+    np.testing.assert_array_equal(selector.ensemble_predict(X), selector.ensemble_predict(X, voting="hard"))
+
+
+def test_soft_voting_reuses_buffer(two_models):
+    selector, X = two_models
+    selector.ensemble_predict_proba(X)
+    buffer = selector._proba_buffer
+    # batch เล็กกว่าเดิม (เช่นแถวเดียวตอน live) ใช้ buffer เดิม และผลไม่ติดค่าจากรอบก่อน
+    single = selector.ensemble_predict_proba(X.tail(1))
+    assert selector._proba_buffer is buffer
+    np.testing.assert_allclose(single, selector.ensemble_predict_proba(X)[-1:])
+
+
+def test_soft_voting_reorders_columns(two_models):
+    selector, X = two_models
+    np.testing.assert_allclose(selector.ensemble_predict_proba(X[X.columns[::-1]]),
+                               selector.ensemble_predict_proba(X))
+
+
+def test_save_best_model_invalid_schema_writes_nothing(tmp_path):
+    from project.features.feature_schema import load_feature_schema
+    from project.models.model_backends import get_backend
+    from project.models.model_cache import load_model
+    from project.models.tree_compiler import compiled_path_for
+
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.normal(size=(300, 4)), columns=["rsi", "atr", "macd_diff", "close"])
+    y = (X["rsi"] > 0).astype(int)
+    xgboost = get_backend("xgboost")
+    first = xgboost.fit({"n_estimators": 5}, X, y, n_jobs=1)
+    selector = ModelSelector({"xgboost": first}, {"xgboost": {}})
+    selector.config["pipeline"]["outputs_path"] = str(tmp_path)
+    path = selector.save_best_model(first, "xgboost")
+    files = {p: open(p, "rb").read() for p in [path, compiled_path_for(path)]}
+
+    # คอลัมน์ที่ graph ไม่รู้จัก -> raise ก่อนเขียน .pkl (ไฟล์ของโมเดลตัวก่อนยังครบชุดเดิม)
+    unknown = xgboost.fit({"n_estimators": 5}, X.set_axis(list("abcd"), axis=1), y, n_jobs=1)
+    with pytest.raises(KeyError):
+        selector.save_best_model(unknown, "xgboost")
+    for p, content in files.items():
+        assert open(p, "rb").read() == content
+    assert load_feature_schema(path)["columns"] == list(X.columns)
+    assert load_model(path).get_booster().feature_names == list(X.columns)
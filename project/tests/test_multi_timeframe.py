@@ -0,0 +1,64 @@
+"""
+test_multi_timeframe.py
+-----------------------
+Unit tests สำหรับฟีเจอร์หลาย timeframe
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.features.feature_graph import build_feature_graph
+from project.features.multi_timeframe import add_multi_timeframe_features, MultiTimeframeStream
+
+
+@pytest.fixture
+def m15_data():
+    rng = np.random.default_rng(11)
+    n = 96 * 40
+    close = 1.60 + np.cumsum(rng.normal(0, 0.0005, n))
+    df = pd.DataFrame({
+        "datetime": pd.date_range("2025-01-01", periods=n, freq="15min"),
+        "open": np.r_[close[0], close[:-1]],
+        "high": close + rng.uniform(0, 0.0005, n),
+        "low": close - rng.uniform(0, 0.0005, n),
+        "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+    # ตัดเสาร์-อาทิตย์ และทำให้มีแท่งหายบางแท่ง
+    df = df[df["datetime"].dt.dayofweek < 5].drop(index=[200, 201, 777])
+    return df.reset_index(drop=True)
+
+
+def test_no_lookahead(m15_data):
+    full = add_multi_timeframe_features(m15_data, timeframes=["H1", "H4", "D1"], base_timeframe="M15")
+
+    # ตัดข้อมูลอนาคตทิ้ง ค่าในอดีตต้องไม่เปลี่ยน
+    cut = 1500
+    partial = add_multi_timeframe_features(m15_data.iloc[:cut], timeframes=["H1", "H4", "D1"],
+                                           base_timeframe="M15")
+    pd.testing.assert_frame_equal(partial, full.iloc[:cut])
+
+    # แท่ง 10:00 (ปิด 10:15) เห็นแท่ง H1 09:00-10:00 แต่ยังไม่เห็นแท่ง 10:00-11:00
+    row_1000 = full.index[full["datetime"] == pd.Timestamp("2025-01-02 10:00")][0]
+    row_1045 = full.index[full["datetime"] == pd.Timestamp("2025-01-02 10:45")][0]
+    assert full.loc[row_1000, "h1_rsi"] == full.loc[row_1000 - 1, "h1_rsi"]
+    assert full.loc[row_1045, "h1_rsi"] != full.loc[row_1000, "h1_rsi"]
+
+
+def test_stream_matches_batch(m15_data):
+    batch = add_multi_timeframe_features(m15_data, timeframes=["H1", "H4", "D1"], base_timeframe="M15")
+
+    stream = MultiTimeframeStream(timeframes=["H1", "H4", "D1"], base_timeframe="M15")
+    rows = pd.DataFrame([stream.update(candle) for candle in m15_data.to_dict("records")])
+
+    for col in rows.columns:
+        np.testing.assert_allclose(rows[col].to_numpy(dtype=float), batch[col].to_numpy(dtype=float),
+                                   rtol=1e-8, atol=1e-10, err_msg=col)
+
+
+def test_skips_disabled_indicators(m15_data):
+    # indicator ที่ปิดใน config ต้องไม่ถูกขอจาก timeframe ใหญ่
+    graph = build_feature_graph({"features": {"indicators": ["RSI"]}})
+    df = add_multi_timeframe_features(m15_data, timeframes=["H1"], base_timeframe="M15", graph=graph)
+    assert "h1_rsi" in df.columns
+    assert "h1_macd" not in df.columns
@@ -0,0 +1,192 @@
+"""
+test_onnx_backend.py
+--------------------
+Unit tests สำหรับ ONNX export + ทำนายด้วย onnxruntime (เทียบกับ backend เดิม)
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnxmltools")
+
+from project.features.feature_graph import build_feature_graph
+from project.models.model_backends import get_backend
+from project.models.model_selector import ModelSelector
+from project.models.onnx_backend import (
+    OnnxModel, SessionPool, default_pool, export_onnx, export_onnx_for, onnx_path_for,
+)
+from project.utils.model_versioning import load_model_with_metadata, save_model_with_metadata
+
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(800, 5)), columns=["rsi", "macd_diff", "atr", "volume", "close"])
+    y = (X["rsi"] + 0.5 * X["macd_diff"] * X["atr"] + rng.normal(scale=0.5, size=800) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def pool():
+    return SessionPool(max_sessions=2)
+
+
+@pytest.mark.parametrize("name", ["xgboost", "lightgbm"])
+def test_onnx_matches_native(name, sample_data, pool, tmp_path):
+    X, y = sample_data
+    backend = get_backend(name)
+    model = backend.fit({"n_estimators": 60, "verbose": -1} if name == "lightgbm" else {"n_estimators": 60},
+                        X, y, n_jobs=1)
+    path = export_onnx(model, str(tmp_path / f"{name}.onnx"))
+
+    onnx_model = OnnxModel(path, pool=pool)
+    assert onnx_model.backend == name
+    assert onnx_model.feature_names == list(X.columns)
+    # onnxruntime คำนวณใน float32
+    np.testing.assert_allclose(onnx_model.predict_proba(X), model.predict_proba(X), atol=1e-5)
+    assert (onnx_model.predict(X) == backend.predict(model, X)).mean() > 0.99
+    # คอลัมน์สลับลำดับ -> เลือกตาม feature_names
+    np.testing.assert_allclose(onnx_model.predict_proba(X[X.columns[::-1]]), model.predict_proba(X), atol=1e-5)
+
+
+def test_lstm_export(sample_data, pool, tmp_path):
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("tf2onnx")
+    X, y = sample_data
+    backend = get_backend("lstm")
+    params = {"hidden_units": 8, "dropout": 0.0, "learning_rate": 0.01, "epochs": 1, "batch_size": 64}
+    model = backend.fit(params, X.to_numpy(np.float32), y.to_numpy(), n_jobs=1)
+    path = export_onnx(model, str(tmp_path / "lstm.onnx"), feature_names=list(X.columns))
+
+    onnx_model = OnnxModel(path, pool=pool)
+    expected = model.predict(np.expand_dims(X.to_numpy(np.float32), axis=1), verbose=0).reshape(-1)
+    np.testing.assert_allclose(onnx_model.predict_proba(X)[:, 1], expected, atol=1e-5)
+
+
+def test_session_pool_reuses_and_reloads(sample_data, pool, tmp_path):
+    X, y = sample_data
+    backend = get_backend("xgboost")
+    path = export_onnx(backend.fit({"n_estimators": 5}, X, y, n_jobs=1), str(tmp_path / "model.onnx"))
+    first = OnnxModel(path, pool=pool)
+    session = first.session
+    assert pool.get(path) is session
+    assert len(pool) == 1
+
+    # เขียนทับไฟล์ -> session ใหม่แทนตัวเก่า
+    export_onnx(backend.fit({"n_estimators": 20}, X, y, n_jobs=1), path)
+    os.utime(path, (0, os.path.getmtime(path) + 10))
+    assert first.session is not session
+    assert len(pool) == 1
+
+
+def test_unsupported_backend_removes_old_file(sample_data, tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = sample_data
+    model_path = str(tmp_path / "best.pkl")
+    assert export_onnx_for(get_backend("xgboost").fit({"n_estimators": 5}, X, y, n_jobs=1), model_path)
+    assert export_onnx_for(LogisticRegression().fit(X, y), model_path) is None
+    assert not os.path.exists(onnx_path_for(model_path))
+
+
+def test_selector_onnx_runtime_without_frameworks(sample_data, tmp_path):
+    X, y = sample_data
+    model = get_backend("lightgbm").fit({"n_estimators": 30, "verbose": -1}, X, y, n_jobs=1)
+    model_path = str(tmp_path / "best_model.pkl")
+    export_onnx_for(model, model_path)
+    X.to_csv(tmp_path / "X.csv", index=False)
+
+    # process ใหม่ที่ serving ด้วย onnxruntime ต้องไม่ import framework ของโมเดล
+    script = (
+        "import sys, pandas as pd\n"
+        "from project.models.model_selector import ModelSelector\n"
+        f"selector = ModelSelector.load_best_model({model_path!r}, runtime='onnx')\n"
+        f"pred = selector.predict(pd.read_csv({str(tmp_path / 'X.csv')!r}))\n"
+        "print('pred:' + ''.join(map(str, pred)))\n"
+        "print('loaded:' + ','.join(m for m in ['xgboost', 'lightgbm', 'tensorflow'] if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    lines = dict(line.split(":", 1) for line in out.stdout.splitlines() if line.startswith(("pred:", "loaded:")))
+    assert lines["loaded"] == ""
+    assert lines["pred"] == "".join(map(str, model.predict(X)))
+
+
+def test_selector_native_runtime(sample_data, tmp_path):
+    import joblib
+
+    X, y = sample_data
+    model = get_backend("xgboost").fit({"n_estimators": 10}, X, y, n_jobs=1)
+    model_path = str(tmp_path / "best_model.pkl")
+    joblib.dump(model, model_path)
+    selector = ModelSelector.load_best_model(model_path, runtime="native")
+    assert list(selector.models) == ["xgboost"]
+    np.testing.assert_array_equal(selector.predict(X.tail(1)), model.predict(X.tail(1)))
+
+    with pytest.raises(FileNotFoundError):
+        ModelSelector.load_best_model(str(tmp_path / "missing.pkl"))
+
+
+def test_selector_ignores_stale_onnx(sample_data, tmp_path):
+    X, y = sample_data
+    xgboost = get_backend("xgboost")
+    first = xgboost.fit({"n_estimators": 10}, X, y, n_jobs=1)
+    second = xgboost.fit({"n_estimators": 10, "max_depth": 1}, X, 1 - y, n_jobs=1)
+    selector = ModelSelector({"xgboost": first}, {"xgboost": {}})
+    selector.config["pipeline"]["outputs_path"] = str(tmp_path)
+
+    selector.config["model"].setdefault("onnx", {})["export"] = True
+    path = selector.save_best_model(first, "xgboost")
+    assert os.path.exists(onnx_path_for(path))
+    # ปิด export -> ลบ .onnx ของโมเดลตัวก่อน
+    selector.config["model"]["onnx"]["export"] = False
+    selector.save_best_model(second, "xgboost")
+    assert not os.path.exists(onnx_path_for(path))
+
+    # .onnx เก่ากว่า .pkl (เขียน .pkl ใหม่โดยไม่ export) -> โหลด .pkl แทน
+    export_onnx_for(first, path)
+    stale = os.path.getmtime(path) - 60
+    os.utime(onnx_path_for(path), (stale, stale))
+    loaded = ModelSelector.load_best_model(path, runtime="onnx")
+    assert not isinstance(loaded.models["xgboost"], OnnxModel)
+    np.testing.assert_array_equal(loaded.predict(X), second.predict(X))
+
+
+def test_model_versioning_export(sample_data, tmp_path, monkeypatch):
+    X, y = sample_data
+    model = get_backend("xgboost").fit({"n_estimators": 10}, X, y, n_jobs=1)
+    graph = build_feature_graph()
+    default_pool()  # อ่าน config.yaml ก่อนเปลี่ยน cwd
+    # model_versioning เขียนไปที่ project/models/versions/ (relative) -> ย้ายไป tmp
+    monkeypatch.chdir(tmp_path)
+    _, meta_path = save_model_with_metadata(model, {"accuracy": 1.0}, env="test", version="v1", graph=graph,
+                                            export_onnx=True)
+
+    onnx_model, metadata = load_model_with_metadata(env="test", version="v1", runtime="onnx")
+    assert metadata["onnx"] == "model_v1.onnx"
+    assert isinstance(onnx_model, OnnxModel)
+    np.testing.assert_allclose(onnx_model.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+
+def test_trainer_save_model_without_df(sample_data, tmp_path):
+    from project.models.train_model import ModelTrainer
+
+    X, y = sample_data
+    trainer = ModelTrainer(X.assign(direction=y))
+    trainer.config["pipeline"]["outputs_path"] = str(tmp_path)
+    model = get_backend("xgboost").fit({"n_estimators": 5}, X, y, n_jobs=1)
+
+    # เหมือน worker ของ train_all: ไม่มี df -> ชื่อคอลัมน์มาจากโมเดลที่ fit แล้ว
+    trainer.df = None
+    path = trainer.save_model(model, "xgboost", export_onnx=True)
+    onnx_model = OnnxModel(onnx_path_for(path), pool=SessionPool(max_sessions=1))
+    np.testing.assert_allclose(onnx_model.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+    # ปิด export -> ไม่เหลือ .onnx ของโมเดลตัวก่อน
+    trainer.save_model(model, "xgboost", export_onnx=False)
+    assert not os.path.exists(onnx_path_for(path))
@@ -0,0 +1,106 @@
+"""
+test_tick_aggregator.py
+-----------------------
+Unit tests สำหรับ TickAggregator และ ReplayTickSource
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from project.prediction.tick_aggregator import ReplayTickSource, TickAggregator
+
+
+@pytest.fixture
+def ticks():
+    # tick ห่างกัน 0.05-2 วินาที ประมาณ 3 ชั่วโมง
+    rng = np.random.default_rng(1)
+    n = 20_000
+    times = pd.Timestamp("2025-01-06").value + np.cumsum(rng.integers(50, 1000, n)) * 1_000_000
+    mid = 1.60 + np.cumsum(rng.normal(0, 0.00002, n))
+    return pd.DataFrame({
+        "datetime": pd.to_datetime(times),
+        "bid": mid - 0.00005,
+        "ask": mid + 0.00005,
+    })
+
+
+def expected_bars(ticks, freq):
+    mid = pd.Series(((ticks["bid"] + ticks["ask"]) * 0.5).to_numpy(), index=ticks["datetime"])
+    bars = mid.resample(freq).ohlc()
+    bars["volume"] = mid.resample(freq).count().astype(float)
+    return bars.dropna().reset_index()
+
+
+@pytest.mark.parametrize("timeframe, freq", [("M1", "1min"), ("M15", "15min")])
+def test_bars_match_resample(ticks, timeframe, freq):
+    closed = []
+    aggregator = TickAggregator(timeframes=["M1", "M15"], history=10_000,
+                                on_bar=lambda tf, bar: closed.append((tf, bar)))
+    aggregator.run(ReplayTickSource(ticks))
+    aggregator.flush()
+
+    df = aggregator.to_frame(timeframe)
+    expected = expected_bars(ticks, freq)
+    assert len(df) == len(expected)
+    assert (df["datetime"].to_numpy() == expected["datetime"].to_numpy()).all()
+    for col in ["open", "high", "low", "close", "volume"]:
+        np.testing.assert_allclose(df[col], expected[col], rtol=0, atol=1e-12)
+
+    # callback ถูกเรียกครบทุกแท่ง และแท่ง M1 ปิดก่อนแท่ง M15 ที่ครอบมัน
+    assert sum(tf == timeframe for tf, _ in closed) == len(expected)
+    first_m15 = next(i for i, (tf, _) in enumerate(closed) if tf == "M15")
+    assert closed[first_m15 - 1][0] == "M1"
+
+
+def test_out_of_order_ticks_are_skipped():
+    aggregator = TickAggregator(timeframes=["M1"])
+    t0 = pd.Timestamp("2025-01-06 10:00").value
+    aggregator.push(t0, 1.60, 1.60)
+    aggregator.push(t0 + 61 * 10**9, 1.61, 1.61)
+    aggregator.push(t0 + 5 * 10**9, 1.70, 1.70)  # ย้อนไปแท่งที่ปิดแล้ว
+
+    assert aggregator.stats["out_of_order"] == 1
+    assert aggregator.bars["M1"][-1]["high"] == 1.60
+
+
+def test_flush_closes_bar_on_timer():
+    closed = []
+    aggregator = TickAggregator(timeframes=["M1", "M15"], on_bar=lambda tf, bar: closed.append(tf))
+    t0 = pd.Timestamp("2025-01-06 10:14:30").value
+    aggregator.push(t0, 1.60, 1.60)
+
+    aggregator.flush(t0 + 10 * 10**9)  # ยังอยู่ในนาทีเดิม
+    assert closed == []
+    aggregator.flush(t0 + 40 * 10**9)  # ข้ามไป 10:15 -> ปิดทั้ง M1 และ M15
+    assert closed == ["M1", "M15"]
+
+
+def test_late_tick_after_flush_does_not_duplicate_bar():
+    closed = []
+    aggregator = TickAggregator(timeframes=["M1", "M15"], on_bar=lambda tf, bar: closed.append((tf, bar)))
+    t0 = pd.Timestamp("2025-01-06 10:14:30").value
+    aggregator.push(t0, 1.60, 1.60)
+    aggregator.flush(t0 + 31 * 10**9)  # timer ปิดแท่ง 10:14 ก่อน tick สุดท้ายของแท่งมาถึง
+
+    aggregator.push(t0 + 20 * 10**9, 1.70, 1.70)  # tick ช้าของแท่ง 10:14 ที่ปิดไปแล้ว
+    aggregator.push(t0 + 45 * 10**9, 1.61, 1.61)  # แท่ง 10:15
+    aggregator.flush()
+
+    assert aggregator.stats["out_of_order"] == 1
+    starts = [bar["datetime"] for tf, bar in closed if tf == "M1"]
+    assert starts == [pd.Timestamp("2025-01-06 10:14"), pd.Timestamp("2025-01-06 10:15")]
+    assert aggregator.bars["M1"][0]["high"] == 1.60
+    assert [bar["datetime"] for tf, bar in closed if tf == "M15"] == [pd.Timestamp("2025-01-06 10:00"),
+                                                                    pd.Timestamp("2025-01-06 10:15")]
+
+
+def test_history_is_bounded(ticks):
+    aggregator = TickAggregator(timeframes=["M1"], history=50)
+    aggregator.run(ReplayTickSource(ticks))
+    assert len(aggregator.bars["M1"]) == 50
+    assert aggregator.stats["bars"]["M1"] > 50
+
+
+def test_invalid_price_raises():
+    with pytest.raises(ValueError):
+        TickAggregator(timeframes=["M1", "M15"], price="last")
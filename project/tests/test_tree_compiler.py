@@ -0,0 +1,119 @@
+"""
+test_tree_compiler.py
+---------------------
+Unit tests สำหรับ tree_compiler (ทำนายด้วยต้นไม้แบบ array เทียบกับ XGBoost / LightGBM)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+import xgboost as xgb
+
+from project.models.tree_compiler import (
+    CompiledTrees, compile_model, compiled_path_for, load_compiled, save_compiled,
+)
+
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(1500, 6)), columns=[f"f{i}" for i in range(6)])
+    y = (X["f0"] + 0.5 * X["f1"] * X["f2"] + rng.normal(scale=0.5, size=1500) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def with_missing(sample_data):
+    # ค่าหาย (NaN) และศูนย์ปนในข้อมูล
+    X, y = sample_data
+    X = X.copy()
+    rng = np.random.default_rng(1)
+    X = X.mask(rng.random(X.shape) < 0.1)
+    X.loc[rng.random(len(X)) < 0.1, "f3"] = 0.0
+    return X, y
+
+
+def assert_same_predictions(model, compiled, X, atol):
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, atol=atol)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    # ทางเร็วแบบแถวเดียว
+    for i in range(0, len(X), 97):
+        row = X.iloc[[i]]
+        assert compiled.predict_row(row.to_numpy()[0]) == pytest.approx(expected[i, 1], abs=atol)
+        np.testing.assert_allclose(compiled.predict_proba(row), expected[[i]], atol=atol)
+
+
+@pytest.mark.parametrize("data", ["sample_data", "with_missing"])
+def test_xgboost_matches_predict_proba(data, request):
+    X, y = request.getfixturevalue(data)
+    model = xgb.XGBClassifier(n_estimators=80, max_depth=5, n_jobs=1).fit(X, y)
+    compiled = compile_model(model)
+    assert compiled.n_trees == 80
+    assert compiled.max_depth == 5
+    assert_same_predictions(model, compiled, X, atol=1e-6)
+
+
+@pytest.mark.parametrize("data", ["sample_data", "with_missing"])
+def test_lightgbm_matches_predict_proba(data, request):
+    X, y = request.getfixturevalue(data)
+    model = lgb.LGBMClassifier(n_estimators=80, num_leaves=31, n_jobs=1, verbose=-1).fit(X, y)
+    compiled = compile_model(model)
+    assert compiled.n_trees == 80
+    assert_same_predictions(model, compiled, X, atol=1e-12)
+
+
+def test_lightgbm_zero_as_missing(with_missing):
+    X, y = with_missing
+    model = lgb.LGBMClassifier(n_estimators=50, zero_as_missing=True, n_jobs=1, verbose=-1).fit(X, y)
+    compiled = compile_model(model)
+    assert compiled.zero_missing is not None
+    assert_same_predictions(model, compiled, X, atol=1e-12)
+
+
+def test_xgboost_early_stopping_uses_best_iteration(sample_data):
+    X, y = sample_data
+    model = xgb.XGBClassifier(n_estimators=300, learning_rate=0.5, early_stopping_rounds=5, n_jobs=1)
+    model.fit(X[:1000], y[:1000], eval_set=[(X[1000:], y[1000:])], verbose=False)
+    compiled = compile_model(model)
+    assert compiled.n_trees == model.best_iteration + 1
+    assert_same_predictions(model, compiled, X, atol=1e-6)
+
+
+def test_feature_names_reorder_columns(sample_data):
+    X, y = sample_data
+    model = lgb.LGBMClassifier(n_estimators=20, n_jobs=1, verbose=-1).fit(X, y)
+    compiled = compile_model(model)
+    # คอลัมน์สลับลำดับ -> เลือกตาม feature_names
+    np.testing.assert_allclose(compiled.predict_proba(X[X.columns[::-1]]), model.predict_proba(X), atol=1e-12)
+
+
+def test_save_and_load(sample_data, tmp_path):
+    X, y = sample_data
+    model = xgb.XGBClassifier(n_estimators=30, n_jobs=1).fit(X, y)
+    model_path = str(tmp_path / "xgboost_best.pkl")
+    open(model_path, "wb").close()
+
+    path = save_compiled(model, model_path)
+    assert path == compiled_path_for(model_path)
+    loaded = CompiledTrees.load(path)
+    assert loaded.feature_names == list(X.columns)
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), atol=1e-6)
+    # ไฟล์ใหม่กว่าโมเดล -> โหลดจากไฟล์โดยไม่ต้องมีโมเดล
+    assert load_compiled(model_path) is not None
+
+
+def test_unsupported_model(sample_data, tmp_path):
+    X, y = sample_data
+    multiclass = xgb.XGBClassifier(n_estimators=5, n_jobs=1).fit(X, np.arange(len(y)) % 3)
+    with pytest.raises(ValueError):
+        compile_model(multiclass)
+    with pytest.raises(ValueError):
+        compile_model(object())
+
+    # โมเดลที่ compile ไม่ได้ -> ลบไฟล์ของโมเดลตัวก่อน
+    model_path = str(tmp_path / "best.pkl")
+    save_compiled(xgb.XGBClassifier(n_estimators=5, n_jobs=1).fit(X, y), model_path)
+    assert save_compiled(multiclass, model_path) is None
+    assert load_compiled(model_path, multiclass) is None
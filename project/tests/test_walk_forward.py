@@ -0,0 +1,83 @@
+"""
+test_walk_forward.py
+--------------------
+Unit tests สำหรับ walk-forward cross-validation (purge / embargo / fold ขนาน)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from project.models.walk_forward import evaluate_predictions, make_model, run_walk_forward, walk_forward_splits
+
+PARAMS = {"n_estimators": 20, "max_depth": 3, "learning_rate": 0.1, "random_state": 42}
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(3)
+    n = 1200
+    X = pd.DataFrame({"f1": rng.normal(size=n), "f2": rng.normal(size=n), "f3": rng.normal(size=n)})
+    y = (X["f1"] - 0.5 * X["f2"] + rng.normal(scale=0.5, size=n) > 0).astype(int).to_numpy()
+    return X, y
+
+
+def test_expanding_splits_are_time_ordered():
+    splits = walk_forward_splits(100, n_splits=4, purge=3)
+    assert [test for _, test in splits] == [(20, 40), (40, 60), (60, 80), (80, 100)]
+    for train_ranges, (test_start, _) in splits:
+        # train มีแต่อดีต และเว้น purge แท่งก่อน test
+        assert train_ranges == [(0, test_start - 3)]
+
+
+def test_rolling_and_kfold_splits():
+    rolling = walk_forward_splits(100, n_splits=4, purge=2, mode="rolling", max_train_size=10)
+    assert rolling[-1] == ([(68, 78)], (80, 100))
+
+    kfold = walk_forward_splits(100, n_splits=4, purge=2, embargo=5, mode="kfold")
+    assert kfold[1] == ([(0, 23), (55, 100)], (25, 50))
+    # fold สุดท้ายไม่มีข้อมูลหลัง test
+    assert kfold[-1] == ([(0, 73)], (75, 100))
+
+
+def test_invalid_splits_raise():
+    with pytest.raises(ValueError):
+        walk_forward_splits(10, n_splits=20)
+    with pytest.raises(ValueError):
+        walk_forward_splits(100, n_splits=4, mode="shuffle")
+    with pytest.raises(ValueError):
+        walk_forward_splits(100, n_splits=4, purge=50)
+
+
+@pytest.mark.parametrize("model_name", ["xgboost", "lightgbm"])
+def test_folds_match_direct_training(dataset, model_name):
+    X, y = dataset
+    splits = walk_forward_splits(len(X), n_splits=3, purge=1)
+    results, models = run_walk_forward(X, y, model_name, PARAMS, splits, max_workers=1, return_models=True)
+
+    assert list(results.index) == [0, 1, 2]
+    for k, (train_ranges, (test_start, test_end)) in enumerate(splits):
+        (train_start, train_end), = train_ranges
+        model = make_model(model_name, PARAMS, n_jobs=1)
+        model.fit(X.to_numpy()[train_start:train_end], y[train_start:train_end])
+        expected = evaluate_predictions(y[test_start:test_end], model.predict(X.to_numpy()[test_start:test_end]))
+        assert results.loc[k, "accuracy"] == pytest.approx(expected["accuracy"])
+        assert results.loc[k, "n_train"] == train_end - train_start
+        np.testing.assert_array_equal(models[k].predict(X.to_numpy()[test_start:test_end]),
+                                      model.predict(X.to_numpy()[test_start:test_end]))
+
+
+def test_process_pool_matches_sequential(dataset):
+    X, y = dataset
+    splits = walk_forward_splits(len(X), n_splits=4, purge=2, embargo=3, mode="kfold")
+    sequential, _ = run_walk_forward(X, y, "lightgbm", PARAMS, splits, max_workers=1, n_jobs=1)
+    parallel, _ = run_walk_forward(X, y, "lightgbm", PARAMS, splits, max_workers=2, n_jobs=1)
+
+    metric_cols = ["n_train", "n_test", "accuracy", "f1", "rmse"]
+    pd.testing.assert_frame_equal(parallel[metric_cols], sequential[metric_cols])
+
+
+def test_unsupported_model(dataset):
+    X, y = dataset
+    with pytest.raises(ValueError):
+        run_walk_forward(X, y, "lstm", {}, walk_forward_splits(len(X), n_splits=2), max_workers=1)
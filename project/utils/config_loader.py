@@ -11,14 +11,33 @@
     "config_loader.py\n",
     "----------------\n",
     "Utility สำหรับโหลด config ตาม environment (dev/test/prod)\n",
+    "- config_{env}.yaml เก็บเฉพาะค่าที่ต่างกันตาม environment (path ข้อมูล, path โมเดล, ...)\n",
+    "- ค่าที่เหลือ (timeframe, features, live, pipeline, ...) มาจาก config.yaml\n",
     "\"\"\"\n",
     "\n",
     "import yaml\n",
     "import os\n",
     "\n",
+    "BASE_CONFIG_PATH = \"project/config/config.yaml\"\n",
+    "\n",
+    "\n",
+    "def merge_config(base: dict, override: dict) -> dict:\n",
+    "    \"\"\"\n",
+    "    รวม config สองชั้น: ค่าใน override ทับ base (dict ซ้อนกันจะรวมทีละ key)\n",
+    "    ไม่แก้ไข dict ที่ส่งเข้ามา\n",
+    "    \"\"\"\n",
+    "    merged = dict(base)\n",
+    "    for key, value in override.items():\n",
+    "        if isinstance(value, dict) and isinstance(merged.get(key), dict):\n",
+    "            merged[key] = merge_config(merged[key], value)\n",
+    "        else:\n",
+    "            merged[key] = value\n",
+    "    return merged\n",
+    "\n",
+    "\n",
     "def load_config(env=\"dev\"):\n",
     "    \"\"\"\n",
-    "    โหลดไฟล์ config ตาม environment\n",
+    "    โหลดไฟล์ config ตาม environment (config_{env}.yaml ทับค่าใน config.yaml)\n",
     "    Args:\n",
     "        env (str): \"dev\", \"test\", หรือ \"prod\"\n",
     "    Returns:\n",
@@ -28,8 +47,10 @@
     "    if not os.path.exists(path):\n",
     "        raise FileNotFoundError(f\"Config file not found: {path}\")\n",
     "\n",
+    "    with open(BASE_CONFIG_PATH, \"r\") as f:\n",
+    "        base = yaml.safe_load(f) or {}\n",
     "    with open(path, \"r\") as f:\n",
-    "        return yaml.safe_load(f)"
+    "        return merge_config(base, yaml.safe_load(f) or {})"
    ]
   }
  ],
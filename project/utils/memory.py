@@ -0,0 +1,144 @@
+"""
+memory.py
+---------
+Utility สำหรับโหมดประหยัดหน่วยความจำ (low-memory mode)
+- downcast คอลัมน์ฟีเจอร์ float64 -> float32 และ flag (bool / COMPACT_DTYPES) -> int8
+- วัด peak memory ของแต่ละขั้นตอนด้วย tracemalloc (NumPy/pandas ลงทะเบียน allocation กับ tracemalloc)
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# คอลัมน์ราคาดิบคงเป็น float64 เสมอ (ใช้เทียบ touch/threshold ที่ละเอียดระดับ pip)
+RAW_PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+# dtype ของคอลัมน์ flag ที่คำนวณเป็น integer (0/1) ในโหมด low-memory
+# เลือกตามชื่อคอลัมน์ ไม่ดูจากค่าใน chunk (ทุก chunk / ทุกรอบได้ dtype เดียวกัน)
+COMPACT_DTYPES = {
+    "bullish_engulfing": np.int8,
+    "volume_spike": np.int8,
+}
+
+
+def compact_array(values: np.ndarray, column: str = None) -> np.ndarray:
+    """
+    แปลง array เป็น dtype ที่เล็กที่สุดที่ใช้ในโหมด low-memory
+
+    dtype ขึ้นกับชนิดที่ประกาศไว้เท่านั้น (ไม่ขึ้นกับช่วงค่าใน array)
+    - column อยู่ใน COMPACT_DTYPES -> dtype ตามที่กำหนด
+    - float64 -> float32
+    - bool -> int8
+    - dtype อื่น (รวม integer ที่ไม่ได้ประกาศ) หรือไม่ใช่ np.ndarray (เช่น pd.Categorical)
+      คืนค่าเดิม (ไม่ copy)
+    """
+    if not isinstance(values, np.ndarray):
+        return values
+    if column in COMPACT_DTYPES and values.dtype.kind in "biu":
+        return values.astype(COMPACT_DTYPES[column], copy=False)
+    if values.dtype == np.float64:
+        return values.astype(np.float32)
+    if values.dtype == np.bool_:
+        return values.astype(np.int8)
+    return values
+
+
+def downcast_features(df: pd.DataFrame, exclude=None) -> pd.DataFrame:
+    """
+    downcast คอลัมน์ฟีเจอร์ใน df แบบ in-place (แทนที่ทีละคอลัมน์ ไม่สร้าง frame ใหม่)
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame ที่ต้องการลดขนาด
+    exclude : list
+        คอลัมน์ที่ไม่แปลง (None = RAW_PRICE_COLUMNS)
+
+    Returns
+    -------
+    pd.DataFrame
+        df เดิม
+    """
+    exclude = set(RAW_PRICE_COLUMNS if exclude is None else exclude)
+    for col in df.columns:
+        if col in exclude or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        values = df[col].to_numpy()
+        compact = compact_array(values, col)
+        if compact is not values:
+            df[col] = compact
+    return df
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """ขนาดของ DataFrame (MB) รวม index"""
+    return df.memory_usage(index=True, deep=True).sum() / 1e6
+
+
+class MemoryProfiler:
+    def __init__(self, enabled: bool = True):
+        """
+        วัด peak memory และเวลาของแต่ละขั้นตอนใน pipeline
+
+        Parameters
+        ----------
+        enabled : bool
+            False = ไม่วัดอะไร (stage() เป็น no-op, ไม่มี overhead ของ tracemalloc)
+        """
+        self.enabled = enabled
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        ใช้กับ with: วัด peak memory ระหว่างขั้นตอน (MB, เทียบกับตอนเริ่มขั้นตอน)
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages[name] = {
+                "peak_mb": round((peak - base) / 1e6, 2),
+                "retained_mb": round((current - base) / 1e6, 2),
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+            if started_here:
+                tracemalloc.stop()
+
+    def report(self) -> pd.DataFrame:
+        """ตารางสรุปทุกขั้นตอน (index = ชื่อขั้นตอน)"""
+        return pd.DataFrame.from_dict(self.stages, orient="index")
+
+    def summary(self) -> str:
+        """สรุปแบบบรรทัดเดียวสำหรับ AuditLogger"""
+        return ", ".join(
+            f"{name}: peak={s['peak_mb']}MB retained={s['retained_mb']}MB"
+            for name, s in self.stages.items()
+        )
+
+
+# ============================
+# ตัวอย่างการใช้งาน
+# ============================
+if __name__ == "__main__":
+    profiler = MemoryProfiler()
+    with profiler.stage("float64"):
+        df = pd.DataFrame({"close": np.random.rand(1_000_000), "rsi": np.random.rand(1_000_000) * 100})
+    with profiler.stage("downcast"):
+        downcast_features(df)
+    print(df.dtypes)
+    print(profiler.report())
@@ -6,12 +6,63 @@ Utility สำหรับบันทึกและโหลดโมเดล
 
 import os
 import json
-import joblib
 from datetime import datetime
 
-def save_model_with_metadata(model, metrics, drift_result=None, env="prod", version=None):
+from project.features.feature_schema import (
+    build_feature_schema, model_feature_names, save_feature_schema, schema_path_for,
+)
+from project.models.model_cache import dump_model, load_model
+from project.models.onnx_backend import OnnxModel, export_onnx_for, onnx_path_for
+from project.models.tree_compiler import compile_model, compiled_path_for
+from project.utils.config_loader import load_config
+
+
+def promoted_model_path(env="prod") -> str:
+    """ไฟล์โมเดลที่ live ของ env ใช้และ ModelWatcher เฝ้า (model.save_path + best_model.pkl)"""
+    return load_config(env=env)["model"]["save_path"] + "best_model.pkl"
+
+
+def promote_model(model, model_path, feature_columns=None, graph=None) -> str:
+    """
+    เลื่อนโมเดลขึ้นเป็นโมเดลที่ live ใช้: เขียนทับ model_path แบบ atomic พร้อมไฟล์คู่
+
+    feature schema และต้นไม้ที่ compile สร้างก่อนเขียน (schema สร้างไม่ได้ -> raise โดยไม่แตะไฟล์เดิม)
+    .features.json เขียนก่อน .pkl: ModelWatcher เห็น .pkl ใหม่เมื่อ schema ของมันพร้อมแล้ว
+    .trees.npz เขียนหลัง .pkl (load_compiled ใช้เฉพาะไฟล์ที่ไม่เก่ากว่า .pkl) และลบ .onnx ของโมเดลตัวก่อน
+    """
+    feature_columns = feature_columns if feature_columns is not None else model_feature_names(model)
+    schema = build_feature_schema(feature_columns, graph=graph) if feature_columns is not None else None
+    try:
+        compiled = compile_model(model)
+    except ValueError:
+        compiled = None
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    if schema is not None:
+        save_feature_schema(model_path, schema)
+    elif os.path.exists(schema_path_for(model_path)):
+        os.remove(schema_path_for(model_path))
+    if os.path.exists(onnx_path_for(model_path)):
+        os.remove(onnx_path_for(model_path))
+    dump_model(model, model_path)
+    if compiled is not None:
+        compiled.save(compiled_path_for(model_path))
+    elif os.path.exists(compiled_path_for(model_path)):
+        os.remove(compiled_path_for(model_path))
+    print(f"✅ Model promoted to {model_path}")
+    return model_path
+
+
+def save_model_with_metadata(model, metrics, drift_result=None, env="prod", version=None,
+                             feature_columns=None, graph=None, export_onnx=False, promote=False):
     """
     บันทึกโมเดลพร้อม metadata ลงใน project/models/versions/{env}/
+
+    feature_columns = คอลัมน์อินพุตตามลำดับตอน train (None = อ่านจากโมเดล เช่น feature_names_in_)
+    ถ้ารู้คอลัมน์ จะบันทึก feature schema (คอลัมน์ + node ของ feature graph ที่ต้องใช้)
+    ไว้ใน metadata["features"] เพื่อให้ฝั่ง inference คำนวณเฉพาะคอลัมน์เหล่านี้
+    export_onnx = True -> export model_{version}.onnx คู่กัน (ชื่อไฟล์อยู่ใน metadata["onnx"])
+    promote = True -> หลังเขียน metadata แล้ว promote_model ไปที่ไฟล์ที่ live ของ env ใช้ (promoted_model_path)
     """
     version_dir = f"project/models/versions/{env}/"
     os.makedirs(version_dir, exist_ok=True)
@@ -24,7 +75,7 @@ def save_model_with_metadata(model, metrics, drift_result=None, env="prod", vers
     meta_path = os.path.join(version_dir, f"model_{version}.json")
 
     # บันทึกโมเดล
-    joblib.dump(model, model_path)
+    dump_model(model, model_path)
 
     # บันทึก metadata
     metadata = {
@@ -34,16 +85,25 @@ def save_model_with_metadata(model, metrics, drift_result=None, env="prod", vers
         "metrics": metrics,
         "drift_result": drift_result
     }
+    feature_columns = feature_columns if feature_columns is not None else model_feature_names(model)
+    if feature_columns is not None:
+        metadata["features"] = build_feature_schema(feature_columns, graph=graph)
+    if export_onnx:
+        onnx_path = export_onnx_for(model, model_path, feature_names=feature_columns)
+        metadata["onnx"] = os.path.basename(onnx_path) if onnx_path else None
     with open(meta_path, "w") as f:
         json.dump(metadata, f, indent=4)
+    if promote:
+        promote_model(model, promoted_model_path(env), feature_columns=feature_columns, graph=graph)
 
     return model_path, meta_path
 
 
-def load_model_with_metadata(env="prod", version=None):
+def load_model_with_metadata(env="prod", version=None, runtime="native"):
     """
     โหลดโมเดลและ metadata จาก project/models/versions/{env}/
     ถ้าไม่กำหนด version จะโหลดเวอร์ชันล่าสุด
+    runtime = 'onnx' -> คืน OnnxModel ของไฟล์ที่ export ไว้ (ไม่ต้อง import framework ของโมเดล)
     """
     version_dir = f"project/models/versions/{env}/"
 
@@ -61,8 +121,13 @@ def load_model_with_metadata(env="prod", version=None):
     model_path = os.path.join(version_dir, f"model_{version}.pkl")
     meta_path = os.path.join(version_dir, f"model_{version}.json")
 
-    model = joblib.load(model_path)
     with open(meta_path, "r") as f:
         metadata = json.load(f)
+    if runtime == "onnx":
+        if not metadata.get("onnx"):
+            raise FileNotFoundError(f"❌ No ONNX export for version {version}")
+        return OnnxModel(os.path.join(version_dir, metadata["onnx"])), metadata
+    # ผ่าน model cache: โหลดเวอร์ชันเดิมซ้ำใน process เดียวกันไม่ต้อง deserialize ใหม่
+    model = load_model(model_path, env=env, version=version)
 
     return model, metadata
\ No newline at end of file